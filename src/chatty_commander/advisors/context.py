@@ -26,17 +26,36 @@ Tab-aware context switching for advisors.
 This module manages persistent identity and context switching across different
 applications, allowing advisors to maintain appropriate personas and memory
 per application/tab context.
+
+Persistence is a snapshot (``persistence_path``) plus an append-only change
+journal next to it (``<persistence_path>.journal``). Saves append one record
+per dirty context instead of rewriting every context; once the journal holds
+``snapshot_every_records`` records a fresh snapshot is written and the journal
+truncated. Startup loads the snapshot and replays only journal records newer
+than it, stopping at a torn trailing line left by a crash.
+
+:class:`ContextManager` is shared by advisor messages running on the
+dispatcher's worker pool, so every mutation and save happens under one
+re-entrant lock; journal appends therefore land in sequence order.
 """
 
 import json
+import logging
 import os
 import tempfile
+import threading
 import time
 from dataclasses import asdict, dataclass
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from ..obs.metrics import DEFAULT_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+
 
 class PlatformType(Enum):
     """Supported platform types for context switching."""
@@ -125,6 +144,9 @@ class ContextManager:
         """Initialize context manager."""
         self.config = config
         self.contexts: dict[str, ContextState] = {}
+        # Guards ``contexts`` and all persistence bookkeeping. Re-entrant
+        # because mutators save (and expiry clears) while already holding it.
+        self._lock = threading.RLock()
 
         # Support both direct 'personas' key or nested under 'context'
         personas_dict = config.get("personas", {}) or config.get("context", {}).get("personas", {})
@@ -147,6 +169,26 @@ class ContextManager:
         self._changes_since_save = 0
         self._last_save_time = 0.0
 
+        # Journal bookkeeping: keys changed (or deleted) since the last save,
+        # the last journal sequence number written, and how many records the
+        # journal holds past the current snapshot.
+        self.journal_path = Path(f"{self.persistence_path}.journal")
+        self._snapshot_every = max(1, int(config.get("snapshot_every_records", 1000)))
+        self._dirty: set[str] = set()
+        self._seq = 0
+        self._journal_records = 0
+        self._logical_bytes = 0
+        self._physical_bytes = 0
+        self._snapshots = 0
+        self._bytes_written = DEFAULT_REGISTRY.counter(
+            "advisor_context_bytes_written_total",
+            "Bytes written persisting advisor contexts, by kind (journal/snapshot)",
+        )
+        self._amplification = DEFAULT_REGISTRY.gauge(
+            "advisor_context_write_amplification",
+            "Bytes written to disk per byte of changed advisor context state",
+        )
+
         # Opportunistic expiry of inactive contexts on access, gated by a counter
         # so it does not run on every call.
         self._inactive_max_age_hours = float(
@@ -180,8 +222,6 @@ class ContextManager:
         Returns:
             ContextState for the identity
         """
-        self._maybe_expire_inactive()
-
         identity = ContextIdentity(
             platform=platform,
             channel=channel,
@@ -192,39 +232,44 @@ class ContextManager:
 
         context_key = identity.context_key
 
-        if context_key not in self.contexts:
-            # Create new context
-            persona_id = self._resolve_persona_for_context(identity)
-            system_prompt = self.personas.get(persona_id, {}).get("system_prompt", "")
-            memory_key = f"{context_key}:memory"
-
-            context = ContextState(
-                identity=identity,
-                persona_id=persona_id,
-                system_prompt=system_prompt,
-                memory_key=memory_key,
-                last_activity=time.time(),
-                metadata={},
-            )
+        with self._lock:
+            self._maybe_expire_inactive()
 
-            self.contexts[context_key] = context
+            if context_key not in self.contexts:
+                # Create new context
+                persona_id = self._resolve_persona_for_context(identity)
+                system_prompt = self.personas.get(persona_id, {}).get("system_prompt", "")
+                memory_key = f"{context_key}:memory"
 
-            if self.persistence_enabled:
-                self._maybe_save()
+                context = ContextState(
+                    identity=identity,
+                    persona_id=persona_id,
+                    system_prompt=system_prompt,
+                    memory_key=memory_key,
+                    last_activity=time.time(),
+                    metadata={},
+                )
 
-        else:
-            # Update existing context
-            context = self.contexts[context_key]
-            context.last_activity = time.time()
+                self.contexts[context_key] = context
 
-            # Update identity if new info provided
-            if username and username != context.identity.username:
-                context.identity.username = username
+                if self.persistence_enabled:
+                    self._dirty.add(context_key)
+                    self._maybe_save()
 
-            if self.persistence_enabled:
-                self._maybe_save()
+            else:
+                # Update existing context
+                context = self.contexts[context_key]
+                context.last_activity = time.time()
+
+                # Update identity if new info provided
+                if username and username != context.identity.username:
+                    context.identity.username = username
 
-        return self.contexts[context_key]
+                if self.persistence_enabled:
+                    self._dirty.add(context_key)
+                    self._maybe_save()
+
+            return self.contexts[context_key]
 
     def switch_persona(self, context_key: str, persona_id: str) -> bool:
         """
@@ -237,21 +282,23 @@ class ContextManager:
         Returns:
             True if switch successful, False if persona not found
         """
-        if context_key not in self.contexts:
-            return False
+        with self._lock:
+            if context_key not in self.contexts:
+                return False
 
-        if persona_id not in self.personas:
-            return False
+            if persona_id not in self.personas:
+                return False
 
-        context = self.contexts[context_key]
-        context.persona_id = persona_id
-        context.system_prompt = self.personas[persona_id].get("system_prompt", "")
-        context.last_activity = time.time()
+            context = self.contexts[context_key]
+            context.persona_id = persona_id
+            context.system_prompt = self.personas[persona_id].get("system_prompt", "")
+            context.last_activity = time.time()
 
-        if self.persistence_enabled:
-            self._save_contexts()
+            if self.persistence_enabled:
+                self._dirty.add(context_key)
+                self._save_contexts()
 
-        return True
+            return True
 
     def get_context(self, context_key: str) -> ContextState | None:
         """
@@ -268,7 +315,8 @@ class ContextManager:
         return self.contexts.get(context_key)
 
     def list_contexts(self) -> list[ContextState]:
-        return list(self.contexts.values())
+        with self._lock:
+            return list(self.contexts.values())
 
     def clear_context(self, context_key: str) -> bool:
         """
@@ -280,15 +328,17 @@ class ContextManager:
         Returns:
             True if context was cleared, False if not found
         """
-        if context_key not in self.contexts:
-            return False
+        with self._lock:
+            if context_key not in self.contexts:
+                return False
 
-        del self.contexts[context_key]
+            del self.contexts[context_key]
 
-        if self.persistence_enabled:
-            self._save_contexts()
+            if self.persistence_enabled:
+                self._dirty.add(context_key)
+                self._save_contexts()
 
-        return True
+            return True
 
     def clear_inactive_contexts(self, max_age_hours: float = 24.0) -> int:
         """
@@ -304,18 +354,21 @@ class ContextManager:
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
         to_clear = []
-        for context_key, context in list(self.contexts.items()):
-            # last_activity is set in __post_init__, guaranteed non-None after initialization
-            if context.last_activity is None:
-                continue
-            if current_time - context.last_activity > max_age_seconds:
-                to_clear.append(context_key)
-
-        for context_key in to_clear:
-            del self.contexts[context_key]
+        with self._lock:
+            for context_key, context in list(self.contexts.items()):
+                # last_activity is set in __post_init__, guaranteed non-None after initialization
+                if context.last_activity is None:
+                    continue
+                if current_time - context.last_activity > max_age_seconds:
+                    to_clear.append(context_key)
 
-        if to_clear and self.persistence_enabled:
-            self._save_contexts()
+            for context_key in to_clear:
+                del self.contexts[context_key]
+                if self.persistence_enabled:
+                    self._dirty.add(context_key)
+
+            if to_clear and self.persistence_enabled:
+                self._save_contexts()
 
         return len(to_clear)
 
@@ -333,11 +386,11 @@ class ContextManager:
     def _maybe_save(self) -> None:
         """Debounced save: persist only after enough changes or time elapsed.
 
-        Re-serializing the entire context dict on every message is expensive.
-        This flushes when ``_save_every`` changes have accumulated or when
-        ``_save_interval`` seconds have passed since the last save (whichever
-        comes first). The first change always persists because ``_last_save_time``
-        starts at 0.0.
+        Each save journals only the dirty contexts, but batching still saves
+        a write (and an fsync) per message. This flushes when ``_save_every``
+        changes have accumulated or when ``_save_interval`` seconds have passed
+        since the last save (whichever comes first). The first change always
+        persists because ``_last_save_time`` starts at 0.0.
         """
         if not self.persistence_enabled:
             return
@@ -371,71 +424,203 @@ class ContextManager:
         return self.default_persona
 
     def _load_contexts(self) -> None:
-        """Load contexts from persistence file."""
-        if not self.persistence_path.exists():
+        """Load the snapshot, then replay journal records newer than it."""
+        snapshot_seq = 0
+        if self.persistence_path.exists():
+            try:
+                with open(self.persistence_path) as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and data.get("version") == SNAPSHOT_VERSION:
+                    snapshot_seq = int(data.get("seq", 0))
+                    data = data.get("contexts", {})
+                # Older files are a bare {context_key: state} mapping.
+                for context_key, context_data in data.items():
+                    try:
+                        self.contexts[context_key] = ContextState.from_dict(context_data)
+                    except Exception:
+                        # Skip invalid contexts
+                        continue
+            except Exception as e:
+                logger.warning(f"Could not load context snapshot {self.persistence_path}: {e}")
+        self._seq = snapshot_seq
+        self._replay_journal(snapshot_seq)
+
+    def _replay_journal(self, after_seq: int) -> None:
+        """Apply journal records with ``seq > after_seq``.
+
+        A crash mid-append can leave a torn last line; replay stops there and
+        the file is truncated back to the last complete record so later
+        appends start on a clean line.
+        """
+        if not self.journal_path.exists():
             return
-
+        good_offset = 0
         try:
-            with open(self.persistence_path) as f:
-                data = json.load(f)
-
-            for context_key, context_data in data.items():
-                try:
-                    context = ContextState.from_dict(context_data)
-                    self.contexts[context_key] = context
-                except Exception:
-                    # Skip invalid contexts
-                    continue
-
-        except Exception:
-            # Log error but continue
-            pass
+            with open(self.journal_path, "rb") as f:
+                for raw in f:
+                    try:
+                        if not raw.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        record = json.loads(raw)
+                        seq = int(record["seq"])
+                        key = record["key"]
+                        state = (
+                            ContextState.from_dict(record["state"])
+                            if record["op"] == "put"
+                            else None
+                        )
+                    except Exception:
+                        logger.warning(
+                            f"Context journal {self.journal_path} truncated at byte "
+                            f"{good_offset} (torn or corrupt record)"
+                        )
+                        break
+                    good_offset += len(raw)
+                    if seq <= after_seq:
+                        continue
+                    self._seq = max(self._seq, seq)
+                    self._journal_records += 1
+                    if state is None:
+                        self.contexts.pop(key, None)
+                    else:
+                        self.contexts[key] = state
+            if good_offset < self.journal_path.stat().st_size:
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_offset)
+        except OSError as e:
+            logger.warning(f"Could not replay context journal {self.journal_path}: {e}")
 
     def _save_contexts(self) -> None:
-        """Save contexts to persistence file using an atomic write.
+        """Persist pending changes: journal the dirty contexts.
 
-        Writes to a temporary file in the same directory and then atomically
-        replaces the target via os.replace(). This prevents a corrupted or
-        partially written file if the process is interrupted mid-write or if
-        multiple saves race; the target file always reflects a complete state.
+        Appends one ``put``/``del`` record per changed context and fsyncs, so
+        the cost of a save is proportional to what changed rather than to the
+        number of contexts. When the journal reaches ``snapshot_every_records``
+        a full snapshot is written instead (see :meth:`_write_snapshot`).
         """
-        self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
-
-        data = {}
-        for context_key, context in self.contexts.items():
-            data[context_key] = context.to_dict()
-
-        fd, tmp_path = tempfile.mkstemp(
-            dir=str(self.persistence_path.parent),
-            prefix=self.persistence_path.name,
-            suffix=".tmp",
-        )
-        try:
-            with os.fdopen(fd, "w") as f:
-                json.dump(data, f, indent=2)
-            os.replace(tmp_path, self.persistence_path)
-        except Exception:
+        with self._lock:
+            # Take ownership of the pending keys: anything marked dirty from
+            # here on belongs to the next save, not to this one.
+            dirty, self._dirty = self._dirty, set()
+            if dirty:
+                self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
+                lines = []
+                for context_key in sorted(dirty):
+                    self._seq += 1
+                    context = self.contexts.get(context_key)
+                    record: dict[str, Any] = {"seq": self._seq, "key": context_key}
+                    if context is None:
+                        record["op"] = "del"
+                    else:
+                        record["op"] = "put"
+                        record["state"] = context.to_dict()
+                    lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+                payload = "".join(lines).encode("utf-8")
+                try:
+                    with open(self.journal_path, "ab") as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                except OSError:
+                    self._dirty |= dirty  # retry these on the next save
+                    raise
+                self._journal_records += len(lines)
+                self._account(len(payload), len(payload), "journal")
+
+                if self._journal_records >= self._snapshot_every:
+                    self._write_snapshot()
+
+            # Reset debounce bookkeeping now that disk reflects current state.
+            self._changes_since_save = 0
+            self._last_save_time = time.time()
+
+    def _write_snapshot(self) -> None:
+        """Write every context to ``persistence_path`` and truncate the journal.
+
+        The snapshot records the journal sequence it covers and is written to
+        a temporary file then atomically swapped in with os.replace(). If the
+        process dies before the journal is truncated, replay skips records the
+        snapshot already contains.
+        """
+        with self._lock:
+            self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
+
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "seq": self._seq,
+                "contexts": {
+                    key: ctx.to_dict() for key, ctx in list(self.contexts.items())
+                },
+            }
+            payload = json.dumps(data, indent=2).encode("utf-8")
+
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.persistence_path.parent),
+                prefix=self.persistence_path.name,
+                suffix=".tmp",
+            )
             try:
-                os.unlink(tmp_path)
-            except OSError:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.persistence_path)
+            except Exception:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            with open(self.journal_path, "wb"):
                 pass
-            raise
+            self._journal_records = 0
+            self._snapshots += 1
+            self._account(len(payload), 0, "snapshot")
 
-        # Reset debounce bookkeeping now that disk reflects current state.
-        self._changes_since_save = 0
-        self._last_save_time = time.time()
+    def _account(self, physical: int, logical: int, kind: str) -> None:
+        self._physical_bytes += physical
+        self._logical_bytes += logical
+        self._bytes_written.inc(physical, labels={"kind": kind})
+        if self._logical_bytes:
+            self._amplification.set(self._physical_bytes / self._logical_bytes)
 
     def flush(self) -> None:
         """Force any pending debounced changes to disk (e.g. on shutdown)."""
-        if self.persistence_enabled and self._changes_since_save:
+        with self._lock:
+            if self.persistence_enabled and (self._changes_since_save or self._dirty):
+                self._save_contexts()
+
+    def compact(self) -> None:
+        """Journal pending changes and fold the journal into a new snapshot."""
+        if not self.persistence_enabled:
+            return
+        with self._lock:
             self._save_contexts()
+            self._write_snapshot()
+
+    def persistence_stats(self) -> dict[str, Any]:
+        """Journal/snapshot counters, including write amplification."""
+        return {
+            "journal_records": self._journal_records,
+            "journal_seq": self._seq,
+            "dirty": len(self._dirty),
+            "snapshots": self._snapshots,
+            "bytes_written": self._physical_bytes,
+            "bytes_changed": self._logical_bytes,
+            "write_amplification": (
+                self._physical_bytes / self._logical_bytes
+                if self._logical_bytes
+                else 0.0
+            ),
+        }
 
     def get_stats(self) -> dict[str, Any]:
         """Get statistics about current contexts."""
         platform_counts: dict[str, int] = {}
         persona_counts: dict[str, int] = {}
 
-        for context in self.contexts.values():
+        for context in self.list_contexts():
             platform = context.identity.platform.value
             platform_counts[platform] = platform_counts.get(platform, 0) + 1
 
@@ -444,7 +629,7 @@ class ContextManager:
             )
 
         return {
-            "total_contexts": len(self.contexts),
+            "total_contexts": sum(platform_counts.values()),
             "platform_distribution": platform_counts,
             "persona_distribution": persona_counts,
             "persistence_enabled": self.persistence_enabled,
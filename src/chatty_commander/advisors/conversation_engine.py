@@ -22,26 +22,65 @@
 
 """Advanced conversation engine for ChattyCommander AI interactions."""
 
-import json
-import re
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+from .prompt_assembly import AssembledPrompt, PromptAssembler
+from .text_features import Lexicon, TextFeatures, extract_features
 
-def _contains_word(text_lower: str, words: list[str]) -> bool:
-    """Return True if any keyword/phrase matches ``text_lower`` on word boundaries.
+_QUESTION_STARTS = ("what", "how", "why", "when", "where", "who")
+_MODE_TRIGGERS = Lexicon(["switch", "change", "go to"])
+_MODE = Lexicon(["mode"])
+_TASK = Lexicon(["help", "assist", "do", "make", "create"])
+_GREETING = Lexicon(["hello", "hi", "hey", "good morning", "good afternoon"])
+_FAREWELL = Lexicon(["bye", "goodbye", "see you", "farewell"])
+_INFORMATION = Lexicon(["tell me", "explain", "describe", "what is"])
+_POSITIVE = Lexicon(
+    ["good", "great", "awesome", "excellent", "love", "like", "happy", "pleased"]
+)
+_NEGATIVE = Lexicon(
+    ["bad", "terrible", "awful", "hate", "dislike", "sad", "angry", "frustrated"]
+)
 
-    Multi-word phrases (e.g. ``"go to"``, ``"good morning"``) are matched with
-    flexible whitespace between tokens. Matching is case-insensitive (the caller
-    passes already-lowercased text) and anchored on word boundaries (``\\b``) so
-    substrings do not false-fire (e.g. ``"do"`` does not match ``"window"``).
-    """
-    for word in words:
-        pattern = r"\s+".join(re.escape(part) for part in word.split())
-        if re.search(rf"\b{pattern}\b", text_lower):
-            return True
-    return False
+
+def _intent(features: TextFeatures) -> str:
+    # Command intents
+    if _MODE_TRIGGERS.matches(features) and _MODE.matches(features):
+        return "mode_switch"
+
+    # Question intents
+    if features.lower.startswith(_QUESTION_STARTS):
+        return "question"
+
+    # Task intents
+    if _TASK.matches(features):
+        return "task_request"
+
+    # Social intents
+    if _GREETING.matches(features):
+        return "greeting"
+
+    if _FAREWELL.matches(features):
+        return "farewell"
+
+    # Information seeking
+    if _INFORMATION.matches(features):
+        return "information_seeking"
+
+    return "general_conversation"
+
+
+def _sentiment(features: TextFeatures) -> str:
+    positive_count = _POSITIVE.count(features)
+    negative_count = _NEGATIVE.count(features)
+    if positive_count > negative_count:
+        return "positive"
+    elif negative_count > positive_count:
+        return "negative"
+    else:
+        return "neutral"
 
 
 @dataclass
@@ -54,6 +93,7 @@ class ConversationTurn:
     context: dict[str, Any]
     sentiment: str | None = None
     intent: str | None = None
+    features: TextFeatures | None = field(default=None, repr=False, compare=False)
 
 
 class ConversationEngine:
@@ -63,85 +103,26 @@ class ConversationEngine:
         self.config = config
         self.conversation_history: dict[str, list[ConversationTurn]] = {}
         self.user_preferences: dict[str, dict[str, Any]] = {}
+        prompt_cfg = config.get("prompt") if isinstance(config, dict) else None
+        self.prompts = PromptAssembler.from_config(prompt_cfg)
 
     def analyze_intent(self, text: str) -> str:
         """Analyze user intent from text.
 
-        Keyword matching is anchored on word boundaries (case-insensitive) so
-        that substrings do not false-fire (e.g. "window" must not match "do",
-        "this"/"today" must not match "hi"). Mirrors the approach used in
-        ``ai.intelligence_core._analyze_intent``.
+        Keyword matching is on whole words (case-insensitive) so that
+        substrings do not false-fire (e.g. "window" must not match "do",
+        "this"/"today" must not match "hi"). ``ai.intelligence_core._analyze_intent``
+        uses the same matcher (``advisors/text_features.py``) with its own
+        keyword lists.
         """
         if not text:
             return "general_conversation"
-        text_lower = text.lower()
-
-        # Command intents
-        if _contains_word(text_lower, ["switch", "change", "go to"]):
-            if _contains_word(text_lower, ["mode"]):
-                return "mode_switch"
-
-        # Question intents
-        if text_lower.startswith(("what", "how", "why", "when", "where", "who")):
-            return "question"
-
-        # Task intents
-        if _contains_word(text_lower, ["help", "assist", "do", "make", "create"]):
-            return "task_request"
-
-        # Social intents
-        if _contains_word(
-            text_lower, ["hello", "hi", "hey", "good morning", "good afternoon"]
-        ):
-            return "greeting"
-
-        if _contains_word(text_lower, ["bye", "goodbye", "see you", "farewell"]):
-            return "farewell"
-
-        # Information seeking
-        if _contains_word(text_lower, ["tell me", "explain", "describe", "what is"]):
-            return "information_seeking"
-
-        return "general_conversation"
+        return _intent(extract_features(text))
 
     def analyze_sentiment(self, text: str) -> str:
-        positive_words = [
-            "good",
-            "great",
-            "awesome",
-            "excellent",
-            "love",
-            "like",
-            "happy",
-            "pleased",
-        ]
-        negative_words = [
-            "bad",
-            "terrible",
-            "awful",
-            "hate",
-            "dislike",
-            "sad",
-            "angry",
-            "frustrated",
-        ]
-
         if not text:
             return "neutral"
-        text_lower = text.lower()
-        positive_count = sum(
-            1 for word in positive_words if _contains_word(text_lower, [word])
-        )
-        negative_count = sum(
-            1 for word in negative_words if _contains_word(text_lower, [word])
-        )
-
-        if positive_count > negative_count:
-            return "positive"
-        elif negative_count > positive_count:
-            return "negative"
-        else:
-            return "neutral"
+        return _sentiment(extract_features(text))
 
     def get_conversation_context(self, user_id: str, limit: int = 5) -> str:
         """Get recent conversation context for a user."""
@@ -165,79 +146,53 @@ class ConversationEngine:
         current_mode: str = "chatty",
     ) -> str:
         """Build an enhanced prompt with context, personality, and intelligence."""
-        # Analyze current input
-        intent = self.analyze_intent(user_input)
-        sentiment = self.analyze_sentiment(user_input)
+        return self.assemble_prompt(
+            user_input, user_id, persona_config, current_mode
+        ).text
+
+    def assemble_prompt(
+        self,
+        user_input: str,
+        user_id: str,
+        persona_config: dict[str, Any],
+        current_mode: str = "chatty",
+    ) -> AssembledPrompt:
+        """Like :meth:`build_enhanced_prompt`, split at the reusable prefix.
+
+        See ``advisors/prompt_assembly.py`` for the layout and budgeting.
+        """
+        return self.prompts.assemble(
+            user_id=user_id,
+            user_input=user_input,
+            persona_config=persona_config,
+            mode=current_mode,
+            intent=self.analyze_intent(user_input),
+            sentiment=self.analyze_sentiment(user_input),
+            preferences=self.user_preferences.get(user_id),
+        )
 
-        # Get conversation history
-        context = self.get_conversation_context(user_id)
+    def has_history(self, user_id: str) -> bool:
+        """Whether a history window exists for ``user_id``."""
+        return self.prompts.has_window(user_id)
 
-        # Get user preferences
-        preferences = self.user_preferences.get(user_id, {})
+    def seed_history(self, user_id: str, turns: Iterable[tuple[str, str]]) -> bool:
+        """Start ``user_id``'s history window from persisted ``(role, content)`` turns.
 
-        # Build persona prompt
-        persona_name = persona_config.get("name", "Chatty")
-        persona_traits = persona_config.get(
-            "traits", ["friendly", "helpful", "knowledgeable", "conversational"]
+        Only the first call per user has an effect; afterwards the window is
+        kept current by :meth:`record_conversation_turn`.
+        """
+        if self.prompts.has_window(user_id):
+            return False
+        self.prompts.window(user_id).extend(
+            f"{'Assistant' if role == 'assistant' else 'User'}: {content}"
+            for role, content in turns
         )
-        persona_style = persona_config.get("style", "casual and engaging")
-
-        # Build system prompt - use persona system_prompt if available, otherwise build default
-        if "system_prompt" in persona_config:
-            base_system_prompt = persona_config["system_prompt"]
-            # Add context and analysis to the persona's system prompt
-            system_prompt = f"""{base_system_prompt}
-
-CONVERSATION CONTEXT:
-{context if context else "This is the start of our conversation."}
-
-CURRENT ANALYSIS:
-- User Intent: {intent}
-- Sentiment: {sentiment}
-
-INSTRUCTIONS:
-1. Respond naturally and conversationally
-2. Remember context from our conversation
-3. If asked to switch modes, use: SWITCH_MODE:mode_name
-4. Be helpful but also engaging and personable
-5. Adapt your response style to the user's sentiment"""
-        else:
-            # Fallback to default system prompt
-            system_prompt = f"""You are {persona_name}, an advanced AI assistant with the following characteristics:
-
-PERSONALITY TRAITS: {', '.join(persona_traits)}
-COMMUNICATION STYLE: {persona_style}
-CURRENT MODE: {current_mode}
-
-CAPABILITIES:
-- Voice conversation with natural speech patterns
-- 3D avatar with expressive responses
-- Mode switching (idle, computer, chatty modes)
-- Intelligent task assistance
-- Contextual memory and learning
-
-CONVERSATION CONTEXT:
-{context if context else "This is the start of our conversation."}
-
-USER PREFERENCES: {json.dumps(preferences) if preferences else "None learned yet"}
-
-CURRENT ANALYSIS:
-- User Intent: {intent}
-- Sentiment: {sentiment}
-
-INSTRUCTIONS:
-1. Respond naturally and conversationally
-2. Remember context from our conversation
-3. If asked to switch modes, use: SWITCH_MODE:mode_name
-4. Be helpful but also engaging and personable
-5. Adapt your response style to the user's sentiment
-6. For greetings, be warm and welcoming
-7. For questions, be informative but conversational
-8. For tasks, be helpful and offer step-by-step guidance
-
-Remember: You're not just answering questions - you're having a conversation with a human who values both intelligence and personality."""
-
-        return f"{system_prompt}\n\nUser: {user_input}\n\nAssistant:"
+        return True
+
+    def clear_history(self, user_id: str) -> None:
+        """Forget ``user_id``'s recorded turns and history window."""
+        self.conversation_history.pop(user_id, None)
+        self.prompts.drop_window(user_id)
 
     def record_conversation_turn(
         self,
@@ -250,16 +205,20 @@ Remember: You're not just answering questions - you're having a conversation wit
         if user_id not in self.conversation_history:
             self.conversation_history[user_id] = []
 
+        # Usually a cache hit: the prompt for this input was just assembled.
+        features = extract_features(user_input or "")
         turn = ConversationTurn(
             timestamp=datetime.now(),
             user_input=user_input,
             assistant_response=assistant_response,
             context=context,
-            sentiment=self.analyze_sentiment(user_input),
-            intent=self.analyze_intent(user_input),
+            sentiment=_sentiment(features),
+            intent=_intent(features),
+            features=features,
         )
 
         self.conversation_history[user_id].append(turn)
+        self.prompts.window(user_id).add_turn(user_input, assistant_response)
 
         # Keep only last 50 turns per user to manage memory
         if len(self.conversation_history[user_id]) > 50:
@@ -0,0 +1,239 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Bounded, per-context-ordered dispatch of blocking advisor work.
+
+:meth:`AdvisorsService.handle_message` blocks on the LLM for seconds at a time.
+Calling it from an ``async def`` route stalls the event loop; pushing it onto
+an unbounded thread pool instead lets a burst of requests pile up without
+limit. :class:`AdvisorDispatcher` sits in between:
+
+- work runs on a fixed-size thread pool;
+- messages for the same context key run strictly one after another, in
+  arrival order (``asyncio.Lock`` wakes waiters FIFO);
+- admission is bounded, per context and overall, and rejected requests raise
+  :class:`AdvisorOverloadError` carrying the HTTP status to return;
+- cancelling the awaiting coroutine (e.g. the client went away) drops the
+  message if it has not started running yet. A message that has started runs
+  to completion, and later messages for its key wait for it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AdvisorOverloadError(RuntimeError):
+    """Raised when a message cannot be admitted.
+
+    ``status_code`` is 429 when a single context has too much queued work
+    (the caller should slow down) and 503 when the service as a whole is
+    saturated.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the advisor reply was ready."""
+
+
+@dataclass
+class _ContextQueue:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pending: int = 0
+
+
+class AdvisorDispatcher:
+    """Run blocking handlers on a bounded pool with per-key ordering.
+
+    Args:
+        max_workers: Threads executing handlers concurrently.
+        max_pending: Messages admitted (queued or running) across all keys
+            before new ones are rejected with 503.
+        max_pending_per_key: Messages admitted for one key before new ones
+            for that key are rejected with 429.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        max_pending_per_key: int = 8,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.max_pending_per_key = max(1, max_pending_per_key)
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._queues: dict[str, _ContextQueue] = {}
+        self._pending = 0
+        self._running = 0
+        self._rejected = 0
+        self._cancelled = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict[str, Any] | None) -> AdvisorDispatcher:
+        cfg = cfg or {}
+        return cls(
+            max_workers=int(cfg.get("max_workers", 4)),
+            max_pending=int(cfg.get("max_queue", 64)),
+            max_pending_per_key=int(cfg.get("max_queue_per_context", 8)),
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="advisor"
+                )
+            return self._executor
+
+    async def submit(self, key: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on the pool after earlier work for ``key``.
+
+        Raises:
+            AdvisorOverloadError: if the message cannot be admitted.
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise AdvisorOverloadError(
+                "Advisor service is overloaded", status_code=503, retry_after=5
+            )
+        queue = self._queues.get(key)
+        if queue is not None and queue.pending >= self.max_pending_per_key:
+            self._rejected += 1
+            raise AdvisorOverloadError(
+                "Too many pending messages for this conversation", status_code=429
+            )
+        if queue is None:
+            queue = self._queues[key] = _ContextQueue()
+
+        queue.pending += 1
+        self._pending += 1
+        handed_off = False
+        try:
+            await queue.lock.acquire()
+            try:
+                future = self._get_executor().submit(fn, *args)
+                self._running += 1
+                try:
+                    return await asyncio.wrap_future(future)
+                except asyncio.CancelledError:
+                    # Not started yet: the message is skipped. Already running:
+                    # the thread cannot be stopped, so the key stays locked
+                    # until it returns and the next message cannot overlap it.
+                    if not future.cancel():
+                        handed_off = True
+                        self._release_when_done(future, key, queue)
+                    raise
+                finally:
+                    if not handed_off:
+                        self._running -= 1
+            finally:
+                if not handed_off:
+                    queue.lock.release()
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            logger.debug(f"Advisor work for {key} cancelled")
+            raise
+        finally:
+            if not handed_off:
+                self._leave(key, queue)
+
+    def _release_when_done(
+        self, future: Future[Any], key: str, queue: _ContextQueue
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        def release() -> None:
+            self._running -= 1
+            queue.lock.release()
+            self._leave(key, queue)
+
+        def on_done(_: Future[Any]) -> None:
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # Event loop already closed; nothing is left to wake.
+                pass
+
+        future.add_done_callback(on_done)
+
+    def _leave(self, key: str, queue: _ContextQueue) -> None:
+        queue.pending -= 1
+        self._pending -= 1
+        if queue.pending == 0 and self._queues.get(key) is queue:
+            del self._queues[key]
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "pending": self._pending,
+            "running": self._running,
+            "contexts": len(self._queues),
+            "rejected": self._rejected,
+            "cancelled": self._cancelled,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+async def await_unless_disconnected(
+    request: Any, awaitable: Any, poll_interval: float = 0.25
+) -> Any:
+    """Await ``awaitable``, cancelling it if the HTTP client disconnects.
+
+    Raises :class:`ClientDisconnected` when the client has gone away.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected; cancelling advisor request")
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
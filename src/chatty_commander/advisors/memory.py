@@ -20,17 +20,46 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+"""Per-conversation advisor memory.
+
+:class:`MemoryStore` keeps a capped window of recent turns per context
+(``platform:channel:user``) in memory and optionally persists them through a
+pluggable backend:
+
+- :class:`SqliteMemoryBackend` (default for persistence): sqlite in WAL mode.
+  A single writer thread group-commits queued appends, windows are loaded per
+  context on first use through a ``(ctx, id)`` index (so startup cost does not
+  grow with history), an FTS5 index serves :meth:`MemoryStore.search`, and
+  retention caps rows per context and, optionally, by age. An existing JSONL
+  log is imported once and renamed to ``*.migrated``.
+- :class:`JsonlMemoryBackend`: the original append-only JSONL log, replayed in
+  full at startup and compacted every ``compact_every`` appends. Selected when
+  ``persist_path`` ends in ``.jsonl`` (or ``backend="jsonl"``).
+"""
+
 from __future__ import annotations
 
 import json
 import logging
 import os
-from collections import deque
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Protocol
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_JSONL_PATH = "data/advisors_memory.jsonl"
+DEFAULT_SQLITE_PATH = "data/advisors_memory.sqlite3"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
 
 @dataclass
 class MemoryItem:
@@ -39,142 +68,617 @@ class MemoryItem:
     timestamp: str
 
 
+class MemoryBackend(Protocol):
+    """Persistence seam behind :class:`MemoryStore`.
+
+    ``lazy`` backends are asked for one context's window on first use
+    (:meth:`recent`); eager ones hand over everything once via :meth:`load_all`.
+    """
+
+    lazy: bool
+
+    def load_all(self) -> Iterable[tuple[str, MemoryItem]]: ...
+
+    def recent(self, key: str, limit: int) -> list[MemoryItem]: ...
+
+    def append(self, key: str, item: MemoryItem) -> None: ...
+
+    def clear(self, key: str) -> None: ...
+
+    def compact(self, windows: dict[str, deque[MemoryItem]]) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _item_from_record(data: dict[str, Any]) -> tuple[str, MemoryItem] | None:
+    key = data.get("key")
+    if not key:
+        return None
+    return key, MemoryItem(
+        role=data["role"],
+        content=data["content"],
+        timestamp=data.get("timestamp", datetime.utcnow().isoformat()),
+    )
+
+
+def read_jsonl(path: str) -> Iterable[tuple[str, MemoryItem]]:
+    """Yield ``(context_key, item)`` from a legacy JSONL log, skipping bad lines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = _item_from_record(json.loads(line))
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                continue
+            if record is not None:
+                yield record
+
+
+class JsonlMemoryBackend:
+    """Append-only JSONL log, compacted every ``compact_every`` appends."""
+
+    lazy = False
+
+    def __init__(self, path: str = DEFAULT_JSONL_PATH, compact_every: int = 500):
+        self._path = path
+        # Compact the on-disk JSONL after this many appends so the file does
+        # not grow unbounded (in-memory deques are already capped).
+        self._compact_every = max(1, int(compact_every))
+        self._appends_since_compact = 0
+        self._windows: dict[str, deque[MemoryItem]] | None = None
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+
+    def load_all(self) -> Iterable[tuple[str, MemoryItem]]:
+        if not os.path.exists(self._path):
+            return []
+        try:
+            return list(read_jsonl(self._path))
+        except Exception as e:
+            logger.warning("Failed to load advisor memory from %s: %s", self._path, e)
+            return []
+
+    def recent(self, key: str, limit: int) -> list[MemoryItem]:
+        return []
+
+    def append(self, key: str, item: MemoryItem) -> None:
+        try:
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(_record(key, item)) + "\n")
+            self._appends_since_compact += 1
+        except Exception as e:
+            logger.warning("Failed to persist advisor memory to %s: %s", self._path, e)
+            return
+        if self._appends_since_compact >= self._compact_every and self._windows is not None:
+            self.compact(self._windows)
+
+    def clear(self, key: str) -> None:
+        # Cleared contexts disappear from disk at the next compaction.
+        return None
+
+    def compact(self, windows: dict[str, deque[MemoryItem]]) -> None:
+        """Atomically rewrite the file to only the currently retained items."""
+        tmp_path = f"{self._path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, q in windows.items():
+                    for item in q:
+                        f.write(json.dumps(_record(key, item)) + "\n")
+            os.replace(tmp_path, self._path)
+            self._appends_since_compact = 0
+        except Exception as e:
+            logger.warning("Failed to compact advisor memory at %s: %s", self._path, e)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def flush(self) -> None:
+        if self._windows is not None:
+            self.compact(self._windows)
+
+    def close(self) -> None:
+        return None
+
+
+def _record(key: str, item: MemoryItem) -> dict[str, str]:
+    return {
+        "key": key,
+        "role": item.role,
+        "content": item.content,
+        "timestamp": item.timestamp,
+    }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ctx TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memory_ctx ON memory(ctx, id);
+CREATE INDEX IF NOT EXISTS memory_created ON memory(created);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts
+    USING fts5(content, content='memory', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+    INSERT INTO memory_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+    INSERT INTO memory_fts(memory_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+END;
+"""
+
+
+class SqliteMemoryBackend:
+    """sqlite (WAL) persistence with a group-commit writer thread.
+
+    Args:
+        path: Database file (parent directories are created).
+        retain_per_context: Rows kept per context; older ones are deleted as
+            new turns are committed. Defaults to 1000, so search reaches well
+            past the prompt window.
+        max_age_days: Optionally delete turns older than this.
+        batch_size: Most appends committed in one transaction.
+        linger: Seconds the writer waits for more appends before committing
+            a partial batch.
+        migrate_from: Legacy JSONL log to import once (then renamed
+            ``*.migrated``). Defaults to the JSONL file next to ``path``.
+    """
+
+    lazy = True
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SQLITE_PATH,
+        *,
+        retain_per_context: int = 1000,
+        max_age_days: float | None = None,
+        batch_size: int = 256,
+        linger: float = 0.005,
+        migrate_from: str | None = None,
+    ) -> None:
+        self.path = path
+        self.retain_per_context = max(1, int(retain_per_context))
+        self.max_age_days = max_age_days
+        self.batch_size = max(1, int(batch_size))
+        self.linger = linger
+        self.commits = 0
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._write = self._connect()
+        self._write.executescript(_SCHEMA)
+        try:
+            self._write.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logger.info(f"FTS5 unavailable ({e}); memory search falls back to LIKE")
+            self.fts = False
+        self._write.commit()
+        self._read = self._connect()
+        self._read_lock = threading.Lock()
+
+        legacy = migrate_from or os.path.splitext(path)[0] + ".jsonl"
+        if os.path.exists(legacy):
+            migrate_jsonl(legacy, self)
+        self._apply_age_retention()
+
+        self._ops: queue.Queue[tuple[Any, ...]] = queue.Queue()
+        # Writes enqueued vs committed; reads only wait for the writer when
+        # they could otherwise miss something. Both counters change under
+        # _seq_lock: callers and the writer thread update them concurrently.
+        self._queued = 0
+        self._committed = 0
+        self._seq_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._run, name="advisor-memory-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL is durable against application crashes; an OS crash
+        # can lose only the last group commit.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            op = self._ops.get()
+            batch = [op]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size and op[0] == "add":
+                timeout = deadline - time.monotonic()
+                try:
+                    op = self._ops.get(timeout=max(0.0, timeout))
+                except queue.Empty:
+                    break
+                batch.append(op)
+            if not self._commit(batch):
+                return
+
+    def _commit(self, batch: list[tuple[Any, ...]]) -> bool:
+        rows = [op[1] for op in batch if op[0] == "add"]
+        keep_running = True
+        try:
+            if rows:
+                self._write.executemany(
+                    "INSERT INTO memory (ctx, role, content, ts, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                for ctx in {row[0] for row in rows}:
+                    self._trim(ctx)
+            for op in batch:
+                if op[0] == "clear":
+                    self._write.execute("DELETE FROM memory WHERE ctx = ?", (op[1],))
+            self._write.commit()
+            self.commits += 1
+        except sqlite3.Error as e:
+            logger.warning("Failed to persist advisor memory to %s: %s", self.path, e)
+            self._write.rollback()
+        with self._seq_lock:
+            self._committed += len(rows) + sum(
+                1 for op in batch if op[0] == "clear"
+            )
+        for op in batch:
+            if op[0] == "compact":
+                try:
+                    self._apply_age_retention()
+                    self._write.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                except sqlite3.Error as e:
+                    logger.warning(f"Advisor memory compaction failed: {e}")
+            if op[0] in ("flush", "compact", "stop"):
+                op[1].set()
+            if op[0] == "stop":
+                keep_running = False
+        return keep_running
+
+    def _trim(self, ctx: str) -> None:
+        self._write.execute(
+            "DELETE FROM memory WHERE ctx = ? AND id <= ("
+            "SELECT id FROM memory WHERE ctx = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (ctx, ctx, self.retain_per_context),
+        )
+
+    def _apply_age_retention(self) -> None:
+        if not self.max_age_days:
+            return
+        cutoff = time.time() - self.max_age_days * 86400
+        self._write.execute("DELETE FROM memory WHERE created < ?", (cutoff,))
+        self._write.commit()
+
+    # ------------------------------------------------------------------
+    # MemoryBackend
+    # ------------------------------------------------------------------
+    def load_all(self) -> Iterable[tuple[str, MemoryItem]]:
+        return []
+
+    def _has_pending_writes(self) -> bool:
+        with self._seq_lock:
+            return self._queued != self._committed
+
+    def _enqueue(self, op: tuple[Any, ...]) -> None:
+        with self._seq_lock:
+            self._queued += 1
+        self._ops.put(op)
+
+    def recent(self, key: str, limit: int) -> list[MemoryItem]:
+        if self._has_pending_writes():
+            self.flush()
+        with self._read_lock:
+            rows = self._read.execute(
+                "SELECT role, content, ts FROM memory WHERE ctx = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (key, limit),
+            ).fetchall()
+        return [MemoryItem(role=r, content=c, timestamp=t) for r, c, t in reversed(rows)]
+
+    def append(self, key: str, item: MemoryItem) -> None:
+        self._enqueue(("add", (key, item.role, item.content, item.timestamp, time.time())))
+
+    def append_many(self, records: Iterable[tuple[str, MemoryItem]]) -> int:
+        """Synchronously insert ``records`` in one transaction (migration)."""
+        now = time.time()
+        rows = [(k, i.role, i.content, i.timestamp, now) for k, i in records]
+        self._write.executemany(
+            "INSERT INTO memory (ctx, role, content, ts, created) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        for ctx in {row[0] for row in rows}:
+            self._trim(ctx)
+        self._write.commit()
+        return len(rows)
+
+    def clear(self, key: str) -> None:
+        self._enqueue(("clear", key))
+
+    def search(
+        self, query: str, key: str | None = None, limit: int = 10
+    ) -> list[tuple[str, MemoryItem]]:
+        """Keyword search (all words must match), best matches first."""
+        words = _WORD_RE.findall(query)
+        if not words or limit <= 0:
+            return []
+        if self._has_pending_writes():
+            self.flush()
+        if self.fts:
+            match = " ".join('"' + w.replace('"', '""') + '"' for w in words)
+            sql = (
+                "SELECT m.ctx, m.role, m.content, m.ts FROM memory_fts "
+                "JOIN memory m ON m.id = memory_fts.rowid "
+                "WHERE memory_fts MATCH ?"
+            )
+            params: list[Any] = [match]
+            order = " ORDER BY bm25(memory_fts), m.id DESC LIMIT ?"
+        else:
+            sql = "SELECT m.ctx, m.role, m.content, m.ts FROM memory m WHERE 1=1"
+            params = []
+            for w in words:
+                sql += " AND m.content LIKE ?"
+                params.append(f"%{w}%")
+            order = " ORDER BY m.id DESC LIMIT ?"
+        if key is not None:
+            sql += " AND m.ctx = ?"
+            params.append(key)
+        params.append(limit)
+        with self._read_lock:
+            rows = self._read.execute(sql + order, params).fetchall()
+        return [
+            (ctx, MemoryItem(role=r, content=c, timestamp=t)) for ctx, r, c, t in rows
+        ]
+
+    def compact(self, windows: dict[str, deque[MemoryItem]]) -> None:
+        """Apply age retention and fold the WAL back into the database file."""
+        self._barrier("compact")
+
+    def flush(self) -> None:
+        """Block until every queued write is committed."""
+        self._barrier("flush")
+
+    def _barrier(self, kind: str) -> None:
+        if self._closed:
+            return
+        done = threading.Event()
+        self._ops.put((kind, done))
+        done.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        done = threading.Event()
+        self._ops.put(("stop", done))
+        done.wait()
+        self._closed = True
+        self._writer.join(timeout=5)
+        self._write.close()
+        self._read.close()
+
+
+def migrate_jsonl(jsonl_path: str, backend: SqliteMemoryBackend) -> int:
+    """Import a legacy JSONL memory log into ``backend``.
+
+    The file is renamed to ``<path>.migrated`` afterwards so the import runs
+    once. Returns the number of imported turns.
+    """
+    try:
+        count = backend.append_many(read_jsonl(jsonl_path))
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Advisor memory migration from {jsonl_path} failed: {e}")
+        return 0
+    os.replace(jsonl_path, jsonl_path + ".migrated")
+    logger.info(f"Migrated {count} advisor memory turns from {jsonl_path}")
+    return count
+
+
 class MemoryStore:
+    """Recent conversation turns per context, optionally persisted.
+
+    Args:
+        max_items_per_context: Window returned by :meth:`get`.
+        persist: Enable the persistence backend.
+        persist_path: File for the backend; a ``.jsonl`` path keeps the
+            legacy JSONL log, anything else (default) uses sqlite.
+        compact_every: JSONL only: appends between automatic compactions.
+        backend: ``"memory"``, ``"jsonl"``, ``"sqlite"`` or a backend instance;
+            ``None`` infers from ``persist_path``.
+        retain_per_context: sqlite only: rows kept per context for search.
+        max_age_days: sqlite only: drop turns older than this.
+        max_cached_contexts: sqlite only: windows kept in memory; others are
+            re-read from the index on demand.
+    """
+
     def __init__(
         self,
         max_items_per_context: int = 100,
         persist: bool = False,
         persist_path: str | None = None,
         compact_every: int = 500,
+        backend: str | MemoryBackend | None = None,
+        retain_per_context: int = 1000,
+        max_age_days: float | None = None,
+        max_cached_contexts: int = 1024,
     ) -> None:
-        self._store: dict[str, deque[MemoryItem]] = {}
+        self._store: OrderedDict[str, deque[MemoryItem]] = OrderedDict()
         self._max = max(1, int(max_items_per_context))
-        self._persist = persist
-        self._path = persist_path or "data/advisors_memory.jsonl"
-        # Compact the on-disk JSONL after this many appends so the file does
-        # not grow unbounded (in-memory deques are already capped at ``_max``).
-        self._compact_every = max(1, int(compact_every))
-        self._appends_since_compact = 0
-        if self._persist:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            self._load_from_disk()
+        self._max_cached = max(1, int(max_cached_contexts))
+        self._lock = threading.RLock()
+        self._backend: MemoryBackend | None = None
+        if isinstance(backend, str) or backend is None:
+            if persist and backend != "memory":
+                self._backend = _build_backend(
+                    backend,
+                    persist_path,
+                    compact_every=compact_every,
+                    retain_per_context=max(retain_per_context, self._max),
+                    max_age_days=max_age_days,
+                )
+        else:
+            self._backend = backend
+        if self._backend is not None and not self._backend.lazy:
+            for key, item in self._backend.load_all():
+                self._store.setdefault(key, deque(maxlen=self._max)).append(item)
+            if isinstance(self._backend, JsonlMemoryBackend):
+                self._backend._windows = self._store
 
-    def _load_from_disk(self) -> None:
-        """Load memory from the persistence file."""
-        if not os.path.exists(self._path):
-            return
-
-        try:
-            with open(self._path, encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        data = json.loads(line)
-                        key = data.get("key")
-                        if key:
-                            q = self._store.setdefault(key, deque(maxlen=self._max))
-                            q.append(
-                                MemoryItem(
-                                    role=data["role"],
-                                    content=data["content"],
-                                    timestamp=data.get("timestamp", datetime.utcnow().isoformat()),
-                                )
-                            )
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-        except Exception as e:
-            logger.warning("Failed to load advisor memory from %s: %s", self._path, e)
+    @property
+    def backend(self) -> MemoryBackend | None:
+        return self._backend
 
     def _ctx(self, platform: str, channel: str, user: str) -> str:
         return f"{platform}:{channel}:{user}"
 
+    def _window(self, key: str) -> deque[MemoryItem]:
+        # Caller holds self._lock.
+        q = self._store.get(key)
+        if q is not None:
+            self._store.move_to_end(key)
+            return q
+        q = deque(maxlen=self._max)
+        if self._backend is not None and self._backend.lazy:
+            q.extend(self._backend.recent(key, self._max))
+            # Only lazily loaded windows can be dropped and re-read later.
+            while len(self._store) >= self._max_cached:
+                self._store.popitem(last=False)
+        self._store[key] = q
+        return q
+
     def add(
         self, platform: str, channel: str, user: str, role: str, content: str
     ) -> None:
         """Add memory item for context."""
         key = self._ctx(platform, channel, user)
-        q = self._store.setdefault(key, deque(maxlen=self._max))
-        ts = datetime.utcnow().isoformat()
-        q.append(
-            MemoryItem(
-                role=role, content=content, timestamp=ts
-            )
-        )
-        if self._persist:
-            try:
-                with open(self._path, "a", encoding="utf-8") as f:
-                    f.write(
-                        json.dumps(
-                            {
-                                "key": key,
-                                "role": role,
-                                "content": content,
-                                "timestamp": ts,
-                            }
-                        )
-                        + "\n"
-                    )
-                self._appends_since_compact += 1
-                if self._appends_since_compact >= self._compact_every:
-                    self.compact()
-            except Exception as e:
-                logger.warning("Failed to persist advisor memory to %s: %s", self._path, e)
+        item = MemoryItem(role=role, content=content, timestamp=datetime.utcnow().isoformat())
+        with self._lock:
+            self._window(key).append(item)
+            if self._backend is not None:
+                self._backend.append(key, item)
 
     def get(
         self, platform: str, channel: str, user: str, limit: int = 20
     ) -> list[MemoryItem]:
         """Get recent memory items for context."""
-        key = self._ctx(platform, channel, user)
-        items = list(self._store.get(key, deque()))
         if limit <= 0:
             return []
+        key = self._ctx(platform, channel, user)
+        with self._lock:
+            if key not in self._store and (
+                self._backend is None or not self._backend.lazy
+            ):
+                return []
+            items = list(self._window(key))
         return items[-limit:]
 
     def clear(self, platform: str, channel: str, user: str) -> int:
         """Clear memory for a context."""
         key = self._ctx(platform, channel, user)
-        count = len(self._store.get(key, []))
-        if key in self._store:
-            del self._store[key]
+        with self._lock:
+            if self._backend is not None and self._backend.lazy:
+                count = len(self._window(key))
+            else:
+                count = len(self._store.get(key, ()))
+            self._store.pop(key, None)
+            if self._backend is not None:
+                self._backend.clear(key)
         return count
 
+    def search(
+        self,
+        query: str,
+        platform: str | None = None,
+        channel: str | None = None,
+        user: str | None = None,
+        limit: int = 10,
+    ) -> list[tuple[str, MemoryItem]]:
+        """Find past turns containing every word of ``query``.
+
+        Scoped to one context when ``platform``/``channel``/``user`` are all
+        given. Uses the sqlite FTS index when available, otherwise scans the
+        retained in-memory windows (newest first).
+        """
+        key = (
+            self._ctx(platform, channel, user)
+            if platform is not None and channel is not None and user is not None
+            else None
+        )
+        search: Callable[..., list[tuple[str, MemoryItem]]] | None = getattr(
+            self._backend, "search", None
+        )
+        if search is not None:
+            return search(query, key=key, limit=limit)
+        words = [w.lower() for w in _WORD_RE.findall(query)]
+        if not words or limit <= 0:
+            return []
+        hits: list[tuple[str, MemoryItem]] = []
+        with self._lock:
+            windows = [(key, self._store.get(key, deque()))] if key else list(self._store.items())
+            for ctx, q in windows:
+                for item in reversed(q):
+                    text = item.content.lower()
+                    if all(w in text for w in words):
+                        hits.append((ctx, item))
+        hits.sort(key=lambda hit: hit[1].timestamp, reverse=True)
+        return hits[:limit]
+
     def compact(self) -> None:
-        """Rewrite the on-disk JSONL to only the currently-retained items.
+        """Shrink persisted history to what retention keeps.
 
-        The append-only persistence file grows unbounded over time even though
-        the in-memory deques are capped at ``max_items_per_context``. Compaction
-        atomically rewrites the file from the (capped) in-memory state, keeping
-        the same one-JSON-object-per-line format that ``_load_from_disk`` reads.
-        This is a no-op when persistence is disabled.
+        JSONL: atomically rewrite the file from the capped in-memory windows,
+        keeping the one-JSON-object-per-line format. sqlite: apply age
+        retention and checkpoint the WAL. No-op without persistence.
         """
-        if not self._persist:
+        if self._backend is None:
             return
-
-        tmp_path = f"{self._path}.tmp"
-        try:
-            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                for key, q in self._store.items():
-                    for item in q:
-                        f.write(
-                            json.dumps(
-                                {
-                                    "key": key,
-                                    "role": item.role,
-                                    "content": item.content,
-                                    "timestamp": item.timestamp,
-                                }
-                            )
-                            + "\n"
-                        )
-            os.replace(tmp_path, self._path)
-            self._appends_since_compact = 0
-        except Exception as e:
-            logger.warning("Failed to compact advisor memory at %s: %s", self._path, e)
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+        with self._lock:
+            self._backend.compact(self._store)
 
     def flush(self) -> None:
-        """Flush retained state to disk by compacting (no-op without persistence)."""
-        self.compact()
+        """Make everything added so far durable (no-op without persistence)."""
+        if self._backend is not None:
+            self._backend.flush()
+
+    def close(self) -> None:
+        if self._backend is not None:
+            self._backend.close()
+
+
+def _build_backend(
+    kind: str | None,
+    path: str | None,
+    *,
+    compact_every: int,
+    retain_per_context: int,
+    max_age_days: float | None,
+) -> MemoryBackend:
+    if kind is None:
+        kind = "jsonl" if path and path.endswith(".jsonl") else "sqlite"
+    if kind == "jsonl":
+        return JsonlMemoryBackend(path or DEFAULT_JSONL_PATH, compact_every=compact_every)
+    if kind != "sqlite":
+        raise ValueError(f"unknown advisor memory backend: {kind!r}")
+    migrate_from = None
+    if path and path.endswith(".jsonl"):
+        # Explicitly switching an existing JSONL setup to sqlite: keep the
+        # database next to it and import the log.
+        migrate_from = path
+        path = os.path.splitext(path)[0] + ".sqlite3"
+    return SqliteMemoryBackend(
+        path or DEFAULT_SQLITE_PATH,
+        retain_per_context=retain_per_context,
+        max_age_days=max_age_days,
+        migrate_from=migrate_from,
+    )
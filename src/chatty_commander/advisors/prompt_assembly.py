@@ -0,0 +1,322 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Prompt assembly for :class:`~chatty_commander.advisors.conversation_engine.ConversationEngine`.
+
+A prompt is laid out so that everything that changes per turn comes last:
+
+1. the system segment: persona, mode, capabilities and instructions. It is
+   rendered once per persona and mode and then cached;
+2. learned user preferences;
+3. the conversation history;
+4. the per-turn analysis and the user's message.
+
+Parts 1-3 form :attr:`AssembledPrompt.prefix`. Between turns the history
+only grows at its end, so consecutive prompts share that prefix. Backends
+that reuse the KV cache for a repeated prefix (Ollama does this per model)
+then only process the new tail.
+
+:class:`HistoryWindow` keeps one user's history as rendered lines with a
+running token count, updated as turns are appended. Nothing is re-joined
+per prompt. When the history exceeds its share of the token budget, the
+oldest lines are dropped down to ``low_water`` of that share rather than
+one line per turn. The start of the history, and with it the prefix, then
+stays put for several turns.
+
+Token counts come from :func:`estimate_tokens`, a local approximation of a
+BPE tokenizer: common words are one token, long words several. It errs on
+the high side for English, which is the safe direction for a budget.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+NO_HISTORY = "This is the start of our conversation."
+
+_INSTRUCTIONS = """INSTRUCTIONS:
+1. Respond naturally and conversationally
+2. Remember context from our conversation
+3. If asked to switch modes, use: SWITCH_MODE:mode_name
+4. Be helpful but also engaging and personable
+5. Adapt your response style to the user's sentiment"""
+
+_DEFAULT_INSTRUCTIONS = (
+    _INSTRUCTIONS
+    + """
+6. For greetings, be warm and welcoming
+7. For questions, be informative but conversational
+8. For tasks, be helpful and offer step-by-step guidance
+
+Remember: You're not just answering questions - you're having a conversation with a human who values both intelligence and personality."""
+)
+
+_DEFAULT_SYSTEM = """You are {name}, an advanced AI assistant with the following characteristics:
+
+PERSONALITY TRAITS: {traits}
+COMMUNICATION STYLE: {style}
+CURRENT MODE: {mode}
+
+CAPABILITIES:
+- Voice conversation with natural speech patterns
+- 3D avatar with expressive responses
+- Mode switching (idle, computer, chatty modes)
+- Intelligent task assistance
+- Contextual memory and learning
+
+"""
+
+_DEFAULT_TRAITS = ["friendly", "helpful", "knowledgeable", "conversational"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: one per punctuation mark and per six word characters."""
+    return sum((len(piece) + 5) // 6 for piece in _TOKEN_RE.findall(text))
+
+
+class HistoryWindow:
+    """One conversation's rendered history lines and their token count."""
+
+    def __init__(self, max_lines: int = 200, low_water: float = 0.75) -> None:
+        self.max_lines = max_lines
+        self.low_water = low_water
+        self._lines: deque[tuple[str, int]] = deque()
+        self._tokens = 0
+        self._text: str | None = ""
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, line: str) -> None:
+        # +1 for the newline joining it to the previous line.
+        cost = estimate_tokens(line) + 1
+        with self._lock:
+            self._lines.append((line, cost))
+            self._tokens += cost
+            if len(self._lines) > self.max_lines:
+                keep = int(self.max_lines * self.low_water)
+                self._drop_oldest(len(self._lines) - keep)
+            elif self._text is not None:
+                self._text = f"{self._text}\n{line}" if self._text else line
+
+    def extend(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.append(line)
+
+    def add_turn(self, user_input: str, assistant_response: str) -> None:
+        self.append(f"User: {user_input}")
+        self.append(f"Assistant: {assistant_response}")
+
+    def _drop_oldest(self, count: int) -> None:
+        # Caller holds self._lock.
+        for _ in range(count):
+            _, cost = self._lines.popleft()
+            self._tokens -= cost
+        self._text = None
+
+    def render(self, budget: int) -> str:
+        """The history text, truncated from the oldest end to fit ``budget`` tokens."""
+        with self._lock:
+            if self._tokens > budget:
+                target = int(max(budget, 0) * self.low_water)
+                dropped, remaining = 0, self._tokens
+                for _, cost in self._lines:
+                    if remaining <= target:
+                        break
+                    remaining -= cost
+                    dropped += 1
+                self._drop_oldest(dropped)
+            if self._text is None:
+                self._text = "\n".join(line for line, _ in self._lines)
+            return self._text
+
+
+@dataclass
+class AssembledPrompt:
+    """A prompt split into the part shared with later turns and the rest."""
+
+    prefix: str
+    suffix: str
+    tokens: int
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+class PromptAssembler:
+    """Cached system segments and per-user history windows.
+
+    Args:
+        max_prompt_tokens: Budget for the whole prompt.
+        reserve_tokens: Kept free within the budget for the reply.
+        history_tokens: Upper bound on the history's share.
+        low_water: Fraction of the history share kept when truncating.
+        max_cached_segments: System segments kept (LRU).
+    """
+
+    def __init__(
+        self,
+        max_prompt_tokens: int = 2048,
+        reserve_tokens: int = 256,
+        history_tokens: int = 1024,
+        low_water: float = 0.75,
+        max_cached_segments: int = 64,
+    ) -> None:
+        self.max_prompt_tokens = max_prompt_tokens
+        self.reserve_tokens = reserve_tokens
+        self.history_tokens = history_tokens
+        self.low_water = low_water
+        self.max_cached_segments = max_cached_segments
+        self._segments: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._windows: dict[str, HistoryWindow] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any] | None) -> PromptAssembler:
+        cfg = config or {}
+        return cls(
+            max_prompt_tokens=int(cfg.get("max_prompt_tokens", 2048)),
+            reserve_tokens=int(cfg.get("reserve_tokens", 256)),
+            history_tokens=int(cfg.get("history_tokens", 1024)),
+            low_water=float(cfg.get("low_water", 0.75)),
+        )
+
+    # ------------------------------------------------------------------
+    # System segments
+    # ------------------------------------------------------------------
+    def system_segment(
+        self, persona_config: dict[str, Any], mode: str
+    ) -> tuple[str, int]:
+        """Rendered persona/system text and its token estimate, cached."""
+        key = json.dumps([persona_config, mode], sort_keys=True, default=str)
+        with self._lock:
+            cached = self._segments.get(key)
+            if cached is not None:
+                self._segments.move_to_end(key)
+                return cached
+        segment = _render_system(persona_config, mode)
+        entry = (segment, estimate_tokens(segment))
+        with self._lock:
+            self._segments[key] = entry
+            while len(self._segments) > self.max_cached_segments:
+                self._segments.popitem(last=False)
+        return entry
+
+    # ------------------------------------------------------------------
+    # History windows
+    # ------------------------------------------------------------------
+    def window(self, user_id: str) -> HistoryWindow:
+        with self._lock:
+            window = self._windows.get(user_id)
+            if window is None:
+                window = HistoryWindow(low_water=self.low_water)
+                self._windows[user_id] = window
+            return window
+
+    def has_window(self, user_id: str) -> bool:
+        return user_id in self._windows
+
+    def drop_window(self, user_id: str) -> None:
+        with self._lock:
+            self._windows.pop(user_id, None)
+
+    # ------------------------------------------------------------------
+    # Assembly
+    # ------------------------------------------------------------------
+    def assemble(
+        self,
+        *,
+        user_id: str,
+        user_input: str,
+        persona_config: dict[str, Any],
+        mode: str,
+        intent: str,
+        sentiment: str,
+        preferences: dict[str, Any] | None = None,
+    ) -> AssembledPrompt:
+        system, system_tokens = self.system_segment(persona_config, mode)
+        learned = ""
+        if "system_prompt" not in persona_config:
+            learned = (
+                "USER PREFERENCES: "
+                f"{json.dumps(preferences) if preferences else 'None learned yet'}\n\n"
+            )
+        suffix = (
+            "\n\nCURRENT ANALYSIS:\n"
+            f"- User Intent: {intent}\n"
+            f"- Sentiment: {sentiment}"
+            f"\n\nUser: {user_input}\n\nAssistant:"
+        )
+        fixed = system_tokens + estimate_tokens(learned) + estimate_tokens(suffix)
+        budget = min(
+            self.history_tokens,
+            self.max_prompt_tokens - self.reserve_tokens - fixed,
+        )
+        history, history_tokens = "", 0
+        if self.has_window(user_id):
+            window = self.window(user_id)
+            history = window.render(budget)
+            history_tokens = window.tokens
+        if not history:
+            history, history_tokens = NO_HISTORY, estimate_tokens(NO_HISTORY)
+        return AssembledPrompt(
+            prefix=f"{system}{learned}CONVERSATION CONTEXT:\n{history}",
+            suffix=suffix,
+            tokens=fixed + history_tokens,
+        )
+
+
+def _render_system(persona_config: dict[str, Any], mode: str) -> str:
+    if "system_prompt" in persona_config:
+        return f"{persona_config['system_prompt']}\n\n{_INSTRUCTIONS}\n\n"
+    return (
+        _DEFAULT_SYSTEM.format(
+            name=persona_config.get("name", "Chatty"),
+            traits=", ".join(persona_config.get("traits", _DEFAULT_TRAITS)),
+            style=persona_config.get("style", "casual and engaging"),
+            mode=mode,
+        )
+        + _DEFAULT_INSTRUCTIONS
+        + "\n\n"
+    )
+
+
+__all__ = [
+    "AssembledPrompt",
+    "HistoryWindow",
+    "PromptAssembler",
+    "estimate_tokens",
+]
@@ -23,7 +23,7 @@
 """Advisor service for handling AI advisor interactions."""
 
 import logging
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterable
 from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Any
@@ -32,6 +32,7 @@ from ..avatars.thinking_state import get_thinking_manager
 from . import providers as providers_module
 from .context import ContextManager, PlatformType
 from .conversation_engine import create_conversation_engine
+from .dispatcher import AdvisorDispatcher
 from .memory import MemoryStore
 from .providers import build_provider_safe as build_provider_safe
 
@@ -52,6 +53,22 @@ def _get_provider_builder():
     return providers_module.build_provider_safe
 
 
+def _emit_chunk(on_chunk: Callable[[str], None], text: str) -> None:
+    try:
+        on_chunk(text)
+    except Exception as e:
+        logger.error(f"Error in advisor stream callback: {e}")
+
+
+def _consume_stream(fragments: Iterable[str], on_chunk: Callable[[str], None]) -> str:
+    """Forward each fragment to ``on_chunk`` and return the joined text."""
+    parts: list[str] = []
+    for fragment in fragments:
+        parts.append(fragment)
+        _emit_chunk(on_chunk, fragment)
+    return "".join(parts).strip()
+
+
 @dataclass
 class AdvisorMessage:
     """Incoming message for advisor processing."""
@@ -93,6 +110,9 @@ class AdvisorsService:
             max_items_per_context=mem_cfg.get("max_items_per_context", 100),
             persist=mem_cfg.get("persistence_enabled", mem_cfg.get("persist", False)),
             persist_path=mem_cfg.get("persistence_path") or mem_cfg.get("persist_path"),
+            backend=mem_cfg.get("backend"),
+            retain_per_context=mem_cfg.get("retain_per_context", 1000),
+            max_age_days=mem_cfg.get("max_age_days"),
         )
         provider_builder = _get_provider_builder()
         self.provider = provider_builder(base_cfg.get("providers", {}))
@@ -101,6 +121,10 @@ class AdvisorsService:
         # Check if advisors are enabled
         self.enabled = base_cfg.get("enabled", False)
 
+        # Bounded pool for handle_message_async; per-context ordering and
+        # overload limits come from the "concurrency" section.
+        self.dispatcher = AdvisorDispatcher.from_config(base_cfg.get("concurrency"))
+
         # Initialize conversation engine for enhanced AI interactions
         self.conversation_engine = create_conversation_engine(base_cfg)
 
@@ -203,11 +227,18 @@ class AdvisorsService:
                 thinking_manager.end_tool_call(agent_id, tool_name="browser_analyst")
         return None
 
-    def handle_message(self, message: AdvisorMessage) -> AdvisorReply:
+    def handle_message(
+        self,
+        message: AdvisorMessage,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> AdvisorReply:
         """Process an incoming message and return an advisor response.
 
         Args:
             message: The incoming message to process.
+            on_chunk: Optional callback receiving reply text fragments as the
+                LLM streams them (e.g. to feed TTS or a websocket). The returned
+                reply still carries the complete, post-processed text.
 
         Returns:
             AdvisorReply with response and metadata.
@@ -217,7 +248,10 @@ class AdvisorsService:
 
         # Handle special commands
         if message.text.startswith("summarize "):
-            return self._handle_summarize_command(message)
+            reply = self._handle_summarize_command(message)
+            if on_chunk is not None:
+                _emit_chunk(on_chunk, reply.reply)
+            return reply
 
         # Get or create context for this identity
         try:
@@ -236,17 +270,18 @@ class AdvisorsService:
         )
 
         agent_id = self._setup_thinking_state(message, context)
+        history_key = f"{platform.value}:{message.channel}:{message.user}"
 
         try:
-            combined_user_text = self._build_combined_history_text(
-                platform.value, message.channel, message.user, message.text
+            self._seed_history(
+                history_key, platform.value, message.channel, message.user
             )
 
             thinking_manager = get_thinking_manager()
             thinking_manager.start_processing(agent_id, "Generating response...")
 
             response, model_name, api_mode = self._generate_llm_response(
-                combined_user_text, message, context, platform
+                message.text, message, context, history_key, on_chunk=on_chunk
             )
 
             thinking_manager.start_responding(agent_id, "Finalizing response...")
@@ -265,6 +300,24 @@ class AdvisorsService:
             thinking_manager.set_error(agent_id, f"Error processing message: {str(e)}")
             raise
 
+    async def handle_message_async(
+        self,
+        message: AdvisorMessage,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> AdvisorReply:
+        """Async variant of :meth:`handle_message` for event-loop callers.
+
+        The blocking work runs on :attr:`dispatcher`'s worker pool, so the
+        loop stays responsive. Messages from the same platform/channel/user
+        are processed in arrival order. Cancelling the returned coroutine
+        drops the message if it has not started yet.
+
+        Raises:
+            AdvisorOverloadError: when the queue limits are exceeded.
+        """
+        key = f"{message.platform.lower()}:{message.channel}:{message.user}"
+        return await self.dispatcher.submit(key, self.handle_message, message, on_chunk)
+
     def _setup_thinking_state(self, message: AdvisorMessage, context) -> str:
         """Small helper extracted to reduce handle_message complexity (setup phase)."""
         agent_id = f"{message.platform}-{message.channel}-{message.user}"
@@ -287,28 +340,49 @@ class AdvisorsService:
         return model_name, api_mode
 
     def _generate_llm_response(
-        self, combined_user_text: str, message: AdvisorMessage, context, platform
+        self,
+        user_text: str,
+        message: AdvisorMessage,
+        context,
+        history_key: str,
+        on_chunk: Callable[[str], None] | None = None,
     ) -> tuple[str, str, str]:
         """Small helper extracted to reduce handle_message complexity (LLM execution + post)."""
         try:
             persona_config = self._resolve_persona_config(context)
 
             enhanced_prompt = self.conversation_engine.build_enhanced_prompt(
-                user_input=combined_user_text,
-                user_id=f"{message.platform}:{message.channel}:{message.user}",
+                user_input=user_text,
+                user_id=history_key,
                 persona_config=persona_config,
                 current_mode=self.config.get("current_mode", "chatty"),
             )
 
             if hasattr(self, "llm_manager") and self.llm_manager:
-                response = self.llm_manager.generate_response(
-                    enhanced_prompt,
-                    model=getattr(self.llm_manager.active_backend, "model", "gpt-3.5-turbo"),
-                    max_tokens=self.config.get("max_tokens", 150),
-                    temperature=self.config.get("temperature", 0.7),
-                )
+                llm_kwargs = {
+                    "model": getattr(self.llm_manager.active_backend, "model", "gpt-3.5-turbo"),
+                    "max_tokens": self.config.get("max_tokens", 150),
+                    "temperature": self.config.get("temperature", 0.7),
+                }
+                if on_chunk is not None:
+                    response = _consume_stream(
+                        self.llm_manager.generate_stream(enhanced_prompt, **llm_kwargs),
+                        on_chunk,
+                    )
+                else:
+                    response = self.llm_manager.generate_response(
+                        enhanced_prompt, **llm_kwargs
+                    )
                 _backend_name = self.llm_manager.get_active_backend_name()
                 model_name, api_mode = self._resolve_model_and_api(_backend_name)
+            elif on_chunk is not None:
+                # Providers may return a generator (Ollama) or a plain string.
+                streamed = self.provider.generate_stream(enhanced_prompt)
+                if isinstance(streamed, str):
+                    streamed = [streamed]
+                response = _consume_stream(streamed, on_chunk)
+                model_name = getattr(self.provider, "model", "unknown")
+                api_mode = getattr(self.provider, "api_mode", "unknown")
             else:
                 response = self.provider.generate(enhanced_prompt)
                 model_name = getattr(self.provider, "model", "unknown")
@@ -317,7 +391,7 @@ class AdvisorsService:
             response = self._apply_switch_mode_directives(response)
 
             self.conversation_engine.record_conversation_turn(
-                user_id=f"{message.platform}:{message.channel}:{message.user}",
+                user_id=history_key,
                 user_input=message.text,
                 assistant_response=response,
                 context={
@@ -330,20 +404,29 @@ class AdvisorsService:
         except Exception as e:
             return f"[LLM Error] {message.text} ({str(e)})", "error", "error"
 
-    def _build_combined_history_text(
-        self, platform_value: str, channel: str, user: str, current_text: str
-    ) -> str:
-        """Pure helper extracted from handle_message() to reduce complexity.
+    def _seed_history(
+        self, history_key: str, platform_value: str, channel: str, user: str
+    ) -> None:
+        """Load persisted memory into the engine's history window on first contact.
 
-        Fetches recent memory and builds combined history+current user text.
+        ``history_key`` is the engine user id that prompt building and turn
+        recording use for this message. After seeding, the window is
+        extended as turns are recorded, instead of the whole memory being
+        re-joined into every prompt.
         """
-        memory_items = self.memory.get(platform_value, channel, user)
-        history_text = (
-            "\n".join([f"{mi.role}: {mi.content}" for mi in memory_items])
-            if memory_items
-            else ""
+        if self.conversation_engine.has_history(history_key):
+            return
+        items = self.memory.get(platform_value, channel, user)
+        self.conversation_engine.seed_history(
+            history_key, [(mi.role, mi.content) for mi in items]
         )
-        return f"{history_text}\n{current_text}" if history_text else current_text
+
+    def clear_memory(self, platform: str, channel: str, user: str) -> int:
+        """Clear a context's stored memory and the prompt history built from it."""
+        platform = platform.lower()
+        count = self.memory.clear(platform, channel, user)
+        self.conversation_engine.clear_history(f"{platform}:{channel}:{user}")
+        return count
 
     def _resolve_persona_config(self, context) -> dict:
         """Pure helper extracted from handle_message() to reduce complexity.
@@ -0,0 +1,129 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Shared text features for intent and sentiment analysis.
+
+Both :class:`~chatty_commander.advisors.conversation_engine.ConversationEngine`
+and :class:`~chatty_commander.ai.intelligence_core.IntelligenceCore` classify
+the same user message with keyword lists. This module tokenizes a message
+once (:func:`extract_features`, memoized per text) and compiles each keyword
+list once (:class:`Lexicon`). Single words are matched by set lookup against
+the message's tokens; multi-word phrases are folded into one alternation
+pattern searched over the space-joined tokens.
+
+Matching is case-insensitive and on whole words: ``"do"`` does not match
+``"window"``, and ``"go to"`` matches ``"go   to"``.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """Lowercased word tokens of ``text``."""
+    return tuple(_WORD_RE.findall(text.lower()))
+
+
+@dataclass(frozen=True)
+class TextFeatures:
+    """A message reduced to what the keyword classifiers look at."""
+
+    text: str
+    lower: str
+    tokens: tuple[str, ...]
+    words: frozenset[str]
+    normalized: str
+
+    @classmethod
+    def from_text(cls, text: str) -> TextFeatures:
+        lower = text.lower()
+        tokens = tuple(_WORD_RE.findall(lower))
+        return cls(
+            text=text,
+            lower=lower,
+            tokens=tokens,
+            words=frozenset(tokens),
+            normalized=" ".join(tokens),
+        )
+
+
+@lru_cache(maxsize=1024)
+def extract_features(text: str) -> TextFeatures:
+    """Features of ``text``, computed once per distinct message."""
+    return TextFeatures.from_text(text)
+
+
+class Lexicon:
+    """A keyword list compiled for matching against :class:`TextFeatures`."""
+
+    def __init__(self, entries: Iterable[str]) -> None:
+        self.entries = tuple(entries)
+        words: set[str] = set()
+        phrases: set[str] = set()
+        for entry in self.entries:
+            parts = tokenize(entry)
+            if len(parts) == 1:
+                words.add(parts[0])
+            elif parts:
+                phrases.add(" ".join(parts))
+        self._words = frozenset(words)
+        self._phrases: re.Pattern[str] | None = None
+        if phrases:
+            # Longest first so overlapping phrases report the longer match.
+            alternation = "|".join(
+                re.escape(p) for p in sorted(phrases, key=len, reverse=True)
+            )
+            self._phrases = re.compile(rf"(?<!\S)(?:{alternation})(?!\S)")
+
+    def matches(self, features: TextFeatures) -> bool:
+        """Whether any entry occurs in ``features`` as whole words."""
+        if not self._words.isdisjoint(features.words):
+            return True
+        return (
+            self._phrases is not None
+            and self._phrases.search(features.normalized) is not None
+        )
+
+    def count(self, features: TextFeatures) -> int:
+        """Number of distinct entries that occur in ``features``."""
+        found = len(self._words & features.words)
+        if self._phrases is not None:
+            found += len(set(self._phrases.findall(features.normalized)))
+        return found
+
+    def __repr__(self) -> str:
+        return f"Lexicon({list(self.entries)!r})"
+
+
+__all__ = [
+    "Lexicon",
+    "TextFeatures",
+    "extract_features",
+    "tokenize",
+]
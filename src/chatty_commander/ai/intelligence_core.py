@@ -23,7 +23,6 @@
 """Core AI intelligence module that orchestrates all AI capabilities."""
 
 import logging
-import re
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
@@ -34,10 +33,21 @@ from ..advisors.service import (
     AdvisorMessage,
     AdvisorsService,
 )
+from ..advisors.text_features import Lexicon, extract_features
 from ..app.config import Config
 from ..app.state_manager import StateManager
 from ..voice.enhanced_processor import VoiceResult, create_enhanced_voice_processor
 
+_MODE_TRIGGERS = Lexicon(["switch", "change", "go to"])
+_MODE_TARGETS = Lexicon(["mode", "idle", "computer", "chatty"])
+_SCREENSHOT = Lexicon(["screenshot", "capture", "take picture", "take a picture"])
+_LIGHTS_ON = Lexicon(["lights on", "turn on lights", "turn on the lights"])
+_LIGHTS_OFF = Lexicon(["lights off", "turn off lights", "turn off the lights"])
+_GREETING = Lexicon(
+    ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]
+)
+_TASK = Lexicon(["help", "assist", "do", "make", "create"])
+
 
 @dataclass
 class AIResponse:
@@ -233,49 +243,33 @@ class IntelligenceCore:
     def _analyze_intent(self, text: str) -> str:
         if not text:
             return "conversation"
-        text_lower = text.lower()
+        features = extract_features(text)
 
         # Mode switching: a trigger phrase plus either the word "mode" or a
         # known mode name (e.g. "go to idle", "switch to chatty").
-        if any(word in text_lower for word in ["switch", "change", "go to"]) and (
-            "mode" in text_lower
-            or any(name in text_lower for name in ["idle", "computer", "chatty"])
-        ):
+        if _MODE_TRIGGERS.matches(features) and _MODE_TARGETS.matches(features):
             return "mode_switch"
 
         # System commands
-        if any(
-            word in text_lower
-            for word in ["screenshot", "capture", "take picture", "take a picture"]
-        ):
+        if _SCREENSHOT.matches(features):
             return "screenshot"
 
-        if any(
-            word in text_lower
-            for word in ["lights on", "turn on lights", "turn on the lights"]
-        ):
+        if _LIGHTS_ON.matches(features):
             return "lights_on"
 
-        if any(
-            word in text_lower
-            for word in ["lights off", "turn off lights", "turn off the lights"]
-        ):
+        if _LIGHTS_OFF.matches(features):
             return "lights_off"
 
         # Questions
-        if text_lower.startswith(("what", "how", "why", "when", "where", "who")):
+        if features.lower.startswith(("what", "how", "why", "when", "where", "who")):
             return "question"
 
-        # Greetings (use word boundaries so e.g. "hi" does not match "this")
-        if re.search(
-            r"\b(hello|hi|hey|good\s+(morning|afternoon|evening))\b", text_lower
-        ):
+        # Greetings
+        if _GREETING.matches(features):
             return "greeting"
 
         # Tasks
-        if any(
-            word in text_lower for word in ["help", "assist", "do", "make", "create"]
-        ):
+        if _TASK.matches(features):
             return "task_request"
 
         return "conversation"
@@ -33,8 +33,22 @@ import logging
 import os
 import shlex
 import subprocess
+import threading
+import time
 from typing import Any
 
+from chatty_commander.app.execution_engine import (
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_NOT_FOUND,
+    STATUS_OK,
+    CommandEngine,
+    ExecutionResult,
+    HttpClientPool,
+    PinnedResolutionCache,
+    pool_key,
+)
+
 # Optional deps that may not be present in CI/headless environments
 try:  # pragma: no cover - exercised via tests with patching
     import pyautogui
@@ -71,6 +85,108 @@ class CommandExecutor:
         self.model_manager: Any = model_manager
         self.state_manager: Any = state_manager
         self.last_command: str | None = None
+        self._http_pool: HttpClientPool | None = None
+        self._resolutions: PinnedResolutionCache | None = None
+        self._engine: CommandEngine | None = None
+        self._engine_lock = threading.Lock()
+        # Last error reported on the current thread, for run()'s result.
+        self._errors = threading.local()
+
+    def _engine_settings(self) -> dict[str, Any]:
+        """The ``command_engine`` config section (empty if absent)."""
+        raw = getattr(self.config, "config", None)
+        section = raw.get("command_engine") if isinstance(raw, dict) else None
+        return section if isinstance(section, dict) else {}
+
+    @property
+    def engine(self) -> CommandEngine:
+        """Async dispatcher for this executor, built on first use."""
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = CommandEngine.from_config(self, self._engine_settings())
+            return self._engine
+
+    def action_type(self, command_name: str) -> str | None:
+        """Return the action type configured for ``command_name``, if any."""
+        command_action = self._get_action_safely(command_name)
+        if not command_action or not hasattr(command_action, "get"):
+            return None
+        action = command_action.get("action")
+        if isinstance(action, str):
+            return action
+        for legacy in ("keypress", "url", "shell"):
+            if legacy in command_action:
+                return legacy
+        return None
+
+    def run(self, command_name: str) -> ExecutionResult:
+        """Execute ``command_name`` and return a timed, structured result.
+
+        Same semantics as :meth:`execute_command`, but never raises: invalid
+        configuration and unexpected errors are reported in the result.
+        """
+        action = self.action_type(command_name)
+        started = time.time()
+        t0 = time.perf_counter()
+        self._errors.message = None
+        if action is None:
+            return ExecutionResult(command_name, None, STATUS_NOT_FOUND, False)
+        error: str | None
+        try:
+            ok = bool(self.execute_command(command_name))
+            status = STATUS_OK if ok else STATUS_FAILED
+            error = self._errors.message
+        except Exception as e:  # noqa: BLE001 - surfaced in the result
+            ok, status, error = False, STATUS_ERROR, str(e)
+        return ExecutionResult(
+            command_name,
+            action,
+            status,
+            ok,
+            started_at=started,
+            duration_ms=(time.perf_counter() - t0) * 1000,
+            error=error,
+        )
+
+    async def execute_async(self, command_name: str) -> ExecutionResult:
+        """Queue ``command_name`` on :attr:`engine` and await the result."""
+        return await self.engine.submit(command_name)
+
+    def close(self) -> None:
+        """Release pooled HTTP connections and engine threads."""
+        with self._engine_lock:
+            engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.shutdown()
+        if self._http_pool is not None:
+            self._http_pool.close()
+            self._http_pool = None
+
+    def _resolution_cache(self) -> PinnedResolutionCache:
+        if self._resolutions is None:
+            ttl = float(self._engine_settings().get("dns_ttl", 60))
+            self._resolutions = PinnedResolutionCache(ttl=ttl)
+        return self._resolutions
+
+    def _http_client_pool(self) -> HttpClientPool:
+        if self._http_pool is None:
+            settings = self._engine_settings()
+            keepalive = int(settings.get("http_keepalive", 8))
+
+            def factory() -> Any:
+                # Looked up at call time so tests can patch ``httpx``.
+                return httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=keepalive * 2,
+                        max_keepalive_connections=keepalive,
+                        keepalive_expiry=30.0,
+                    )
+                )
+
+            self._http_pool = HttpClientPool(
+                factory, max_clients=int(settings.get("http_max_clients", 16))
+            )
+        return self._http_pool
 
     def _get_command_action(self, command_name: str) -> Any:
         """Get command action from config, with validation.
@@ -338,12 +454,11 @@ class CommandExecutor:
             self.report_error(command_name, "missing URL")
             return
 
-        from chatty_commander.utils.url_validator import resolve_safe_url
-
         # Validate and PIN the URL to its resolved IP. Fetching the pinned URL
         # (host = validated IP literal) closes the DNS-rebinding TOCTOU window:
-        # no second DNS lookup happens between validation and connect.
-        pinned = resolve_safe_url(url)
+        # no second DNS lookup happens between validation and connect. Pins
+        # are reused for ``command_engine.dns_ttl`` seconds.
+        pinned = self._resolution_cache().resolve(url)
         if pinned is None:
             self.report_error(command_name, "unsafe URL rejected")
             return
@@ -355,14 +470,16 @@ class CommandExecutor:
             # Add timeout and disable redirects for security. Connect to the
             # pinned IP while presenting the original host via the Host header
             # and TLS SNI (sni_hostname) so HTTPS verification still works.
-            with httpx.Client() as client:
-                resp = client.get(
-                    pinned.url,
-                    timeout=10,
-                    follow_redirects=False,
-                    headers={"Host": pinned.host_header},
-                    extensions={"sni_hostname": pinned.sni_hostname},
-                )
+            # Clients are pooled per origin + host so keep-alive connections
+            # survive between commands.
+            client = self._http_client_pool().get(pool_key(pinned))
+            resp = client.get(
+                pinned.url,
+                timeout=10,
+                follow_redirects=False,
+                headers={"Host": pinned.host_header},
+                extensions={"sni_hostname": pinned.sni_hostname},
+            )
             if getattr(resp, "status_code", 200) >= 400:
                 self.report_error(command_name, f"http {resp.status_code}")
             else:
@@ -548,16 +665,32 @@ class CommandExecutor:
             logging.warning("No input received for voice chat")
             return False
 
-        # 3. Generate response
-        response = llm_manager.generate_response(user_input)
-
-        # 4. Speak response
-        if voice_pipeline.tts.is_available():
-            voice_pipeline.tts.speak(response)
+        # 3+4. Generate and speak; when both ends support streaming, playback
+        # starts on the first sentence instead of after the whole reply, and a
+        # slow first token is hedged against the next healthy backend.
+        if self._can_stream_voice_chat(llm_manager, voice_pipeline.tts):
+            voice_pipeline.tts.speak_stream(
+                llm_manager.generate_stream(user_input, hedge=True)
+            )
+        else:
+            response = llm_manager.generate_response(user_input)
+            if voice_pipeline.tts.is_available():
+                voice_pipeline.tts.speak(response)
 
         logging.info("Completed voice chat session")
         return True
 
+    @staticmethod
+    def _can_stream_voice_chat(llm_manager: Any, tts: Any) -> bool:
+        from chatty_commander.llm.manager import LLMManager
+        from chatty_commander.voice.tts import TextToSpeech
+
+        return (
+            isinstance(llm_manager, LLMManager)
+            and isinstance(tts, TextToSpeech)
+            and tts.is_available()
+        )
+
     def _execute_voice_chat(self, command_name: str) -> bool:
         """Executes a voice chat session."""
         logging.info(f"Starting voice chat for {command_name}")
@@ -580,6 +713,7 @@ class CommandExecutor:
 
     def report_error(self, command_name: str, error_message: str) -> None:
         logging.critical(f"Error in {command_name}: {error_message}")
+        self._errors.message = error_message
 
         # Also report to the utils logger for test compatibility
         try:
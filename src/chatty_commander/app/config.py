@@ -22,13 +22,25 @@
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import os
 import shlex
 import subprocess
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any
 
+from .config_watcher import (
+    ConfigChange,
+    ConfigListener,
+    ConfigSection,
+    SaveCoalescer,
+    diff_config,
+)
+
 logger = logging.getLogger(__name__)
 
 # Default command set used when no `commands` are present in the config file.
@@ -41,9 +53,13 @@ DEFAULT_COMMANDS: dict[str, Any] = {
 
 
 class Config:
+    # What the file held when last loaded or saved; reloads diff against it.
+    _file_snapshot: dict[str, Any]
+
     def __init__(self, config_file: str = "config.json") -> None:
         self.config_file = config_file
         self.config_data: dict[str, Any] = self._load_config()
+        self._init_change_tracking()
 
         # Track if the original config was valid (not empty due to errors)
         self._config_was_valid: bool = bool(self.config_data)
@@ -81,12 +97,7 @@ class Config:
         )
 
         # Advisors configuration
-        advisors_cfg = self.config_data.get("advisors", {})
-        self.advisors = {
-            "enabled": advisors_cfg.get("enabled", False),
-            "llm_api_mode": advisors_cfg.get("llm_api_mode", "completion"),
-            "model": advisors_cfg.get("model", "gpt-oss20b"),
-        }
+        self.advisors = self._advisors_settings()
 
         # Voice/GUI behaviour
         self._voice_only: bool = bool(self.config_data.get("voice_only", False))
@@ -166,7 +177,7 @@ class Config:
 
             @debug_mode.setter
             def debug_mode(self, v: bool) -> None:
-                self._cfg._update_general_setting("debug_mode", bool(v))
+                self._cfg._update_general_setting("debug_mode", bool(v), defer=True)
 
             @property
             def inference_framework(self) -> str:
@@ -178,7 +189,7 @@ class Config:
 
             @inference_framework.setter
             def inference_framework(self, v: str) -> None:
-                self._cfg._update_general_setting("inference_framework", v)
+                self._cfg._update_general_setting("inference_framework", v, defer=True)
 
             @property
             def start_on_boot(self) -> bool:
@@ -188,7 +199,7 @@ class Config:
 
             @start_on_boot.setter
             def start_on_boot(self, v: bool) -> None:
-                self._cfg._update_general_setting("start_on_boot", bool(v))
+                self._cfg._update_general_setting("start_on_boot", bool(v), defer=True)
 
             @property
             def check_for_updates(self) -> bool:
@@ -200,7 +211,7 @@ class Config:
 
             @check_for_updates.setter
             def check_for_updates(self, v: bool) -> None:
-                self._cfg._update_general_setting("check_for_updates", bool(v))
+                self._cfg._update_general_setting("check_for_updates", bool(v), defer=True)
 
         self.general_settings = _GeneralSettings(self)
 
@@ -241,14 +252,27 @@ class Config:
                 logger.info(f"Model path does not exist: {path}")
 
     def reload_config(self) -> bool:
-        """Reload configuration from file. Returns True if successful."""
+        """Reload configuration from file. Returns True if anything changed.
+
+        The file is diffed against the version last loaded or saved, and only
+        settings derived from the changed sections are recomputed. In
+        particular ``model_actions`` is rebuilt (and with it the voice command
+        matcher's index) only when commands, keybindings or API endpoints
+        changed. Listeners registered with :meth:`subscribe` then receive the
+        list of :class:`ConfigChange`.
+        """
         try:
             new_config = self._load_config()
-            if new_config != self.config_data:
-                self.config_data = new_config
-                self.config = new_config
-                # Refresh top-level derived attributes that callers read directly;
-                # otherwise edits to these in the config file are silently ignored.
+            changes = diff_config(self._file_snapshot, new_config)
+            if not changes:
+                return False
+            sections = {change.section for change in changes}
+            self._file_snapshot = copy.deepcopy(new_config)
+            self.config_data = new_config
+            self.config = new_config
+            # Refresh top-level derived attributes that callers read directly;
+            # otherwise edits to these in the config file are silently ignored.
+            if ConfigSection.MODEL_PATHS in sections:
                 self.general_models_path = self.config_data.get(
                     "general_models_path", "models-idle"
                 )
@@ -258,29 +282,125 @@ class Config:
                 self.chat_models_path = self.config_data.get(
                     "chat_models_path", "models-chatty"
                 )
+            if ConfigSection.STATES in sections:
                 self.state_models = self.config_data.get("state_models", {})
-                self.api_endpoints = self.config_data.get(
-                    "api_endpoints", self.api_endpoints
-                )
                 self.wakeword_state_map = self.config_data.get(
                     "wakeword_state_map", {}
                 )
                 self.state_transitions = self.config_data.get("state_transitions", {})
+            if ConfigSection.API_ENDPOINTS in sections:
+                self.api_endpoints = self.config_data.get(
+                    "api_endpoints", self.api_endpoints
+                )
+            if ConfigSection.COMMANDS in sections:
                 self.commands = self.config_data.get("commands", self.commands)
-                self._validate_config()
-                # Re-apply env overrides + web server config so they keep
-                # precedence over freshly-loaded file values (matches __init__).
-                self._apply_env_overrides()
-                self._apply_web_server_config()
-                self._load_general_settings()  # Load general settings to update default_state
-                # Force re-load of other properties that depend on config_data
+            if ConfigSection.ADVISORS in sections:
+                self.advisors = self._advisors_settings()
+            self._validate_config()
+            # Re-apply env overrides + web server config so they keep
+            # precedence over freshly-loaded file values (matches __init__).
+            self._apply_env_overrides()
+            self._apply_web_server_config()
+            self._load_general_settings()  # Load general settings to update default_state
+            if sections & {
+                ConfigSection.COMMANDS,
+                ConfigSection.KEYBINDINGS,
+                ConfigSection.API_ENDPOINTS,
+            }:
                 self.model_actions = self._build_model_actions()
-                logger.info("Configuration reloaded successfully")
-                return True
-            return False
+            logger.info(
+                "Configuration reloaded (%s)",
+                ", ".join(change.section.value for change in changes),
+            )
         except Exception as e:
             logger.error(f"Failed to reload configuration: {e}")
             return False
+        self._notify(changes)
+        return True
+
+    # ------------------------------------------------------------------
+    # Change tracking: listeners and coalesced saves
+    def _init_change_tracking(self) -> None:
+        self._file_snapshot = copy.deepcopy(self.config_data)
+        self._listeners: list[tuple[ConfigListener, frozenset[ConfigSection] | None]] = []
+        self._save_lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_save_pending = False
+        self._coalescer: SaveCoalescer | None = None
+
+    def subscribe(
+        self,
+        listener: ConfigListener,
+        sections: Iterable[ConfigSection] | None = None,
+    ) -> Callable[[], None]:
+        """Call ``listener(changes)`` after reloads touching ``sections``.
+
+        With ``sections=None`` every reload is delivered. Returns a function
+        that removes the subscription.
+        """
+        entry = (listener, frozenset(sections) if sections is not None else None)
+        self._listeners.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._listeners:
+                self._listeners.remove(entry)
+
+        return unsubscribe
+
+    def _notify(self, changes: list[ConfigChange]) -> None:
+        for listener, wanted in list(self._listeners):
+            relevant = [c for c in changes if wanted is None or c.section in wanted]
+            if not relevant:
+                continue
+            try:
+                listener(relevant)
+            except Exception as e:
+                logger.error(f"Config change listener {listener!r} failed: {e}")
+
+    @contextmanager
+    def batch_updates(self) -> Iterator[None]:
+        """Defer saves inside the block and write once when it exits.
+
+        ``save_config`` returns True immediately while a batch is open, and
+        ``schedule_save`` (used by the setters) waits for the batch instead of
+        arming its timer.
+        """
+        with self._save_lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._save_lock:
+                self._batch_depth -= 1
+                flush = self._batch_depth == 0 and self._batch_save_pending
+                if flush:
+                    self._batch_save_pending = False
+            if flush and not self.save_config():
+                logger.error("Failed to persist batched config updates")
+
+    def schedule_save(self, delay: float = 0.25) -> None:
+        """Save ``delay`` seconds after the last call (one write per burst)."""
+        with self._save_lock:
+            if self._batch_depth:
+                self._batch_save_pending = True
+                return
+            if self._coalescer is None:
+                self._coalescer = SaveCoalescer(self.save_config, delay=delay)
+            self._coalescer.delay = delay
+        self._coalescer.request()
+
+    def flush_pending_save(self) -> bool:
+        """Write a scheduled save now (e.g. on shutdown)."""
+        coalescer = self._coalescer
+        return coalescer.flush() if coalescer is not None else True
+
+    def _advisors_settings(self) -> dict[str, Any]:
+        advisors_cfg = self.config_data.get("advisors", {})
+        return {
+            "enabled": advisors_cfg.get("enabled", False),
+            "llm_api_mode": advisors_cfg.get("llm_api_mode", "completion"),
+            "model": advisors_cfg.get("model", "gpt-oss20b"),
+        }
 
     # ------------------------------------------------------------------
     # Helpers
@@ -483,6 +603,10 @@ class Config:
         if config_data is not None:
             self.config_data.update(config_data)
             self.config = self.config_data
+        with self._save_lock:
+            if self._batch_depth:
+                self._batch_save_pending = True
+                return True
         # Persist web server config and voice_only
         self._apply_web_server_config()
         self.config_data["web_server"] = self.web_server
@@ -501,9 +625,12 @@ class Config:
                 prefix=".config-", suffix=".tmp", dir=target_dir
             )
             try:
+                payload = json.dumps(self.config_data, indent=2)
                 with _os.fdopen(fd, "w", encoding="utf-8") as f:
-                    json.dump(self.config_data, f, indent=2)
+                    f.write(payload)
                 _os.replace(tmp_path, self.config_file)
+                # Our own write must not look like an external edit on reload.
+                self._file_snapshot = json.loads(payload)
             except BaseException:
                 # Never leave a temp file behind on failure.
                 try:
@@ -535,7 +662,7 @@ class Config:
     def set_start_on_boot(self, enabled: bool) -> None:
         """Update with (self, enabled: bool)."""
 
-        self._update_general_setting("start_on_boot", bool(enabled))
+        self._update_general_setting("start_on_boot", bool(enabled), defer=True)
         self.start_on_boot = bool(enabled)
         if enabled:
             self._enable_start_on_boot()
@@ -563,10 +690,20 @@ class Config:
             "implemented for this platform; no autostart entry was removed."
         )
 
-    def _update_general_setting(self, key: str, value: Any) -> bool:
+    def _update_general_setting(
+        self, key: str, value: Any, defer: bool = False
+    ) -> bool:
+        """Set ``general[key]`` and persist it.
+
+        Writes now and returns the ``save_config`` result, or with ``defer``
+        coalesces the write via :meth:`schedule_save` and returns True.
+        """
         if "general" not in self.config_data:
             self.config_data["general"] = {}
         self.config_data["general"][key] = value
+        if defer:
+            self.schedule_save()
+            return True
         saved = self.save_config(self.config_data)
         if not saved:
             logger.error(
@@ -617,7 +754,7 @@ class Config:
             return None
 
     def set_check_for_updates(self, enabled: bool) -> None:
-        self._update_general_setting("check_for_updates", bool(enabled))
+        self._update_general_setting("check_for_updates", bool(enabled), defer=True)
         self.check_for_updates = bool(enabled)
 
     @classmethod
@@ -634,6 +771,7 @@ class Config:
         instance.config_file = config_file
 
         instance.config_data = (data or {}).copy()
+        instance._init_change_tracking()
         # Mirror __init__: web handlers/tests expect `.config` as the raw dict.
         instance.config = instance.config_data
         instance._config_was_valid = bool(instance.config_data)
@@ -730,3 +868,23 @@ class Config:
         result["general"]["start_on_boot"] = self.start_on_boot
 
         return result
+
+
+def persist_config(cfg_mgr: Any) -> None:
+    """Save a config manager's settings from a web handler.
+
+    A :class:`Config` gets a coalesced :meth:`Config.schedule_save`, so a burst
+    of settings edits is written once; other managers (test doubles, legacy
+    objects) get ``save_config()`` or ``save_config(config)`` right away.
+    """
+    # type(), not isinstance(): a Mock(spec=Config) passes isinstance but
+    # expects the direct save_config() call.
+    if issubclass(type(cfg_mgr), Config):
+        cfg_mgr.schedule_save()
+        return
+    save = getattr(cfg_mgr, "save_config", None)
+    if callable(save):
+        try:
+            save()
+        except TypeError:
+            save(getattr(cfg_mgr, "config", {}))
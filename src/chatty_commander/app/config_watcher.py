@@ -0,0 +1,394 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Config change detection: structural diffs, a file watcher, save coalescing.
+
+- :func:`diff_config` compares two raw config dicts and returns one
+  :class:`ConfigChange` per affected section (commands, keybindings,
+  advisors, ...) with the entry names that were added, removed or modified.
+  :meth:`Config.reload_config` uses it to refresh only the derived state that
+  depends on what changed and then notifies ``Config.subscribe`` callbacks.
+- :class:`ConfigWatcher` calls ``reload_config`` when the file changes on
+  disk, using watchdog (inotify on Linux) when available and stat polling
+  otherwise.
+- :class:`SaveCoalescer` turns a burst of save requests into one write.
+  Saves still pending at interpreter exit are written by
+  :func:`flush_pending_saves`, which is registered with :mod:`atexit`.
+
+:func:`start_config_watcher` is how the CLI and web entry points start
+watching; ``Config.flush_pending_save`` is their matching shutdown step.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import weakref
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigSection(Enum):
+    """Groups of top-level config keys that subscribers react to together."""
+
+    COMMANDS = "commands"
+    KEYBINDINGS = "keybindings"
+    ADVISORS = "advisors"
+    API_ENDPOINTS = "api_endpoints"
+    STATES = "states"
+    MODEL_PATHS = "model_paths"
+    WEB_SERVER = "web_server"
+    GENERAL = "general"
+    OTHER = "other"
+
+
+_SECTION_OF_KEY: dict[str, ConfigSection] = {
+    "commands": ConfigSection.COMMANDS,
+    "keybindings": ConfigSection.KEYBINDINGS,
+    "advisors": ConfigSection.ADVISORS,
+    "api_endpoints": ConfigSection.API_ENDPOINTS,
+    "state_models": ConfigSection.STATES,
+    "state_transitions": ConfigSection.STATES,
+    "wakeword_state_map": ConfigSection.STATES,
+    "default_state": ConfigSection.STATES,
+    "general_models_path": ConfigSection.MODEL_PATHS,
+    "system_models_path": ConfigSection.MODEL_PATHS,
+    "chat_models_path": ConfigSection.MODEL_PATHS,
+    "web_server": ConfigSection.WEB_SERVER,
+    "general": ConfigSection.GENERAL,
+    "general_settings": ConfigSection.GENERAL,
+    "voice_only": ConfigSection.GENERAL,
+}
+
+
+def section_of(key: str) -> ConfigSection:
+    return _SECTION_OF_KEY.get(key, ConfigSection.OTHER)
+
+
+@dataclass(frozen=True)
+class ConfigChange:
+    """What changed in one section between two versions of the config.
+
+    ``keys`` are the top-level config keys that differ. For dict-valued keys,
+    ``added``/``removed``/``modified`` name the entries inside them (e.g.
+    command names); a top-level key that appears or disappears is reported
+    in ``added``/``removed`` itself.
+    """
+
+    section: ConfigSection
+    keys: frozenset[str]
+    added: frozenset[str] = field(default_factory=frozenset)
+    removed: frozenset[str] = field(default_factory=frozenset)
+    modified: frozenset[str] = field(default_factory=frozenset)
+
+
+_MISSING = object()
+
+
+def diff_config(old: Mapping[str, Any], new: Mapping[str, Any]) -> list[ConfigChange]:
+    """Return the per-section changes between ``old`` and ``new``."""
+    grouped: dict[ConfigSection, dict[str, set[str]]] = {}
+    for key in old.keys() | new.keys():
+        before = old.get(key, _MISSING)
+        after = new.get(key, _MISSING)
+        if before == after:
+            continue
+        parts = grouped.setdefault(
+            section_of(key),
+            {"keys": set(), "added": set(), "removed": set(), "modified": set()},
+        )
+        parts["keys"].add(key)
+        if before is _MISSING:
+            parts["added"].add(key)
+        elif after is _MISSING:
+            parts["removed"].add(key)
+        elif isinstance(before, dict) and isinstance(after, dict):
+            parts["added"].update(after.keys() - before.keys())
+            parts["removed"].update(before.keys() - after.keys())
+            parts["modified"].update(
+                k for k in before.keys() & after.keys() if before[k] != after[k]
+            )
+        else:
+            parts["modified"].add(key)
+    return [
+        ConfigChange(
+            section=section,
+            keys=frozenset(parts["keys"]),
+            added=frozenset(parts["added"]),
+            removed=frozenset(parts["removed"]),
+            modified=frozenset(parts["modified"]),
+        )
+        for section, parts in sorted(grouped.items(), key=lambda item: item[0].value)
+    ]
+
+
+ConfigListener = Callable[[list[ConfigChange]], None]
+
+
+def _file_signature(path: str) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class ConfigWatcher:
+    """Reload a :class:`Config` when its file changes.
+
+    Args:
+        config: Object with ``config_file`` and ``reload_config()``.
+        poll_interval: Seconds between stat checks when polling.
+        debounce: Quiet period after the last change before reloading, so an
+            editor's write-rename sequence triggers a single reload.
+        use_watchdog: Prefer filesystem notifications (watchdog) when the
+            package is installed.
+    """
+
+    def __init__(
+        self,
+        config: Any,
+        poll_interval: float = 1.0,
+        debounce: float = 0.2,
+        use_watchdog: bool = True,
+    ) -> None:
+        self.config = config
+        self.path = os.path.abspath(config.config_file)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_watchdog = use_watchdog
+        self.reloads = 0
+        self._signature = _file_signature(self.path)
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._observer: Any = None
+
+    @classmethod
+    def from_config(cls, config: Any) -> ConfigWatcher | None:
+        """Build a watcher from the ``config_watch`` section; ``None`` if off."""
+        path = getattr(config, "config_file", None)
+        data = getattr(config, "config_data", None)
+        if not isinstance(path, str) or not path or not isinstance(data, dict):
+            return None
+        opts = data.get("config_watch", {}) or {}
+        if not opts.get("enabled", True):
+            return None
+        return cls(
+            config,
+            poll_interval=float(opts.get("poll_interval", 1.0)),
+            debounce=float(opts.get("debounce", 0.2)),
+            use_watchdog=bool(opts.get("use_watchdog", True)),
+        )
+
+    @property
+    def mode(self) -> str:
+        if self._observer is not None:
+            return "watchdog"
+        return "polling" if self._thread is not None else "stopped"
+
+    def start(self) -> ConfigWatcher:
+        if self._observer is not None or self._thread is not None:
+            return self
+        self._stop.clear()
+        if self.use_watchdog and self._start_watchdog():
+            return self
+        self._thread = threading.Thread(
+            target=self._poll, name="config-watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _start_watchdog(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):  # type: ignore[misc]
+            def on_any_event(self, event: Any) -> None:
+                paths = {getattr(event, "src_path", ""), getattr(event, "dest_path", "")}
+                if watcher.path in {os.path.abspath(p) for p in paths if p}:
+                    watcher.notify()
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), os.path.dirname(self.path) or ".", recursive=False)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.info(f"Config file notifications unavailable ({e}); polling instead")
+            return False
+        self._observer = observer
+        return True
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            if _file_signature(self.path) != self._signature:
+                self.notify()
+
+    def notify(self) -> None:
+        """Schedule a reload after the debounce period (restarting it)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def check(self) -> bool:
+        """Reload now if the file changed since the last check."""
+        signature = _file_signature(self.path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            changed = bool(self.config.reload_config())
+        except Exception as e:
+            logger.error(f"Config reload after file change failed: {e}")
+            return False
+        if changed:
+            self.reloads += 1
+        return changed
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+
+def start_config_watcher(
+    config: Any, model_manager: Any = None, state_manager: Any = None
+) -> ConfigWatcher | None:
+    """Watch ``config``'s file and reload only what an edit touched.
+
+    Shared by the CLI and web entry points. When ``model_manager`` is given,
+    edits to the model paths reload the models for the current state.
+    Returns the started watcher, or ``None`` when watching is off.
+    """
+    watcher = ConfigWatcher.from_config(config)
+    if watcher is None:
+        return None
+
+    if model_manager is not None and hasattr(config, "subscribe"):
+
+        def reload_models(_changes: list[ConfigChange]) -> None:
+            if hasattr(model_manager, "invalidate"):
+                model_manager.invalidate()
+            if hasattr(model_manager, "reload_models"):
+                state = getattr(state_manager, "current_state", None)
+                model_manager.reload_models(state)
+
+        config.subscribe(reload_models, sections=[ConfigSection.MODEL_PATHS])
+    watcher.start()
+    logger.info(f"Watching {watcher.path} for changes ({watcher.mode})")
+    return watcher
+
+
+class SaveCoalescer:
+    """Collapse bursts of save requests into a single ``save`` call.
+
+    :meth:`request` (re)arms a timer; the save runs ``delay`` seconds after the
+    last request, or immediately on :meth:`flush`.
+    """
+
+    def __init__(self, save: Callable[[], bool], delay: float = 0.25) -> None:
+        self._save = save
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self.requests = 0
+        self.saves = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._timer is not None
+
+    def request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+            _pending_coalescers.add(self)
+
+    def flush(self) -> bool:
+        """Run the pending save now; ``True`` if nothing was pending."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+            _pending_coalescers.discard(self)
+            if timer is None:
+                return True
+            timer.cancel()
+            self.saves += 1
+        return self._save()
+
+
+# Coalescers with a save scheduled. Timer threads are daemons, so without this
+# a save requested just before exit would be dropped.
+_pending_coalescers: weakref.WeakSet[SaveCoalescer] = weakref.WeakSet()
+
+
+def flush_pending_saves() -> None:
+    """Run every scheduled save now (interpreter exit, test teardown)."""
+    for coalescer in list(_pending_coalescers):
+        try:
+            coalescer.flush()
+        except Exception as e:  # noqa: BLE001 - one failed save must not skip the rest
+            logger.error(f"Failed to flush pending config save: {e}")
+
+
+atexit.register(flush_pending_saves)
+
+
+__all__ = [
+    "ConfigChange",
+    "ConfigListener",
+    "ConfigSection",
+    "ConfigWatcher",
+    "SaveCoalescer",
+    "diff_config",
+    "flush_pending_saves",
+    "section_of",
+    "start_config_watcher",
+]
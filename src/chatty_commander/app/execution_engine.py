@@ -0,0 +1,601 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Asynchronous command execution: dispatch queue, concurrency limits, pooling.
+
+:meth:`CommandExecutor.execute_command` is synchronous and every call pays
+full price: URL actions build a fresh HTTP client and re-resolve DNS, shell
+actions block the caller, and nothing stops a wake word that fires three
+times in a row from running the same command three times.
+:class:`CommandEngine` wraps an executor with:
+
+- an asyncio dispatch queue; blocking actions run on a bounded thread pool;
+- per-action-type concurrency limits and wall-clock timeouts
+  (:class:`ActionPolicy`);
+- debouncing: a trigger for a command that was already accepted within
+  ``debounce_window`` seconds joins that execution instead of starting a
+  new one;
+- structured :class:`ExecutionResult` records with queue and run timings.
+
+:class:`HttpClientPool` and :class:`PinnedResolutionCache` are used by the
+executor itself so URL actions reuse keep-alive connections and validated
+DNS pins for ``dns_ttl`` seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any
+from urllib.parse import urlsplit
+
+from chatty_commander.obs.metrics import DEFAULT_REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_REJECTED = "rejected"
+STATUS_NOT_FOUND = "not_found"
+
+
+@dataclass(frozen=True)
+class ExecutionResult:
+    """Outcome of one command execution.
+
+    ``queued_ms`` is the time spent waiting for a concurrency slot and
+    ``duration_ms`` the time spent running the action. ``debounced`` is True
+    for triggers that were folded into an execution already in progress.
+    """
+
+    command: str
+    action: str | None
+    status: str
+    success: bool
+    started_at: float = field(default_factory=time.time)
+    queued_ms: float = 0.0
+    duration_ms: float = 0.0
+    error: str | None = None
+    debounced: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class ActionPolicy:
+    """Concurrency cap and wall-clock timeout for one action type."""
+
+    concurrency: int
+    timeout: float
+
+
+# Keystrokes are serialized so overlapping hotkeys never interleave; the
+# timeouts sit above the executor's own request/subprocess timeouts.
+DEFAULT_POLICIES: dict[str, ActionPolicy] = {
+    "keypress": ActionPolicy(concurrency=1, timeout=5.0),
+    "url": ActionPolicy(concurrency=8, timeout=15.0),
+    "shell": ActionPolicy(concurrency=2, timeout=20.0),
+    "custom_message": ActionPolicy(concurrency=4, timeout=5.0),
+    "voice_chat": ActionPolicy(concurrency=1, timeout=120.0),
+    "dograh_call": ActionPolicy(concurrency=2, timeout=30.0),
+}
+FALLBACK_POLICY = ActionPolicy(concurrency=2, timeout=30.0)
+
+
+class PinnedResolutionCache:
+    """TTL cache of :func:`resolve_safe_url` results.
+
+    Only successful resolutions are cached; rejected URLs are re-validated on
+    every call. The resolver is looked up at call time so tests can patch
+    ``chatty_commander.utils.url_validator.resolve_safe_url``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 256,
+        resolver: Callable[[str], Any] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._resolver = resolver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve(self, url: str) -> Any:
+        if self._resolver is not None:
+            return self._resolver(url)
+        from chatty_commander.utils import url_validator
+
+        return url_validator.resolve_safe_url(url)
+
+    def resolve(self, url: str) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        pinned = self._resolve(url)
+        if pinned is None or self.ttl <= 0:
+            return pinned
+        with self._lock:
+            self._entries[url] = (now + self.ttl, pinned)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pinned
+
+    def invalidate(self, url: str | None = None) -> None:
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl": self.ttl,
+            }
+
+
+def pool_key(pinned: Any) -> str:
+    """Pool key for a pinned URL: the connect origin plus the virtual host.
+
+    Connections are made to the pinned IP, so two hostnames served from the
+    same address would otherwise share a TLS session negotiated for the
+    other's SNI name.
+    """
+    parts = urlsplit(pinned.url)
+    return f"{parts.scheme}://{parts.netloc}|{pinned.host_header}"
+
+
+class HttpClientPool:
+    """LRU of long-lived HTTP clients so URL actions reuse connections.
+
+    Args:
+        factory: Builds a new client (e.g. ``httpx.Client(limits=...)``).
+        max_clients: Clients kept open; the least recently used one is closed
+            when a new origin would exceed this.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_clients: int = 16):
+        self._factory = factory
+        self.max_clients = max(1, max_clients)
+        self._lock = threading.Lock()
+        self._clients: OrderedDict[str, Any] = OrderedDict()
+        self.created = 0
+        self.reused = 0
+
+    def get(self, key: str) -> Any:
+        evicted = None
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return client
+            client = self._factory()
+            self.created += 1
+            self._clients[key] = client
+            if len(self._clients) > self.max_clients:
+                _, evicted = self._clients.popitem(last=False)
+        if evicted is not None:
+            self._close(evicted)
+        return client
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            client = self._clients.pop(key, None)
+        if client is not None:
+            self._close(client)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            self._close(client)
+
+    @staticmethod
+    def _close(client: Any) -> None:
+        try:
+            client.close()
+        except Exception as e:  # noqa: BLE001 - closing is best effort
+            logger.debug(f"Error closing pooled HTTP client: {e}")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+@dataclass
+class _Job:
+    command: str
+    action: str | None
+    future: asyncio.Future[ExecutionResult]
+    enqueued: float
+
+
+class CommandEngine:
+    """Queue, rate-shape and time command executions.
+
+    Args:
+        executor: Object with ``run(command) -> ExecutionResult`` and
+            ``action_type(command) -> str | None`` (a
+            :class:`~chatty_commander.app.command_executor.CommandExecutor`).
+        policies: Per-action-type overrides merged over
+            :data:`DEFAULT_POLICIES`.
+        debounce_window: Seconds during which repeat triggers of the same
+            command share the first trigger's execution. ``0`` disables.
+        max_pending: Executions admitted (queued or running) before new
+            triggers are rejected.
+        max_workers: Threads running blocking actions.
+    """
+
+    def __init__(
+        self,
+        executor: Any,
+        policies: dict[str, ActionPolicy] | None = None,
+        debounce_window: float = 0.75,
+        max_pending: int = 64,
+        max_workers: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+        registry: MetricsRegistry | None = None,
+    ):
+        self.executor = executor
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.debounce_window = max(0.0, debounce_window)
+        self.max_pending = max(1, max_pending)
+        self.max_workers = max(1, max_workers)
+        self._clock = clock
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        # Event-loop-bound state, rebuilt if the engine moves to a new loop.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._recent: dict[str, tuple[float, asyncio.Future[ExecutionResult]]] = {}
+        self._pending = 0
+        self._running = 0
+        self._counts = {
+            "submitted": 0,
+            "executed": 0,
+            "debounced": 0,
+            "rejected": 0,
+            "timeouts": 0,
+        }
+        # Background loop for callers without one (see :meth:`dispatch`).
+        self._thread: threading.Thread | None = None
+        self._thread_loop: asyncio.AbstractEventLoop | None = None
+        self._thread_lock = threading.Lock()
+
+        reg = registry or DEFAULT_REGISTRY
+        self._m_total = reg.counter(
+            "command_executions_total", "Command executions by action and status"
+        )
+        self._m_seconds = reg.histogram(
+            "command_execution_seconds", "Command run time by action"
+        )
+        self._m_queued = reg.histogram(
+            "command_queue_wait_seconds", "Time commands waited for a slot"
+        )
+
+    @classmethod
+    def from_config(cls, executor: Any, cfg: dict[str, Any] | None) -> CommandEngine:
+        """Build from the ``command_engine`` config section."""
+        cfg = cfg or {}
+        policies: dict[str, ActionPolicy] = {}
+        for action, spec in (cfg.get("limits") or {}).items():
+            if not isinstance(spec, dict):
+                continue
+            base = DEFAULT_POLICIES.get(action, FALLBACK_POLICY)
+            policies[action] = ActionPolicy(
+                concurrency=max(1, int(spec.get("concurrency", base.concurrency))),
+                timeout=float(spec.get("timeout", base.timeout)),
+            )
+        return cls(
+            executor,
+            policies=policies,
+            debounce_window=float(cfg.get("debounce_ms", 750)) / 1000.0,
+            max_pending=int(cfg.get("max_pending", 64)),
+            max_workers=int(cfg.get("max_workers", 8)),
+        )
+
+    def policy_for(self, action: str | None) -> ActionPolicy:
+        return self.policies.get(action or "", FALLBACK_POLICY)
+
+    # -- async API ---------------------------------------------------------
+
+    async def submit(self, command_name: str) -> ExecutionResult:
+        """Queue ``command_name`` and wait for its :class:`ExecutionResult`.
+
+        Never raises for command failures; those are reported in the result.
+        """
+        self._bind_loop()
+        self._counts["submitted"] += 1
+        now = self._clock()
+
+        recent = self._recent.get(command_name)
+        if recent is not None and now - recent[0] < self.debounce_window:
+            self._counts["debounced"] += 1
+            logger.debug(f"Debounced repeat trigger for {command_name}")
+            result = await asyncio.shield(recent[1])
+            return replace(result, debounced=True)
+
+        action = self._action_type(command_name)
+        if action is None:
+            return self._record(
+                ExecutionResult(command_name, None, STATUS_NOT_FOUND, False)
+            )
+        if self._pending >= self.max_pending:
+            self._counts["rejected"] += 1
+            return self._record(
+                ExecutionResult(
+                    command_name,
+                    action,
+                    STATUS_REJECTED,
+                    False,
+                    error="command queue is full",
+                )
+            )
+
+        assert self._loop is not None and self._queue is not None
+        job = _Job(command_name, action, self._loop.create_future(), now)
+        self._prune_recent(now)
+        if self.debounce_window > 0:
+            self._recent[command_name] = (now, job.future)
+        self._pending += 1
+        self._queue.put_nowait(job)
+        return await asyncio.shield(job.future)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._dispatcher is not None:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._semaphores = {}
+        self._recent = {}
+        self._tasks = set()
+        self._pending = 0
+        self._dispatcher = loop.create_task(self._dispatch())
+
+    def _action_type(self, command_name: str) -> str | None:
+        try:
+            action: str | None = self.executor.action_type(command_name)
+            return action
+        except Exception as e:  # noqa: BLE001 - bad config is a not-found
+            logger.debug(f"Could not determine action for {command_name}: {e}")
+            return None
+
+    def _prune_recent(self, now: float) -> None:
+        if len(self._recent) < 256:
+            return
+        stale = [
+            name
+            for name, (at, fut) in self._recent.items()
+            if fut.done() and now - at >= self.debounce_window
+        ]
+        for name in stale:
+            del self._recent[name]
+
+    async def _dispatch(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _semaphore(self, action: str | None) -> asyncio.Semaphore:
+        key = action or ""
+        sem = self._semaphores.get(key)
+        if sem is None:
+            sem = self._semaphores[key] = asyncio.Semaphore(
+                self.policy_for(action).concurrency
+            )
+        return sem
+
+    async def _run(self, job: _Job) -> None:
+        policy = self.policy_for(job.action)
+        sem = self._semaphore(job.action)
+        try:
+            await sem.acquire()
+        except asyncio.CancelledError:
+            self._pending -= 1
+            if not job.future.done():
+                job.future.cancel()
+            raise
+        queued = self._clock() - job.enqueued
+        loop = asyncio.get_running_loop()
+        started = time.time()
+        t0 = time.perf_counter()
+        self._running += 1
+        fut = loop.run_in_executor(self._get_pool(), self.executor.run, job.command)
+        # The slot is held until the thread really finishes, even after a
+        # timeout, so a hung action cannot exceed its type's concurrency cap.
+        fut.add_done_callback(lambda _f: self._release(sem))
+        try:
+            result = await asyncio.wait_for(asyncio.shield(fut), policy.timeout)
+        except TimeoutError:
+            self._counts["timeouts"] += 1
+            logger.warning(
+                f"Command {job.command} ({job.action}) timed out after {policy.timeout}s"
+            )
+            result = ExecutionResult(
+                job.command,
+                job.action,
+                STATUS_TIMEOUT,
+                False,
+                started_at=started,
+                duration_ms=(time.perf_counter() - t0) * 1000,
+                error=f"timed out after {policy.timeout}s",
+            )
+        except Exception as e:  # noqa: BLE001 - surfaced in the result
+            result = ExecutionResult(
+                job.command,
+                job.action,
+                STATUS_ERROR,
+                False,
+                started_at=started,
+                duration_ms=(time.perf_counter() - t0) * 1000,
+                error=str(e),
+            )
+        finally:
+            self._pending -= 1
+        self._counts["executed"] += 1
+        result = replace(result, queued_ms=queued * 1000)
+        self._m_queued.observe(queued, labels={"action": str(job.action)})
+        if not job.future.done():
+            job.future.set_result(self._record(result))
+
+    def _release(self, sem: asyncio.Semaphore) -> None:
+        self._running -= 1
+        sem.release()
+
+    def _record(self, result: ExecutionResult) -> ExecutionResult:
+        labels = {"action": str(result.action), "status": result.status}
+        self._m_total.inc(labels=labels)
+        if result.status not in (STATUS_NOT_FOUND, STATUS_REJECTED):
+            self._m_seconds.observe(
+                result.duration_ms / 1000, labels={"action": str(result.action)}
+            )
+        return result
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="command"
+                )
+            return self._pool
+
+    # -- sync API ----------------------------------------------------------
+
+    def dispatch(self, command_name: str) -> concurrent.futures.Future:
+        """Submit from synchronous code; returns a future of the result.
+
+        Runs the engine on a private background event loop, started on first
+        use, so callers such as the voice loop never block on the action.
+        """
+        loop = self._ensure_thread_loop()
+        return asyncio.run_coroutine_threadsafe(self.submit(command_name), loop)
+
+    def _ensure_thread_loop(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._thread_loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(
+                    target=run, name="command-engine", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+                self._thread_loop = loop
+            return self._thread_loop
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the background loop (if any) and the worker threads."""
+        with self._thread_lock:
+            loop, self._thread_loop = self._thread_loop, None
+            thread, self._thread = self._thread, None
+        if loop is not None:
+            try:
+                if self._loop is loop:
+                    asyncio.run_coroutine_threadsafe(
+                        self._cancel_tasks(), loop
+                    ).result(2.0)
+            except Exception as e:  # noqa: BLE001 - shutdown is best effort
+                logger.debug(f"Error cancelling command tasks: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=2.0)
+            if not loop.is_running():
+                loop.close()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
+
+    async def _cancel_tasks(self) -> None:
+        tasks = [*self._tasks, *([self._dispatcher] if self._dispatcher else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counts,
+            "pending": self._pending,
+            "running": self._running,
+            "debounce_window": self.debounce_window,
+            "policies": {
+                name: {"concurrency": p.concurrency, "timeout": p.timeout}
+                for name, p in self.policies.items()
+            },
+        }
+
+
+__all__ = [
+    "ActionPolicy",
+    "CommandEngine",
+    "DEFAULT_POLICIES",
+    "ExecutionResult",
+    "HttpClientPool",
+    "PinnedResolutionCache",
+    "pool_key",
+]
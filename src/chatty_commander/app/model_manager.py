@@ -25,6 +25,11 @@ model_manager.py
 
 Manages loading and utilization of wakeword models for the ChattyCommander application.
 Supports dynamic reloading and provides a patchable Model symbol for tests.
+
+Models are loaded per state on first use rather than all at startup. Files
+are loaded in parallel through a shared :class:`ModelRegistry` (one instance
+per file, even if several states list it), and after each state transition
+the most likely next state is prewarmed in the background.
 """
 
 from __future__ import annotations
@@ -33,7 +38,11 @@ import asyncio
 import logging
 import os
 import random
-from typing import Any
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, cast
+
+from .model_registry import ModelRegistry
 
 # Try importing the real wakewords Model, but keep a local fallback
 try:  # pragma: no cover - optional dependency
@@ -94,18 +103,48 @@ def _get_patchable_model_class():
     return Model
 
 
+# State name -> key in ModelManager.models, and the config attribute holding
+# that category's model directory.
+STATE_CATEGORIES: dict[str, str] = {
+    "idle": "general",
+    "computer": "system",
+    "chatty": "chat",
+}
+_CATEGORY_PATHS: dict[str, str] = {
+    "general": "general_models_path",
+    "system": "system_models_path",
+    "chat": "chat_models_path",
+}
+
+
 class ModelManager:
-    def __init__(self, config: Any, mock_models: bool = False) -> None:
+    def __init__(
+        self,
+        config: Any,
+        mock_models: bool = False,
+        registry: ModelRegistry | None = None,
+        load_workers: int = 4,
+    ) -> None:
         logging.basicConfig(level=logging.INFO)
         self.config: Any = config
         self.mock_models = mock_models
+        self.registry = registry or ModelRegistry(max_workers=load_workers)
         self.models: dict[str, dict[str, Model]] = {
             "general": {},
             "system": {},
             "chat": {},
         }
         self.active_models: dict[str, Model] = {}
-        self.reload_models()
+        # Categories whose directory has been scanned and loaded.
+        self._loaded: set[str] = set()
+        # Observed state transitions, used to guess which state to prewarm.
+        self._transitions: dict[str, Counter[str]] = {}
+        if mock_models:
+            self.reload_models()
+        else:
+            # Only the starting state's models are needed right away.
+            start = getattr(config, "default_state", "idle")
+            self.reload_models(start if start in STATE_CATEGORIES else "idle")
 
     def reload_models(
         self, state: str | None = None
@@ -123,6 +162,7 @@ class ModelManager:
             self.models["general"] = dummy
             self.models["system"] = {"mock_system": Model("mock_path")}
             self.models["chat"] = {"mock_chat": Model("mock_path")}
+            self._loaded.update(_CATEGORY_PATHS)
             if state:
                 self.active_models = dummy
                 return dummy
@@ -130,67 +170,136 @@ class ModelManager:
             return self.models
 
         if state is None:
-            self.models["general"] = self.load_model_set(
-                self.config.general_models_path
-            )
-            self.models["system"] = self.load_model_set(self.config.system_models_path)
-            self.models["chat"] = self.load_model_set(self.config.chat_models_path)
+            self._load_categories(list(_CATEGORY_PATHS))
             self.active_models = self.models["general"]
             return self.models
-        if state == "idle":
-            self.models["general"] = self.load_model_set(
-                self.config.general_models_path
-            )
-            self.active_models = self.models["general"]
-            return self.models["general"]
-        if state == "computer":
-            self.models["system"] = self.load_model_set(self.config.system_models_path)
-            self.active_models = self.models["system"]
-            return self.models["system"]
-        if state == "chatty":
-            self.models["chat"] = self.load_model_set(self.config.chat_models_path)
-            self.active_models = self.models["chat"]
-            return self.models["chat"]
-        return {}
+        category = STATE_CATEGORIES.get(state)
+        if category is None:
+            return {}
+        self._load_categories([category])
+        self.active_models = self.models[category]
+        return self.models[category]
 
-    def load_model_set(self, path: str) -> dict[str, Model]:
-        """Load all .onnx models from the given path."""
-        model_set: dict[str, Model] = {}
+    def _model_dir(self, category: str) -> str:
+        return cast(str, getattr(self.config, _CATEGORY_PATHS[category]))
+
+    def _load_categories(self, categories: list[str]) -> None:
+        """(Re)scan and load several categories with one parallel batch."""
+        listed = {category: self._list_models(self._model_dir(category)) for category in categories}
+        loaded = self._load_files([entry for entries in listed.values() for entry in entries])
+        for category, entries in listed.items():
+            self.models[category] = {
+                name: loaded[path] for name, path in entries if path in loaded
+            }
+            self._loaded.add(category)
+
+    def _list_models(self, path: str) -> list[tuple[str, str]]:
+        """Return ``(model_name, model_path)`` for each .onnx file in ``path``."""
         if not os.path.exists(path):
             logging.error(f"Model directory {path} does not exist.")
-            return model_set
+            return []
 
         try:
             entries = os.listdir(path)
         except Exception as e:
             logging.error(f"Error listing directory {path}: {e}")
-            return model_set
+            return []
 
+        found: list[tuple[str, str]] = []
         for model_file in entries:
             if not model_file.lower().endswith(".onnx"):
                 continue
 
             model_path = os.path.join(path, model_file)
-            model_name = os.path.splitext(model_file)[0]
-
             if not os.path.exists(model_path):
                 logging.warning(f"Model file '{model_path}' does not exist. Skipping.")
                 continue
+            found.append((os.path.splitext(model_file)[0], model_path))
+        return found
 
-            try:
-                ModelClass = _get_patchable_model_class()
-                instance = ModelClass(model_path)  # type: ignore[call-arg]
-                model_set[model_name] = instance
-                logging.info(
-                    f"Successfully loaded model '{model_name}' from '{model_path}'."
-                )
-            except Exception as e:
+    def _load_files(self, entries: list[tuple[str, str]]) -> dict[str, Model]:
+        """Load ``entries`` in parallel; failed files are logged and left out."""
+        if not entries:
+            return {}
+        try:
+            # Resolved once per batch rather than once per file.
+            ModelClass = _get_patchable_model_class()
+        except Exception as e:
+            logging.error(f"Failed to resolve the wakeword Model class: {e}")
+            return {}
+
+        results = self.registry.load_many([path for _, path in entries], ModelClass)
+        loaded: dict[str, Model] = {}
+        for model_name, model_path in entries:
+            result = results[model_path]
+            if isinstance(result, BaseException):
                 logging.error(
-                    f"Failed to load model '{model_name}' from '{model_path}'. Error details: {e}. Continuing with other models."
+                    f"Failed to load model '{model_name}' from '{model_path}'. Error details: {result}. Continuing with other models."
                 )
                 continue
+            loaded[model_path] = result
+            logging.info(f"Successfully loaded model '{model_name}' from '{model_path}'.")
+        return loaded
+
+    def load_model_set(self, path: str) -> dict[str, Model]:
+        """Load all .onnx models from the given path."""
+        entries = self._list_models(path)
+        loaded = self._load_files(entries)
+        return {name: loaded[p] for name, p in entries if p in loaded}
+
+    def prewarm(self, state: str) -> list[Future[Any]]:
+        """Start loading ``state``'s models in the background.
+
+        A later :meth:`reload_models` for that state then finds them already
+        in the registry.
+        """
+        category = STATE_CATEGORIES.get(state)
+        if self.mock_models or category is None:
+            return []
+        entries = self._list_models(self._model_dir(category))
+        if not entries:
+            return []
+        try:
+            ModelClass = _get_patchable_model_class()
+        except Exception as e:
+            logging.debug(f"Skipping prewarm of {state}: {e}")
+            return []
+        logging.debug(f"Prewarming {len(entries)} model(s) for state '{state}'")
+        return self.registry.prewarm([path for _, path in entries], ModelClass)
+
+    def predict_next_state(self, state: str) -> str | None:
+        """Guess the state most likely to follow ``state``.
+
+        Prefers the most frequent transition seen so far, then the first
+        target configured in ``state_transitions`` for ``state``.
+        """
+        seen = self._transitions.get(state)
+        if seen:
+            return seen.most_common(1)[0][0]
+        transitions = getattr(self.config, "state_transitions", None)
+        if isinstance(transitions, dict) and isinstance(transitions.get(state), dict):
+            for target in transitions[state].values():
+                if target != state and target in STATE_CATEGORIES:
+                    return str(target)
+        return None
+
+    def on_state_change(self, old_state: str, new_state: str) -> None:
+        """StateManager callback: learn the transition, prewarm what's next."""
+        self._transitions.setdefault(old_state, Counter())[new_state] += 1
+        upcoming = self.predict_next_state(new_state)
+        if upcoming is not None and STATE_CATEGORIES.get(upcoming) not in self._loaded:
+            self.prewarm(upcoming)
+
+    def attach_state_manager(self, state_manager: Any) -> None:
+        """Subscribe to ``state_manager`` transitions for background prewarming."""
+        state_manager.add_state_change_callback(self.on_state_change)
+
+    def invalidate(self) -> None:
+        """Forget which states are loaded (e.g. after model paths change)."""
+        self._loaded.clear()
 
-        return model_set
+    def shutdown(self) -> None:
+        self.registry.shutdown()
 
     async def async_listen_for_commands(self) -> str | None:
         """Asynchronously simulate listening for voice commands."""
@@ -204,8 +313,15 @@ class ModelManager:
         return asyncio.run(self.async_listen_for_commands())
 
     def get_models(self, state: str) -> dict[str, Model]:
-        """Retrieve models for the given state."""
-        return self.models.get(state, {})
+        """Retrieve models for the given state (or category), loading on first use."""
+        category = STATE_CATEGORIES.get(state, state)
+        if (
+            category in _CATEGORY_PATHS
+            and category not in self._loaded
+            and not self.mock_models
+        ):
+            self._load_categories([category])
+        return self.models.get(category, {})
 
     def __repr__(self) -> str:
         return (
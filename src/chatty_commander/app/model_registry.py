@@ -0,0 +1,160 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+model_registry.py
+
+Shared, parallel loader for wake-word model files.
+
+:class:`ModelRegistry` owns every loaded model instance, keyed by the file's
+real path, so a file that appears in more than one state's directory (or via
+symlinks) is loaded once and shared. Loads run on a small thread pool, and
+concurrent requests for the same file join the in-flight load instead of
+starting another one. An instance is reused until the file's size or mtime
+changes.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of a model file; None when it cannot be stat'ed.
+_Signature = tuple[int, int] | None
+
+
+def _signature(path: str) -> _Signature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class ModelRegistry:
+    """Load-once, share-everywhere cache of model instances.
+
+    Args:
+        max_workers: Threads used to load model files in parallel.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self._instances: dict[str, tuple[_Signature, Any]] = {}
+        self._inflight: dict[str, Future[Any]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self.loads = 0
+        self.hits = 0
+        self.failures = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Caller holds self._lock.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="model-load"
+            )
+        return self._executor
+
+    def submit(self, path: str, factory: Callable[[str], Any]) -> Future[Any]:
+        """Return a future for the model at ``path``, loading it if needed."""
+        key = os.path.realpath(path)
+        sig = _signature(key)
+        with self._lock:
+            cached = self._instances.get(key)
+            if cached is not None and cached[0] == sig:
+                self.hits += 1
+                done: Future[Any] = Future()
+                done.set_result(cached[1])
+                return done
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._get_executor().submit(self._load, key, sig, path, factory)
+                self._inflight[key] = future
+            return future
+
+    def _load(
+        self, key: str, sig: _Signature, path: str, factory: Callable[[str], Any]
+    ) -> Any:
+        try:
+            instance = factory(path)
+        except BaseException:
+            with self._lock:
+                self.failures += 1
+                self._inflight.pop(key, None)
+            raise
+        with self._lock:
+            self._instances[key] = (sig, instance)
+            self._inflight.pop(key, None)
+            self.loads += 1
+        return instance
+
+    def load_many(
+        self, paths: Iterable[str], factory: Callable[[str], Any]
+    ) -> dict[str, Any | BaseException]:
+        """Load ``paths`` in parallel; map each path to its model or the error."""
+        futures = {path: self.submit(path, factory) for path in paths}
+        results: dict[str, Any | BaseException] = {}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = e
+        return results
+
+    def prewarm(self, paths: Iterable[str], factory: Callable[[str], Any]) -> list[Future[Any]]:
+        """Start loading ``paths`` in the background without waiting."""
+        return [self.submit(path, factory) for path in paths]
+
+    def evict(self, path: str) -> None:
+        with self._lock:
+            self._instances.pop(os.path.realpath(path), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "instances": len(self._instances),
+                "in_flight": len(self._inflight),
+                "loads": self.loads,
+                "hits": self.hits,
+                "failures": self.failures,
+                "max_workers": self.max_workers,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+__all__ = ["ModelRegistry"]
@@ -140,9 +140,14 @@ class VoiceTestPipeline:
             return self._transcriber
         self._transcriber_resolved = True
         try:
-            from chatty_commander.voice.transcription import VoiceTranscriber
+            from chatty_commander.voice.transcription import (
+                TranscriptionPriority,
+                VoiceTranscriber,
+            )
 
-            transcriber = VoiceTranscriber(backend="whisper_local")
+            transcriber = VoiceTranscriber(
+                backend="whisper_local", priority=TranscriptionPriority.INTERACTIVE
+            )
             backend = getattr(transcriber, "_backend", None)
             if type(backend).__name__ == "MockTranscriptionBackend":
                 logger.info("voice-test: only mock transcription available; disabled")
@@ -599,8 +599,9 @@ Error responses include a JSON body with details:
 
 ## Rate Limiting
 
-Basic in-memory per-IP rate limiting is implemented via RateLimitMiddleware (default 60 req/min, X-RateLimit-* headers, secure client IP extraction considering trusted proxies). See src/chatty_commander/web/web_mode.py.
-- Not yet Redis-backed or per-endpoint configurable (roadmap item).
+In-memory per-caller rate limiting is implemented via RateLimitMiddleware on the shared GCRA limiter (default 600 req/min, RateLimit-* and legacy X-RateLimit-* headers, secure client IP extraction considering trusted proxies). See src/chatty_commander/web/ratelimit.py.
+- Per-route and per-principal budgets: web_server.rate_limit_routes / web_server.rate_limit_principals (key budgets apply only once auth has verified the key).
+- Not yet Redis-backed (roadmap item).
 - Suitable for dev/single-instance; production should consider distributed limiting + nginx/ingress rules (see SECURITY.md).
 
 ## Examples
@@ -104,6 +104,9 @@ def run_cli_mode(config, model_manager, state_manager, command_executor, logger)
                 model_manager.shutdown()
             if hasattr(state_manager, "shutdown"):
                 state_manager.shutdown()
+            # Write any coalesced settings save before the process exits.
+            if hasattr(config, "flush_pending_save"):
+                config.flush_pending_save()
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
         logger.info("ChattyCommander CLI shutdown complete")
@@ -242,6 +245,9 @@ def run_web_mode(
                 model_manager.shutdown()
             if hasattr(state_manager, "shutdown"):
                 state_manager.shutdown()
+            # Write any coalesced settings save before the process exits.
+            if hasattr(config, "flush_pending_save"):
+                config.flush_pending_save()
         except Exception as e:
             logger.error(f"Error during web mode shutdown: {e}")
         logger.info("Web mode shutdown complete")
@@ -833,6 +839,9 @@ def cli_main():
 
     model_manager = ModelManager(config, mock_models=getattr(args, "test_mode", False))
     state_manager = StateManager()
+    if hasattr(model_manager, "attach_state_manager"):
+        # Prewarm the likely next state's models in the background.
+        model_manager.attach_state_manager(state_manager)
     command_executor = CommandExecutor(config, model_manager, state_manager)
 
     # Handle list subcommand
@@ -922,6 +931,12 @@ def cli_main():
     else:
         logger.info("Test mode enabled: AI Intelligence Core disabled.")
 
+    # Hot-reload config edits; only the changed sections are re-derived.
+    if not getattr(args, "test_mode", False) and not getattr(args, "config", False):
+        from chatty_commander.app.config_watcher import start_config_watcher
+
+        start_config_watcher(config, model_manager, state_manager)
+
     # Route to appropriate mode
     if getattr(args, "config", False):
         from chatty_commander.config_cli import ConfigCLI
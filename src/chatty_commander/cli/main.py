@@ -59,6 +59,40 @@ generate_default_config_if_needed = None  # type: ignore[assignment]
 from chatty_commander.utils.logger import setup_logger  # noqa: E402
 
 
+def _command_engine(command_executor):
+    """Return the executor's async engine, or None for stand-in executors."""
+    from chatty_commander.app.execution_engine import CommandEngine
+
+    engine = getattr(command_executor, "engine", None)
+    return engine if isinstance(engine, CommandEngine) else None
+
+
+def _dispatch_command(command_executor, command, logger):
+    """Run a detected command without blocking the listen loop.
+
+    Goes through the executor's engine when it has one, so repeated wake
+    words for the same command are debounced and slow actions run under
+    their per-type concurrency limits; otherwise executes inline.
+    """
+    engine = _command_engine(command_executor)
+    if engine is None:
+        command_executor.execute_command(command)
+        return
+
+    def _log_result(future):
+        try:
+            result = future.result()
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Command {command} failed: {e}")
+            return
+        if not result.success and not result.debounced:
+            logger.warning(
+                f"Command {command} {result.status}: {result.error or 'no detail'}"
+            )
+
+    engine.dispatch(command).add_done_callback(_log_result)
+
+
 def run_cli_mode(config, model_manager, state_manager, command_executor, logger):
     logger.info("Starting CLI voice command mode")
 
@@ -92,17 +126,22 @@ def run_cli_mode(config, model_manager, state_manager, command_executor, logger)
 
             # Execute the detected command if it's actionable
             if command in config.model_actions:
-                command_executor.execute_command(command)
+                _dispatch_command(command_executor, command, logger)
 
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received; shutting down")
     finally:
         # Perform any resource cleanup if needed
         try:
+            if _command_engine(command_executor) is not None:
+                command_executor.close()
             if hasattr(model_manager, "shutdown"):
                 model_manager.shutdown()
             if hasattr(state_manager, "shutdown"):
                 state_manager.shutdown()
+            # Write any coalesced settings save before the process exits.
+            if hasattr(config, "flush_pending_save"):
+                config.flush_pending_save()
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
         logger.info("ChattyCommander CLI shutdown complete")
@@ -221,6 +260,9 @@ def run_web_mode(
                 model_manager.shutdown()
             if hasattr(state_manager, "shutdown"):
                 state_manager.shutdown()
+            # Write any coalesced settings save before the process exits.
+            if hasattr(config, "flush_pending_save"):
+                config.flush_pending_save()
         except Exception as e:
             logger.error(f"Error during web mode shutdown: {e}")
         logger.info("Web mode shutdown complete")
@@ -673,6 +715,9 @@ def main():
 
     model_manager = ModelManager(config, mock_models=getattr(args, "test_mode", False))
     state_manager = StateManager()
+    if hasattr(model_manager, "attach_state_manager"):
+        # Prewarm the likely next state's models in the background.
+        model_manager.attach_state_manager(state_manager)
     command_executor = CommandExecutor(config, model_manager, state_manager)
 
     # Initialize AI intelligence core for enhanced conversations
@@ -703,6 +748,12 @@ def main():
     else:
         logger.info("Test mode enabled: AI Intelligence Core disabled.")
 
+    # Hot-reload config edits; only the changed sections are re-derived.
+    if not getattr(args, "test_mode", False) and not getattr(args, "config", False):
+        from chatty_commander.app.config_watcher import start_config_watcher
+
+        start_config_watcher(config, model_manager, state_manager)
+
     # Route to appropriate mode
     if getattr(args, "config", False):
         from chatty_commander.config_cli import ConfigCLI
@@ -32,10 +32,16 @@ Environment variables:
 - OPENAI_API_KEY: Enable OpenAI API backend
 - OPENAI_API_BASE: Override OpenAI base URL
 - OLLAMA_HOST: Override Ollama host (default: ollama:11434)
+- OLLAMA_KEEP_ALIVE: Model residency after each request (default: 30m)
+- OLLAMA_PREWARM: Probe in the background and pre-load the Ollama model
 - LLM_BACKEND: Force specific backend (openai, ollama, local)
+- LLM_ROUTING: Backend routing, priority (default) or fastest
+- LLM_WARMUP: Load the active backend in a background thread at startup
+- LLM_CACHE_TTL / LLM_CACHE_SIZE / LLM_CACHE_PATH: Response cache settings
 """
 
 from .backends import LLMBackend, LocalTransformersBackend, OllamaBackend, OpenAIBackend
+from .cache import ResponseCache
 from .manager import LLMManager
 from .processor import CommandProcessor
 
@@ -45,5 +51,6 @@ __all__ = [
     "OllamaBackend",
     "LocalTransformersBackend",
     "LLMManager",
+    "ResponseCache",
     "CommandProcessor",
 ]
@@ -26,11 +26,23 @@ LLM backend implementations with automatic fallback strategy.
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from typing import Any
 
+from .ollama import (
+    DEFAULT_KEEP_ALIVE,
+    OllamaClient,
+    OllamaHealth,
+    OllamaKeeper,
+    validate_ollama_url,
+)
+from .warmup import COLD, FAILED, LOADING, WARM, LazyLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,9 +51,26 @@ class LLMBackend(ABC):
 
     @abstractmethod
     def is_available(self) -> bool:
-        """Check if backend is available and ready."""
+        """Cheap check that the backend can serve requests.
+
+        Backend selection calls this, so it must not do heavy loading;
+        expensive setup belongs in :meth:`load`.
+        """
         pass
 
+    def load(self) -> bool:
+        """Run any heavy initialization now; return whether it is ready.
+
+        Called on first use or from a warmup thread. Backends without an
+        expensive setup step have nothing to do.
+        """
+        return self.is_available()
+
+    @property
+    def load_state(self) -> str:
+        """``cold``, ``loading``, ``warm`` or ``failed`` (see ``llm/warmup.py``)."""
+        return WARM
+
     @abstractmethod
     def generate_response(self, prompt: str, **kwargs) -> str:
         """Generate response from prompt."""
@@ -52,6 +81,13 @@ class LLMBackend(ABC):
         """Get backend information."""
         pass
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield the response incrementally as text fragments.
+
+        Backends without native streaming yield the full response once.
+        """
+        yield self.generate_response(prompt, **kwargs)
+
 
 class OpenAIBackend(LLMBackend):
     """OpenAI API backend."""
@@ -137,6 +173,45 @@ class OpenAIBackend(LLMBackend):
 
         raise RuntimeError(f"OpenAI generation failed after {self.max_retries} retries: {last_error}")
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream response deltas from the chat completions API.
+
+        Only opening the stream is retried; a failure after the first delta
+        has been yielded propagates to the caller.
+        """
+        if not self._client:
+            raise RuntimeError("OpenAI client not available")
+
+        import time
+
+        model = kwargs.get("model", getattr(self, "model", "gpt-3.5-turbo"))
+        stream = None
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                stream = self._client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=kwargs.get("max_tokens", 150),
+                    temperature=kwargs.get("temperature", 0.7),
+                    stream=True,
+                )
+                break
+            except Exception as e:
+                last_error = e
+                logger.warning(f"OpenAI stream attempt {attempt + 1} failed: {e}")
+                if attempt < self.max_retries:
+                    time.sleep(1.0 * (2 ** attempt))
+        if stream is None:
+            raise RuntimeError(f"OpenAI streaming failed after {self.max_retries} retries: {last_error}")
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
     def get_backend_info(self) -> dict[str, Any]:
         """Get OpenAI backend information."""
         return {
@@ -149,87 +224,187 @@ class OpenAIBackend(LLMBackend):
 
 
 class OllamaBackend(LLMBackend):
-    """Ollama local server backend."""
+    """Ollama local server backend.
 
-    def __init__(self, host: str | None = None, model: str = "gpt-oss:20b"):
+    Requests share one keep-alive connection pool (:class:`OllamaClient`),
+    carry ``keep_alive`` so the model stays resident between requests, and
+    availability is a cached ``/api/tags`` probe that is re-run on failure.
+    Set ``prewarm`` (or ``OLLAMA_PREWARM=1``) to probe in the background and
+    load the model before the first request; see ``llm/ollama.py``.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        model: str = "gpt-oss:20b",
+        keep_alive: str | int | None = None,
+        probe_interval: float = 30.0,
+        prewarm: bool | None = None,
+        warm_interval: float | None = None,
+    ):
         self.host = host or os.getenv("OLLAMA_HOST", "ollama:11434")
         self.model = model
         self.base_url = f"http://{self.host}"
-        self._available: bool | None = None
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_KEEP_ALIVE)
+        # Re-validated when it expires (validate_ttl) or after a transport error.
+        self._client = OllamaClient(
+            self.base_url, validate=lambda url: self._validate_url(url)
+        )
+        self._health = OllamaHealth(probe_interval)
+        self.warmed_at: float | None = None
+        self._warming = False
+        self._keeper: OllamaKeeper | None = None
         logger.info(f"Initialized Ollama backend: {self.base_url}, model: {self.model}")
 
+        if prewarm is None:
+            prewarm = os.getenv("OLLAMA_PREWARM", "").lower() in ("1", "true", "yes")
+        if prewarm:
+            self.start_keeper(warm_interval=warm_interval)
+
+    @property
+    def _available(self) -> bool | None:
+        """Last probe result while it is fresh, else ``None``."""
+        return self._health.available if self._health.fresh() else None
+
+    @_available.setter
+    def _available(self, value: bool | None) -> None:
+        # Assigning records a probe result; ``None`` forces a re-probe.
+        self._health.record(value)
+
     def _validate_url(self, url: str) -> None:
         """Reject an outbound Ollama URL that fails the SSRF policy.
 
-        Applied immediately before every outbound request so a switched or
-        otherwise unvalidated ``OLLAMA_HOST`` can never be hit, regardless of
-        whether ``is_available`` (which is cacheable/skippable) ran first.
+        Called by the pooled client before it opens connections and again
+        once per ``validate_ttl``, so a switched or otherwise unvalidated
+        ``OLLAMA_HOST`` can never be hit, regardless of whether
+        ``is_available`` (which is cacheable/skippable) ran first.
         """
-        from chatty_commander.utils.url_validator import is_safe_url
-
-        if not is_safe_url(url):
-            logger.warning(f"Ollama URL {url} rejected by security policy.")
-            raise RuntimeError("Ollama URL rejected by security policy")
+        validate_ollama_url(url)
 
     def is_available(self) -> bool:
         """Check if the Ollama server is reachable.
 
         This is a CHEAP check: it does a single short-timeout ``GET
-        /api/tags`` to confirm the server responds. It must NEVER trigger a
-        model *pull* (which can block for minutes) — backend *selection* calls
-        this, and selection must not download models. Auto-pull, if needed,
-        happens lazily inside :meth:`generate_response`.
+        /api/tags`` to confirm the server responds, and the result is reused
+        for ``probe_interval`` seconds. It must NEVER trigger a model *pull*
+        (which can block for minutes) — backend *selection* calls this, and
+        selection must not download models. Auto-pull, if needed, happens
+        lazily inside :meth:`generate_response`.
         """
-        if self._available is not None:
-            return self._available
+        cached = self._available
+        if cached is not None:
+            return cached
+        return self.probe()
 
-        tags_url = f"{self.base_url}/api/tags"
+    def probe(self) -> bool:
+        """Run the ``/api/tags`` reachability probe and record the result."""
         try:
-            import httpx
-
-            self._validate_url(tags_url)
-
-            # Quick reachability probe with a short timeout; never pulls.
-            with httpx.Client() as client:
-                response = client.get(tags_url, timeout=5, follow_redirects=False)
-            self._available = response.status_code == 200
-            if self._available:
+            response = self._client.get("/api/tags", timeout=5)
+            available = response.status_code == 200
+            if available:
                 logger.debug(f"Ollama server reachable at {self.base_url}")
+                try:
+                    models = response.json().get("models", [])
+                    self._health.models = [m.get("name", "") for m in models]
+                except Exception:
+                    self._health.models = []
             else:
                 logger.debug(f"Ollama server not responding: {response.status_code}")
-
+            self._health.record(
+                available, None if available else f"HTTP {response.status_code}"
+            )
         except ImportError:
             logger.warning("httpx library not available for Ollama backend")
-            self._available = False
+            self._health.record(False, "httpx not installed")
         except Exception as e:
             logger.debug(f"Ollama availability check failed: {e}")
-            self._available = False
+            self._health.record(False, str(e))
+        return bool(self._health.available)
+
+    def _request_failed(self, error: Exception) -> None:
+        # The server may have gone away: probe again on the next check
+        # instead of trusting a stale "available".
+        self._health.invalidate(str(error))
+        self.warmed_at = None
+
+    def warm(self) -> bool:
+        """Load the model and keep it resident for ``keep_alive``."""
+        self._warming = True
+        try:
+            response = self._client.post(
+                "/api/generate",
+                {"model": self.model, "keep_alive": self.keep_alive},
+                timeout=300,  # a cold load of a large model takes a while
+            )
+        except Exception as e:
+            logger.debug(f"Ollama pre-warm of {self.model} failed: {e}")
+            self._request_failed(e)
+            return False
+        finally:
+            self._warming = False
+        if response.status_code != 200:
+            logger.debug(f"Ollama pre-warm of {self.model}: {response.status_code}")
+            return False
+        self.warmed_at = time.monotonic()
+        logger.info(f"Ollama model {self.model} warm (keep_alive={self.keep_alive})")
+        return True
 
-        return self._available
+    def load(self) -> bool:
+        """Make the model resident on the server (see :meth:`warm`)."""
+        return self.is_available() and self.warm()
 
-    def _try_pull_model(self):
-        """Try to pull the model if not available."""
+    @property
+    def load_state(self) -> str:
+        if self._warming:
+            return LOADING
+        return WARM if self.warmed_at is not None else COLD
+
+    def unload(self) -> bool:
+        """Ask the server to evict the model now (``keep_alive=0``)."""
         try:
-            import httpx
+            response = self._client.post(
+                "/api/generate", {"model": self.model, "keep_alive": 0}, timeout=30
+            )
+        except Exception as e:
+            logger.debug(f"Ollama unload of {self.model} failed: {e}")
+            return False
+        self.warmed_at = None
+        return response.status_code == 200  # type: ignore[no-any-return]
+
+    def start_keeper(self, warm_interval: float | None = None) -> OllamaKeeper:
+        """Probe every ``probe_interval`` and keep the model pre-warmed."""
+        if self._keeper is None:
+            self._keeper = OllamaKeeper(
+                self,
+                probe_interval=self._health.probe_interval,
+                warm_interval=warm_interval,
+            )
+        self._keeper.start()
+        return self._keeper
 
-            pull_url = f"{self.base_url}/api/pull"
-            self._validate_url(pull_url)
+    def close(self) -> None:
+        """Stop the keeper thread and release pooled connections."""
+        if self._keeper is not None:
+            self._keeper.stop()
+            self._keeper = None
+        self._client.close()
 
+    def _try_pull_model(self):
+        """Try to pull the model if not available."""
+        try:
             logger.info(f"Attempting to pull model {self.model}...")
-            with httpx.Client() as client:
-                response = client.post(
-                    pull_url,
-                    json={"name": self.model},
-                    timeout=300,  # 5 minutes timeout for model download
-                    follow_redirects=False,
-                )
+            response = self._client.post(
+                "/api/pull",
+                {"name": self.model},
+                timeout=300,  # 5 minutes timeout for model download
+            )
 
-                if response.status_code == 200:
-                    logger.info(f"Successfully pulled model {self.model}")
-                else:
-                    logger.warning(
-                        f"Failed to pull model {self.model}: {response.status_code}"
-                    )
+            if response.status_code == 200:
+                logger.info(f"Successfully pulled model {self.model}")
+            else:
+                logger.warning(
+                    f"Failed to pull model {self.model}: {response.status_code}"
+                )
 
         except Exception as e:
             logger.warning(f"Error pulling model {self.model}: {e}")
@@ -240,48 +415,73 @@ class OllamaBackend(LLMBackend):
             raise RuntimeError("Ollama backend not available")
 
         try:
-            import httpx
+            response = self._client.post(
+                "/api/generate",
+                self._generate_payload(prompt, stream=False, **kwargs),
+                timeout=30,
+            )
+        except Exception as e:
+            logger.error(f"Ollama generation failed: {e}")
+            self._request_failed(e)
+            raise
 
-            max_tokens = kwargs.get("max_tokens", 150)
-            temperature = kwargs.get("temperature", 0.7)
+        if response.status_code == 200:
+            self.warmed_at = time.monotonic()
+            result = response.json()
+            return result.get("response", "").strip()  # type: ignore[no-any-return]
+        error = RuntimeError(f"Ollama request failed: {response.status_code}")
+        logger.error(f"Ollama generation failed: {error}")
+        if response.status_code >= 500:
+            self._request_failed(error)
+        raise error
+
+    def _generate_payload(self, prompt: str, stream: bool, **kwargs) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "num_predict": kwargs.get("max_tokens", 150),
+                "temperature": kwargs.get("temperature", 0.7),
+            },
+        }
 
-            generate_url = f"{self.base_url}/api/generate"
-            self._validate_url(generate_url)
-
-            with httpx.Client() as client:
-                response = client.post(
-                    generate_url,
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "num_predict": max_tokens,
-                            "temperature": temperature,
-                        },
-                    },
-                    timeout=30,
-                    follow_redirects=False,
-                )
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream tokens from ``/api/generate`` as newline-delimited JSON.
 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("response", "").strip()  # type: ignore[no-any-return]
-                else:
-                    raise RuntimeError(f"Ollama request failed: {response.status_code}")
+        Mirrors :meth:`OllamaProvider.generate_stream`: each line carries a
+        ``response`` fragment and the final line sets ``done``.
+        """
+        if not self.is_available():
+            raise RuntimeError("Ollama backend not available")
 
+        payload = self._generate_payload(prompt, stream=True, **kwargs)
+        try:
+            for data in self._client.stream_lines("/api/generate", payload, timeout=30):
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done", False):
+                    break
         except Exception as e:
-            logger.error(f"Ollama generation failed: {e}")
+            self._request_failed(e)
             raise
+        self.warmed_at = time.monotonic()
 
     def get_backend_info(self) -> dict[str, Any]:
         """Get Ollama backend information."""
+        available = self.is_available()
         return {
             "backend": "ollama",
-            "available": self.is_available(),
+            "available": available,
             "host": self.host,
             "base_url": self.base_url,
             "model": self.model,
+            "model_listed": self.model in self._health.models,
+            "keep_alive": self.keep_alive,
+            "warm": self.warmed_at is not None,
+            "state": self.load_state,
+            "last_error": self._health.last_error,
         }
 
 
@@ -300,7 +500,14 @@ class LocalTransformersBackend(LLMBackend):
         self._model: Any = None
         self._tokenizer: Any = None
         self._device: str | None = None
+        # Loading the model takes seconds, so it waits for first use or a
+        # warmup thread; construction only checks the dependencies exist.
+        self._deps_installed = _modules_installed("torch", "transformers")
+        self._loader = LazyLoader(self._load_model, name=f"local:{model_name}")
+
+    def _load_model(self) -> bool:
         self._initialize_model()
+        return self._loaded()
 
     def _initialize_model(self):
         """Initialize local transformers model."""
@@ -337,13 +544,26 @@ class LocalTransformersBackend(LLMBackend):
         except Exception as e:
             logger.error(f"Failed to load local model: {e}")
 
-    def is_available(self) -> bool:
-        """Check if local transformers backend is available."""
+    def _loaded(self) -> bool:
         return self._model is not None and self._tokenizer is not None
 
+    def is_available(self) -> bool:
+        """Loaded, or loadable: dependencies installed and no failed load."""
+        if self._loaded():
+            return True
+        return self._deps_installed and self._loader.state != FAILED
+
+    def load(self) -> bool:
+        """Load the model now, or wait for a load already in progress."""
+        return self._loaded() or self._loader.ensure()
+
+    @property
+    def load_state(self) -> str:
+        return WARM if self._loaded() else self._loader.state
+
     def generate_response(self, prompt: str, **kwargs) -> str:
         """Generate response using local transformers model."""
-        if not self.is_available():
+        if not self.load():
             raise RuntimeError("Local transformers backend not available")
 
         try:
@@ -385,9 +605,19 @@ class LocalTransformersBackend(LLMBackend):
             "available": self.is_available(),
             "model_name": self.model_name,
             "device": self._device,
+            "state": self.load_state,
+            "load_seconds": self._loader.load_seconds,
         }
 
 
+def _modules_installed(*names: str) -> bool:
+    """Whether every module can be imported, without importing any of them."""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+
 class MockLLMBackend(LLMBackend):
     """Mock LLM backend for testing."""
 
@@ -411,6 +641,12 @@ class MockLLMBackend(LLMBackend):
         logger.debug(f"Mock LLM response: '{response}'")
         return response
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield the scripted response word by word."""
+        words = self.generate_response(prompt, **kwargs).split(" ")
+        for i, word in enumerate(words):
+            yield word if i == 0 else f" {word}"
+
     def get_backend_info(self) -> dict[str, Any]:
         """Retrieve backend info."""
         return {
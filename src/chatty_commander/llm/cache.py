@@ -0,0 +1,314 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Response cache for :class:`~chatty_commander.llm.manager.LLMManager`.
+
+Repeated voice queries and command-interpretation prompts are common, and each
+one otherwise pays a full inference. :class:`ResponseCache` provides:
+
+- an exact-match LRU with TTL, keyed by backend, model, whitespace-normalized
+  prompt and generation parameters;
+- optional persistence to a sqlite file so warm entries survive restarts;
+- singleflight coalescing: concurrent identical requests share one in-flight
+  generation instead of each hitting the backend.
+
+Hits, misses and coalesced waits are counted in :mod:`chatty_commander.obs.metrics`.
+Failures are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from ..obs.metrics import DEFAULT_REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse runs of whitespace and trim, so formatting noise still hits."""
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+class _InFlight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: str | None = None
+        self.error: BaseException | None = None
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache of LLM responses with request coalescing.
+
+    Args:
+        max_entries: In-memory capacity; least recently used entries are evicted.
+        ttl: Seconds an entry stays valid.
+        persist_path: Optional sqlite file backing the memory tier.
+        registry: Metrics registry (defaults to the process-wide one).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 300.0,
+        persist_path: str | None = None,
+        registry: MetricsRegistry | None = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.persist_path = persist_path
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+        reg = registry or DEFAULT_REGISTRY
+        self._hits = reg.counter("llm_cache_hits_total", "LLM response cache hits")
+        self._misses = reg.counter(
+            "llm_cache_misses_total", "LLM response cache misses"
+        )
+        self._coalesced = reg.counter(
+            "llm_cache_coalesced_total",
+            "LLM requests served by joining an identical in-flight generation",
+        )
+        self._size = reg.gauge("llm_cache_entries", "LLM response cache entries")
+
+        if persist_path:
+            self._open_db(persist_path)
+
+    @classmethod
+    def from_env(cls) -> ResponseCache | None:
+        """Build a cache from ``LLM_CACHE_*`` settings; ``None`` when disabled.
+
+        - ``LLM_CACHE_TTL``: seconds (default 300; ``0`` disables caching)
+        - ``LLM_CACHE_SIZE``: max in-memory entries (default 512)
+        - ``LLM_CACHE_PATH``: sqlite file for persistence (default: memory only)
+        """
+        try:
+            ttl = float(os.getenv("LLM_CACHE_TTL", "300"))
+            size = int(os.getenv("LLM_CACHE_SIZE", "512"))
+        except ValueError:
+            logger.warning("Invalid LLM_CACHE_TTL/LLM_CACHE_SIZE; cache disabled")
+            return None
+        if ttl <= 0:
+            return None
+        return cls(max_entries=size, ttl=ttl, persist_path=os.getenv("LLM_CACHE_PATH"))
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    @staticmethod
+    def make_key(
+        backend: str, model: str | None, prompt: str, params: dict[str, Any] | None = None
+    ) -> str:
+        payload = json.dumps(
+            {
+                "backend": backend,
+                "model": model,
+                "prompt": normalize_prompt(prompt),
+                "params": params or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _open_db(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            db.execute("DELETE FROM llm_cache WHERE expires <= ?", (time.time(),))
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache persistence disabled ({path}): {e}")
+            self._db = None
+
+    def _db_get(self, key: str) -> tuple[str, float] | None:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, expires FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"LLM cache read failed: {e}")
+            return None
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0], row[1]
+
+    def _db_put(self, key: str, value: str, expires: float) -> None:
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires) VALUES (?, ?, ?)",
+                    (key, value, expires),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"LLM cache write failed: {e}")
+
+    def get(self, key: str) -> str | None:
+        """Return a live cached value (memory first, then disk) or ``None``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+        stored = self._db_get(key)
+        if stored is None:
+            return None
+        with self._lock:
+            self._store(key, stored[0], stored[1])
+        return stored[0]
+
+    def set(self, key: str, value: str) -> None:
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires)
+        self._db_put(key, value, expires)
+
+    def _store(self, key: str, value: str, expires: float) -> None:
+        # Caller holds self._lock.
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._size.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size.set(0)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def lookup(self, key: str, backend: str = "unknown") -> str | None:
+        """Like :meth:`get`, but counted as a hit or miss.
+
+        For callers that produce the value themselves (e.g. streaming) and
+        cannot go through :meth:`get_or_compute`.
+        """
+        value = self.get(key)
+        counter = self._hits if value is not None else self._misses
+        counter.inc(labels={"backend": backend})
+        return value
+
+    # ------------------------------------------------------------------
+    # Singleflight
+    # ------------------------------------------------------------------
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], str],
+        backend: str = "unknown",
+        store_if: Callable[[], bool] | None = None,
+    ) -> str:
+        """Return the cached value for ``key`` or compute it exactly once.
+
+        Concurrent callers with the same key wait for the first caller's
+        result (or exception) instead of starting their own generation.
+        ``store_if`` is consulted after ``compute`` returns; when it returns
+        False the result is handed to the waiting callers but not cached.
+        """
+        labels = {"backend": backend}
+        cached = self.get(key)
+        if cached is not None:
+            self._hits.inc(labels=labels)
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._inflight[key] = flight
+        assert flight is not None
+
+        if not leader:
+            self._coalesced.inc(labels=labels)
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            assert flight.result is not None
+            return flight.result
+
+        self._misses.inc(labels=labels)
+        try:
+            result = compute()
+            flight.result = result
+            if store_if is None or store_if():
+                self.set(key, result)
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            inflight = len(self._inflight)
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "in_flight": inflight,
+            "persistent": self._db is not None,
+        }
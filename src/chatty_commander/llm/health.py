@@ -0,0 +1,319 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Per-backend health tracking for :class:`~chatty_commander.llm.manager.LLMManager`.
+
+Without it, every request that reached a hung backend paid that backend's
+full timeout and retry budget before falling back. Here each backend gets:
+
+- a :class:`RollingWindow` of recent call latencies and outcomes (the last
+  ``size`` calls within ``horizon`` seconds);
+- a :class:`CircuitBreaker`. It is ``closed`` normally. It goes ``open``
+  after ``failure_threshold`` consecutive failures, or when the window error
+  rate reaches ``error_rate_threshold``; while open, calls are refused
+  without touching the backend. After ``reset_timeout`` it goes
+  ``half_open`` and lets one trial call through: success closes it, failure
+  re-opens it.
+
+:class:`BackendHealth` owns one of each per backend name. It exports the
+breaker state, transitions, latency and errors to
+:mod:`chatty_commander.obs.metrics`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from ..obs.metrics import DEFAULT_REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Exported as the llm_circuit_state gauge value.
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class RollingWindow:
+    """Latencies and outcomes of the last ``size`` calls within ``horizon`` s."""
+
+    def __init__(self, size: int = 50, horizon: float = 300.0) -> None:
+        self.size = size
+        self.horizon = horizon
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self) -> list[tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.horizon
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return list(self._samples)
+
+    def count(self) -> int:
+        return len(self._recent())
+
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, _, ok in samples if not ok) / len(samples)
+
+    def latency(self, quantile: float = 0.5) -> float | None:
+        """Latency quantile of successful calls, ``None`` without data."""
+        values = sorted(lat for _, lat, ok in self._recent() if ok)
+        if not values:
+            return None
+        index = min(len(values) - 1, int(quantile * len(values)))
+        return values[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a :class:`RollingWindow`."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        window: RollingWindow | None = None,
+        on_transition: Callable[[str, str, str], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.window = window or RollingWindow()
+        self._on_transition = on_transition
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        # Called with the lock held.
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._trial_in_flight = False
+        if previous != state:
+            logger.info(f"LLM backend {self.name}: circuit {previous} -> {state}")
+            if self._on_transition is not None:
+                self._on_transition(self.name, previous, state)
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._set_state(HALF_OPEN)
+
+    def available(self) -> bool:
+        """Whether a call could go through now (does not claim the trial)."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state == CLOSED or (
+                self._state == HALF_OPEN and not self._trial_in_flight
+            )
+
+    def allow(self) -> bool:
+        """Claim permission for one call; half-open admits a single trial."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self) -> None:
+        """Give up a claimed call without an outcome (e.g. an abandoned stream).
+
+        Frees the half-open trial so the next call can probe the backend;
+        the state is unchanged.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        self.window.record(latency, True)
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self, latency: float) -> None:
+        self.window.record(latency, False)
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN:
+                self._set_state(OPEN)
+            elif self._state == CLOSED and (
+                self._consecutive_failures >= self.failure_threshold
+                or (
+                    self.window.count() >= self.min_calls
+                    and self.window.error_rate() >= self.error_rate_threshold
+                )
+            ):
+                self._set_state(OPEN)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._set_state(CLOSED)
+        self.window.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "calls": self.window.count(),
+            "error_rate": round(self.window.error_rate(), 3),
+            "latency_p50": self.window.latency(0.5),
+            "latency_p95": self.window.latency(0.95),
+        }
+
+
+class BackendHealth:
+    """One breaker per backend name, with metrics."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry | None = None,
+        **breaker_kwargs: Any,
+    ) -> None:
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+        reg = registry or DEFAULT_REGISTRY
+        self._state = reg.gauge(
+            "llm_circuit_state", "LLM backend circuit state (0 closed, 1 half-open, 2 open)"
+        )
+        self._transitions = reg.counter(
+            "llm_circuit_transitions_total", "LLM backend circuit state changes"
+        )
+        self._latency = reg.histogram(
+            "llm_backend_latency_seconds", "LLM backend call latency"
+        )
+        self._errors = reg.counter("llm_backend_errors_total", "Failed LLM backend calls")
+        self._rejected = reg.counter(
+            "llm_circuit_rejected_total", "LLM calls skipped because the circuit was open"
+        )
+        # Incremented by LLMManager's hedged requests.
+        self.hedges = reg.counter(
+            "llm_hedged_requests_total", "LLM requests raced against a second backend"
+        )
+        self.hedge_wins = reg.counter(
+            "llm_hedge_wins_total", "Hedged LLM requests answered by the second backend"
+        )
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name, on_transition=self._transition, **self._breaker_kwargs
+                )
+                self._breakers[name] = breaker
+                self._state.set(STATE_VALUES[CLOSED], {"backend": name})
+            return breaker
+
+    def _transition(self, name: str, previous: str, state: str) -> None:
+        self._state.set(STATE_VALUES[state], {"backend": name})
+        self._transitions.inc(
+            labels={"backend": name, "from_state": previous, "to_state": state}
+        )
+
+    def allow(self, name: str) -> bool:
+        allowed = self.breaker(name).allow()
+        if not allowed:
+            self._rejected.inc(labels={"backend": name})
+        return allowed
+
+    def available(self, name: str) -> bool:
+        return self.breaker(name).available()
+
+    def release(self, name: str) -> None:
+        self.breaker(name).release_trial()
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        breaker = self.breaker(name)
+        if ok:
+            self._latency.observe(latency, {"backend": name})
+            breaker.record_success(latency)
+        else:
+            self._errors.inc(labels={"backend": name})
+            breaker.record_failure(latency)
+
+    def latency(self, name: str, quantile: float = 0.5) -> float | None:
+        return self.breaker(name).window.latency(quantile)
+
+    def reset(self) -> None:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.reset()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: b.snapshot() for name, b in breakers.items()}
+
+
+__all__ = [
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "BackendHealth",
+    "CircuitBreaker",
+    "RollingWindow",
+]
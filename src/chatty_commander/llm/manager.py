@@ -28,13 +28,38 @@ Tries backends in order:
 2. Ollama (if server available)
 3. Local transformers (if dependencies available)
 4. Mock (always available)
+
+Responses from real backends are memoized in a :class:`ResponseCache` (see
+``LLM_CACHE_*`` in :meth:`ResponseCache.from_env`); pass ``cache=False`` to
+:meth:`LLMManager.generate_response` to bypass it for a single call.
+
+Every backend call goes through a circuit breaker (see ``llm/health.py``):
+backends whose circuit is open are skipped instead of being waited on. With
+``routing="fastest"`` (or ``LLM_ROUTING=fastest``), each request goes to the
+preferred backend while it is healthy, otherwise to the healthy backend with
+the lowest recent median latency, instead of following the static priority
+order. Pass ``hedge=True`` for latency-critical calls (voice): if the first
+backend has not answered within its recent p95 latency, the next one is
+raced against it and the first answer wins. Routing and hedging decide per
+request; only a failure fallback changes the active backend.
+
+Constructing the manager only runs each backend's cheap availability probe;
+heavy loading (the local transformers model) happens on first use, or in the
+background after :meth:`LLMManager.warmup` (or ``warmup=True`` /
+``LLM_WARMUP=1``). :meth:`LLMManager.get_backend_states` reports each
+backend as cold, loading, warm or failed (see ``llm/warmup.py``).
 """
 
 from __future__ import annotations
 
 import logging
 import os
+import queue
+import threading
 import time
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import closing
 from typing import Any
 
 from .backends import (
@@ -44,9 +69,34 @@ from .backends import (
     OllamaBackend,
     OpenAIBackend,
 )
+from .cache import ResponseCache
+from .health import BackendHealth
 
 logger = logging.getLogger(__name__)
 
+PRIORITY_ORDER = ["openai", "ollama", "local", "mock"]
+ROUTING_MODES = ("priority", "fastest")
+
+# Hedge delay bounds (seconds) when derived from a backend's p95 latency.
+_HEDGE_MIN_DELAY = 0.05
+_HEDGE_DEFAULT_DELAY = 1.0
+
+
+def _spawn(fn: Callable[[], Any]) -> Future:
+    """Run ``fn`` on a daemon thread, so a hung backend never blocks exit."""
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:  # noqa: BLE001 - handed to the waiter
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+    return future
+
 
 class LLMManager:
     """Manages LLM backends with automatic selection and fallback."""
@@ -60,9 +110,24 @@ class LLMManager:
         ollama_model: str = "gpt-oss:20b",
         local_model: str = "microsoft/DialoGPT-medium",
         use_mock: bool = False,
+        response_cache: ResponseCache | None = None,
+        routing: str | None = None,
+        health: BackendHealth | None = None,
+        hedge_delay: float | None = None,
+        warmup: bool | None = None,
     ):
         self.preferred_backend = preferred_backend or os.getenv("LLM_BACKEND")
         self.use_mock = use_mock
+        self.response_cache = (
+            response_cache if response_cache is not None else ResponseCache.from_env()
+        )
+        self.routing = (routing or os.getenv("LLM_ROUTING") or "priority").lower()
+        if self.routing not in ROUTING_MODES:
+            logger.warning(f"Unknown LLM routing {self.routing!r}; using priority")
+            self.routing = "priority"
+        self.health = health or BackendHealth()
+        # Fixed hedge delay; ``None`` derives it from the primary's p95.
+        self.hedge_delay = hedge_delay
 
         # Initialize all backends
         self.backends: dict[str, LLMBackend] = {}
@@ -78,6 +143,11 @@ class LLMManager:
             f"LLM Manager initialized with backend: {self.get_active_backend_name()}"
         )
 
+        if warmup is None:
+            warmup = os.getenv("LLM_WARMUP", "").lower() in ("1", "true", "yes")
+        if warmup:
+            self.warmup()
+
     def _initialize_backends(
         self,
         openai_api_key: str | None,
@@ -131,9 +201,7 @@ class LLMManager:
                 )
 
         # Try backends in priority order
-        priority_order = ["openai", "ollama", "local", "mock"]
-
-        for backend_name in priority_order:
+        for backend_name in PRIORITY_ORDER:
             if backend_name in self.backends:
                 backend = self.backends[backend_name]
                 if backend.is_available():
@@ -145,52 +213,399 @@ class LLMManager:
         self.active_backend = self.backends["mock"]
         logger.warning("All backends failed, using mock backend")
 
+    def warmup(
+        self, names: list[str] | None = None, background: bool = True
+    ) -> threading.Thread | None:
+        """Load backends ahead of first use.
+
+        Defaults to the active backend only, so backends that are never used
+        are never loaded. Returns the warmup thread, or ``None`` when run in
+        the foreground.
+        """
+        targets = [
+            n for n in (names or [self.get_active_backend_name()]) if n in self.backends
+        ]
+
+        def run() -> None:
+            for name in targets:
+                try:
+                    self.backends[name].load()
+                except Exception as e:
+                    logger.warning(f"Warming up LLM backend {name} failed: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="llm-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_backend_states(self) -> dict[str, str]:
+        """Load state (cold, loading, warm or failed) per backend."""
+        states: dict[str, str] = {}
+        for name, backend in self.backends.items():
+            try:
+                states[name] = str(getattr(backend, "load_state", "warm"))
+            except Exception:
+                states[name] = "unknown"
+        return states
+
     def is_available(self) -> bool:
         """Check if any backend is available."""
         return self.active_backend is not None
 
     def generate_response(self, prompt: str, **kwargs) -> str:
-        """Generate response using active backend."""
+        """Generate response using active backend.
+
+        Identical requests (same backend, model, normalized prompt and
+        parameters) are served from the response cache, and concurrent
+        duplicates share a single in-flight generation. The mock backend is
+        never cached since its scripted responses rotate on every call, and
+        neither is a reply from any backend other than the one in the cache
+        key (a fallback or hedge answer), so the keyed backend is retried.
+        """
         if not self.active_backend:
             raise RuntimeError("No LLM backend available")
 
+        use_cache = kwargs.pop("cache", True)
+        hedge = kwargs.pop("hedge", False)
+        backend_name, backend = self._route()
+        served_by: list[str] = []
+
+        def compute() -> str:
+            if hedge:
+                text, name = self._generate_hedged(
+                    backend_name, backend, prompt, **kwargs
+                )
+            else:
+                text, name = self._generate_uncached(
+                    backend_name, backend, prompt, **kwargs
+                )
+            served_by.append(name)
+            return text
+
+        if not use_cache or self.response_cache is None or backend_name == "mock":
+            return compute()
+
+        key = self.response_cache.make_key(
+            backend_name, _backend_model(backend), prompt, kwargs
+        )
+        return self.response_cache.get_or_compute(
+            key,
+            compute,
+            backend=backend_name,
+            store_if=lambda: served_by == [backend_name],
+        )
+
+    def _call_backend(self, name: str, backend: LLMBackend, prompt: str, **kwargs) -> str:
+        """One timed backend call, recorded on its circuit breaker."""
+        t0 = time.perf_counter()
+        try:
+            result = backend.generate_response(prompt, **kwargs)
+        except Exception:
+            self.health.record(name, time.perf_counter() - t0, ok=False)
+            raise
+        self.health.record(name, time.perf_counter() - t0, ok=True)
+        return result
+
+    def _generate_uncached(
+        self, name: str, backend: LLMBackend, prompt: str, **kwargs
+    ) -> tuple[str, str]:
+        """Generate with ``backend``, falling back once on failure.
+
+        Returns the reply and the name of the backend that produced it.
+        """
         try:
-            return self.active_backend.generate_response(prompt, **kwargs)
+            if not self.health.allow(name):
+                raise RuntimeError(f"Circuit open for LLM backend {name}")
+            return self._call_backend(name, backend, prompt, **kwargs), name
         except Exception as e:
-            logger.error(
-                f"Generation failed with {self.get_active_backend_name()}: {e}"
-            )
+            logger.error(f"Generation failed with {name}: {e}")
 
             # Try to fallback to next available backend
-            if self._try_fallback():
-                logger.info(f"Falling back to {self.get_active_backend_name()}")
+            if self._try_fallback(name):
+                fallback = self.get_active_backend_name()
+                logger.info(f"Falling back to {fallback}")
+                fallback_backend = self.active_backend
+                assert fallback_backend is not None  # _try_fallback just set it
                 try:
-                    return self.active_backend.generate_response(prompt, **kwargs)
+                    reply = self._call_backend(
+                        fallback, fallback_backend, prompt, **kwargs
+                    )
+                    return reply, fallback
                 except Exception as fallback_error:
                     logger.error(
                         f"Generation failed with fallback backend "
-                        f"{self.get_active_backend_name()}: {fallback_error}"
+                        f"{fallback}: {fallback_error}"
                     )
                     raise
             else:
                 raise
 
-    def _try_fallback(self) -> bool:
-        """Try to fallback to next available backend."""
-        current_backend = self.get_active_backend_name()
+    # ------------------------------------------------------------------
+    # Routing and hedging
+    # ------------------------------------------------------------------
+    def _route(self) -> tuple[str, LLMBackend]:
+        """Pick the backend for one request.
+
+        ``priority`` uses the active backend. ``fastest`` uses the preferred
+        backend while it is healthy, otherwise the quickest healthy one.
+        Neither changes :attr:`active_backend`, so one slow or fast reply
+        does not re-route later requests.
+        """
+        assert self.active_backend is not None
+        active = self.get_active_backend_name()
+        if self.routing == "fastest":
+            candidates = self._healthy_candidates(active)
+            if candidates:
+                return candidates[0], self.backends[candidates[0]]
+        return active, self.active_backend
+
+    def _healthy_candidates(self, first: str) -> list[str]:
+        """Real backends that are available with a non-open circuit, best first.
+
+        ``priority`` keeps the static order, starting from ``first`` (the
+        backend the request was routed to). ``fastest`` sorts by recent
+        median latency, with the preferred backend (if any) ahead of the
+        rest; backends without samples sort first so they get measured. The
+        mock backend is never included.
+        """
+        names = [
+            n
+            for n in PRIORITY_ORDER
+            if n != "mock"
+            and n in self.backends
+            and self.health.available(n)
+            and self.backends[n].is_available()
+        ]
+        if self.routing == "fastest":
+            names.sort(key=lambda n: self.health.latency(n) or 0.0)
+            first = self.preferred_backend or ""
+        if first in names:
+            names.remove(first)
+            names.insert(0, first)
+        return names
+
+    def _hedge_delay(self, name: str) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        p95 = self.health.latency(name, 0.95)
+        return _HEDGE_DEFAULT_DELAY if p95 is None else max(_HEDGE_MIN_DELAY, p95)
+
+    def _generate_hedged(
+        self, name: str, backend: LLMBackend, prompt: str, **kwargs
+    ) -> tuple[str, str]:
+        """Race ``name`` against the runner-up once it runs late.
+
+        Returns the reply and the name of the backend that produced it.
+        """
+        candidates = self._healthy_candidates(name)
+        if len(candidates) < 2 or candidates[0] != name:
+            return self._generate_uncached(name, backend, prompt, **kwargs)
+        primary, secondary = candidates[0], candidates[1]
+        if not self.health.allow(primary):
+            return self._generate_uncached(name, backend, prompt, **kwargs)
+
+        def call(name: str) -> Callable[[], str]:
+            return lambda: self._call_backend(
+                name, self.backends[name], prompt, **kwargs
+            )
+
+        futures = {_spawn(call(primary)): primary}
+        done, _ = wait(futures, timeout=self._hedge_delay(primary))
+        first = next(iter(done), None)
+        if first is not None and first.exception() is None:
+            return first.result(), primary
+
+        if self.health.allow(secondary):
+            logger.debug(f"Hedging {primary} with {secondary}")
+            self.health.hedges.inc()
+            futures[_spawn(call(secondary))] = secondary
+
+        last_error: BaseException | None = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    winner = futures[future]
+                    if winner != primary:
+                        self.health.hedge_wins.inc()
+                    return future.result(), winner
+                last_error = error
+        logger.error(f"Hedged generation failed with {primary}/{secondary}: {last_error}")
+        if self._try_fallback(primary):
+            name = self.get_active_backend_name()
+            logger.info(f"Falling back to {name}")
+            return self._call_backend(name, self.backends[name], prompt, **kwargs), name
+        assert last_error is not None
+        raise last_error
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield the response from the routed backend as it is generated.
+
+        A cached response is yielded in one piece; a fresh one is cached once
+        the stream completes. Fallback to the next backend only happens if the
+        routed one fails before producing any output. With ``hedge=True`` the
+        runner-up is started if the first fragment is late, and whichever
+        backend produces output first is streamed.
+        """
+        if not self.active_backend:
+            raise RuntimeError("No LLM backend available")
+
+        use_cache = kwargs.pop("cache", True)
+        hedge = kwargs.pop("hedge", False)
+        backend_name, backend = self._route()
+        cache = self.response_cache
+        key = None
+        if use_cache and cache is not None and backend_name != "mock":
+            key = cache.make_key(backend_name, _backend_model(backend), prompt, kwargs)
+            cached = cache.lookup(key, backend=backend_name)
+            if cached is not None:
+                yield cached
+                return
+
+        if hedge:
+            source = self._hedged_stream(backend_name, backend, prompt, kwargs)
+        else:
+            source = (
+                (backend_name, fragment)
+                for fragment in self._stream_from(backend_name, backend, prompt, kwargs)
+            )
+        parts: list[str] = []
+        served_by = backend_name
+        try:
+            for source_name, fragment in source:
+                served_by = source_name
+                parts.append(fragment)
+                yield fragment
+        except Exception as e:
+            logger.error(f"Streaming failed with {backend_name}: {e}")
+            if parts or not self._try_fallback(backend_name):
+                raise
+            name = self.get_active_backend_name()
+            logger.info(f"Falling back to {name}")
+            yield from self._stream_from(name, self.active_backend, prompt, kwargs)
+            return
+
+        # A hedge won by another backend is not cached under this key.
+        if key is not None and cache is not None and served_by == backend_name:
+            cache.set(key, "".join(parts).strip())
+
+    def _stream_from(
+        self, name: str, backend: LLMBackend, prompt: str, kwargs: dict[str, Any]
+    ) -> Generator[str, None, None]:
+        """Stream from one backend through its circuit breaker."""
+        if not self.health.allow(name):
+            raise RuntimeError(f"Circuit open for LLM backend {name}")
+        t0 = time.perf_counter()
+        try:
+            yield from backend.generate_stream(prompt, **kwargs)
+        except GeneratorExit:
+            # Closed before the end (the losing side of a hedge, or the
+            # consumer stopped reading): no outcome, but a half-open trial
+            # must not stay claimed forever.
+            self.health.release(name)
+            raise
+        except Exception:
+            self.health.record(name, time.perf_counter() - t0, ok=False)
+            raise
+        self.health.record(name, time.perf_counter() - t0, ok=True)
+
+    def _hedged_stream(
+        self, name: str, backend: LLMBackend, prompt: str, kwargs: dict[str, Any]
+    ) -> Iterator[tuple[str, str]]:
+        """Stream ``(backend, fragment)`` from the first of two backends to produce output."""
+        candidates = self._healthy_candidates(name)
+        if len(candidates) < 2 or candidates[0] != name:
+            for piece in self._stream_from(name, backend, prompt, kwargs):
+                yield name, piece
+            return
+        primary, secondary = candidates[0], candidates[1]
+        events: queue.Queue[tuple[str, str | None, BaseException | None]] = queue.Queue()
+        state: dict[str, Any] = {"winner": None, "closed": False}
+
+        def pump(name: str) -> None:
+            try:
+                stream = self._stream_from(name, self.backends[name], prompt, kwargs)
+                with closing(stream):
+                    for fragment in stream:
+                        if state["closed"] or state["winner"] not in (None, name):
+                            return
+                        events.put((name, fragment, None))
+                events.put((name, None, None))
+            except BaseException as e:  # noqa: BLE001 - handed to the consumer
+                events.put((name, None, e))
+
+        def start(name: str) -> None:
+            threading.Thread(target=pump, args=(name,), name="llm-hedge", daemon=True).start()
+            started.append(name)
+
+        started: list[str] = []
+        failed: set[str] = set()
+        start(primary)
+        hedge_at = time.monotonic() + self._hedge_delay(primary)
+        try:
+            while True:
+                timeout = None
+                if state["winner"] is None and len(started) == 1:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                try:
+                    name, fragment, error = events.get(timeout=timeout)
+                except queue.Empty:
+                    logger.debug(f"Hedging {primary} stream with {secondary}")
+                    self.health.hedges.inc()
+                    start(secondary)
+                    continue
+                if state["winner"] is None:
+                    if error is not None:
+                        failed.add(name)
+                        if len(started) == 1:
+                            start(secondary)
+                        elif failed.issuperset(started):
+                            raise error
+                        continue
+                    state["winner"] = name
+                    if name != primary:
+                        self.health.hedge_wins.inc()
+                if name != state["winner"]:
+                    continue
+                if error is not None:
+                    raise error
+                if fragment is None:
+                    return
+                yield name, fragment
+        finally:
+            state["closed"] = True
+
+    def _try_fallback(self, current: str | None = None) -> bool:
+        """Make the next available backend after ``current`` active.
+
+        ``current`` defaults to the active backend. Backends whose circuit is
+        open are skipped. In ``fastest`` mode the remaining real backends are
+        tried quickest first, then mock.
+        """
+        current_backend = current or self.get_active_backend_name()
 
         # Get backends to try (excluding current)
-        fallback_order = ["openai", "ollama", "local", "mock"]
+        fallback_order = PRIORITY_ORDER
         try:
             current_index = fallback_order.index(current_backend)
             candidates = fallback_order[current_index + 1 :]
         except ValueError:
             candidates = fallback_order
+        if self.routing == "fastest":
+            candidates = [
+                *self._healthy_candidates(current_backend),
+                *(n for n in fallback_order if n == "mock"),
+            ]
+            candidates = [n for n in candidates if n != current_backend]
 
         for backend_name in candidates:
             if backend_name in self.backends:
                 backend = self.backends[backend_name]
-                if backend.is_available():
+                if self.health.available(backend_name) and backend.is_available():
                     self.active_backend = backend
                     return True
 
@@ -211,12 +626,12 @@ class LLMManager:
         """Get information about a specific backend or active backend."""
         if backend_name:
             if backend_name in self.backends:
-                return self.backends[backend_name].get_backend_info()
+                return _backend_info(self.backends[backend_name])
             else:
                 return {"error": f"Backend {backend_name} not found"}
         else:
             if self.active_backend:
-                return self.active_backend.get_backend_info()
+                return _backend_info(self.active_backend)
             else:
                 return {"error": "No active backend"}
 
@@ -225,13 +640,17 @@ class LLMManager:
         info: dict[str, dict[str, Any]] = {}
         for name, backend in self.backends.items():
             try:
-                info[name] = backend.get_backend_info()
+                info[name] = _backend_info(backend)
             except Exception as e:
                 info[name] = {"error": str(e)}
 
         info["active"] = self.get_active_backend_name()  # type: ignore[assignment]
         return info
 
+    def get_health(self) -> dict[str, dict[str, Any]]:
+        """Circuit state, error rate and latency per backend."""
+        return self.health.snapshot()
+
     def switch_backend(self, backend_name: str) -> bool:
         """Switch to a specific backend."""
         if backend_name not in self.backends:
@@ -255,6 +674,8 @@ class LLMManager:
         for backend in self.backends.values():
             if hasattr(backend, "_available"):
                 backend._available = None
+        # An explicit refresh also gives tripped circuits a fresh start
+        self.health.reset()
 
         # Reselect best backend
         self._select_backend()
@@ -288,6 +709,19 @@ class LLMManager:
             return {"error": str(e), "backend_info": backend.get_backend_info()}
 
 
+def _backend_info(backend: LLMBackend) -> dict[str, Any]:
+    info = backend.get_backend_info()
+    state = getattr(backend, "load_state", None)
+    if isinstance(info, dict) and isinstance(state, str):
+        info.setdefault("state", state)
+    return info
+
+
+def _backend_model(backend: LLMBackend) -> str | None:
+    model = getattr(backend, "model", None) or getattr(backend, "model_name", None)
+    return model if isinstance(model, str) else None
+
+
 # Convenience function for quick LLM access
 def get_default_llm_manager(**kwargs) -> LLMManager:
     return LLMManager(**kwargs)
@@ -0,0 +1,271 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Keep-alive Ollama client with health probing and model residency.
+
+:class:`OllamaClient` holds one pooled ``httpx.Client`` per server, so
+requests reuse TCP connections. The base URL is checked against the SSRF
+policy when the pool is created and again every ``validate_ttl`` seconds,
+rather than before every request. Transport errors drop the pool, which
+forces a fresh connection and re-validation.
+
+:class:`OllamaHealth` caches the result of the cheap ``GET /api/tags``
+probe for ``probe_interval`` seconds. A failed request clears the cache so
+the next availability check probes again. A dead server is noticed, and so
+is one that comes back.
+
+:class:`OllamaKeeper` is an optional daemon thread. It probes on a schedule
+and pre-warms the configured model: on start, whenever the server comes
+back, and every ``warm_interval`` seconds. Warming sends a prompt-less
+``/api/generate`` with ``keep_alive``, which loads the model and keeps it
+resident, so the first real request does not pay the cold load.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_ALIVE = "30m"
+
+
+def validate_ollama_url(url: str) -> None:
+    """Raise ``RuntimeError`` if ``url`` fails the SSRF policy."""
+    from chatty_commander.utils.url_validator import is_safe_url
+
+    if not is_safe_url(url):
+        logger.warning(f"Ollama URL {url} rejected by security policy.")
+        raise RuntimeError("Ollama URL rejected by security policy")
+
+
+class OllamaClient:
+    """Pooled HTTP access to one Ollama server."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float = 30.0,
+        max_connections: int = 4,
+        validate_ttl: float = 60.0,
+        validate: Callable[[str], None] | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._check_url = validate or validate_ollama_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.validate_ttl = validate_ttl
+        self._client: Any = None
+        self._validated_at: float | None = None
+        self._lock = threading.Lock()
+
+    def _validate(self) -> None:
+        """Apply the SSRF check, at most once per ``validate_ttl`` seconds."""
+        now = time.monotonic()
+        if self._validated_at is not None and now - self._validated_at < self.validate_ttl:
+            return
+        self._check_url(self.base_url)
+        self._validated_at = now
+
+    def client(self) -> Any:
+        """The pooled ``httpx.Client``, validating the URL when due."""
+        import httpx
+
+        with self._lock:
+            self._validate()
+            if self._client is None:
+                # Looked up at call time so tests can patch ``httpx.Client``.
+                self._client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=60.0,
+                    ),
+                    timeout=self.timeout,
+                    follow_redirects=False,
+                )
+            return self._client
+
+    def _call(self, method: str, path: str, **kwargs: Any) -> Any:
+        client = self.client()
+        try:
+            return getattr(client, method)(
+                f"{self.base_url}{path}", follow_redirects=False, **kwargs
+            )
+        except Exception as e:
+            if _is_transport_error(e):
+                self.reset()
+            raise
+
+    def get(self, path: str, timeout: float | None = None) -> Any:
+        return self._call("get", path, timeout=timeout or self.timeout)
+
+    def post(
+        self, path: str, payload: dict[str, Any], timeout: float | None = None
+    ) -> Any:
+        return self._call("post", path, json=payload, timeout=timeout or self.timeout)
+
+    def stream_lines(
+        self, path: str, payload: dict[str, Any], timeout: float | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """POST ``payload`` and yield each newline-delimited JSON object."""
+        client = self.client()
+        try:
+            with client.stream(
+                "POST",
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=timeout or self.timeout,
+                follow_redirects=False,
+            ) as response:
+                if response.status_code != 200:
+                    raise RuntimeError(f"Ollama request failed: {response.status_code}")
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except Exception as e:
+            if _is_transport_error(e):
+                self.reset()
+            raise
+
+    def reset(self) -> None:
+        """Drop pooled connections; the next call reconnects and re-validates."""
+        with self._lock:
+            client, self._client = self._client, None
+            self._validated_at = None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    close = reset
+
+
+def _is_transport_error(exc: Exception) -> bool:
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(exc, httpx.TransportError)
+
+
+class OllamaHealth:
+    """Last ``/api/tags`` probe result, trusted for ``probe_interval`` seconds."""
+
+    def __init__(self, probe_interval: float = 30.0) -> None:
+        self.probe_interval = probe_interval
+        self.available: bool | None = None
+        self.models: list[str] = []
+        self.checked_at: float | None = None
+        self.last_error: str | None = None
+
+    def fresh(self) -> bool:
+        return (
+            self.available is not None
+            and self.checked_at is not None
+            and time.monotonic() - self.checked_at < self.probe_interval
+        )
+
+    def record(self, available: bool | None, error: str | None = None) -> None:
+        self.available = available
+        self.checked_at = None if available is None else time.monotonic()
+        self.last_error = error
+
+    def invalidate(self, error: str | None = None) -> None:
+        """Forget the cached result so the next check probes again."""
+        self.record(None)
+        self.last_error = error
+
+
+class OllamaKeeper:
+    """Background probing and pre-warming for one backend."""
+
+    def __init__(
+        self,
+        backend: Any,
+        *,
+        probe_interval: float,
+        warm_interval: float | None = None,
+    ) -> None:
+        self.backend = backend
+        self.probe_interval = probe_interval
+        self.warm_interval = warm_interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ollama-keeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        was_up = False
+        while not self._stop.is_set():
+            try:
+                up = self.backend.probe()
+                if up:
+                    last = self.backend.warmed_at
+                    due = (
+                        not was_up
+                        or last is None
+                        or (
+                            self.warm_interval is not None
+                            and time.monotonic() - last >= self.warm_interval
+                        )
+                    )
+                    if due:
+                        self.backend.warm()
+                was_up = up
+            except Exception as e:  # keep the thread alive
+                logger.debug(f"Ollama keeper cycle failed: {e}")
+            self._stop.wait(self.probe_interval)
+
+
+__all__ = [
+    "DEFAULT_KEEP_ALIVE",
+    "OllamaClient",
+    "OllamaHealth",
+    "OllamaKeeper",
+    "validate_ollama_url",
+]
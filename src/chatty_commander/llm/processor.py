@@ -173,6 +173,7 @@ class CommandProcessor:
                 prompt,
                 max_tokens=100,
                 temperature=0.3,  # Lower temperature for more consistent results
+                hedge=True,  # voice commands are latency-critical
             )
 
             return self._parse_llm_response(response)
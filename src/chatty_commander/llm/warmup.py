@@ -0,0 +1,117 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Deferred heavy initialization for LLM backends.
+
+Backends split setup in two. ``is_available()`` is a cheap probe: config
+present, dependencies importable, server answering. It is what backend
+selection calls, so it must not load anything. The expensive step, such as
+loading a transformers model onto the device, runs in ``load()``. That
+happens on first use, or ahead of time from a background warmup thread
+(:meth:`LLMManager.warmup <chatty_commander.llm.manager.LLMManager.warmup>`).
+
+:class:`LazyLoader` runs such a step exactly once. Concurrent callers wait
+for the load already in progress instead of starting another. Its
+:attr:`~LazyLoader.state` is what ``get_backend_info()`` and ``/health``
+report:
+
+- ``cold``: not loaded yet;
+- ``loading``: a load is in progress;
+- ``warm``: loaded and ready;
+- ``failed``: the load failed and is not retried.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+COLD = "cold"
+LOADING = "loading"
+WARM = "warm"
+FAILED = "failed"
+
+
+class LazyLoader:
+    """Run ``load`` once, on demand or in the background."""
+
+    def __init__(self, load: Callable[[], bool], name: str = "backend") -> None:
+        self._load = load
+        self.name = name
+        self.state = COLD
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure(self, timeout: float | None = None) -> bool:
+        """Load now unless already done; wait if another thread is loading.
+
+        Returns whether the backend ended up ``warm``. With ``timeout``, a
+        load still running elsewhere after that many seconds counts as not
+        ready.
+        """
+        with self._lock:
+            if self.state == COLD:
+                self.state = LOADING
+                owner = True
+            else:
+                owner = False
+        if owner:
+            self._run()
+        else:
+            self._done.wait(timeout)
+        return self.state == WARM
+
+    def start(self) -> threading.Thread | None:
+        """Load in a daemon thread; ``None`` if already started."""
+        with self._lock:
+            if self.state != COLD:
+                return None
+            self.state = LOADING
+        thread = threading.Thread(
+            target=self._run, name=f"llm-warmup-{self.name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _run(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            ok = bool(self._load())
+        except Exception as e:
+            logger.error(f"Loading {self.name} failed: {e}")
+            self.error = str(e)
+            ok = False
+        self.load_seconds = time.perf_counter() - t0
+        self.state = WARM if ok else FAILED
+        if ok:
+            logger.info(f"{self.name} warm after {self.load_seconds:.2f}s")
+        self._done.set()
+
+
+__all__ = ["COLD", "FAILED", "LOADING", "WARM", "LazyLoader"]
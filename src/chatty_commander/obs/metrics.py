@@ -27,6 +27,7 @@ This module provides an in-process metrics system with the following features:
 - Counter: monotonic integer value that can be incremented.
 - Gauge: value that can be set up/down (not persisted across processes).
 - Histogram: track distribution of observed values using configurable buckets.
+- Bound children (``counter.labels(route="/x")``): a metric pinned to one label set.
 - Timer context/decorator: record execution duration into a histogram.
 - Starlette/FastAPI middleware: collect request duration, status codes, and method counts.
 - Optional FastAPI router to expose metrics in JSON format (human/debug-friendly) and
@@ -34,7 +35,12 @@ This module provides an in-process metrics system with the following features:
 
 Design principles
 - No runtime dependencies beyond the standard library and FastAPI/Starlette (if you use the router/middleware).
-- Thread-safe updates using per-metric locks.
+- Cheap, thread-safe updates: counters and histograms write to per-thread
+  shards (merged when read), histograms bisect to a single per-bucket count,
+  and ``metric.labels(...)`` returns a bound child so hot paths skip label
+  sorting.
+- Prometheus text is cached by the registry and re-rendered only when a
+  metric's generation counter has moved.
 - Zero global side-effects: A default global registry is available, but you can create
   isolatable registries for tests.
 - Defensive coding: invalid inputs are clamped/sanitized; errors in metrics collection
@@ -47,7 +53,9 @@ This module is wired into the running server via web_mode.py:
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
 from threading import Lock
 from time import monotonic
@@ -63,16 +71,88 @@ except Exception:  # pragma: no cover
     BaseHTTPMiddleware = object  # type: ignore
 
 
+LabelKey = tuple[tuple[str, str], ...]
+
+
+class _Shards:
+    """Per-thread value maps for lock-free hot-path updates.
+
+    Each thread writes only to its own dict, so updates need no lock; readers
+    merge every shard. Shards of threads that have exited are folded into a
+    single retired map on the next read so worker churn does not grow the
+    shard list without bound. ``merge(acc, key, value)`` adds one shard's
+    ``value`` into ``acc``.
+    """
+
+    def __init__(self, merge: Callable[[dict[LabelKey, Any], LabelKey, Any], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = Lock()
+        self._live: list[tuple[threading.Thread, dict[LabelKey, Any]]] = []
+        self._retired: dict[LabelKey, Any] = {}
+
+    def mine(self) -> dict[LabelKey, Any]:
+        try:
+            values: dict[LabelKey, Any] = self._local.values
+            return values
+        except AttributeError:
+            values = {}
+            self._local.values = values
+            with self._lock:
+                self._live.append((threading.current_thread(), values))
+            return values
+
+    def collect(self) -> dict[LabelKey, Any]:
+        merged: dict[LabelKey, Any] = {}
+        with self._lock:
+            live = []
+            for thread, values in self._live:
+                if thread.is_alive():
+                    live.append((thread, values))
+                else:
+                    # The owner is gone, so nothing else writes these.
+                    for key, value in values.items():
+                        self._merge(self._retired, key, value)
+            self._live = live
+            for key, value in self._retired.items():
+                self._merge(merged, key, value)
+            shards = [values for _, values in live]
+        for values in shards:
+            # dict.copy() is atomic under the GIL, so a concurrent insert by
+            # the owning thread cannot break the iteration.
+            for key, value in values.copy().items():
+                self._merge(merged, key, value)
+        return merged
+
+
+def _merge_number(acc: dict[LabelKey, Any], key: LabelKey, value: Any) -> None:
+    acc[key] = acc.get(key, 0) + value
+
+
+def _merge_buckets(acc: dict[LabelKey, Any], key: LabelKey, value: Any) -> None:
+    cell = list(value)
+    prev = acc.get(key)
+    if prev is None:
+        acc[key] = cell
+    else:
+        for i, v in enumerate(cell):
+            prev[i] += v
+
+
 class Metric:
     """Base class for all metrics types.
 
-    Metrics store a name and a dictionary of labels->value.
+    Metrics store a name and a dictionary of labels->value. ``generation``
+    increases on every update so exporters can tell whether anything changed
+    since their last render.
     """
 
     def __init__(self, name: str, description: str = "") -> None:
         self.name = name
         self.description = description
         self._lock = Lock()
+        self._children: dict[LabelKey, Any] = {}
+        self.generation = 0
 
     def _key(self, labels: dict[str, str] | None = None) -> tuple[tuple[str, str], ...]:
         if not labels:
@@ -80,33 +160,66 @@ class Metric:
         # Sort for deterministic keys
         return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
 
+    def labels(self, labels: dict[str, str] | None = None, **kwargs: str) -> Any:
+        """Return a child bound to one label set.
+
+        Binding sorts the labels once; hot paths should keep the child and
+        call it directly instead of passing ``labels=`` on every update.
+        """
+        key = self._key({**(labels or {}), **kwargs})
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._bind(key)
+        return child
+
+    def _bind(self, key: LabelKey) -> Any:  # pragma: no cover - abstract
+        raise NotImplementedError
+
 
 class Counter(Metric):
-    """Monotonic counter."""
+    """Monotonic counter, sharded per thread."""
 
     def __init__(self, name: str, description: str = "") -> None:
         super().__init__(name, description)
-        self._values: dict[tuple[tuple[str, str], ...], int] = {}
+        self._shards = _Shards(_merge_number)
 
-    def inc(self, amount: int = 1, labels: dict[str, str] | None = None) -> None:
+    def _add(self, key: LabelKey, amount: int) -> None:
         if amount < 0:
             amount = 0
-        key = self._key(labels)
-        with self._lock:
-            self._values[key] = self._values.get(key, 0) + amount
+        values = self._shards.mine()
+        values[key] = values.get(key, 0) + amount
+        self.generation += 1
+
+    def inc(self, amount: int = 1, labels: dict[str, str] | None = None) -> None:
+        self._add(self._key(labels), amount)
 
     def get(self, labels: dict[str, str] | None = None) -> int:
-        with self._lock:
-            return self._values.get(self._key(labels), 0)
+        return int(self._shards.collect().get(self._key(labels), 0))
 
     def samples(self) -> list[tuple[dict[str, str], int]]:
-        with self._lock:
-            snapshot = list(self._values.items())
-        out: list[tuple[dict[str, str], int]] = []
-        for key, value in snapshot:
-            labels = dict(key)
-            out.append((labels, value))
-        return out
+        return [(dict(key), value) for key, value in self._shards.collect().items()]
+
+    def _bind(self, key: LabelKey) -> BoundCounter:
+        return BoundCounter(self, key)
+
+
+class BoundCounter:
+    """A :class:`Counter` child with its label set resolved up front."""
+
+    __slots__ = ("_metric", "_key")
+
+    def __init__(self, metric: Counter, key: LabelKey) -> None:
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount: int = 1) -> None:
+        self._metric._add(self._key, amount)
+
+    def get(self) -> int:
+        return int(self._metric._shards.collect().get(self._key, 0))
 
 
 class Gauge(Metric):
@@ -114,25 +227,40 @@ class Gauge(Metric):
 
     def __init__(self, name: str, description: str = "") -> None:
         super().__init__(name, description)
-        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+        self._values: dict[LabelKey, float] = {}
+
+    def _set(self, key: LabelKey, value: float) -> None:
+        # A single dict store is atomic; last writer wins, as a gauge should.
+        self._values[key] = float(value)
+        self.generation += 1
 
     def set(self, value: float, labels: dict[str, str] | None = None) -> None:
-        key = self._key(labels)
-        with self._lock:
-            self._values[key] = float(value)
+        self._set(self._key(labels), value)
 
     def get(self, labels: dict[str, str] | None = None) -> float:
-        with self._lock:
-            return self._values.get(self._key(labels), 0.0)
+        return self._values.get(self._key(labels), 0.0)
 
     def samples(self) -> list[tuple[dict[str, str], float]]:
-        with self._lock:
-            snapshot = list(self._values.items())
-        out: list[tuple[dict[str, str], float]] = []
-        for key, value in snapshot:
-            labels = dict(key)
-            out.append((labels, value))
-        return out
+        return [(dict(key), value) for key, value in self._values.copy().items()]
+
+    def _bind(self, key: LabelKey) -> BoundGauge:
+        return BoundGauge(self, key)
+
+
+class BoundGauge:
+    """A :class:`Gauge` child with its label set resolved up front."""
+
+    __slots__ = ("_metric", "_key")
+
+    def __init__(self, metric: Gauge, key: LabelKey) -> None:
+        self._metric = metric
+        self._key = key
+
+    def set(self, value: float) -> None:
+        self._metric._set(self._key, value)
+
+    def get(self) -> float:
+        return self._metric._values.get(self._key, 0.0)
 
 
 @dataclass
@@ -160,71 +288,78 @@ class HistogramBuckets:
 
 
 class Histogram(Metric):
-    """Histogram with cumulative buckets."""
+    """Histogram with per-bucket counts, sharded per thread.
+
+    Each observation increments exactly one bucket, found by bisecting the
+    edges; cumulative ``le`` counts are summed at export. A series cell is
+    ``[count_0, ..., count_n, overflow, sum]``.
+    """
 
     def __init__(
         self, name: str, description: str = "", buckets: HistogramBuckets | None = None
     ) -> None:
         super().__init__(name, description)
         self._buckets = buckets or HistogramBuckets()
-        # mapping key -> list of counts per bucket + +Inf
-        self._counts: dict[tuple[tuple[str, str], ...], list[int]] = {}
-        self._sum: dict[tuple[tuple[str, str], ...], float] = {}
-        self._count: dict[tuple[tuple[str, str], ...], int] = {}
+        self._edges = sorted(self._buckets.edges)
+        self._width = len(self._edges) + 2  # + overflow + sum
+        self._shards = _Shards(_merge_buckets)
 
-    def observe(self, value: float, labels: dict[str, str] | None = None) -> None:
+    def _observe(self, key: LabelKey, value: float) -> None:
         v = self._buckets.clamp(value)
-        key = self._key(labels)
-        with self._lock:
-            counts = self._counts.get(key)
-            if counts is None:
-                counts = [0] * (len(self._buckets.edges) + 1)  # last is +Inf
-                self._counts[key] = counts
-                self._sum[key] = 0.0
-                self._count[key] = 0
-            self._sum[key] += v
-            self._count[key] += 1
-            # cumulative counts: increment all buckets where le >= v
-            placed = False
-            for idx, edge in enumerate(self._buckets.edges):
-                if v <= edge:
-                    counts[idx] += 1
-                    placed = True
-            if not placed:
-                counts[-1] += 1
+        values = self._shards.mine()
+        cell = values.get(key)
+        if cell is None:
+            cell = values[key] = [0] * (self._width - 1) + [0.0]
+        # bisect_left finds the first edge >= v, i.e. the smallest le bucket.
+        cell[bisect_left(self._edges, v)] += 1
+        cell[-1] += v
+        self.generation += 1
+
+    def observe(self, value: float, labels: dict[str, str] | None = None) -> None:
+        self._observe(self._key(labels), value)
 
     def snapshot(self) -> dict[str, Any]:
-        out: dict[str, Any] = {"buckets": self._buckets.edges, "series": []}
-        with self._lock:
-            # Copy the per-series state inside the lock so a concurrent
-            # observe() can't mutate the dicts while we iterate them.
-            snapshot = [
-                (
-                    dict(key),
-                    list(counts),
-                    self._sum.get(key, 0.0),
-                    self._count.get(key, 0),
-                )
-                for key, counts in self._counts.items()
-            ]
-        for labels, counts, sum_val, count_val in snapshot:
+        """Per-series bucket counts.
+
+        ``counts`` holds one non-cumulative count per edge plus a final
+        overflow bucket (observations above the largest edge).
+        """
+        out: dict[str, Any] = {"buckets": list(self._edges), "series": []}
+        for key, cell in self._shards.collect().items():
+            counts = cell[:-1]
             out["series"].append(
                 {
-                    "labels": labels,
+                    "labels": dict(key),
                     "counts": counts,
-                    "sum": sum_val,
-                    "count": count_val,
+                    "sum": cell[-1],
+                    # Derived from the buckets so +Inf always equals _count.
+                    "count": sum(counts),
                 }
             )
         return out
 
+    def _bind(self, key: LabelKey) -> BoundHistogram:
+        return BoundHistogram(self, key)
+
+
+class BoundHistogram:
+    """A :class:`Histogram` child with its label set resolved up front."""
+
+    __slots__ = ("_metric", "_key")
+
+    def __init__(self, metric: Histogram, key: LabelKey) -> None:
+        self._metric = metric
+        self._key = key
+
+    def observe(self, value: float) -> None:
+        self._metric._observe(self._key, value)
+
 
 class Timer:
     """Context/decorator for timing functions and recording in a histogram."""
 
     def __init__(self, hist: Histogram, labels: dict[str, str] | None = None) -> None:
-        self._h = hist
-        self._l = labels or {}
+        self._h = hist.labels(labels)
         self._t0 = 0.0
 
     def __enter__(self) -> Timer:
@@ -233,7 +368,7 @@ class Timer:
 
     def __exit__(self, _exc_type, _exc, _tb) -> None:
         dt = monotonic() - self._t0
-        self._h.observe(dt, labels=self._l)
+        self._h.observe(dt)
 
     def __call__(self, fn: Callable[..., Any]) -> Callable[..., Any]:
         def wrapper(*args, **kwargs):
@@ -243,13 +378,20 @@ class Timer:
 
 
 class MetricsRegistry:
-    """Container for metrics."""
+    """Container for metrics.
+
+    :meth:`to_prometheus` caches its output and re-renders only when a metric
+    was added or updated since the last call.
+    """
 
     def __init__(self) -> None:
         self._lock = Lock()
         self.counters: dict[str, Counter] = {}
         self.gauges: dict[str, Gauge] = {}
         self.hists: dict[str, Histogram] = {}
+        self._render_lock = Lock()
+        self._exposition: tuple[tuple[int, ...], str] | None = None
+        self.renders = 0
 
     def counter(self, name: str, description: str = "") -> Counter:
         with self._lock:
@@ -279,30 +421,101 @@ class MetricsRegistry:
 
     def to_json(self) -> dict[str, Any]:
         out: dict[str, Any] = {"counters": {}, "gauges": {}, "histograms": {}}
-        for k, c in self.counters.items():
+        for k, c in list(self.counters.items()):
             out["counters"][k] = [
                 {"labels": labels_map, "value": val} for labels_map, val in c.samples()
             ]
-        for k, g in self.gauges.items():
+        for k, g in list(self.gauges.items()):
             out["gauges"][k] = [
                 {"labels": labels_map, "value": val} for labels_map, val in g.samples()
             ]
-        for k, h in self.hists.items():
+        for k, h in list(self.hists.items()):
             out["histograms"][k] = h.snapshot()
         return out
 
+    def generation(self) -> tuple[int, ...]:
+        """Fingerprint that changes whenever any metric is added or updated."""
+        with self._lock:
+            metrics = [
+                *self.counters.values(),
+                *self.gauges.values(),
+                *self.hists.values(),
+            ]
+        return (len(metrics), *(m.generation for m in metrics))
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition, served from cache while unchanged."""
+        with self._render_lock:
+            # Read the generation before rendering: an update that lands
+            # mid-render bumps it again and forces the next call to re-render.
+            gen = self.generation()
+            cached = self._exposition
+            if cached is not None and cached[0] == gen:
+                return cached[1]
+            text = self._render_prometheus()
+            self._exposition = (gen, text)
+            self.renders += 1
+            return text
+
+    def _render_prometheus(self) -> str:
+        lines: list[str] = []
+        # Counters
+        for name, c in list(self.counters.items()):
+            if c.description:
+                lines.append(f"# HELP {name} {c.description}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in c.samples():
+                if labels:
+                    lines.append(f"{name}{{{_lbl(labels)}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+        # Gauges
+        for name, g in list(self.gauges.items()):
+            if g.description:
+                lines.append(f"# HELP {name} {g.description}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, gvalue in g.samples():
+                if labels:
+                    lines.append(f"{name}{{{_lbl(labels)}}} {gvalue}")
+                else:
+                    lines.append(f"{name} {gvalue}")
+        # Histograms
+        for name, h in list(self.hists.items()):
+            if h.description:
+                lines.append(f"# HELP {name} {h.description}")
+            lines.append(f"# TYPE {name} histogram")
+            snap = h.snapshot()
+            for series in snap["series"]:
+                labels = series["labels"]
+                counts = series["counts"]
+                # Buckets are stored per-edge; Prometheus wants cumulative
+                # counts, and +Inf must equal the total observation count.
+                running = 0
+                for idx, edge in enumerate(snap["buckets"]):
+                    running += counts[idx]
+                    bucket_lbl = {**labels, "le": str(edge)}
+                    lines.append(f"{name}_bucket{{{_lbl(bucket_lbl)}}} {running}")
+                bucket_lbl_inf = {**labels, "le": "+Inf"}
+                lines.append(
+                    f"{name}_bucket{{{_lbl(bucket_lbl_inf)}}} {series['count']}"
+                )
+                lines.append(f"{name}_sum{{{_lbl(labels)}}} {series['sum']}")
+                lines.append(f"{name}_count{{{_lbl(labels)}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
 
 # Global default registry (opt-in usage)
 DEFAULT_REGISTRY = MetricsRegistry()
 
 
-class RequestMetricsMiddleware(BaseHTTPMiddleware):  # type: ignore[misc]
-    """Starlette middleware to collect per-request metrics."""
+class RequestMetrics:
+    """Per-request HTTP metrics: duration histogram and request counter.
 
-    def __init__(
-        self, app, registry: MetricsRegistry | None = None, service: str = "chatty"
-    ) -> None:  # type: ignore[no-untyped-def]
-        super().__init__(app)
+    Shared by :class:`RequestMetricsMiddleware` and the web-mode edge
+    middleware so both record identical series.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None, service: str = "chatty") -> None:
         self.registry = registry or DEFAULT_REGISTRY
         self.service = service
         self.c_req = self.registry.counter("http_requests_total", "Total HTTP requests")
@@ -310,6 +523,51 @@ class RequestMetricsMiddleware(BaseHTTPMiddleware):  # type: ignore[misc]
             "http_request_duration_seconds",
             "Request duration in seconds",
         )
+        # (route, method, status) -> bound children, so the per-request path
+        # never re-sorts label dicts.
+        self._series: dict[tuple[str, str, str], tuple[BoundHistogram, BoundCounter]] = {}
+
+    def _children(
+        self, route: str, method: str, status: str
+    ) -> tuple[BoundHistogram, BoundCounter]:
+        key = (route, method, status)
+        children = self._series.get(key)
+        if children is None:
+            labels = {"route": route, "method": method, "service": self.service}
+            children = self._series[key] = (
+                self.h_latency.labels(labels),
+                self.c_req.labels({**labels, "status": status}),
+            )
+        return children
+
+    def observe(
+        self, scope: Mapping[str, Any], method: str, status: int, elapsed: float
+    ) -> None:
+        """Record one finished request.
+
+        The route label comes from ``scope["route"]``, so call this after the
+        app has run. Best-effort: metrics must never break the request path.
+        """
+        try:
+            route = scope.get("route", None)
+            route_path = getattr(route, "path", "unknown") if route else "unknown"
+            latency, requests = self._children(route_path, method, str(status))
+            latency.observe(elapsed)
+            requests.inc()
+        except Exception:  # pragma: no cover - defensive
+            pass
+
+
+class RequestMetricsMiddleware(BaseHTTPMiddleware):  # type: ignore[misc]
+    """Starlette middleware to collect per-request metrics."""
+
+    def __init__(
+        self, app, registry: MetricsRegistry | None = None, service: str = "chatty"
+    ) -> None:  # type: ignore[no-untyped-def]
+        super().__init__(app)
+        self.metrics = RequestMetrics(registry, service)
+        self.registry = self.metrics.registry
+        self.service = service
 
     async def dispatch(
         self, request: Request, call_next: Callable[[Request], Any]
@@ -317,33 +575,16 @@ class RequestMetricsMiddleware(BaseHTTPMiddleware):  # type: ignore[misc]
         method = getattr(request, "method", "GET")
         t0 = monotonic()
         status = 0
-        response = None
         try:
             response = await call_next(request)
             status = getattr(response, "status_code", 0)
             return response  # type: ignore[no-any-return]
         finally:
             # Resolve the route only after call_next so the matched route is
-            # available on request.scope. Record duration manually with the
-            # real route label rather than the fixed-label Timer wrapper.
-            # Metrics collection is best-effort and must never break the app
-            # request path, so swallow any errors here.
-            try:
-                elapsed = monotonic() - t0
-                route = getattr(request, "scope", {}).get("route", None)
-                route_path = getattr(route, "path", "unknown") if route else "unknown"
-                labels = {
-                    "route": route_path,
-                    "method": method,
-                    "service": self.service,
-                }
-                self.h_latency.observe(elapsed, labels=labels)
-                self.c_req.inc(
-                    1,
-                    labels={**labels, "status": str(status)},
-                )
-            except Exception:  # pragma: no cover - defensive
-                pass
+            # available on request.scope.
+            self.metrics.observe(
+                getattr(request, "scope", {}), method, status, monotonic() - t0
+            )
 
 
 def create_metrics_router(registry: MetricsRegistry | None = None) -> APIRouter | None:  # type: ignore[misc]
@@ -368,57 +609,7 @@ def create_metrics_router(registry: MetricsRegistry | None = None) -> APIRouter
 
     @router.get("/metrics/prom")
     async def metrics_prom() -> Response:  # type: ignore[override]
-        lines: list[str] = []
-        # Counters
-        for name, c in reg.counters.items():
-            if c.description:
-                lines.append(f"# HELP {name} {c.description}")
-            lines.append(f"# TYPE {name} counter")
-            for labels, value in c.samples():
-                if labels:
-                    lbl = ",".join(f"{k}={_quote(v)}" for k, v in labels.items())
-                    lines.append(f"{name}{{{lbl}}} {value}")
-                else:
-                    lines.append(f"{name} {value}")
-        # Gauges
-        for name, g in reg.gauges.items():
-            if g.description:
-                lines.append(f"# HELP {name} {g.description}")
-            lines.append(f"# TYPE {name} gauge")
-            for labels, value in g.samples():  # type: ignore[assignment]
-                if labels:
-                    lbl = ",".join(f"{k}={_quote(v)}" for k, v in labels.items())
-                    lines.append(f"{name}{{{lbl}}} {value}")
-                else:
-                    lines.append(f"{name} {value}")
-        # Histograms
-        for name, h in reg.hists.items():
-            if h.description:
-                lines.append(f"# HELP {name} {h.description}")
-            lines.append(f"# TYPE {name} histogram")
-            snap = h.snapshot()
-            for series in snap.get("series", []):
-                labels = series.get("labels", {})
-                counts = series.get("counts", [])
-                sum_val = series.get("sum", 0.0)
-                count_val = series.get("count", 0)
-                # observe() stores per-finite-edge counts that are already
-                # cumulative (each counts[idx] == observations <= edges[idx]).
-                # Emit them as-is, then the +Inf bucket which, per the
-                # Prometheus spec, must equal the total observation count.
-                for idx, edge in enumerate(snap.get("buckets", [])):
-                    bucket_lbl = {**labels, "le": str(edge)}
-                    lines.append(
-                        f"{name}_bucket{{{_lbl(bucket_lbl)}}} {counts[idx] if idx < len(counts) else 0}"
-                    )
-                bucket_lbl_inf = {**labels, "le": "+Inf"}
-                lines.append(
-                    f"{name}_bucket{{{_lbl(bucket_lbl_inf)}}} {count_val}"
-                )
-                lines.append(f"{name}_sum{{{_lbl(labels)}}} {sum_val}")
-                lines.append(f"{name}_count{{{_lbl(labels)}}} {count_val}")
-        content = "\n".join(lines) + "\n"
-        return Response(content=content, media_type="text/plain")
+        return Response(content=reg.to_prometheus(), media_type="text/plain")
 
     return router
 
@@ -0,0 +1,341 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+In-process latency tracing for the voice pipeline.
+
+One :class:`Trace` covers a single utterance from wake word to spoken
+confirmation and is split into named stage spans (``wake``, ``capture``,
+``vad_endpoint``, ``transcription``, ``matching``, ``execution``, ``tts``).
+The active trace travels in a :mod:`contextvars` variable, so components deep
+in the call stack (the transcriber's record loop, for instance) add spans with
+:func:`span` / :func:`add_span` without the trace being threaded through their
+signatures; both are no-ops when no trace is active.
+
+Every finished span is observed into the ``voice_stage_seconds{stage}``
+histogram, and finished traces are kept in a ring buffer exposed at
+``GET /api/v1/traces``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import DEFAULT_REGISTRY, BoundHistogram, HistogramBuckets, MetricsRegistry
+
+try:  # Optional; only needed for the router
+    from fastapi import APIRouter, HTTPException
+except Exception:  # pragma: no cover
+    APIRouter = None  # type: ignore
+    HTTPException = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Voice stages range from sub-millisecond matching to multi-second capture.
+STAGE_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+_current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar(
+    "voice_trace", default=None
+)
+
+
+@dataclass
+class Span:
+    name: str
+    start_ms: float
+    duration_ms: float
+    attrs: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out = {
+            "name": self.name,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class Trace:
+    """Spans recorded for one pass through the voice pipeline.
+
+    Span offsets (``start_ms``) are relative to the start of the trace.
+    """
+
+    def __init__(self, tracer: VoiceTracer, origin: str, **attrs: Any) -> None:
+        self.tracer = tracer
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.origin = origin
+        self.attrs: dict[str, Any] = dict(attrs)
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+        self.status: str | None = None
+        self.duration_ms: float | None = None
+
+    def _offset_ms(self, t: float) -> float:
+        return (t - self._t0) * 1000
+
+    def add_span(
+        self,
+        name: str,
+        duration_s: float,
+        end: float | None = None,
+        error: str | None = None,
+        **attrs: Any,
+    ) -> Span:
+        """Record a span timed by the caller, ending at ``end`` (default now)."""
+        end = time.perf_counter() if end is None else end
+        duration_s = max(0.0, duration_s)
+        s = Span(
+            name,
+            self._offset_ms(end - duration_s),
+            duration_s * 1000,
+            attrs,
+            error,
+        )
+        with self._lock:
+            self.spans.append(s)
+        self.tracer._stage(name).observe(duration_s)
+        return s
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block as stage ``name``.
+
+        Yields the span's attribute dict so the block can annotate it.
+        """
+        t0 = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            self.add_span(name, end - t0, end=end, error=error, **attrs)
+
+    def finish(self, status: str = "ok") -> None:
+        """Close the trace and hand it to the tracer's ring buffer (once)."""
+        with self._lock:
+            if self.duration_ms is not None:
+                return
+            self.status = status
+            self.duration_ms = self._offset_ms(time.perf_counter())
+        self.tracer._finish(self)
+
+    def stage_ms(self, name: str) -> float:
+        """Total time spent in spans called ``name``."""
+        with self._lock:
+            return sum(s.duration_ms for s in self.spans if s.name == name)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ms)
+        return {
+            "trace_id": self.trace_id,
+            "origin": self.origin,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": (
+                round(self.duration_ms, 3) if self.duration_ms is not None else None
+            ),
+            "attrs": self.attrs,
+            "spans": [s.to_dict() for s in spans],
+        }
+
+
+class VoiceTracer:
+    """Creates traces and keeps the most recent finished ones.
+
+    Args:
+        capacity: Finished traces retained for ``recent()``.
+        registry: Metrics registry receiving the stage histograms.
+    """
+
+    def __init__(self, capacity: int = 100, registry: MetricsRegistry | None = None):
+        self._lock = threading.Lock()
+        self._recent: deque[Trace] = deque(maxlen=max(1, capacity))
+        self.started = 0
+        self.finished = 0
+        reg = registry or DEFAULT_REGISTRY
+        buckets = HistogramBuckets(list(STAGE_BUCKETS))
+        self._h_stage = reg.histogram(
+            "voice_stage_seconds", "Voice pipeline time per stage", buckets
+        )
+        self._h_total = reg.histogram(
+            "voice_trace_seconds", "Voice pipeline time per utterance", buckets
+        )
+        self._stages: dict[str, BoundHistogram] = {}
+        self._totals: dict[str, BoundHistogram] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self._recent.maxlen or 0
+
+    def start(self, origin: str, **attrs: Any) -> Trace:
+        with self._lock:
+            self.started += 1
+        return Trace(self, origin, **attrs)
+
+    def _stage(self, name: str) -> BoundHistogram:
+        child = self._stages.get(name)
+        if child is None:
+            child = self._stages[name] = self._h_stage.labels(stage=name)
+        return child
+
+    def _finish(self, trace: Trace) -> None:
+        status = trace.status or "ok"
+        total = self._totals.get(status)
+        if total is None:
+            total = self._totals[status] = self._h_total.labels(status=status)
+        total.observe((trace.duration_ms or 0.0) / 1000)
+        with self._lock:
+            self._recent.append(trace)
+            self.finished += 1
+        logger.debug(
+            f"Voice trace {trace.trace_id} {status} in {trace.duration_ms:.1f}ms"
+        )
+
+    def recent(self, limit: int | None = None) -> list[Trace]:
+        """Finished traces, newest first."""
+        with self._lock:
+            traces = list(self._recent)
+        traces.reverse()
+        return traces[:limit] if limit is not None else traces
+
+    def get(self, trace_id: str) -> Trace | None:
+        with self._lock:
+            for trace in self._recent:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "started": self.started,
+                "finished": self.finished,
+                "retained": len(self._recent),
+                "capacity": self.capacity,
+            }
+
+
+DEFAULT_TRACER = VoiceTracer()
+
+
+def current_trace() -> Trace | None:
+    """The trace active in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(trace: Trace | None) -> Iterator[Trace | None]:
+    """Make ``trace`` the current trace for the enclosed block."""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+    """Time a stage of the current trace; a no-op when none is active."""
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    with trace.span(name, **attrs) as a:
+        yield a
+
+
+def add_span(name: str, duration_s: float, **attrs: Any) -> None:
+    """Record a caller-timed stage on the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, duration_s, **attrs)
+
+
+def create_traces_router(tracer: VoiceTracer | None = None) -> APIRouter | None:  # type: ignore[misc]
+    """Return a FastAPI router serving recent voice traces.
+
+    Returns ``None`` when FastAPI is not installed.
+
+    Endpoints:
+    - GET /api/v1/traces?limit=N
+    - GET /api/v1/traces/{trace_id}
+    """
+    if APIRouter is None:
+        return None
+
+    tr = tracer or DEFAULT_TRACER
+    router = APIRouter()
+
+    @router.get("/api/v1/traces")
+    async def list_traces(limit: int = 20) -> dict[str, Any]:
+        limit = max(1, min(limit, tr.capacity))
+        return {
+            "traces": [t.to_dict() for t in tr.recent(limit)],
+            "stats": tr.stats(),
+        }
+
+    @router.get("/api/v1/traces/{trace_id}")
+    async def get_trace(trace_id: str) -> dict[str, Any]:
+        trace = tr.get(trace_id)
+        if trace is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+        return trace.to_dict()
+
+    return router
+
+
+__all__ = [
+    "DEFAULT_TRACER",
+    "Span",
+    "Trace",
+    "VoiceTracer",
+    "activate",
+    "add_span",
+    "create_traces_router",
+    "current_trace",
+    "span",
+]
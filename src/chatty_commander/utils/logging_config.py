@@ -44,7 +44,7 @@ import logging
 import os
 import uuid
 from collections.abc import Callable
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
 from typing import Any
 
 # Context variable holding the current request ID (empty string when not in a request)
@@ -55,6 +55,15 @@ def get_request_id() -> str:
     return _request_id_var.get()
 
 
+def set_request_id(request_id: str) -> Token[str]:
+    """Bind ``request_id`` to the current context; pass the token to reset."""
+    return _request_id_var.set(request_id)
+
+
+def reset_request_id(token: Token[str]) -> None:
+    _request_id_var.reset(token)
+
+
 class StructuredJSONFormatter(logging.Formatter):
     """JSON log formatter that includes request_id from context.
 
@@ -27,12 +27,21 @@ Provides:
 - Wake word detection using OpenWakeWord
 - Voice-to-text transcription (local and cloud options)
 - Voice command processing pipeline
-- Audio input/output management
+- Audio input/output management (one shared capture stream)
 """
 
+from .capture import AudioCaptureService
+from .phrase_cache import PhraseAudioCache
 from .pipeline import VoicePipeline
 from .transcription import VoiceTranscriber
 from .tts import TextToSpeech
 from .wakeword import WakeWordDetector
 
-__all__ = ["WakeWordDetector", "VoiceTranscriber", "VoicePipeline", "TextToSpeech"]
+__all__ = [
+    "AudioCaptureService",
+    "WakeWordDetector",
+    "VoiceTranscriber",
+    "VoicePipeline",
+    "TextToSpeech",
+    "PhraseAudioCache",
+]
@@ -0,0 +1,441 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Shared, long-lived audio capture.
+
+Previously the wake word detector held one PyAudio stream and the transcriber
+opened a fresh ``pyaudio.PyAudio()`` + stream for every command, paying the
+device-open latency each time and losing whatever was said between the wake
+word and the new stream coming up.
+
+:class:`AudioCaptureService` owns a single input stream and writes it into an
+:class:`AudioRingBuffer`. Consumers (wake word detection, transcription, the
+enhanced processor) each hold an :class:`AudioReader` with an independent
+cursor. A reader can be opened with pre-roll, i.e. positioned slightly in the
+past, so the utterance that starts right after the wake word is never clipped.
+
+:class:`BufferAudioSource` and :class:`WaveFileSource` stand in for the
+microphone in headless tests and tooling.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import wave
+from collections.abc import Callable
+from typing import Any, Protocol
+
+try:
+    import pyaudio
+
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    pyaudio = None  # type: ignore[assignment]
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 16-bit mono PCM throughout
+SAMPLE_WIDTH = 2
+
+
+class AudioSource(Protocol):
+    """Something that produces 16-bit mono PCM in fixed-size reads."""
+
+    def open(self) -> None: ...
+
+    def read(self, frames: int) -> bytes:
+        """Return up to ``frames`` samples; ``b""`` signals end of stream."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class PyAudioSource:
+    """Microphone input via PyAudio. The device is opened lazily in :meth:`open`."""
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._audio: Any = None
+        self._stream: Any = None
+
+    def open(self) -> None:
+        if not PYAUDIO_AVAILABLE:
+            raise ImportError(
+                "PyAudio not available. Install with: pip install pyaudio"
+            )
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+        )
+
+    def read(self, frames: int) -> bytes:
+        return self._stream.read(frames, exception_on_overflow=False)  # type: ignore[no-any-return]
+
+    def close(self) -> None:
+        if self._stream:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.warning(f"Error closing audio stream: {e}")
+            finally:
+                self._stream = None
+        if self._audio:
+            try:
+                self._audio.terminate()
+            except Exception as e:
+                logger.warning(f"Error terminating audio: {e}")
+            finally:
+                self._audio = None
+
+
+class BufferAudioSource:
+    """Serve pre-recorded or synthetic PCM as if it were a microphone.
+
+    Args:
+        data: Raw 16-bit mono PCM.
+        sample_rate: Used to pace reads when ``realtime`` is set.
+        realtime: Sleep for each chunk's duration, like a real device would.
+        loop: Restart from the beginning instead of signalling end of stream.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        sample_rate: int = 16000,
+        realtime: bool = False,
+        loop: bool = False,
+    ):
+        self.data = data
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.loop = loop
+        self._offset = 0
+
+    def open(self) -> None:
+        self._offset = 0
+
+    def read(self, frames: int) -> bytes:
+        if self._offset >= len(self.data):
+            if not self.loop or not self.data:
+                return b""
+            self._offset = 0
+        n_bytes = frames * SAMPLE_WIDTH
+        chunk = self.data[self._offset : self._offset + n_bytes]
+        self._offset += len(chunk)
+        if self.realtime:
+            time.sleep(len(chunk) / (SAMPLE_WIDTH * self.sample_rate))
+        return chunk
+
+    def close(self) -> None:
+        pass
+
+
+class WaveFileSource(BufferAudioSource):
+    """Serve a 16-bit mono WAV file as a capture source."""
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False):
+        with wave.open(path, "rb") as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: expected 16-bit mono WAV")
+            sample_rate = wav_file.getframerate()
+            data = wav_file.readframes(wav_file.getnframes())
+        super().__init__(data, sample_rate=sample_rate, realtime=realtime, loop=loop)
+
+
+class AudioRingBuffer:
+    """Single-writer, multi-reader byte ring addressed by absolute position.
+
+    The writer copies into the ring and then publishes the new write position.
+    Readers never take a lock to copy: they snapshot the published position,
+    copy, and re-check that the writer has not lapped them in the meantime
+    (seqlock style). The condition variable is only used to park readers that
+    are waiting for more data.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0 or capacity % SAMPLE_WIDTH:
+            raise ValueError("capacity must be a positive multiple of the sample width")
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._write_pos = 0
+        # Bumped *before* the writer starts copying; readers validate against
+        # it so a copy that overlaps an in-progress write is detected.
+        self._reserved_pos = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def write_position(self) -> int:
+        return self._write_pos
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        n = len(data)
+        if n == 0:
+            return
+        if n > self.capacity:
+            data = data[-self.capacity :]
+            self._write_pos += n - self.capacity
+            n = self.capacity
+        self._reserved_pos = self._write_pos + n
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start : start + first] = data[:first]
+        if first < n:
+            self._buf[: n - first] = data[first:]
+        self._write_pos += n
+        with self._cond:
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Mark end of stream and wake all waiting readers."""
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        self._closed = False
+
+    def oldest_position(self) -> int:
+        return max(0, self._write_pos - self.capacity)
+
+    def read_from(self, position: int, max_bytes: int) -> tuple[bytes, int, int]:
+        """Copy up to ``max_bytes`` starting at ``position``.
+
+        Returns ``(data, new_position, dropped)`` where ``dropped`` counts bytes
+        the reader lost because the writer overwrote them before they were read.
+        """
+        dropped = 0
+        while True:
+            end = self._write_pos
+            oldest = max(0, end - self.capacity)
+            if position < oldest:
+                dropped += oldest - position
+                position = oldest
+            n = min(max_bytes, end - position)
+            if n <= 0:
+                return b"", position, dropped
+            start = position % self.capacity
+            first = min(n, self.capacity - start)
+            data = bytes(self._buf[start : start + first])
+            if first < n:
+                data += bytes(self._buf[: n - first])
+            # If the writer lapped us mid-copy the bytes may be torn; retry.
+            if self._reserved_pos - position <= self.capacity:
+                return data, position + n, dropped
+
+    def wait_for(
+        self,
+        position: int,
+        n_bytes: int,
+        timeout: float | None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Block until ``n_bytes`` past ``position`` are available (or closed)."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed
+                or self._write_pos - position >= n_bytes
+                or (cancelled is not None and cancelled()),
+                timeout=timeout,
+            )
+
+    def wake_readers(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+
+class AudioReader:
+    """An independent cursor into an :class:`AudioCaptureService` ring."""
+
+    def __init__(self, ring: AudioRingBuffer, position: int, name: str = "reader"):
+        self.name = name
+        self._ring = ring
+        self._position = position
+        self._closed = False
+        self.dropped_bytes = 0
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def available(self) -> int:
+        return max(0, self._ring.write_position - self._position)
+
+    def read(self, n_bytes: int, timeout: float | None = None) -> bytes:
+        """Read exactly ``n_bytes`` unless the timeout expires or capture ends.
+
+        Returns fewer bytes (possibly ``b""``) on timeout, on end of stream, or
+        after :meth:`close`.
+        """
+        if self._closed:
+            return b""
+        self._ring.wait_for(
+            self._position, n_bytes, timeout, cancelled=lambda: self._closed
+        )
+        if self._closed:
+            return b""
+        data, self._position, dropped = self._ring.read_from(self._position, n_bytes)
+        if dropped:
+            self.dropped_bytes += dropped
+            logger.warning(f"Audio reader '{self.name}' overrun, dropped {dropped} bytes")
+        return data
+
+    def at_end(self) -> bool:
+        """True once capture has stopped and everything has been read."""
+        return self._ring.closed and self.available() == 0
+
+    def close(self) -> None:
+        self._closed = True
+        self._ring.wake_readers()
+
+
+class AudioCaptureService:
+    """One long-lived input stream shared by every audio consumer.
+
+    Args:
+        source: Where audio comes from. Defaults to the microphone.
+        sample_rate: Sample rate of the source.
+        chunk_size: Samples per source read.
+        buffer_seconds: How much history the ring retains; bounds the maximum
+            pre-roll and how far a slow reader may fall behind.
+    """
+
+    def __init__(
+        self,
+        source: AudioSource | None = None,
+        sample_rate: int = 16000,
+        chunk_size: int = 1280,
+        buffer_seconds: float = 10.0,
+    ):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.source: AudioSource = source or PyAudioSource(sample_rate=sample_rate)
+        capacity = int(buffer_seconds * sample_rate) * SAMPLE_WIDTH
+        self._ring = AudioRingBuffer(capacity)
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._readers: list[AudioReader] = []
+
+    def seconds_to_bytes(self, seconds: float) -> int:
+        return int(seconds * self.sample_rate) * SAMPLE_WIDTH
+
+    @property
+    def position(self) -> int:
+        """Absolute byte position of the most recently captured audio."""
+        return self._ring.write_position
+
+    def start(self) -> None:
+        """Open the source and start capturing. Safe to call repeatedly."""
+        with self._lock:
+            if self._running:
+                return
+            self.source.open()
+            self._ring.reopen()
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._capture_loop, name="audio-capture", daemon=True
+            )
+            self._thread.start()
+        logger.info("Audio capture started")
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            thread = self._thread
+            self._thread = None
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        try:
+            self.source.close()
+        except Exception as e:
+            logger.warning(f"Error closing audio source: {e}")
+        self._ring.close()
+        logger.info("Audio capture stopped")
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def _capture_loop(self) -> None:
+        while self._running:
+            try:
+                data = self.source.read(self.chunk_size)
+            except Exception as e:
+                if self._running:
+                    logger.error(f"Error reading audio source: {e}")
+                    time.sleep(0.1)
+                continue
+            if not data:
+                logger.info("Audio source exhausted")
+                break
+            self._ring.write(data)
+        self._running = False
+        self._ring.close()
+
+    def open_reader(
+        self, name: str = "reader", pre_roll: float = 0.0, position: int | None = None
+    ) -> AudioReader:
+        """Open a cursor ``pre_roll`` seconds behind ``position``.
+
+        ``position`` defaults to the live edge; callers that noticed an event
+        earlier (e.g. a wake word) pass the ring position they saw it at.
+        """
+        anchor = self.position if position is None else position
+        start = anchor - self.seconds_to_bytes(pre_roll)
+        start = max(start, self._ring.oldest_position())
+        reader = AudioReader(self._ring, start, name=name)
+        with self._lock:
+            self._readers = [r for r in self._readers if not r.closed]
+            self._readers.append(reader)
+        return reader
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            readers = [r for r in self._readers if not r.closed]
+        return {
+            "running": self._running,
+            "source": type(self.source).__name__,
+            "sample_rate": self.sample_rate,
+            "buffer_seconds": self._ring.capacity / (SAMPLE_WIDTH * self.sample_rate),
+            "captured_seconds": self.position / (SAMPLE_WIDTH * self.sample_rate),
+            "readers": {
+                r.name: {"lag_bytes": r.available(), "dropped_bytes": r.dropped_bytes}
+                for r in readers
+            },
+        }
@@ -30,7 +30,7 @@ import threading
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 try:
     import numpy as np
@@ -40,6 +40,9 @@ except ImportError:  # pragma: no cover - exercised via mocked-absent test
     np = None  # type: ignore[assignment]
     NUMPY_AVAILABLE = False
 
+if TYPE_CHECKING:
+    from .capture import AudioCaptureService
+
 
 @dataclass
 class VoiceProcessingConfig:
@@ -72,8 +75,15 @@ class VoiceResult:
 class EnhancedVoiceProcessor:
     """Enhanced voice processor with improved quality and intelligence."""
 
-    def __init__(self, config: VoiceProcessingConfig):
+    def __init__(
+        self,
+        config: VoiceProcessingConfig,
+        capture: AudioCaptureService | None = None,
+    ):
         self.config = config
+        # Optional shared capture service; when set the processing loop reads
+        # from a ring-buffer cursor instead of opening its own PyAudio stream.
+        self.capture = capture
         self.logger = logging.getLogger(__name__)
         self.is_listening = False
         self.audio_queue: queue.Queue[np.ndarray[Any, np.dtype[Any]]] = queue.Queue()
@@ -369,8 +379,46 @@ class EnhancedVoiceProcessor:
 
         self.logger.info("Enhanced voice processing stopped")
 
+    def _handle_chunk(self, audio_chunk: bytes) -> None:
+        """Process one chunk and fire callbacks for confident results."""
+        result = self._process_audio_chunk(audio_chunk)
+
+        if result and result.confidence >= self.config.confidence_threshold:
+            # Call transcription callback
+            if self.on_transcription:
+                self.on_transcription(result)
+
+            # Call wake word callback if detected
+            if result.wake_word_detected and self.on_wake_word:
+                self.on_wake_word(result.text)
+
+    def _capture_processing_loop(self):
+        """Processing loop fed from the shared capture service."""
+        assert self.capture is not None
+        self.capture.start()
+        reader = self.capture.open_reader("enhanced_processor")
+        chunk_bytes = self.config.chunk_size * 2
+        try:
+            while self.is_listening and not reader.at_end():
+                audio_chunk = reader.read(chunk_bytes, timeout=0.5)
+                if not audio_chunk:
+                    continue
+                try:
+                    self._handle_chunk(audio_chunk)
+                except Exception as e:
+                    self.logger.error(f"Audio processing error: {e}")
+        finally:
+            reader.close()
+
     def _audio_processing_loop(self):
         """Main audio processing loop."""
+        if self.capture is not None:
+            try:
+                self._capture_processing_loop()
+            except Exception as e:
+                self.logger.error(f"Audio processing loop error: {e}")
+            return
+
         try:
             import pyaudio
 
@@ -394,16 +442,7 @@ class EnhancedVoiceProcessor:
                     )
 
                     # Process the chunk
-                    result = self._process_audio_chunk(audio_chunk)
-
-                    if result and result.confidence >= self.config.confidence_threshold:
-                        # Call transcription callback
-                        if self.on_transcription:
-                            self.on_transcription(result)
-
-                        # Call wake word callback if detected
-                        if result.wake_word_detected and self.on_wake_word:
-                            self.on_wake_word(result.text)
+                    self._handle_chunk(audio_chunk)
 
                 except Exception as e:
                     self.logger.error(f"Audio processing error: {e}")
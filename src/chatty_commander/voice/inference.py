@@ -0,0 +1,395 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Shared local Whisper inference with batching and priorities.
+
+Every ``WhisperLocalBackend`` used to load its own model and call
+``model.transcribe`` on the caller's thread. With the voice pipeline, the web
+Voice Test page and ``VoiceSelfTester`` all active, that meant several copies
+of the model in memory, all competing for the CPU.
+
+:class:`TranscriptionService` owns one loaded model and a fixed pool of
+worker threads that take requests from a priority queue:
+
+* ``LIVE`` requests (a command someone just spoke) always run first. With two
+  or more workers, one of them only runs ``LIVE`` work, so a live command
+  never waits behind a long background job;
+* short utterances that are queued together at the same priority are decoded
+  as one batch (one ``whisper.decode`` call on a stacked mel tensor). Non-live
+  requests wait up to ``batch_window`` seconds for others to join;
+* a bounded queue: non-live requests beyond ``max_pending`` are refused with
+  :class:`TranscriptionOverloadError`. ``LIVE`` requests are always accepted.
+
+:func:`shared_whisper_service` returns the single service for each model
+size, loading the model on first use. A loaded openai-whisper model is not
+safe to run from two threads (each decode installs kv-cache hooks on the
+shared decoder), so :class:`WhisperEngine` serializes its calls and the shared
+services default to one worker; ``LIVE`` requests still go first through the
+queue.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from time import monotonic
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Whisper decodes fixed 30 s windows at 16 kHz; anything that fits one window
+# can share a batch.
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30.0
+
+
+class TranscriptionPriority(IntEnum):
+    """Scheduling class of a request; lower values run first."""
+
+    LIVE = 0  # voice pipeline: someone is waiting for their command
+    INTERACTIVE = 1  # web Voice Test uploads
+    BACKGROUND = 2  # self-tests, CLI and other batch work
+
+
+class TranscriptionOverloadError(RuntimeError):
+    """Raised when a non-live request finds the queue full."""
+
+    def __init__(self, message: str, pending: int) -> None:
+        super().__init__(message)
+        self.pending = pending
+
+
+class InferenceEngine(Protocol):
+    """What :class:`TranscriptionService` runs requests on."""
+
+    def transcribe(self, audio: Any) -> str: ...
+
+    def transcribe_batch(self, audios: Sequence[Any]) -> list[str]: ...
+
+
+class WhisperEngine:
+    """Runs float32 16 kHz audio through a loaded openai-whisper model.
+
+    Calls are serialized: concurrent decodes on one model chain each other's
+    kv-cache hooks and corrupt both results.
+    """
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: Any) -> str:
+        with self._lock:
+            result = self.model.transcribe(audio)
+        return str(result.get("text", "")).strip()
+
+    def transcribe_batch(self, audios: Sequence[Any]) -> list[str]:
+        """Decode several clips of at most one window in a single pass.
+
+        This is one greedy decode without ``transcribe``'s temperature
+        fallback, which is fine for the short commands that get batched.
+        """
+        import torch
+        import whisper
+
+        n_mels = getattr(getattr(self.model, "dims", None), "n_mels", 80)
+        mel = torch.stack(
+            [
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels)
+                for audio in audios
+            ]
+        ).to(self.model.device)
+        with self._lock:
+            results = whisper.decode(
+                self.model, mel, whisper.DecodingOptions(fp16=False)
+            )
+        return [r.text.strip() for r in results]
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    audio: Any = field(compare=False)
+    seconds: float = field(compare=False)
+    future: Future = field(compare=False)
+
+
+class TranscriptionService:
+    """Priority queue and worker pool in front of one inference engine."""
+
+    def __init__(
+        self,
+        engine: InferenceEngine,
+        *,
+        workers: int = 2,
+        max_batch: int = 8,
+        batch_window: float = 0.02,
+        batch_max_seconds: float = WHISPER_WINDOW_SECONDS,
+        max_pending: int = 32,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.engine = engine
+        self.workers = workers
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        self.batch_max_seconds = batch_max_seconds
+        self.max_pending = max_pending
+        self.sample_rate = sample_rate
+        # One worker is kept free for LIVE requests when there are several.
+        self._non_live_slots = workers - 1 if workers > 1 else 1
+
+        self._cond = threading.Condition()
+        self._heap: list[_Job] = []
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._running_non_live = 0
+        self._closed = False
+
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._batches = 0
+        self._batched_jobs = 0
+        self._largest_batch = 0
+
+    @property
+    def model(self) -> Any:
+        return getattr(self.engine, "model", None)
+
+    def submit(
+        self,
+        audio: Any,
+        priority: TranscriptionPriority = TranscriptionPriority.BACKGROUND,
+    ) -> Future[str]:
+        """Queue ``audio`` (float32 samples) and return a future for the text."""
+        future: Future[str] = Future()
+        job = _Job(
+            int(priority),
+            next(self._seq),
+            audio,
+            len(audio) / self.sample_rate,
+            future,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Transcription service is closed")
+            if priority != TranscriptionPriority.LIVE:
+                pending = sum(
+                    1 for j in self._heap if j.priority != TranscriptionPriority.LIVE
+                )
+                if pending >= self.max_pending:
+                    self._rejected += 1
+                    raise TranscriptionOverloadError(
+                        f"Transcription queue full ({pending} pending)", pending
+                    )
+            heapq.heappush(self._heap, job)
+            self._submitted += 1
+            self._start_workers()
+            self._cond.notify_all()
+        return future
+
+    def transcribe(
+        self,
+        audio: Any,
+        priority: TranscriptionPriority = TranscriptionPriority.BACKGROUND,
+        timeout: float | None = None,
+    ) -> str:
+        return self.submit(audio, priority).result(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "pending": len(self._heap),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "batches": self._batches,
+                "batched_jobs": self._batched_jobs,
+                "largest_batch": self._largest_batch,
+            }
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Stop accepting work; workers exit once the queue is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout)
+
+    # -- workers ---------------------------------------------------------
+
+    def _start_workers(self) -> None:
+        # Called with the lock held; threads start on first use.
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"whisper-worker-{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _runnable(self) -> bool:
+        if not self._heap:
+            return False
+        return (
+            self._heap[0].priority == TranscriptionPriority.LIVE
+            or self._running_non_live < self._non_live_slots
+        )
+
+    def _batchable(self, job: _Job, priority: int) -> bool:
+        return job.priority == priority and job.seconds <= self.batch_max_seconds
+
+    def _take_batch(self) -> list[_Job] | None:
+        with self._cond:
+            while not self._runnable():
+                if self._closed and not self._heap:
+                    return None
+                self._cond.wait()
+            head = heapq.heappop(self._heap)
+            live = head.priority == TranscriptionPriority.LIVE
+            if not live:
+                self._running_non_live += 1
+            if self.max_batch == 1 or not self._batchable(head, head.priority):
+                return [head]
+
+            if not live and self.batch_window > 0:
+                # Give concurrent submitters a moment to join, but stop as
+                # soon as higher-priority work shows up.
+                deadline = monotonic() + self.batch_window
+                while not self._closed:
+                    ready = sum(1 for j in self._heap if self._batchable(j, head.priority))
+                    remaining = deadline - monotonic()
+                    if ready >= self.max_batch - 1 or remaining <= 0:
+                        break
+                    if self._heap and self._heap[0].priority < head.priority:
+                        break
+                    self._cond.wait(remaining)
+
+            batch = [head]
+            rest = []
+            for job in sorted(self._heap):
+                if len(batch) < self.max_batch and self._batchable(job, head.priority):
+                    batch.append(job)
+                else:
+                    rest.append(job)
+            if len(batch) > 1:
+                heapq.heapify(rest)
+                self._heap = rest
+            return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self._run(batch)
+            finally:
+                with self._cond:
+                    if batch[0].priority != TranscriptionPriority.LIVE:
+                        self._running_non_live -= 1
+                    self._completed += len(batch)
+                    self._batches += 1
+                    if len(batch) > 1:
+                        self._batched_jobs += len(batch)
+                    self._largest_batch = max(self._largest_batch, len(batch))
+                    self._cond.notify_all()
+
+    def _run(self, batch: list[_Job]) -> None:
+        jobs = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not jobs:
+            return
+        try:
+            if len(jobs) == 1:
+                texts = [self.engine.transcribe(jobs[0].audio)]
+            else:
+                texts = list(
+                    self.engine.transcribe_batch([job.audio for job in jobs])
+                )
+            if len(texts) != len(jobs):
+                raise RuntimeError(
+                    f"transcribe_batch returned {len(texts)} results "
+                    f"for {len(jobs)} inputs"
+                )
+        except Exception as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        for job, text in zip(jobs, texts, strict=True):
+            job.future.set_result(text)
+
+
+_services: dict[tuple[str, Callable[[str], Any]], TranscriptionService] = {}
+_services_lock = threading.Lock()
+
+
+def shared_whisper_service(
+    model_size: str, loader: Callable[[str], Any], **service_kwargs: Any
+) -> TranscriptionService:
+    """Return the process-wide service for ``model_size``, loading it once.
+
+    ``loader`` is ``whisper.load_model``. Load errors propagate and nothing is
+    cached, so the next caller retries. ``workers`` defaults to 1: the engine
+    runs one call at a time, so a second worker would only wait on its lock.
+    """
+    service_kwargs.setdefault("workers", 1)
+    key = (model_size, loader)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            model = loader(model_size)
+            logger.info(f"Loaded Whisper model: {model_size}")
+            service = TranscriptionService(WhisperEngine(model), **service_kwargs)
+            _services[key] = service
+        return service
+
+
+def reset_shared_services() -> None:
+    """Close and forget every shared service (tests and shutdown)."""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.close()
+
+
+__all__ = [
+    "InferenceEngine",
+    "TranscriptionOverloadError",
+    "TranscriptionPriority",
+    "TranscriptionService",
+    "WhisperEngine",
+    "reset_shared_services",
+    "shared_whisper_service",
+]
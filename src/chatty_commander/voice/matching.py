@@ -36,13 +36,37 @@ does not match words like "replay"/"display"/"player", and an underscore-joined
 command name like "play_music" matches the spoken phrase "play music". Single
 word phrases require an exact token; multi-word phrases require the token
 sequence to appear contiguously.
+
+:class:`CommandMatcher` is a precompiled index over every command name and
+keyword alias: a token trie, so a transcript is matched in time proportional to
+its own length rather than to the number of configured commands, plus an
+edit-distance (and, for ranking only, phonetic) fallback for mis-transcribed
+words. :func:`get_matcher` caches the most recent index, keyed on the command
+names (in order) and the alias table, and rebuilds it when either changes.
 """
 
 from __future__ import annotations
 
 import re
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Canonical alias table; see get_keyword_map().
+_KEYWORD_MAP: dict[str, tuple[str, ...]] = {
+    "hello": ("hello", "hi", "hey", "greet"),
+    "lights": ("lights", "light", "lamp", "illumination"),
+    "music": ("music", "song", "play", "audio"),
+    "play_music": ("music", "song", "play", "audio"),
+    "weather": ("weather", "temperature", "forecast"),
+    "time": ("time", "clock", "hour"),
+    "timer": ("timer", "alarm", "remind"),
+}
+
 
 def get_keyword_map() -> dict[str, list[str]]:
     """Return the keyword (alias) mapping used for fuzzy command matching.
@@ -50,15 +74,12 @@ def get_keyword_map() -> dict[str, list[str]]:
     This is the canonical table. Keep additions here (and only here) so both
     pipelines stay in sync.
     """
-    return {
-        "hello": ["hello", "hi", "hey", "greet"],
-        "lights": ["lights", "light", "lamp", "illumination"],
-        "music": ["music", "song", "play", "audio"],
-        "play_music": ["music", "song", "play", "audio"],
-        "weather": ["weather", "temperature", "forecast"],
-        "time": ["time", "clock", "hour"],
-        "timer": ["timer", "alarm", "remind"],
-    }
+    return {command: list(keywords) for command, keywords in _KEYWORD_MAP.items()}
+
+
+@lru_cache(maxsize=4096)
+def _phrase_tokens(phrase: str) -> tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall(phrase.lower().strip()))
 
 
 def matches_phrase(phrase: str, tokens: list[str]) -> bool:
@@ -68,24 +89,316 @@ def matches_phrase(phrase: str, tokens: list[str]) -> bool:
     Single-word phrases require an exact token match; multi-word phrases
     require the token sequence to appear contiguously.
     """
-    phrase = phrase.lower().strip()
-    if not phrase:
-        return False
-    phrase_tokens = re.findall(r"[a-z0-9']+", phrase)
+    phrase_tokens = _phrase_tokens(phrase)
     if not phrase_tokens:
         return False
     if len(phrase_tokens) == 1:
         return phrase_tokens[0] in tokens
     n = len(phrase_tokens)
     for i in range(len(tokens) - n + 1):
-        if tokens[i : i + n] == phrase_tokens:
+        if tuple(tokens[i : i + n]) == phrase_tokens:
             return True
     return False
 
 
 def tokenize(text: str) -> list[str]:
     """Tokenize a transcript into lowercase word tokens."""
-    return re.findall(r"[a-z0-9']+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal-string-alignment distance (Levenshtein plus adjacent swaps)."""
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(word: str) -> str:
+    """American Soundex key of ``word`` (e.g. ``"lights" -> "L232"``)."""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+    key = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        code = _SOUNDEX_CODES.get(c, "")
+        if code and code != last:
+            key += code
+            if len(key) == 4:
+                break
+        if c not in "hw":
+            last = code
+    return key.ljust(4, "0")
+
+
+@dataclass(frozen=True)
+class MatchCandidate:
+    """A ranked match for a transcript.
+
+    ``kind`` is ``"name"`` (command name), ``"alias"`` (keyword table), or
+    either prefixed with ``"fuzzy_"`` / ``"phonetic_"`` when the hit needed a
+    corrected token.
+    """
+
+    command: str
+    score: float
+    kind: str
+    phrase: str
+
+
+class _TrieNode:
+    __slots__ = ("children", "hits")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # (command, kind, priority, phrase)
+        self.hits: list[tuple[str, str, int, str]] = []
+
+
+class CommandMatcher:
+    """Precompiled matcher over command names and keyword aliases.
+
+    Exact matching keeps the semantics of :func:`match_command`: a command
+    name hit beats an alias hit, and ties go to the earlier entry (command
+    order in ``model_actions`` for names, keyword table order for aliases).
+    When nothing matches exactly, words within ``max_edit_distance`` of a
+    known phrase word are corrected and matched again at a reduced score.
+    """
+
+    NAME_SCORE = 1.0
+    ALIAS_SCORE = 0.8
+    FUZZY_FACTOR = 0.75
+    PHONETIC_FACTOR = 0.5
+    _KIND_RANK = {"name": 0, "alias": 1}
+
+    def __init__(
+        self,
+        commands: Iterable[Any],
+        keyword_map: Mapping[str, Iterable[str]] | None = None,
+        max_edit_distance: int = 1,
+        min_fuzzy_length: int = 4,
+    ):
+        self.max_edit_distance = max_edit_distance
+        self.min_fuzzy_length = min_fuzzy_length
+        self._root = _TrieNode()
+        self._vocab: set[str] = set()
+        # deletion variant -> vocabulary words (symmetric-delete index)
+        self._deletes: dict[str, set[str]] = {}
+        self._phonetic: dict[str, set[str]] = {}
+        self.size = 0
+
+        names: list[str] = []
+        for priority, command in enumerate(commands):
+            name = str(command)
+            names.append(name)
+            self._add(_phrase_tokens(name), name, "name", priority, name)
+
+        present = set(names)
+        aliases = _KEYWORD_MAP if keyword_map is None else keyword_map
+        for priority, (command, keywords) in enumerate(aliases.items()):
+            if command in present:
+                for keyword in keywords:
+                    self._add(_phrase_tokens(keyword), command, "alias", priority, keyword)
+
+        for word in self._vocab:
+            if len(word) >= min_fuzzy_length:
+                for variant in self._variants(word):
+                    self._deletes.setdefault(variant, set()).add(word)
+                self._phonetic.setdefault(soundex(word), set()).add(word)
+
+    def _add(
+        self, tokens: tuple[str, ...], command: str, kind: str, priority: int, phrase: str
+    ) -> None:
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.children.setdefault(token, _TrieNode())
+            self._vocab.add(token)
+        node.hits.append((command, kind, priority, phrase))
+        self.size += 1
+
+    def _variants(self, word: str) -> set[str]:
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_edit_distance):
+            frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    def _scan(self, tokens: list[str]) -> list[tuple[str, str, int, str]]:
+        """Return every phrase hit in ``tokens`` as (command, kind, priority, phrase)."""
+        hits = []
+        children = self._root.children
+        for i in range(len(tokens)):
+            node = children.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                hits.extend(node.hits)
+                if j >= len(tokens):
+                    break
+                node = node.children.get(tokens[j])
+                j += 1
+        return hits
+
+    def _correct(self, token: str) -> str | None:
+        """Closest vocabulary word within the edit budget, if any."""
+        if token in self._vocab or len(token) < self.min_fuzzy_length:
+            return None
+        best: tuple[int, str] | None = None
+        for variant in self._variants(token):
+            for word in self._deletes.get(variant, ()):
+                distance = edit_distance(token, word)
+                if distance <= self.max_edit_distance and (
+                    best is None or (distance, word) < best
+                ):
+                    best = (distance, word)
+        return best[1] if best else None
+
+    def _phonetic_correct(self, token: str) -> str | None:
+        if token in self._vocab or len(token) < self.min_fuzzy_length:
+            return None
+        words = self._phonetic.get(soundex(token))
+        return min(words) if words else None
+
+    def _rank(
+        self, hits: list[tuple[str, str, int, str]], factor: float, prefix: str
+    ) -> dict[str, tuple[float, int, int, MatchCandidate]]:
+        ranked: dict[str, tuple[float, int, int, MatchCandidate]] = {}
+        for command, kind, priority, phrase in hits:
+            base = self.NAME_SCORE if kind == "name" else self.ALIAS_SCORE
+            score = round(base * factor, 4)
+            key = (-score, self._KIND_RANK[kind], priority)
+            current = ranked.get(command)
+            if current is None or key < current[:3]:
+                ranked[command] = (
+                    *key,
+                    MatchCandidate(command, score, prefix + kind, phrase),
+                )
+        return ranked
+
+    def _corrected_hits(
+        self, tokens: list[str], correct: Any
+    ) -> list[tuple[str, str, int, str]]:
+        corrected = [correct(t) or t for t in tokens]
+        if corrected == tokens:
+            return []
+        return self._scan(corrected)
+
+    def candidates(
+        self, text: str, limit: int | None = 5, phonetic: bool = True
+    ) -> list[MatchCandidate]:
+        """Return ranked candidates (best first) for ``text``.
+
+        Exact hits always outrank corrected ones; phonetic hits are only
+        considered here (they are too loose to act on automatically).
+        """
+        tokens = tokenize(text)
+        ranked = self._rank(self._scan(tokens), 1.0, "")
+        for command, entry in self._rank(
+            self._corrected_hits(tokens, self._correct), self.FUZZY_FACTOR, "fuzzy_"
+        ).items():
+            ranked.setdefault(command, entry)
+        if phonetic:
+            for command, entry in self._rank(
+                self._corrected_hits(tokens, self._phonetic_correct),
+                self.PHONETIC_FACTOR,
+                "phonetic_",
+            ).items():
+                ranked.setdefault(command, entry)
+        ordered = [entry[3] for entry in sorted(ranked.values(), key=lambda e: e[:3])]
+        return ordered if limit is None else ordered[:limit]
+
+    def _best(self, hits: list[tuple[str, str, int, str]]) -> str | None:
+        if not hits:
+            return None
+        return min(hits, key=lambda h: (self._KIND_RANK[h[1]], h[2]))[0]
+
+    def match_tokens(self, tokens: list[str], fuzzy: bool = True) -> str | None:
+        """Best command for already-tokenized text, or ``None``."""
+        best = self._best(self._scan(tokens))
+        if best is None and fuzzy:
+            best = self._best(self._corrected_hits(tokens, self._correct))
+        return best
+
+    def match(self, text: str, fuzzy: bool = True) -> str | None:
+        """Best command for ``text`` (exact first, then edit-distance)."""
+        return self.match_tokens(tokenize(text), fuzzy=fuzzy)
+
+    def match_kind(self, tokens: list[str], kind: str) -> str | None:
+        """Best exact hit of one kind (``"name"`` or ``"alias"``)."""
+        return self._best([h for h in self._scan(tokens) if h[1] == kind])
+
+
+_MatcherKey = tuple[tuple[str, ...], tuple[tuple[str, tuple[str, ...]], ...]]
+
+_matcher_lock = threading.Lock()
+_matcher_cache: tuple[_MatcherKey, CommandMatcher] | None = None
+
+
+def _matcher_key(
+    model_actions: Mapping[str, Any], keyword_map: Mapping[str, Iterable[str]]
+) -> _MatcherKey:
+    """Everything the index is built from: names in order, then aliases.
+
+    Action bodies are not part of it, so editing what a command does keeps
+    the cached index; adding, removing or renaming a command does not.
+    """
+    return (
+        tuple(str(command) for command in model_actions),
+        tuple((command, tuple(words)) for command, words in keyword_map.items()),
+    )
+
+
+def get_matcher(
+    model_actions: Mapping[str, Any],
+    keyword_map: Mapping[str, Iterable[str]] | None = None,
+) -> CommandMatcher:
+    """Return the compiled matcher for ``model_actions``, building it if needed.
+
+    ``keyword_map`` defaults to the canonical alias table. The cache compares
+    content rather than mapping identity, so in-place edits to
+    ``model_actions`` are picked up on the next lookup.
+    """
+    global _matcher_cache
+    aliases = _KEYWORD_MAP if keyword_map is None else keyword_map
+    key = _matcher_key(model_actions, aliases)
+    cached = _matcher_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    matcher = CommandMatcher(model_actions.keys(), keyword_map=aliases)
+    with _matcher_lock:
+        _matcher_cache = (key, matcher)
+    return matcher
+
+
+def invalidate_matcher_cache() -> None:
+    """Drop the cached index so the next lookup rebuilds it."""
+    global _matcher_cache
+    with _matcher_lock:
+        _matcher_cache = None
 
 
 def match_command(text: str, model_actions: dict[str, Any] | None) -> str | None:
@@ -98,23 +411,11 @@ def match_command(text: str, model_actions: dict[str, Any] | None) -> str | None
     2. Keyword alias match: the first command present in ``model_actions``
        whose keyword table entry has a whole-word/phrase hit.
 
+    If neither phase hits, a word one edit away from a known name/alias word
+    (e.g. a mis-transcribed "lihgts") is corrected and both phases run again.
+
     Returns the matched command name, or ``None``.
     """
     if not text or not isinstance(model_actions, dict) or not model_actions:
         return None
-
-    tokens = tokenize(text)
-
-    # Direct name match first (whole-word/phrase, not substring).
-    for command_name in model_actions:
-        if matches_phrase(str(command_name), tokens):
-            return str(command_name)
-
-    # Keyword-based aliases (only for commands present in model_actions).
-    for command_name, keywords in get_keyword_map().items():
-        if command_name in model_actions:
-            for keyword in keywords:
-                if matches_phrase(keyword, tokens):
-                    return command_name
-
-    return None
+    return get_matcher(model_actions).match(text)
@@ -0,0 +1,217 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Content-addressed cache of synthesized speech.
+
+The pipeline says the same handful of phrases (command confirmations, "Sorry,
+I didn't understand that") over and over. :class:`PhraseAudioCache` stores the
+rendered audio keyed by backend, voice, rate and text so repeat phrases play
+back without touching the synthesizer.
+
+Two tiers:
+
+- memory: a small LRU bounded by total bytes;
+- disk (opt-in): one file per phrase under ``cache_dir``, bounded by total
+  bytes with LRU eviction (recency is the file mtime, refreshed on every hit,
+  so it survives restarts).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+#: Suggested ``CHATTY_TTS_CACHE_DIR``; the disk tier is off unless it is set.
+DEFAULT_CACHE_DIR = "~/.chatty_commander/tts_cache"
+
+
+def phrase_key(params: dict[str, Any], text: str) -> str:
+    """Return the content address for ``text`` rendered with ``params``."""
+    payload = json.dumps({"params": params, "text": text}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PhraseAudioCache:
+    """Two-tier (memory + disk) LRU cache of rendered phrase audio.
+
+    Args:
+        cache_dir: Directory for the disk tier; ``None`` keeps the cache in
+            memory only. Created on first write.
+        max_disk_bytes: Upper bound on the total size of cached files.
+        max_memory_bytes: Upper bound on audio held in memory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike[str] | None = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        max_memory_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(os.path.expanduser(str(cache_dir))) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (path, size), oldest first
+        self._disk: OrderedDict[str, tuple[Path, int]] = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._scan_disk()
+
+    @classmethod
+    def from_env(cls) -> PhraseAudioCache:
+        """Build the default cache.
+
+        Memory-only unless ``CHATTY_TTS_CACHE_DIR`` names a directory for the
+        disk tier (e.g. :data:`DEFAULT_CACHE_DIR`), which is then capped at
+        ``CHATTY_TTS_CACHE_MB`` megabytes.
+        """
+        try:
+            max_mb = int(os.getenv("CHATTY_TTS_CACHE_MB", "64"))
+        except ValueError:
+            max_mb = 64
+        return cls(
+            cache_dir=os.getenv("CHATTY_TTS_CACHE_DIR") or None,
+            max_disk_bytes=max_mb * 1024 * 1024,
+        )
+
+    def _scan_disk(self) -> None:
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return
+        entries = []
+        for path in self.cache_dir.iterdir():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                entries.append((st.st_mtime, path.stem, path, st.st_size))
+        for _, key, path, size in sorted(entries):
+            self._disk[key] = (path, size)
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+            entry = self._disk.get(key)
+            if entry is not None:
+                self._disk.move_to_end(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        path = entry[0]
+        try:
+            audio = path.read_bytes()
+            os.utime(path)
+        except OSError as e:
+            logger.debug(f"Dropping unreadable phrase cache entry {path}: {e}")
+            with self._lock:
+                if self._disk.pop(key, None) is not None:
+                    self._disk_bytes -= entry[1]
+                self.misses += 1
+            return None
+        with self._lock:
+            self._remember(key, audio)
+            self.hits += 1
+        return audio
+
+    def put(self, key: str, audio: bytes, ext: str = "bin") -> None:
+        with self._lock:
+            self._remember(key, audio)
+        if self.cache_dir is None or len(audio) > self.max_disk_bytes:
+            return
+        path = self.cache_dir / f"{key}.{ext}"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write phrase cache entry {path}: {e}")
+            return
+        with self._lock:
+            old = self._disk.pop(key, None)
+            if old is not None:
+                self._disk_bytes -= old[1]
+            self._disk[key] = (path, len(audio))
+            self._disk_bytes += len(audio)
+            self._evict_disk()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        # Caller holds self._lock.
+        if len(audio) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self) -> None:
+        # Caller holds self._lock (or is __init__).
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            _, (path, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+            }
+
+
+__all__ = ["PhraseAudioCache", "phrase_key", "DEFAULT_CACHE_DIR"]
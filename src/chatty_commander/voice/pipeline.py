@@ -37,13 +37,33 @@ import threading
 from collections.abc import Callable
 from typing import Any
 
+from ..obs import tracing
+from ..obs.tracing import DEFAULT_TRACER, Trace, VoiceTracer
 from . import matching
+from .capture import AudioCaptureService
+from .inference import TranscriptionPriority
+from .streaming import PartialTranscript
 from .transcription import VoiceTranscriber
 from .tts import TextToSpeech
 from .wakeword import VOICE_DEPS_AVAILABLE, MockWakeWordDetector, WakeWordDetector
 
 logger = logging.getLogger(__name__)
 
+UNRECOGNIZED_PHRASE = "Sorry, I didn't understand that"
+
+
+def _failure_phrase(command_name: str) -> str:
+    return f"Failed to execute {command_name}"
+
+
+def confirmation_phrases(model_actions: dict[str, Any] | None) -> list[str]:
+    """Every fixed phrase the pipeline may speak for ``model_actions``."""
+    phrases = [UNRECOGNIZED_PHRASE]
+    for name in model_actions or {}:
+        phrases.append(name)
+        phrases.append(_failure_phrase(name))
+    return phrases
+
 
 class VoicePipeline:
     """Complete voice processing pipeline."""
@@ -58,11 +78,20 @@ class VoicePipeline:
         use_mock: bool = False,
         tts_backend: str = "pyttsx3",
         voice_only: bool = False,
+        streaming_transcription: bool = False,
+        capture: AudioCaptureService | None = None,
+        shared_capture: bool = True,
+        tracer: VoiceTracer | None = None,
         **kwargs,
     ):
         self.config_manager = config_manager
         self.command_executor = command_executor
         self.state_manager = state_manager
+        # One input stream shared by wake word detection and transcription.
+        # An explicitly supplied service (e.g. a synthetic source in tests) is
+        # left to the caller to stop; one created here is owned by the pipeline.
+        self.capture = capture
+        self._owns_capture = False
 
         # Use mock components if voice deps not available or explicitly requested
         if not VOICE_DEPS_AVAILABLE or use_mock:
@@ -70,11 +99,31 @@ class VoicePipeline:
             self.wake_detector: WakeWordDetector | MockWakeWordDetector = MockWakeWordDetector(wake_words=wake_words, **kwargs)
             transcription_backend = "mock"
         else:
-            self.wake_detector = WakeWordDetector(wake_words=wake_words, **kwargs)
-
-        self.transcriber = VoiceTranscriber(backend=transcription_backend, **kwargs)
+            if self.capture is None and shared_capture:
+                self.capture = AudioCaptureService(
+                    sample_rate=kwargs.get("sample_rate", 16000)
+                )
+                self._owns_capture = True
+            self.wake_detector = WakeWordDetector(
+                wake_words=wake_words, capture=self.capture, **kwargs
+            )
+
+        self.transcriber = VoiceTranscriber(
+            backend=transcription_backend,
+            streaming=streaming_transcription,
+            capture=self.capture,
+            priority=TranscriptionPriority.LIVE,
+            **kwargs,
+        )
         self.tts = TextToSpeech(backend=tts_backend)
         self.voice_only = voice_only
+        # Per-stage latency traces, one per utterance (see obs/tracing.py).
+        self.tracer = tracer or DEFAULT_TRACER
+        self._wake_trace: Trace | None = None
+        # Capture ring position at which the pending wake word fired; the
+        # recording's pre-roll is measured back from here, not from whenever
+        # the worker thread gets round to opening its reader.
+        self._wake_position: int | None = None
 
         # State
         self._listening = False
@@ -89,6 +138,7 @@ class VoicePipeline:
         self._callbacks: list[Callable[[str, str], None]] = (
             []
         )  # (command, transcription)
+        self._partial_callbacks: list[Callable[[PartialTranscript], None]] = []
 
         # Setup wake word detection
         self.wake_detector.add_callback(self._on_wake_word_detected)
@@ -108,6 +158,23 @@ class VoicePipeline:
         if callback in self._callbacks:
             self._callbacks.remove(callback)
 
+    def add_partial_callback(
+        self, callback: Callable[[PartialTranscript], None]
+    ) -> None:
+        """Add callback for in-progress transcription hypotheses.
+
+        Only fires when the pipeline was created with
+        ``streaming_transcription=True``.
+        """
+        self._partial_callbacks.append(callback)
+
+    def remove_partial_callback(
+        self, callback: Callable[[PartialTranscript], None]
+    ) -> None:
+        """Remove partial transcription callback."""
+        if callback in self._partial_callbacks:
+            self._partial_callbacks.remove(callback)
+
     def start(self) -> None:
         """Start the voice pipeline."""
         if self._listening:
@@ -118,6 +185,8 @@ class VoicePipeline:
             self.wake_detector.start_listening()
             self._listening = True
             logger.info("Voice pipeline started - listening for wake words")
+            if self.voice_only:
+                self.warm_tts_cache()
 
             # Update state if state manager available
             self._try_change_state("voice_listening")
@@ -126,12 +195,35 @@ class VoicePipeline:
             logger.error(f"Failed to start voice pipeline: {e}")
             raise
 
+    def warm_tts_cache(self, background: bool = True) -> threading.Thread | None:
+        """Pre-render confirmation phrases for every configured command.
+
+        Runs on a daemon thread by default so startup is not delayed; returns
+        the thread (or ``None`` when run inline or there is nothing to do).
+        """
+        if self.tts.phrase_cache is None:
+            return None
+        model_actions = getattr(self.config_manager, "model_actions", None)
+        phrases = confirmation_phrases(
+            model_actions if isinstance(model_actions, dict) else None
+        )
+        if not background:
+            self.tts.warmup(phrases)
+            return None
+        thread = threading.Thread(
+            target=self.tts.warmup, args=(phrases,), name="tts-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
     def stop(self) -> None:
         """Stop the voice pipeline."""
         self._listening = False
 
         try:
             self.wake_detector.stop_listening()
+            if self._owns_capture and self.capture is not None:
+                self.capture.stop()
             logger.info("Voice pipeline stopped")
 
             # Update state if state manager available
@@ -152,13 +244,36 @@ class VoicePipeline:
 
         logger.info(f"Wake word '{wake_word}' detected (confidence: {confidence:.3f})")
 
+        trace = self.tracer.start(
+            "wake_word", wake_word=wake_word, confidence=round(float(confidence), 3)
+        )
+        inference_ms = getattr(self.wake_detector, "last_inference_ms", None)
+        if isinstance(inference_ms, int | float):
+            trace.add_span("wake", inference_ms / 1000)
+
+        # Handed to the worker through the pipeline: the processing slot is
+        # exclusive, so at most one wake trace is pending at a time.
+        self._wake_trace = trace
+        self._wake_position = self._detection_position()
+
         # Start processing in background thread (tracked, not fully orphaned).
         thread = threading.Thread(
-            target=self._process_voice_command, args=(wake_word,), daemon=True
+            target=self._process_voice_command,
+            args=(wake_word,),
+            daemon=True,
         )
         self._processing_thread = thread
         thread.start()
 
+    def _detection_position(self) -> int | None:
+        """Ring position of the latest wake word, or the live edge without one."""
+        position = getattr(self.wake_detector, "detection_position", None)
+        if isinstance(position, int):
+            return position
+        if self.capture is not None:
+            return self.capture.position
+        return None
+
     def _safe_change_state(self, new_state: str) -> None:
         """Safely attempt a state change if a state_manager is present.
 
@@ -198,51 +313,88 @@ class VoicePipeline:
         if success:
             logger.info(f"Successfully executed command: {command_name}")
             self._notify_callbacks(command_name, transcription)
-            if self.voice_only and self.tts.is_available():
-                self.tts.speak(command_name)
+            self._speak_feedback(command_name)
         else:
             logger.warning(f"Failed to execute command: {command_name}")
-            if self.voice_only and self.tts.is_available():
-                self.tts.speak(f"Failed to execute {command_name}")
+            self._speak_feedback(_failure_phrase(command_name))
         return success
 
+    def _speak_feedback(self, phrase: str) -> None:
+        """Speak ``phrase`` in voice-only mode, timed as the ``tts`` stage."""
+        if self.voice_only and self.tts.is_available():
+            with tracing.span("tts"):
+                self.tts.speak(phrase)
+
     def _handle_unmatched_transcription(self, transcription: str) -> None:
         """Handle the no-match case (notify callbacks + optional TTS)."""
         logger.info(f"No matching command found for: '{transcription}'")
         self._notify_callbacks("", transcription)
-        if self.voice_only and self.tts.is_available():
-            self.tts.speak("Sorry, I didn't understand that")
+        self._speak_feedback(UNRECOGNIZED_PHRASE)
 
     def _process_voice_command(self, wake_word: str) -> None:
-        """Process voice command after wake word detection."""
+        """Process voice command after wake word detection.
+
+        Continues the latency trace opened at detection; one is started here
+        when called directly.
+        """
         self._processing = True
+        trace, self._wake_trace = self._wake_trace, None
+        trace = trace or self.tracer.start("wake_word", wake_word=wake_word)
+        start_position, self._wake_position = self._wake_position, None
+        status = "error"
 
         try:
-            self._safe_change_state("voice_recording")
+            with tracing.activate(trace):
+                status = self._run_traced_command(start_position)
+        except Exception as e:
+            logger.error(f"Error processing voice command: {e}")
+        finally:
+            trace.finish(status)
+            self._processing = False
+            self._safe_change_state("voice_listening")
 
-            logger.info("Recording voice command...")
-            transcription = self.transcriber.record_and_transcribe()
+    def _run_traced_command(self, start_position: int | None = None) -> str:
+        """Record, transcribe, match and act on one utterance.
 
-            if not transcription:
-                logger.warning("No transcription received")
-                return
+        Runs with the utterance's trace active; returns the trace status.
+        ``start_position`` anchors the recording's pre-roll on the capture ring.
+        """
+        self._safe_change_state("voice_recording")
 
-            logger.info(f"Transcribed: '{transcription}'")
+        logger.info("Recording voice command...")
+        transcription = self.transcriber.record_and_transcribe(
+            on_partial=self._on_partial_transcription, start_position=start_position
+        )
 
-            self._safe_change_state("voice_processing")
+        if not transcription:
+            logger.warning("No transcription received")
+            return "no_transcription"
 
-            command_name = self._match_command(transcription)
+        logger.info(f"Transcribed: '{transcription}'")
 
-            if command_name:
-                self._handle_matched_command(command_name, transcription)
-            else:
-                self._handle_unmatched_transcription(transcription)
+        self._safe_change_state("voice_processing")
 
-        except Exception as e:
-            logger.error(f"Error processing voice command: {e}")
-        finally:
-            self._processing = False
-            self._safe_change_state("voice_listening")
+        with tracing.span("matching"):
+            command_name = self._match_command(transcription)
+
+        if command_name:
+            if self._handle_matched_command(command_name, transcription):
+                return "ok"
+            return "failed"
+        self._handle_unmatched_transcription(transcription)
+        return "unmatched"
+
+    def _on_partial_transcription(self, partial: PartialTranscript) -> None:
+        """Forward streaming hypotheses to partial callbacks."""
+        logger.debug(
+            f"Partial transcription ({'final' if partial.is_final else partial.segment_index}): "
+            f"'{partial.text}'"
+        )
+        for callback in self._partial_callbacks.copy():
+            try:
+                callback(partial)
+            except Exception as e:
+                logger.error(f"Error in partial transcription callback: {e}")
 
     def _match_command(self, transcription: str) -> str | None:
         """Match transcription to available commands."""
@@ -256,19 +408,10 @@ class VoicePipeline:
                 logger.debug("No model actions available")
                 return None
 
-            transcription_lower = transcription.lower()
-
-            # Direct name match first (delegated to extracted pure helper)
-            match = self._find_direct_name_match(transcription_lower, model_actions)
-            if match:
-                return match
-
-            # Keyword-based matching (extracted helper to keep _match_command short)
-            match = self._match_by_keywords(transcription_lower, model_actions)
-            if match:
-                return match
-
-            return None
+            # Compiled index (cached until the commands or aliases change):
+            # direct name hits first, then keyword aliases, then a one-edit
+            # fuzzy retry.
+            return self._matcher(model_actions).match(transcription)
 
         except Exception as e:
             logger.error(f"Error matching command: {e}")
@@ -295,26 +438,26 @@ class VoicePipeline:
 
         Only considers keywords for commands that exist in current model_actions.
         Uses word-boundary matching so keywords match whole words only.
-        Delegates to the shared :mod:`chatty_commander.voice.matching` helpers.
+        Delegates to the shared compiled :mod:`chatty_commander.voice.matching`
+        index.
         """
         tokens = matching.tokenize(transcription_lower)
-        command_keywords = self._get_keyword_map()
-        for command_name, keywords in command_keywords.items():
-            if command_name in model_actions:
-                for keyword in keywords:
-                    if self._matches_phrase(keyword, tokens):
-                        return command_name
-        return None
+        return self._matcher(model_actions).match_kind(tokens, "alias")
 
     def _get_keyword_map(self) -> dict[str, list[str]]:
         """Return the keyword mapping used for fuzzy command matching.
 
         Delegates to the canonical table in
         :mod:`chatty_commander.voice.matching` so the real pipeline and the
-        dry-run voice-test pipeline share one source of truth.
+        dry-run voice-test pipeline share one source of truth. Subclasses may
+        override it; every match goes through :meth:`_matcher`, which uses it.
         """
         return matching.get_keyword_map()
 
+    def _matcher(self, model_actions: dict) -> matching.CommandMatcher:
+        """The compiled index for ``model_actions`` and :meth:`_get_keyword_map`."""
+        return matching.get_matcher(model_actions, self._get_keyword_map())
+
     def _find_direct_name_match(self, transcription_lower: str, model_actions: dict) -> str | None:
         """Direct name (whole-word/phrase) match extracted from _match_command.
 
@@ -325,10 +468,7 @@ class VoicePipeline:
         "replay". Delegates tokenization/matching to the shared module.
         """
         tokens = matching.tokenize(transcription_lower)
-        for command_name in model_actions.keys():
-            if self._matches_phrase(str(command_name), tokens):
-                return str(command_name)
-        return None
+        return self._matcher(model_actions).match_kind(tokens, "name")
 
     def _execute_command(self, command_name: str) -> bool:
         """Execute a matched command."""
@@ -336,12 +476,17 @@ class VoicePipeline:
             logger.debug("No command executor available")
             return False
 
-        try:
-            result = self.command_executor.execute_command(command_name)
-            return result is not False
-        except Exception as e:
-            logger.error(f"Error executing command '{command_name}': {e}")
-            return False
+        trace = tracing.current_trace()
+        success = False
+        with tracing.span("execution", command=command_name) as attrs:
+            try:
+                result = self.command_executor.execute_command(command_name)
+                success = result is not False
+            except Exception as e:
+                suffix = f" (trace {trace.trace_id})" if trace is not None else ""
+                logger.error(f"Error executing command '{command_name}': {e}{suffix}")
+            attrs["success"] = success
+        return success
 
     def _notify_callbacks(self, command_name: str, transcription: str) -> None:
         """Notify all registered callbacks."""
@@ -364,15 +509,24 @@ class VoicePipeline:
         Reuses the same matched/unmatched handlers as the voice wake path
         to avoid duplication of notify/TTS/execute logic.
         """
-        command_name = self._match_command(text)
-        if command_name:
-            success = self._handle_matched_command(command_name, text)
-            if success:
-                return command_name
-            # failure feedback (speak) already performed inside handler
-        else:
-            self._handle_unmatched_transcription(text)
-        return None
+        trace = self.tracer.start("text")
+        status = "error"
+        try:
+            with tracing.activate(trace):
+                with tracing.span("matching"):
+                    command_name = self._match_command(text)
+                if command_name:
+                    success = self._handle_matched_command(command_name, text)
+                    status = "ok" if success else "failed"
+                    if success:
+                        return command_name
+                    # failure feedback (speak) already performed inside handler
+                else:
+                    status = "unmatched"
+                    self._handle_unmatched_transcription(text)
+                return None
+        finally:
+            trace.finish(status)
 
     def _get_wake_detector_available(self) -> bool:
         """Small extracted helper from get_status (continuing voice/pipeline qa #1 complexity reduction)."""
@@ -0,0 +1,272 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Streaming, VAD-segmented transcription.
+
+The batch path (:meth:`VoiceTranscriber._record_audio` followed by a single
+backend call) cannot start transcribing until the recording has ended, so every
+command pays record time plus inference time back to back. This module splits
+the utterance at short pauses with a simple energy VAD and hands each finished
+segment to the :class:`TranscriptionBackend` on a worker thread while capture
+continues. Partial hypotheses are emitted as segments complete; the final
+transcript is ready shortly after the endpoint instead of a full inference
+later.
+
+Durations are derived from sample counts rather than wall-clock time, so file
+and synthetic sources segment exactly like a live microphone.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .transcription import TranscriptionBackend
+
+logger = logging.getLogger(__name__)
+
+# 16-bit mono PCM
+SAMPLE_WIDTH = 2
+
+
+@dataclass(frozen=True)
+class PartialTranscript:
+    """A transcription hypothesis emitted while the utterance is in progress.
+
+    ``text`` is the cumulative hypothesis (all completed segments joined);
+    ``segment_text`` is the text of the segment that just finished.
+    """
+
+    text: str
+    segment_text: str
+    segment_index: int
+    is_final: bool = False
+
+
+def chunk_rms(chunk: bytes) -> float:
+    """Return the RMS energy of a chunk of 16-bit little-endian PCM.
+
+    Uses numpy when available and falls back to :mod:`array` so headless
+    environments without the audio extras can still run the VAD.
+    """
+    usable = len(chunk) - (len(chunk) % SAMPLE_WIDTH)
+    if usable <= 0:
+        return 0.0
+    if np is not None:
+        samples = np.frombuffer(chunk[:usable], dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.dot(samples, samples) / len(samples)))
+    samples_arr = array("h")
+    samples_arr.frombytes(chunk[:usable])
+    if sys.byteorder == "big":
+        samples_arr.byteswap()
+    return math.sqrt(sum(s * s for s in samples_arr) / len(samples_arr))
+
+
+class StreamingTranscriber:
+    """Segment an audio stream with an energy VAD and transcribe incrementally.
+
+    Args:
+        backend: Backend used to transcribe each finished segment.
+        sample_rate: Sample rate of the incoming 16-bit mono PCM.
+        silence_threshold: RMS energy below which a chunk counts as silence
+            (same scale as :attr:`VoiceTranscriber.silence_threshold`).
+        segment_silence: Pause length (seconds) that closes a segment and
+            submits it for transcription while capture continues.
+        silence_timeout: Pause length (seconds) that ends the utterance.
+        record_timeout: Hard cap (seconds) on the utterance length.
+        pre_roll: Seconds of audio kept ahead of speech onset so the first
+            phoneme of a segment is not clipped.
+        min_segment: Segments with less voiced audio than this (seconds) are
+            merged into the next one rather than transcribed on their own.
+        on_partial: Optional callback receiving each :class:`PartialTranscript`.
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptionBackend,
+        sample_rate: int = 16000,
+        silence_threshold: float = 500.0,
+        segment_silence: float = 0.3,
+        silence_timeout: float = 1.0,
+        record_timeout: float = 5.0,
+        pre_roll: float = 0.2,
+        min_segment: float = 0.15,
+        on_partial: Callable[[PartialTranscript], None] | None = None,
+    ):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold
+        self.segment_silence = segment_silence
+        self.silence_timeout = silence_timeout
+        self.record_timeout = record_timeout
+        self.pre_roll = pre_roll
+        self.min_segment = min_segment
+        self.on_partial = on_partial
+
+        self._texts: list[str] = []
+        self._texts_lock = threading.Lock()
+
+    def _samples(self, seconds: float) -> int:
+        return int(round(seconds * self.sample_rate))
+
+    def transcribe_stream(self, chunks: Iterable[bytes]) -> str:
+        """Consume ``chunks`` until the endpoint and return the final transcript.
+
+        Completed segments are transcribed on a single worker thread (so the
+        backend sees them in order) while this thread keeps reading audio.
+        """
+        self._texts = []
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="streaming-transcribe"
+        )
+        futures: list[Future[None]] = []
+
+        # All durations are tracked in samples to avoid float drift.
+        segment_silence = self._samples(self.segment_silence)
+        silence_timeout = self._samples(self.silence_timeout)
+        record_timeout = self._samples(self.record_timeout)
+        pre_roll_max = self._samples(self.pre_roll)
+        min_segment = self._samples(self.min_segment)
+
+        segment: list[bytes] = []
+        voiced = 0
+        silence = 0
+        elapsed = 0
+        pre_roll: deque[bytes] = deque()
+        pre_roll_len = 0
+        in_speech = False
+        deadline = time.monotonic() + self.record_timeout
+
+        def submit() -> None:
+            nonlocal segment, voiced
+            index = len(futures)
+            audio = b"".join(segment)
+            futures.append(executor.submit(self._transcribe_segment, index, audio))
+            logger.debug(
+                f"Submitted segment {index} ({len(audio) // SAMPLE_WIDTH} samples) "
+                "for transcription"
+            )
+            segment = []
+            voiced = 0
+
+        try:
+            for chunk in chunks:
+                n = len(chunk) // SAMPLE_WIDTH
+                elapsed += n
+                is_speech = n > 0 and chunk_rms(chunk) >= self.silence_threshold
+
+                if is_speech:
+                    if not in_speech and not segment:
+                        # Speech onset: seed the segment with the pre-roll.
+                        segment.extend(pre_roll)
+                        pre_roll.clear()
+                        pre_roll_len = 0
+                    in_speech = True
+                    segment.append(chunk)
+                    voiced += n
+                    silence = 0
+                elif n > 0:
+                    silence += n
+                    if segment:
+                        segment.append(chunk)
+                    else:
+                        pre_roll.append(chunk)
+                        pre_roll_len += n
+                        while pre_roll and pre_roll_len > pre_roll_max:
+                            pre_roll_len -= len(pre_roll.popleft()) // SAMPLE_WIDTH
+                    if in_speech and silence >= segment_silence and voiced >= min_segment:
+                        submit()
+                        in_speech = False
+
+                if silence >= silence_timeout:
+                    logger.info("Silence detected, stopping recording")
+                    break
+                # Wall-clock guard as well as the sample-based one so a source
+                # yielding only empty buffers cannot spin forever.
+                if elapsed >= record_timeout or time.monotonic() >= deadline:
+                    logger.info("Recording timeout reached")
+                    break
+
+            if segment and voiced > 0:
+                submit()
+
+            for future in futures:
+                future.result()
+        finally:
+            executor.shutdown(wait=True)
+
+        final = self._joined()
+        if self.on_partial is not None:
+            self._emit(
+                PartialTranscript(
+                    text=final,
+                    segment_text="",
+                    segment_index=len(futures) - 1,
+                    is_final=True,
+                )
+            )
+        return final
+
+    def _transcribe_segment(self, index: int, audio: bytes) -> None:
+        try:
+            text = self.backend.transcribe(audio, self.sample_rate).strip()
+        except Exception as e:
+            logger.error(f"Segment {index} transcription failed: {e}")
+            text = ""
+        if not text:
+            return
+        with self._texts_lock:
+            self._texts.append(text)
+            cumulative = " ".join(self._texts)
+        if self.on_partial is not None:
+            self._emit(
+                PartialTranscript(
+                    text=cumulative, segment_text=text, segment_index=index
+                )
+            )
+
+    def _joined(self) -> str:
+        with self._texts_lock:
+            return " ".join(self._texts)
+
+    def _emit(self, partial: PartialTranscript) -> None:
+        assert self.on_partial is not None
+        try:
+            self.on_partial(partial)
+        except Exception as e:
+            logger.error(f"Error in partial transcription callback: {e}")
@@ -38,7 +38,8 @@ import tempfile
 import time
 import wave
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Callable, Generator, Iterable
+from typing import TYPE_CHECKING, Any
 
 try:
     import numpy as np
@@ -50,6 +51,23 @@ except ImportError:
     np = None  # type: ignore[assignment]
     AUDIO_DEPS_AVAILABLE = False
 
+from ..obs import tracing
+from .inference import (
+    TranscriptionOverloadError,
+    TranscriptionPriority,
+    TranscriptionService,
+    shared_whisper_service,
+)
+from .streaming import (
+    SAMPLE_WIDTH,
+    PartialTranscript,
+    StreamingTranscriber,
+    chunk_rms,
+)
+
+if TYPE_CHECKING:
+    from .capture import AudioCaptureService, AudioReader
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,19 +85,32 @@ class TranscriptionBackend(ABC):
 
 
 class WhisperLocalBackend(TranscriptionBackend):
-    """Local Whisper transcription using whisper library."""
+    """Local Whisper transcription using whisper library.
+
+    Backends with the same ``model_size`` share one loaded model and queue
+    their requests on its :class:`~.inference.TranscriptionService` at
+    ``priority``.
+    """
 
-    def __init__(self, model_size: str = "base"):
+    def __init__(
+        self,
+        model_size: str = "base",
+        priority: TranscriptionPriority = TranscriptionPriority.BACKGROUND,
+    ):
         self.model_size = model_size
+        self.priority = priority
         self._model = None
+        self._service: TranscriptionService | None = None
         self._initialize_model()
 
     def _initialize_model(self):
         try:
             import whisper
 
-            self._model = whisper.load_model(self.model_size)
-            logger.info(f"Loaded Whisper model: {self.model_size}")
+            self._service = shared_whisper_service(
+                self.model_size, whisper.load_model
+            )
+            self._model = self._service.model
         except ImportError:
             logger.warning(
                 "Whisper not available. Install with: pip install openai-whisper"
@@ -98,13 +129,19 @@ class WhisperLocalBackend(TranscriptionBackend):
                 np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
             )
 
-            # Transcribe
-            result = self._model.transcribe(audio_array)
-            text = result.get("text", "").strip()
+            service = getattr(self, "_service", None)
+            if service is not None:
+                text = service.transcribe(audio_array, self.priority)
+            else:
+                result = self._model.transcribe(audio_array)
+                text = result.get("text", "").strip()
 
             logger.debug(f"Whisper transcription: '{text}'")
             return text
 
+        except TranscriptionOverloadError:
+            # Let callers tell "busy, retry later" apart from "heard nothing".
+            raise
         except Exception as e:
             logger.error(f"Whisper transcription failed: {e}")
             return ""
@@ -212,6 +249,11 @@ class VoiceTranscriber:
         record_timeout: float = 5.0,
         silence_timeout: float = 1.0,
         silence_threshold: float = 500.0,
+        streaming: bool = False,
+        segment_silence: float = 0.3,
+        capture: AudioCaptureService | None = None,
+        pre_roll: float = 0.3,
+        priority: TranscriptionPriority = TranscriptionPriority.BACKGROUND,
         **backend_kwargs,
     ):
         if not AUDIO_DEPS_AVAILABLE:
@@ -227,6 +269,20 @@ class VoiceTranscriber:
         # may want a lower value, noisier ones a higher value. Exposed here so it
         # can be tuned via config rather than being hardcoded in the record loop.
         self.silence_threshold = silence_threshold
+        # When enabled, record_and_transcribe() splits the utterance at short
+        # pauses (``segment_silence`` seconds) and transcribes each segment
+        # while the user is still speaking; see voice/streaming.py.
+        self.streaming = streaming
+        self.segment_silence = segment_silence
+        # Optional shared capture service. When set, recording reads from a
+        # ring-buffer cursor opened ``pre_roll`` seconds before the wake-word
+        # detection (``start_position``) instead of opening a new PyAudio
+        # stream, so speech that began right after the wake word is not clipped.
+        self._capture = capture
+        self.pre_roll = pre_roll
+        # Queue priority on the shared local Whisper model; the voice
+        # pipeline passes LIVE so spoken commands run ahead of batch work.
+        self.priority = priority
 
         self._backend = self._create_backend(backend, **backend_kwargs)
         self._audio = None
@@ -235,6 +291,9 @@ class VoiceTranscriber:
     def _create_backend(self, backend: str, **kwargs) -> TranscriptionBackend:
         """Create transcription backend."""
         if backend == "whisper_local":
+            kwargs.setdefault(
+                "priority", getattr(self, "priority", TranscriptionPriority.BACKGROUND)
+            )
             return WhisperLocalBackend(**kwargs)
         elif backend == "whisper_api":
             return WhisperAPIBackend(**kwargs)
@@ -251,23 +310,81 @@ class VoiceTranscriber:
         """Transcribe raw audio data."""
         return self._backend.transcribe(audio_data, self.sample_rate)
 
-    def record_and_transcribe(self) -> str:
-        """Record audio from microphone and transcribe."""
-        if not AUDIO_DEPS_AVAILABLE:
+    def transcribe_stream(
+        self,
+        chunks: Iterable[bytes],
+        on_partial: Callable[[PartialTranscript], None] | None = None,
+    ) -> str:
+        """Transcribe an audio chunk stream incrementally, segment by segment.
+
+        ``chunks`` is any iterable of 16-bit mono PCM buffers at
+        :attr:`sample_rate` (a live microphone, a file, or synthetic audio).
+        Iteration stops at the VAD endpoint or ``record_timeout``.
+        """
+        streamer = StreamingTranscriber(
+            self._backend,
+            sample_rate=self.sample_rate,
+            silence_threshold=self.silence_threshold,
+            segment_silence=self.segment_silence,
+            silence_timeout=self.silence_timeout,
+            record_timeout=self.record_timeout,
+            on_partial=on_partial,
+        )
+        return streamer.transcribe_stream(chunks)
+
+    def record_and_transcribe(
+        self,
+        on_partial: Callable[[PartialTranscript], None] | None = None,
+        start_position: int | None = None,
+    ) -> str:
+        """Record audio from microphone and transcribe.
+
+        ``on_partial`` is only invoked in streaming mode. ``start_position`` is
+        the capture ring position at wake-word detection; the pre-roll is
+        measured back from it rather than from the live edge.
+        """
+        if not AUDIO_DEPS_AVAILABLE and self._capture is None:
             logger.warning("Audio recording not available, using mock transcription")
-            return self._backend.transcribe(b"", self.sample_rate)
+            with tracing.span("transcription", audio_bytes=0):
+                return self._backend.transcribe(b"", self.sample_rate)
 
         try:
-            audio_data = self._record_audio()
+            if self.streaming:
+                logger.info("Recording audio... (speak now)")
+                chunks = self._iter_microphone_chunks(start_position)
+                try:
+                    # Capture and decoding overlap when streaming, so they
+                    # are reported as one stage.
+                    with tracing.span("transcription", streaming=True):
+                        return self.transcribe_stream(chunks, on_partial=on_partial)
+                finally:
+                    # Release the device as soon as the endpoint is reached.
+                    chunks.close()
+            with tracing.span("capture") as capture_attrs:
+                audio_data = self._record_audio(start_position)
+                capture_attrs["audio_bytes"] = len(audio_data)
             if audio_data:
-                return self.transcribe_audio_data(audio_data)
+                with tracing.span("transcription", audio_bytes=len(audio_data)):
+                    return self.transcribe_audio_data(audio_data)
             return ""
         except Exception as e:
             logger.error(f"Recording and transcription failed: {e}")
             return ""
 
-    def _record_audio(self) -> bytes:
+    def _record_audio(self, start_position: int | None = None) -> bytes:
         """Record audio from microphone."""
+        if self._capture is not None:
+            reader = self._capture.open_reader(
+                "transcriber", pre_roll=self.pre_roll, position=start_position
+            )
+            try:
+                logger.info("Recording audio... (speak now)")
+                return self._collect_until_silence(
+                    lambda: self._read_capture_chunk(reader)
+                )
+            finally:
+                reader.close()
+
         if not AUDIO_DEPS_AVAILABLE:
             return b""
 
@@ -282,53 +399,115 @@ class VoiceTranscriber:
             )
 
             logger.info("Recording audio... (speak now)")
-            frames = []
-            start_time = time.time()
-            silence_start = None
+            return self._collect_until_silence(
+                lambda: self._stream.read(  # type: ignore[attr-defined]
+                    self.chunk_size, exception_on_overflow=False
+                )
+            )
 
-            while True:
-                try:
-                    data = self._stream.read(  # type: ignore[attr-defined]
-                        self.chunk_size, exception_on_overflow=False
-                    )
-                    frames.append(data)
-
-                    # Check for silence (simple volume-based detection).
-                    # PyAudio can return an empty buffer (b"") on overflow or
-                    # when the stream is closing; computing RMS on a zero-length
-                    # array would raise ZeroDivisionError. Skip the silence
-                    # computation for empty chunks but still fall through to the
-                    # timeout check so a stream that only ever yields empty
-                    # buffers cannot spin forever.
+        finally:
+            self._cleanup_audio()
+
+    def _read_capture_chunk(self, reader: AudioReader) -> bytes | None:
+        """Read one chunk from a capture cursor; ``None`` once capture has ended."""
+        if reader.at_end():
+            return None
+        chunk_seconds = self.chunk_size / self.sample_rate
+        return reader.read(self.chunk_size * SAMPLE_WIDTH, timeout=4 * chunk_seconds)
+
+    def _collect_until_silence(self, read_chunk: Callable[[], bytes | None]) -> bytes:
+        """Accumulate chunks until silence, timeout, or end of stream."""
+        frames = []
+        start_time = time.time()
+        silence_start = None
+
+        while True:
+            try:
+                data = read_chunk()
+                if data is None:
+                    logger.info("Audio stream ended")
+                    break
+                frames.append(data)
+
+                # Check for silence (simple volume-based detection).
+                # PyAudio can return an empty buffer (b"") on overflow or
+                # when the stream is closing; computing RMS on a zero-length
+                # array would raise ZeroDivisionError. Skip the silence
+                # computation for empty chunks but still fall through to the
+                # timeout check so a stream that only ever yields empty
+                # buffers cannot spin forever.
+                volume = None
+                if np is not None:
                     audio_array = np.frombuffer(data, dtype=np.int16).astype(np.float32)
                     if len(audio_array) > 0:
                         volume = np.sqrt(
                             np.dot(audio_array, audio_array) / len(audio_array)
                         )
+                elif data:
+                    volume = chunk_rms(data)
+
+                if volume is not None:
+                    if volume < self.silence_threshold:  # RMS silence threshold
+                        if silence_start is None:
+                            silence_start = time.time()
+                        elif time.time() - silence_start > self.silence_timeout:
+                            logger.info("Silence detected, stopping recording")
+                            # Trailing silence waited out before endpointing.
+                            tracing.add_span(
+                                "vad_endpoint", time.time() - silence_start
+                            )
+                            break
+                    else:
+                        silence_start = None
+
+                # Timeout check
+                if time.time() - start_time > self.record_timeout:
+                    logger.info("Recording timeout reached")
+                    break
 
-                        if volume < self.silence_threshold:  # RMS silence threshold
-                            if silence_start is None:
-                                silence_start = time.time()
-                            elif time.time() - silence_start > self.silence_timeout:
-                                logger.info("Silence detected, stopping recording")
-                                break
-                        else:
-                            silence_start = None
-
-                    # Timeout check
-                    if time.time() - start_time > self.record_timeout:
-                        logger.info("Recording timeout reached")
-                        break
+            except Exception as e:
+                logger.error(f"Error during recording: {e}")
+                break
+
+        # Convert frames to bytes
+        audio_data = b"".join(frames)
+        logger.info(f"Recorded {len(audio_data)} bytes of audio")
+        return audio_data
+
+    def _iter_microphone_chunks(
+        self, start_position: int | None = None
+    ) -> Generator[bytes, None, None]:
+        """Yield microphone chunks until the consumer stops iterating."""
+        if self._capture is not None:
+            reader = self._capture.open_reader(
+                "transcriber", pre_roll=self.pre_roll, position=start_position
+            )
+            try:
+                while True:
+                    chunk = self._read_capture_chunk(reader)
+                    if chunk is None:
+                        return
+                    yield chunk
+            finally:
+                reader.close()
 
+        try:
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(  # type: ignore[attr-defined]
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.sample_rate,
+                input=True,
+                frames_per_buffer=self.chunk_size,
+            )
+            while True:
+                try:
+                    yield self._stream.read(  # type: ignore[attr-defined]
+                        self.chunk_size, exception_on_overflow=False
+                    )
                 except Exception as e:
                     logger.error(f"Error during recording: {e}")
-                    break
-
-            # Convert frames to bytes
-            audio_data = b"".join(frames)
-            logger.info(f"Recorded {len(audio_data)} bytes of audio")
-            return audio_data
-
+                    return
         finally:
             self._cleanup_audio()
 
@@ -359,5 +538,7 @@ class VoiceTranscriber:
             "sample_rate": self.sample_rate,
             "channels": self.channels,
             "chunk_size": self.chunk_size,
+            "streaming": self.streaming,
+            "shared_capture": self._capture is not None,
         }
 
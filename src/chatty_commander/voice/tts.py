@@ -50,12 +50,18 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import queue
+import re
 import shutil
 import subprocess
 import tempfile
 import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import Any
+
+from .phrase_cache import PhraseAudioCache, phrase_key
 
 logger = logging.getLogger(__name__)
 
@@ -133,8 +139,143 @@ def synthesize_to_file(
     return target
 
 
+# Sentence/clause end: terminal punctuation (optionally followed by closing
+# quotes or brackets) and then whitespace, or a line break.
+_SENTENCE_END_RE = re.compile(r"[.!?;:]+[\"')\]]*\s+|\n+")
+_SOFT_BREAK_RE = re.compile(r"[,\u2014-]\s+")
+
+
+class SentenceChunker:
+    """Split a stream of text fragments into speakable sentences.
+
+    Streaming LLM output arrives a few characters at a time; feeding each
+    fragment here yields complete sentences as soon as their terminating
+    punctuation (and the following whitespace) has arrived, so TTS can start
+    on the first sentence while the rest is still being generated.
+
+    Args:
+        min_chars: Sentences shorter than this are held back and merged with
+            the next one, avoiding choppy playback of "Sure." / "OK." fragments.
+        max_chars: A run without sentence punctuation is cut at the last
+            comma/dash (or space) once it grows past this length.
+    """
+
+    def __init__(self, min_chars: int = 12, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, fragment: str) -> list[str]:
+        """Add ``fragment`` and return any sentences it completed."""
+        self._buffer += fragment
+        ready: list[str] = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            candidate = self._buffer[start : match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                ready.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self.max_chars:
+            cut = self._split_point(self._buffer[: self.max_chars])
+            ready.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+        return [r for r in ready if r]
+
+    def flush(self) -> str | None:
+        """Return whatever text remains at the end of the stream."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest or None
+
+    @staticmethod
+    def _split_point(text: str) -> int:
+        soft = [m.end() for m in _SOFT_BREAK_RE.finditer(text)]
+        if soft:
+            return soft[-1]
+        space = text.rfind(" ")
+        return space + 1 if space > 0 else len(text)
+
+
+def iter_sentences(
+    fragments: Iterable[str], min_chars: int = 12, max_chars: int = 240
+) -> Iterator[str]:
+    """Yield complete sentences from an iterable of text fragments."""
+    chunker = SentenceChunker(min_chars=min_chars, max_chars=max_chars)
+    for fragment in fragments:
+        yield from chunker.feed(fragment)
+    rest = chunker.flush()
+    if rest:
+        yield rest
+
+
+#: Audio players tried (in order) for best-effort playback of rendered files.
+_PLAYERS = ("ffplay", "afplay", "aplay", "mpg123", "mpv", "cvlc")
+
+
+def _find_player() -> tuple[str, str] | None:
+    for player in _PLAYERS:
+        exe = shutil.which(player)
+        if exe:
+            return player, exe
+    return None
+
+
+def _play_audio_file(path: str) -> bool:
+    """Play *path* with playsound or the first available player.
+
+    Returns ``False`` when no playback mechanism is available.
+    """
+    try:  # optional, lightweight dependency if present
+        import playsound  # type: ignore
+
+        playsound.playsound(path)
+        return True
+    except Exception:
+        pass
+
+    for player in _PLAYERS:
+        exe = shutil.which(player)
+        if not exe:
+            continue
+        args = [exe]
+        if player == "ffplay":
+            args += ["-nodisp", "-autoexit", "-loglevel", "quiet"]
+        elif player == "cvlc":
+            args += ["--play-and-exit", "--quiet"]
+        args.append(path)
+        try:
+            subprocess.run(args, check=False)
+            return True
+        except Exception as exc:  # pragma: no cover - environment specific
+            logger.debug("Playback via %s failed: %s", player, exc)
+    return False
+
+
+def _play_audio_bytes(audio: bytes, suffix: str) -> bool:
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(audio)
+        return _play_audio_file(tmp_path)
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:  # pragma: no cover - best effort cleanup
+            pass
+
+
 class TTSBackend(ABC):
-    """Abstract interface for text‑to‑speech backends."""
+    """Abstract interface for text‑to‑speech backends.
+
+    Backends that can render to an audio file without playing it implement
+    :meth:`synthesize` / :meth:`play_audio` and return ``True`` from
+    :meth:`supports_synthesis`; :class:`TextToSpeech` then caches rendered
+    phrases and replays them without re-synthesizing.
+    """
+
+    #: File extension of the audio returned by :meth:`synthesize`.
+    audio_format = "bin"
 
     @abstractmethod
     def speak(self, text: str) -> None:  # pragma: no cover - interface
@@ -145,12 +286,32 @@ class TTSBackend(ABC):
         """Return ``True`` if the backend can synthesize speech."""
         pass  # pragma: no cover - interface
 
+    def supports_synthesis(self) -> bool:
+        return False
+
+    def cache_params(self) -> dict[str, Any]:
+        """Settings that change the rendered audio (part of the cache key)."""
+        return {"backend": type(self).__name__}
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError(f"{type(self).__name__} cannot render audio")
+
+    def play_audio(self, audio: bytes) -> None:
+        raise NotImplementedError(f"{type(self).__name__} cannot play audio")
+
 
 class Pyttsx3Backend(TTSBackend):
-    """Backend powered by :mod:`pyttsx3`."""
+    """Backend powered by :mod:`pyttsx3`.
+
+    A pyttsx3 engine is not thread-safe (a second ``runAndWait`` while one is
+    running fails with "run loop already started"), so every engine call
+    holds ``_engine_lock``: phrase warmup and speech on different threads
+    take turns.
+    """
 
     def __init__(self) -> None:
         self._engine = None
+        self._engine_lock = threading.Lock()
         if pyttsx3 is not None:
             try:
                 self._engine = pyttsx3.init()
@@ -163,12 +324,50 @@ class Pyttsx3Backend(TTSBackend):
     def speak(self, text: str) -> None:  # pragma: no cover - requires audio stack
         if not self._engine:
             raise RuntimeError("pyttsx3 backend is not available")
-        self._engine.say(text)
-        self._engine.runAndWait()
+        with self._engine_lock:
+            self._engine.say(text)
+            self._engine.runAndWait()
 
     def is_available(self) -> bool:
         return self._engine is not None
 
+    audio_format = "wav"
+
+    def supports_synthesis(self) -> bool:
+        # Rendering to a file is only useful if something can play it back.
+        return self._engine is not None and _find_player() is not None
+
+    def cache_params(self) -> dict[str, Any]:
+        params: dict[str, Any] = {"backend": "pyttsx3"}
+        if self._engine is not None:
+            try:
+                with self._engine_lock:
+                    params["voice"] = self._engine.getProperty("voice")
+                    params["rate"] = self._engine.getProperty("rate")
+            except Exception:  # pragma: no cover - driver specific
+                pass
+        return params
+
+    def synthesize(self, text: str) -> bytes:
+        if not self._engine:
+            raise RuntimeError("pyttsx3 backend is not available")
+        fd, tmp_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._engine_lock:
+                self._engine.save_to_file(text, tmp_path)
+                self._engine.runAndWait()
+            return Path(tmp_path).read_bytes()
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def play_audio(self, audio: bytes) -> None:  # pragma: no cover - requires audio stack
+        if not _play_audio_bytes(audio, ".wav"):
+            raise RuntimeError("No audio player available for cached speech")
+
 
 class EdgeTTSBackend(TTSBackend):
     """Backend powered by Microsoft Edge neural voices via :mod:`edge_tts`.
@@ -181,8 +380,7 @@ class EdgeTTSBackend(TTSBackend):
     pulled in).
     """
 
-    #: Audio players tried (in order) for best-effort playback.
-    _PLAYERS = ("ffplay", "afplay", "aplay", "mpg123", "mpv", "cvlc")
+    audio_format = "mp3"
 
     def __init__(self, voice: str = DEFAULT_EDGE_VOICE) -> None:
         self.voice = voice
@@ -194,35 +392,44 @@ class EdgeTTSBackend(TTSBackend):
 
     def _play_file(self, path: str) -> None:
         """Best-effort playback of *path*; warn (don't raise) if unsupported."""
-        try:  # optional, lightweight dependency if present
-            import playsound  # type: ignore
+        if not _play_audio_file(path):
+            logger.warning(
+                "edge-tts synthesized audio but no audio player was found; "
+                "skipping playback (file: %s)",
+                path,
+            )
+
+    def supports_synthesis(self) -> bool:
+        return edge_tts is not None
 
-            playsound.playsound(path)
-            return
-        except Exception:
-            pass
+    def cache_params(self) -> dict[str, Any]:
+        return {"backend": "edge", "voice": self.voice}
 
-        for player in self._PLAYERS:
-            exe = shutil.which(player)
-            if not exe:
-                continue
-            args = [exe]
-            if player == "ffplay":
-                args += ["-nodisp", "-autoexit", "-loglevel", "quiet"]
-            elif player == "cvlc":
-                args += ["--play-and-exit", "--quiet"]
-            args.append(path)
+    def synthesize(self, text: str) -> bytes:
+        if edge_tts is None:
+            raise RuntimeError("edge-tts backend is not available")
+        fd, tmp_path = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        try:
+            _run_coro_sync(_edge_save(text, tmp_path, self.voice))
+            return Path(tmp_path).read_bytes()
+        finally:
             try:
-                subprocess.run(args, check=False)
-                return
-            except Exception as exc:  # pragma: no cover - environment specific
-                logger.debug("Playback via %s failed: %s", player, exc)
+                os.remove(tmp_path)
+            except OSError:  # pragma: no cover - best effort cleanup
+                pass
 
-        logger.warning(
-            "edge-tts synthesized audio but no audio player was found; "
-            "skipping playback (file: %s)",
-            path,
-        )
+    def play_audio(self, audio: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".mp3")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(audio)
+            self._play_file(tmp_path)
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:  # pragma: no cover - best effort cleanup
+                pass
 
     def speak(self, text: str) -> None:
         if edge_tts is None:
@@ -253,13 +460,30 @@ class MockTTSBackend(TTSBackend):
 
 
 class TextToSpeech:
-    """Facade that selects an appropriate :class:`TTSBackend`."""
+    """Facade that selects an appropriate :class:`TTSBackend`.
+
+    Short phrases are rendered once and replayed from a
+    :class:`~chatty_commander.voice.phrase_cache.PhraseAudioCache` when the
+    backend supports off-line rendering; longer text (e.g. LLM replies) is
+    spoken directly so it does not churn the cache.
+
+    Args:
+        backend: ``"pyttsx3"``, ``"edge"``/``"edge-tts"`` or ``"mock"``.
+        voice: Voice for the edge backend.
+        phrase_cache: Cache to use; defaults to
+            :meth:`PhraseAudioCache.from_env` for backends that can render.
+        cache_phrases: Set ``False`` to always synthesize.
+        max_cached_chars: Longest text that goes through the cache.
+    """
 
     def __init__(
         self,
         backend: str = "pyttsx3",
         *,
         voice: str = DEFAULT_EDGE_VOICE,
+        phrase_cache: PhraseAudioCache | None = None,
+        cache_phrases: bool = True,
+        max_cached_chars: int = 120,
         **kwargs,
     ) -> None:
         if backend == "pyttsx3":
@@ -277,24 +501,129 @@ class TextToSpeech:
         else:
             raise ValueError(f"Unknown TTS backend: {backend}")
 
+        self.max_cached_chars = max_cached_chars
+        self.phrase_cache: PhraseAudioCache | None = None
+        if cache_phrases and self.backend.supports_synthesis():
+            self.phrase_cache = phrase_cache or PhraseAudioCache.from_env()
+
+        # Streamed sentences are spoken by one long-lived thread (started on
+        # first use) rather than a new thread per stream.
+        self._speech: queue.Queue[str | threading.Event] = queue.Queue()
+        self._speaker: threading.Thread | None = None
+        self._speaker_lock = threading.Lock()
+
     def speak(self, text: str) -> None:
         try:
-            self.backend.speak(text)
+            audio = self._cached_audio(text)
+            if audio is not None:
+                self.backend.play_audio(audio)
+            else:
+                self.backend.speak(text)
         except Exception as exc:  # pragma: no cover - defensive
             logger.error("TTS failure: %s", exc)
 
+    def _cached_audio(self, text: str) -> bytes | None:
+        """Return rendered audio for ``text``, synthesizing on a miss.
+
+        ``None`` means the text is not cacheable and should be spoken directly.
+        """
+        if self.phrase_cache is None or not text or len(text) > self.max_cached_chars:
+            return None
+        key = phrase_key(self.backend.cache_params(), text)
+        audio = self.phrase_cache.get(key)
+        if audio is None:
+            audio = self.backend.synthesize(text)
+            self.phrase_cache.put(key, audio, self.backend.audio_format)
+        return audio
+
+    def warmup(self, phrases: Iterable[str]) -> int:
+        """Render ``phrases`` into the cache ahead of time.
+
+        Returns the number of phrases newly synthesized. Safe to run on a
+        background thread.
+        """
+        if self.phrase_cache is None:
+            return 0
+        params = self.backend.cache_params()
+        rendered = 0
+        for text in dict.fromkeys(phrases):
+            if not text or len(text) > self.max_cached_chars:
+                continue
+            key = phrase_key(params, text)
+            if key in self.phrase_cache:
+                continue
+            try:
+                self.phrase_cache.put(
+                    key, self.backend.synthesize(text), self.backend.audio_format
+                )
+                rendered += 1
+            except Exception as exc:
+                logger.warning("TTS warmup failed for %r: %s", text, exc)
+        logger.info("TTS warmup rendered %d phrase(s)", rendered)
+        return rendered
+
+    def speak_stream(self, fragments: Iterable[str]) -> str:
+        """Speak streamed text sentence by sentence; return the full text.
+
+        Sentences are handed to the speaker thread as they complete, so
+        playback of the first sentence overlaps generation of the rest. Blocks
+        until everything has been spoken. Errors raised by ``fragments``
+        propagate after the already-queued sentences have been spoken.
+        """
+        speech = self._speaker_queue()
+        done = threading.Event()
+        parts: list[str] = []
+
+        def _tee() -> Iterator[str]:
+            for fragment in fragments:
+                parts.append(fragment)
+                yield fragment
+
+        try:
+            for sentence in iter_sentences(_tee()):
+                speech.put(sentence)
+        finally:
+            speech.put(done)
+            done.wait()
+        return "".join(parts).strip()
+
+    def _speaker_queue(self) -> queue.Queue[str | threading.Event]:
+        """Return the speaker thread's queue, starting the thread if needed."""
+        with self._speaker_lock:
+            if self._speaker is None or not self._speaker.is_alive():
+                self._speaker = threading.Thread(
+                    target=self._speak_queued, name="tts-speaker", daemon=True
+                )
+                self._speaker.start()
+        return self._speech
+
+    def _speak_queued(self) -> None:
+        # An Event marks the end of one stream; it is set once every sentence
+        # queued before it has been spoken.
+        while True:
+            item = self._speech.get()
+            if isinstance(item, threading.Event):
+                item.set()
+            else:
+                self.speak(item)
+
     def is_available(self) -> bool:
         return self.backend.is_available()
 
-    def get_backend_info(self) -> dict[str, str | bool]:
-        return {
+    def get_backend_info(self) -> dict[str, Any]:
+        info: dict[str, Any] = {
             "backend_type": type(self.backend).__name__,
             "is_available": self.backend.is_available(),
         }
+        if self.phrase_cache is not None:
+            info["phrase_cache"] = self.phrase_cache.stats()
+        return info
 
 
 __all__ = [
     "TextToSpeech",
+    "SentenceChunker",
+    "iter_sentences",
     "MockTTSBackend",
     "Pyttsx3Backend",
     "EdgeTTSBackend",
@@ -32,6 +32,7 @@ import logging
 import threading
 import time
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 try:
     import numpy as np
@@ -45,6 +46,9 @@ except ImportError:
     np = None  # type: ignore[assignment]
     VOICE_DEPS_AVAILABLE = False
 
+if TYPE_CHECKING:
+    from .capture import AudioCaptureService, AudioReader
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +62,7 @@ class WakeWordDetector:
         chunk_size: int = 1280,  # 80ms at 16kHz
         sample_rate: int = 16000,
         channels: int = 1,
+        capture: AudioCaptureService | None = None,
     ):
         if not VOICE_DEPS_AVAILABLE:
             raise ImportError(
@@ -75,6 +80,10 @@ class WakeWordDetector:
         self.chunk_size = chunk_size
         self.sample_rate = sample_rate
         self.channels = channels
+        # Optional shared capture service; when set the detector reads from a
+        # ring-buffer cursor instead of owning a PyAudio stream.
+        self._capture = capture
+        self._reader: AudioReader | None = None
 
         self._model: openwakeword.Model | None = None
         self._audio: pyaudio.PyAudio | None = None
@@ -87,6 +96,11 @@ class WakeWordDetector:
         # when stop_listening() closes the stream after a join timeout).
         self._stream_lock = threading.Lock()
         self._callbacks: list[Callable[[str, float], None]] = []
+        # Model inference time for the most recent chunk, in milliseconds.
+        self.last_inference_ms: float | None = None
+        # Capture ring position at the end of the chunk that fired; None when
+        # reading a private PyAudio stream rather than the shared capture.
+        self.detection_position: int | None = None
 
         self._initialize_model()
 
@@ -128,14 +142,18 @@ class WakeWordDetector:
             return
 
         try:
-            self._audio = pyaudio.PyAudio()
-            self._stream = self._audio.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size,
-            )
+            if self._capture is not None:
+                self._capture.start()
+                self._reader = self._capture.open_reader("wakeword")
+            else:
+                self._audio = pyaudio.PyAudio()
+                self._stream = self._audio.open(
+                    format=pyaudio.paInt16,
+                    channels=self.channels,
+                    rate=self.sample_rate,
+                    input=True,
+                    frames_per_buffer=self.chunk_size,
+                )
 
             self._running = True
             self._thread = threading.Thread(target=self._listen_loop, daemon=True)
@@ -151,9 +169,16 @@ class WakeWordDetector:
         """Stop listening for wake words."""
         self._running = False
 
+        # Closing the reader wakes the listen loop if it is parked waiting for
+        # audio. The shared capture service itself is left to its owner.
+        if self._reader is not None:
+            self._reader.close()
+
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=1.0)
 
+        self._reader = None
+
         # Close the stream under the lock so we never tear it down while the
         # listen loop is mid-read on the same object. If the loop is still
         # blocked in a >1s read at join-timeout, it re-checks _running after
@@ -197,19 +222,32 @@ class WakeWordDetector:
                     if not self._running:
                         break
                     stream = self._stream
-                    if stream is None:
+                    reader = self._reader
+                    if stream is None and reader is None:
                         break
                     assert self._model is not None
 
                     # Read audio chunk (held under the lock so a concurrent
                     # stop_listening() blocks on teardown until the read returns)
-                    audio_data = stream.read(
-                        self.chunk_size, exception_on_overflow=False
-                    )
+                    if reader is not None:
+                        audio_data = reader.read(self.chunk_size * 2, timeout=0.5)
+                        if not audio_data:
+                            if reader.at_end():
+                                break
+                            continue
+                        chunk_end = reader.position
+                    else:
+                        chunk_end = None
+                        audio_data = stream.read(  # type: ignore[union-attr]
+                            self.chunk_size, exception_on_overflow=False
+                        )
                 audio_array = np.frombuffer(audio_data, dtype=np.int16)
 
-                # Get predictions from model
+                # Get predictions from model; the inference time of the chunk
+                # that fires is reported as the trace's "wake" stage.
+                t0 = time.perf_counter()
                 predictions = self._model.predict(audio_array)
+                self.last_inference_ms = (time.perf_counter() - t0) * 1000
 
                 # Check for wake word detections
                 for wake_word in self.wake_words:
@@ -219,6 +257,7 @@ class WakeWordDetector:
                             logger.info(
                                 f"Wake word detected: {wake_word} (confidence: {confidence:.3f})"
                             )
+                            self.detection_position = chunk_end
                             self._notify_callbacks(wake_word, confidence)
 
             except Exception as e:
@@ -258,6 +297,8 @@ class MockWakeWordDetector:
 
     def __init__(self, *args, **kwargs):
         self._callbacks: list[Callable[[str, float], None]] = []
+        self.last_inference_ms: float | None = 0.0
+        self.detection_position: int | None = None
         self._running = False
         logger.info("Using mock wake word detector (no audio hardware required)")
 
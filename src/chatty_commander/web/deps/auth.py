@@ -62,12 +62,25 @@ no_auth, revocation_store}``. The dependency reads config *live* from it on
 each call so test-time/config changes are reflected, and shares the *same*
 revocation store as the Phase-1 ``/auth/*`` router so a logout/refresh-revoke
 is honored by route guards too.
+
+Verified-claims cache
+---------------------
+Signature verification and claim parsing run once per token, not once per
+request: :func:`decode_token` remembers the verified claims in
+:data:`_CLAIMS_CACHE`, keyed by a hash of the secret and the token and never
+kept past the token's own ``exp``. Type and revocation checks still run on
+every call. The cache subscribes to the revocation store (see
+:meth:`AuthContext.configure`), so ``revoke()`` evicts a token's cached claims
+immediately.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
 import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
@@ -127,6 +140,119 @@ def roles_from(raw: Any) -> list[str]:
     return [r for r in raw if isinstance(r, str)] if isinstance(raw, list) else []
 
 
+# ── verified-claims cache ──────────────────────────────────────────────────
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU of successfully verified JWT claims.
+
+    Entries are keyed by ``sha256(secret, token)`` — so rotating the secret
+    orphans every entry — and expire at the earlier of the token's ``exp``
+    and ``ttl`` seconds after caching. Past ``exp`` the token falls through
+    to ``jwt.decode``, which applies the leeway and reports expiry as usual.
+    A ``jti`` index lets :meth:`invalidate_jti` evict a revoked token.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        *,
+        time_fn: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._time_fn = time_fn
+        self._lock = threading.Lock()
+        # key -> (claims, expires_at)
+        self._entries: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._by_jti: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str, secret: str) -> str:
+        return hashlib.sha256(f"{secret}\0{token}".encode()).hexdigest()
+
+    def get(self, token: str, secret: str) -> dict[str, Any] | None:
+        key = self._key(token, secret)
+        now = self._time_fn()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= now:
+                self._drop_locked(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def put(self, token: str, secret: str, claims: dict[str, Any]) -> None:
+        now = self._time_fn()
+        expires_at = now + self.ttl
+        exp = claims.get("exp")
+        if isinstance(exp, int | float):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        key = self._key(token, secret)
+        with self._lock:
+            self._drop_locked(key)
+            self._entries[key] = (dict(claims), expires_at)
+            jti = claims.get("jti")
+            if isinstance(jti, str):
+                self._by_jti.setdefault(jti, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop_locked(next(iter(self._entries)))
+
+    def invalidate_jti(self, jti: str) -> None:
+        """Evict every cached token carrying ``jti`` (a revocation listener)."""
+        with self._lock:
+            for key in list(self._by_jti.get(jti, ())):
+                self._drop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_jti.clear()
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        jti = entry[0].get("jti")
+        if isinstance(jti, str):
+            keys = self._by_jti.get(jti)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_jti[jti]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+#: Process-wide cache shared by the HTTP dependencies and the WebSocket gate.
+_CLAIMS_CACHE = VerifiedClaimsCache()
+
+
+def get_claims_cache() -> VerifiedClaimsCache:
+    """Return the process-wide :class:`VerifiedClaimsCache`."""
+    return _CLAIMS_CACHE
+
+
+def subscribe_claims_cache(store: RevocationStore) -> None:
+    """Have ``store`` push revocations into the claims cache, if it can."""
+    add_listener = getattr(store, "add_listener", None)
+    if callable(add_listener):
+        add_listener(_CLAIMS_CACHE.invalidate_jti)
+
+
 # ── shared Bearer-token decode/verify (used by routes/auth.py too) ─────────
 
 
@@ -153,23 +279,34 @@ def decode_token(
     signature/format/type problems so we don't leak *which* check failed
     (design §7). Expiry is reported distinctly because it is non-sensitive and
     lets the client know to refresh.
+
+    A token verified earlier is served from :data:`_CLAIMS_CACHE` without
+    re-running ``jwt.decode``; the type and revocation checks below still apply.
     """
-    try:
-        claims: dict[str, Any] = jwt.decode(
-            token,
-            secret,
-            algorithms=[JWT_ALGORITHM],
-            leeway=JWT_LEEWAY_SECONDS,
-        )
-    except jwt.ExpiredSignatureError as exc:
-        raise HTTPException(status_code=401, detail="Token expired") from exc
-    except jwt.InvalidTokenError as exc:
-        raise HTTPException(status_code=401, detail="Invalid token") from exc
+    cached = _CLAIMS_CACHE.get(token, secret)
+    if cached is not None:
+        claims: dict[str, Any] = cached
+    else:
+        try:
+            claims = jwt.decode(
+                token,
+                secret,
+                algorithms=[JWT_ALGORITHM],
+                leeway=JWT_LEEWAY_SECONDS,
+            )
+        except jwt.ExpiredSignatureError as exc:
+            raise HTTPException(status_code=401, detail="Token expired") from exc
+        except jwt.InvalidTokenError as exc:
+            raise HTTPException(status_code=401, detail="Invalid token") from exc
+        _CLAIMS_CACHE.put(token, secret, claims)
     if claims.get("type") != expected_type:
         # Same coarse message as a bad signature: don't reveal it was the type.
         raise HTTPException(status_code=401, detail="Invalid token")
     jti = claims.get("jti")
     if isinstance(jti, str) and store.is_revoked(jti):
+        # Revoked without a push reaching our cache, e.g. by another process
+        # sharing the sqlite store (picked up on its next bloom refresh).
+        _CLAIMS_CACHE.invalidate_jti(jti)
         raise HTTPException(status_code=401, detail="Invalid token")
     return claims
 
@@ -225,6 +362,7 @@ class AuthContext:
         self._config_manager: Any = None
         self._no_auth: bool = False
         self._store: RevocationStore = InMemoryRevocationStore()
+        subscribe_claims_cache(self._store)
 
     def configure(
         self,
@@ -238,6 +376,7 @@ class AuthContext:
             self._no_auth = bool(no_auth)
             if revocation_store is not None:
                 self._store = revocation_store
+                subscribe_claims_cache(revocation_store)
 
     def reset(self) -> None:
         """Restore defaults (used by tests to isolate the singleton)."""
@@ -245,6 +384,8 @@ class AuthContext:
             self._config_manager = None
             self._no_auth = False
             self._store = InMemoryRevocationStore()
+            subscribe_claims_cache(self._store)
+        _CLAIMS_CACHE.clear()
 
     @property
     def config_manager(self) -> Any:
@@ -62,11 +62,15 @@ def resolve_expected_api_key(config_manager) -> str | None:
     return key if isinstance(key, str) else None
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle API key authentication."""
+class ApiKeyAuth:
+    """The global X-API-Key gate for ``/api`` routes.
 
-    def __init__(self, app, config_manager, no_auth: bool = False):
-        super().__init__(app)
+    The per-request check behind :class:`AuthMiddleware`; the pure-ASGI
+    :class:`~chatty_commander.web.middleware.edge.EdgeMiddleware` runs the
+    same check as its auth stage.
+    """
+
+    def __init__(self, config_manager, no_auth: bool = False):
         self.config_manager = config_manager
         self.no_auth = no_auth
 
@@ -107,25 +111,29 @@ class AuthMiddleware(BaseHTTPMiddleware):
             return True
         return False
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and validate authentication if required (thin dispatch using helpers)."""
+    def check(self, request: Request) -> Response | None:
+        """Validate authentication if required.
+
+        Returns the 401 response to short-circuit with, or ``None`` to let the
+        request through (with the resolved scopes on ``request.state``).
+        """
         if self.no_auth:
-            return await call_next(request)  # type: ignore[no-any-return]
+            return None
 
         path = self._decode_and_normalize_path(request.url.path)
 
         if self._is_public_endpoint(path):
-            return await call_next(request)  # type: ignore[no-any-return]
+            return None
 
         if request.method == "OPTIONS":
-            return await call_next(request)  # type: ignore[no-any-return]
+            return None
 
         # The JWT auth router (/api/v1/auth/*) validates user credentials /
         # bearer tokens itself, so it must NOT require the global X-API-Key
         # (the unauthenticated login form has no key). It sits under /api/ so
         # this exemption has to come before the X-API-Key gate below.
         if path == "/api/v1/auth" or path.startswith("/api/v1/auth/"):
-            return await call_next(request)  # type: ignore[no-any-return]
+            return None
 
         if path == "/api" or path.startswith("/api/"):
             api_key = request.headers.get("X-API-Key")
@@ -171,4 +179,19 @@ class AuthMiddleware(BaseHTTPMiddleware):
             request.state.scopes = scopes
             logger.debug("Authentication successful (scopes=%s)", scopes)
 
+        return None
+
+
+class AuthMiddleware(ApiKeyAuth, BaseHTTPMiddleware):
+    """Middleware to handle API key authentication."""
+
+    def __init__(self, app, config_manager, no_auth: bool = False):
+        BaseHTTPMiddleware.__init__(self, app)
+        ApiKeyAuth.__init__(self, config_manager, no_auth)
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        """Process request and validate authentication if required."""
+        denied = self.check(request)
+        if denied is not None:
+            return denied
         return await call_next(request)  # type: ignore[no-any-return]
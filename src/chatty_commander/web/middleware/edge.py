@@ -0,0 +1,178 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Single-pass pure-ASGI middleware for the web-mode app.
+
+``WebModeServer`` used to stack six ``BaseHTTPMiddleware`` classes (request
+ID, request metrics, security headers, auth, rate limiting, response time).
+Each one runs the downstream app in a separate task and re-wraps the response
+body stream, so every request paid six task hops. :class:`EdgeMiddleware`
+does the same work as one plain ASGI callable:
+
+1. bind the request ID (logging contextvar and ``request.state.request_id``);
+2. per-client-IP rate limiting, short-circuiting with 429;
+3. API-key auth, short-circuiting with 401, then the verified key's own
+   rate budget (429 again);
+4. run the app, adding the shared response headers when
+   ``http.response.start`` passes through. Body messages are forwarded
+   untouched, so streaming responses keep streaming;
+5. record the response time and request metrics.
+
+Short-circuited responses get the same headers as normal ones. WebSocket and
+lifespan scopes pass straight through: the old chain never saw them either
+(WebSocket routes authenticate themselves, see ``web/routes/ws.py``).
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable, Mapping
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from chatty_commander import __version__ as APP_VERSION
+from chatty_commander.utils.logging_config import reset_request_id, set_request_id
+
+if TYPE_CHECKING:
+    from chatty_commander.obs.metrics import RequestMetrics
+    from chatty_commander.web.middleware.auth import ApiKeyAuth
+    from chatty_commander.web.routes.core import ResponseTimeWindow
+    from chatty_commander.web.web_mode import RateLimitGate
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Added to every HTTP response.
+SECURITY_HEADERS: dict[str, str] = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    # microphone=(self) so the Voice Test page can call getUserMedia;
+    # everything else stays denied.
+    "Permissions-Policy": "geolocation=(), microphone=(self), camera=()",
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "script-src 'self'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data:; "
+        "connect-src 'self' ws: wss:; "
+        "frame-ancestors 'none'"
+    ),
+}
+
+
+def _encode(headers: Iterable[tuple[str, str]]) -> list[tuple[bytes, bytes]]:
+    return [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+
+class EdgeMiddleware:
+    """Request ID, rate limiting, auth, headers, timing and metrics in one pass.
+
+    Every stage is optional so tests and benchmarks can build partial stacks;
+    ``WebModeServer`` wires all of them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        auth: ApiKeyAuth | None = None,
+        rate_limit: RateLimitGate | None = None,
+        metrics: RequestMetrics | None = None,
+        response_times: ResponseTimeWindow | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.app = app
+        self.auth = auth
+        self.rate_limit = rate_limit
+        self.metrics = metrics
+        self.response_times = response_times
+        static = dict(SECURITY_HEADERS if headers is None else headers)
+        static["X-API-Version"] = APP_VERSION
+        self._static_headers = _encode(static.items())
+        # Headers this middleware owns: stale copies set by the app are
+        # replaced, and the server banner is dropped.
+        self._owned = {name for name, _ in self._static_headers} | {
+            b"x-request-id",
+            b"server",
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        t0 = perf_counter()
+        request = Request(scope, receive)
+        request_id = request.headers.get(REQUEST_ID_HEADER) or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = set_request_id(request_id)
+
+        extra = [(b"x-request-id", request_id.encode("latin-1"))]
+        owned = self._owned
+        status = 0
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                raw = [
+                    (k, v)
+                    for k, v in message.get("headers", ())
+                    if k.lower() not in owned
+                ]
+                raw.extend(self._static_headers)
+                raw.extend(extra)
+                message["headers"] = raw
+            await send(message)
+
+        try:
+            denied = None
+            rate_headers: dict[str, str] = {}
+            if self.rate_limit is not None:
+                denied, rate_headers = self.rate_limit.check(request)
+            if denied is None and self.auth is not None:
+                denied = self.auth.check(request)
+            if denied is None and self.rate_limit is not None:
+                denied, key_headers = self.rate_limit.check_verified(request)
+                rate_headers = key_headers or rate_headers
+            if rate_headers:
+                # Set on the eventual response, replacing any app copy.
+                encoded = _encode(rate_headers.items())
+                extra.extend(encoded)
+                owned = owned | {name for name, _ in encoded}
+            if denied is not None:
+                await denied(scope, receive, send_with_headers)
+            else:
+                await self.app(scope, receive, send_with_headers)
+        finally:
+            reset_request_id(token)
+            elapsed = perf_counter() - t0
+            if self.response_times is not None:
+                self.response_times.record(elapsed * 1000.0)
+            if self.metrics is not None:
+                self.metrics.observe(scope, scope.get("method", "GET"), status, elapsed)
+
+
+__all__ = ["REQUEST_ID_HEADER", "SECURITY_HEADERS", "EdgeMiddleware"]
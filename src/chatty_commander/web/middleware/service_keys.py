@@ -51,17 +51,123 @@ iterate the full active candidate set (no short-circuit on first failure) so the
 work — and timing — does not depend on *which* key matched, mirroring the
 constant-time intent already used for the legacy key compare. The first active
 key whose hash verifies wins and its configured scopes are returned.
+
+Key IDs
+-------
+bcrypt is deliberately slow, so checking every key costs ~N hashes per
+request. Keys minted by :func:`mint_service_key` carry a non-secret ID prefix
+(``<key_id>.<secret>``) that is also stored in the spec as ``key_id``; a
+presented key whose prefix names a configured ``key_id`` is checked against
+that one hash only. Keys without an ID keep the full-scan behaviour above
+(restricted to specs that have no ``key_id``).
+
+Verified-key cache
+------------------
+A successful verification is remembered for a short TTL, keyed by an HMAC of
+the presented key under a per-process random secret (the plaintext is never
+stored). A cache hit is only honoured while the named key is still active with
+the same ``key_hash``, so rotating or deactivating a key in config takes
+effect on the next request; :func:`invalidate_service_key_cache` drops entries
+explicitly. Failed verifications are not cached.
 """
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 import bcrypt
 
 logger = logging.getLogger(__name__)
 
+#: Separator between the non-secret key ID and the secret part of a key.
+KEY_ID_SEPARATOR = "."
+
+
+class VerifiedKeyCache:
+    """Bounded TTL cache of successfully verified service keys.
+
+    Entries map ``HMAC(process_secret, presented_key)`` to the matched key's
+    name and the ``key_hash`` it verified against.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._entries: OrderedDict[bytes, tuple[str, str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, provided: str) -> bytes:
+        return hmac.new(self._secret, provided.encode("utf-8"), hashlib.sha256).digest()
+
+    def get(self, digest: bytes) -> tuple[str, str] | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return entry[0], entry[1]
+
+    def put(self, digest: bytes, name: str, key_hash: str) -> None:
+        with self._lock:
+            self._entries[digest] = (name, key_hash, time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name: str | None = None) -> int:
+        """Drop entries for ``name`` (all entries when ``None``)."""
+        with self._lock:
+            if name is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            stale = [d for d, entry in self._entries.items() if entry[0] == name]
+            for d in stale:
+                del self._entries[d]
+            return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_VERIFIED_CACHE = VerifiedKeyCache()
+
+
+def invalidate_service_key_cache(name: str | None = None) -> int:
+    """Forget cached verifications for key ``name`` (or all keys).
+
+    Call after rotating or revoking a key outside of config (config edits are
+    detected automatically). Returns the number of entries dropped.
+    """
+    return _VERIFIED_CACHE.invalidate(name)
+
+
+def mint_service_key(key_id: str | None = None) -> tuple[str, str, str]:
+    """Create a new service key with an ID prefix.
+
+    Returns ``(plaintext, key_id, key_hash)``; store ``key_id`` and
+    ``key_hash`` in the key's spec and hand ``plaintext`` to the client.
+    """
+    key_id = key_id or f"ck_{secrets.token_hex(6)}"
+    if KEY_ID_SEPARATOR in key_id:
+        raise ValueError(f"key_id must not contain {KEY_ID_SEPARATOR!r}")
+    plaintext = f"{key_id}{KEY_ID_SEPARATOR}{secrets.token_urlsafe(32)}"
+    key_hash = bcrypt.hashpw(plaintext.encode("utf-8"), bcrypt.gensalt()).decode()
+    return plaintext, key_id, key_hash
+
 
 def _as_dict(value: Any) -> dict[str, Any]:
     return value if isinstance(value, dict) else {}
@@ -125,16 +231,53 @@ def resolve_service_key_scopes(
     if not registry:
         return None
 
+    cache = _VERIFIED_CACHE
+    digest = cache.digest(provided_key)
+    cached = cache.get(digest)
+    if cached is not None:
+        name, key_hash = cached
+        spec = registry.get(name)
+        if (
+            isinstance(spec, dict)
+            and spec.get("active") is True
+            and spec.get("key_hash") == key_hash
+        ):
+            return _scopes_from(spec.get("scopes"))
+        # Rotated, revoked or removed since it was cached.
+        cache.invalidate(name)
+
+    matched_name: str | None = None
     matched_scopes: list[str] | None = None
     # Iterate every active candidate (no early break) so timing does not reveal
     # which named key matched.
-    for name, spec in registry.items():
-        if not isinstance(spec, dict):
-            continue
-        if spec.get("active") is not True:
-            continue
+    for name, spec in _candidates(registry, provided_key):
         if _verify_key_hash(provided_key, spec.get("key_hash")):
             if matched_scopes is None:
                 logger.debug("Service key matched: %s", name)
+                matched_name = name
                 matched_scopes = _scopes_from(spec.get("scopes"))
+    if matched_name is not None:
+        cache.put(digest, matched_name, registry[matched_name]["key_hash"])
     return matched_scopes
+
+
+def _candidates(
+    registry: dict[str, Any], provided_key: str
+) -> list[tuple[str, dict[str, Any]]]:
+    """Active specs that could match ``provided_key``.
+
+    A presented ``<key_id>.<secret>`` whose ID names a configured ``key_id``
+    selects that spec alone; anything else is checked against every active
+    spec without a ``key_id``.
+    """
+    active = [
+        (name, spec)
+        for name, spec in registry.items()
+        if isinstance(spec, dict) and spec.get("active") is True
+    ]
+    key_id, sep, _ = provided_key.partition(KEY_ID_SEPARATOR)
+    if sep:
+        by_id = [(n, s) for n, s in active if s.get("key_id") == key_id]
+        if by_id:
+            return by_id
+    return [(n, s) for n, s in active if not s.get("key_id")]
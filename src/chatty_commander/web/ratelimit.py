@@ -0,0 +1,412 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Shared in-memory rate limiting (GCRA) for middleware and routes.
+
+One :class:`RateLimiter` replaces the per-IP timestamp lists the web-mode
+middleware used to rebuild on every request and the command endpoint's
+globally locked token bucket. It implements the Generic Cell Rate Algorithm:
+each ``(policy, key)`` pair stores a single float, the *theoretical arrival
+time* (TAT), so a check is O(1) regardless of the limit or of how many
+clients are tracked. GCRA admits exactly what a token bucket of
+``policy.burst`` tokens refilled at ``limit / window`` per second would.
+
+Scaling and memory:
+
+- keys are spread over independently locked shards, so concurrent requests
+  for different clients rarely contend;
+- a key whose TAT has passed is *idle* (its bucket is full) and can be
+  forgotten without changing any future decision. Every check drops a couple
+  of idle keys from the front of its shard (shards are kept in
+  least-recently-used order), and a background daemon sweeps all live limiters
+  periodically, so memory tracks *active* clients only;
+- each limiter also holds at most ``max_keys`` keys. A flood of distinct
+  clients between sweeps pushes out the least recently seen keys, so memory
+  stays bounded even under address spoofing.
+
+Policies are plain :class:`RatePolicy` values. Callers pick which one applies —
+the web-mode middleware resolves per-route and per-principal overrides via
+:class:`PolicySet` — and :meth:`RateLimitDecision.headers` renders the
+standard ``RateLimit-*`` response headers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+#: Seconds between background idle-key sweeps.
+DEFAULT_EVICTION_INTERVAL = 30.0
+
+#: Hard cap on ``(policy, key)`` pairs tracked by one limiter.
+DEFAULT_MAX_KEYS = 131_072
+
+# Float slack so budgets like 30/min (2.0s spacing) admit exactly ``burst``.
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """``limit`` requests per ``window`` seconds, bursting up to ``burst``.
+
+    ``burst`` defaults to ``limit``: a caller may spend a whole window's
+    budget at once, then is paced at ``window / limit`` seconds per request.
+    """
+
+    name: str
+    limit: float
+    window: float = 60.0
+    burst: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.limit <= 0 or self.window <= 0:
+            raise ValueError("rate limit and window must be positive")
+        if self.burst is not None and self.burst < 1:
+            raise ValueError("burst must be at least 1")
+
+    @classmethod
+    def per_minute(
+        cls, name: str, requests_per_minute: float, burst: float | None = None
+    ) -> RatePolicy:
+        return cls(name=name, limit=requests_per_minute, window=60.0, burst=burst)
+
+    @property
+    def interval(self) -> float:
+        """Seconds of budget one request consumes."""
+        return self.window / self.limit
+
+    @property
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(1.0, self.limit)
+
+    @property
+    def header_value(self) -> str:
+        """``RateLimit-Policy`` value, e.g. ``600;w=60``."""
+        return f"{math.floor(self.limit)};w={math.ceil(self.window)}"
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of one :meth:`RateLimiter.hit`."""
+
+    allowed: bool
+    policy: RatePolicy
+    remaining: int
+    #: Seconds until the caller's budget is fully restored.
+    reset_after: float
+    #: Seconds until a request would be admitted (0.0 when allowed).
+    retry_after: float = 0.0
+
+    def headers(self) -> dict[str, str]:
+        """Standard ``RateLimit-*`` headers (plus ``Retry-After`` on denial)."""
+        headers = {
+            "RateLimit-Limit": str(math.floor(self.policy.capacity)),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+            "RateLimit-Policy": self.policy.header_value,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class _Shard:
+    __slots__ = ("lock", "tats")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # (policy name, key) -> theoretical arrival time; least recent first.
+        self.tats: OrderedDict[tuple[str, str], float] = OrderedDict()
+
+
+class RateLimiter:
+    """Sharded GCRA limiter keyed by ``(policy, key)``.
+
+    Args:
+        shards: Number of independently locked partitions.
+        time_fn: Monotonic clock (injectable for tests).
+        background_eviction: Register with the process-wide idle sweeper.
+        max_keys: Upper bound on tracked ``(policy, key)`` pairs, split
+            evenly across shards. Past it the least recently seen keys are
+            forgotten, which resets their budget.
+    """
+
+    def __init__(
+        self,
+        *,
+        shards: int = 16,
+        time_fn: Callable[[], float] = time.monotonic,
+        background_eviction: bool = True,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ) -> None:
+        if max_keys <= 0:
+            raise ValueError("max_keys must be positive")
+        self._time_fn = time_fn
+        count = max(1, min(int(shards), max_keys))
+        self._shards = [_Shard() for _ in range(count)]
+        self._shard_cap = max_keys // count
+        if background_eviction:
+            _EVICTOR.register(self)
+
+    def _shard(self, key: tuple[str, str]) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def hit(self, policy: RatePolicy, key: str) -> RateLimitDecision:
+        """Charge one request for ``key`` against ``policy``."""
+        now = self._time_fn()
+        interval = policy.interval
+        horizon = policy.capacity * interval
+        slot = (policy.name, key)
+        shard = self._shard(slot)
+        with shard.lock:
+            tats = shard.tats
+            tat = max(tats.get(slot, now), now)
+            new_tat = tat + interval
+            if new_tat - now > horizon + _EPSILON:
+                return RateLimitDecision(
+                    allowed=False,
+                    policy=policy,
+                    remaining=0,
+                    reset_after=tat - now,
+                    retry_after=new_tat - now - horizon,
+                )
+            tats[slot] = new_tat
+            tats.move_to_end(slot)
+            self._evict_front_locked(shard, now, limit=2)
+            while len(tats) > self._shard_cap:
+                tats.popitem(last=False)
+        remaining = int((horizon - (new_tat - now)) / interval + _EPSILON)
+        return RateLimitDecision(
+            allowed=True,
+            policy=policy,
+            remaining=max(0, remaining),
+            reset_after=new_tat - now,
+        )
+
+    def refund(self, policy: RatePolicy, key: str) -> None:
+        """Give back one request previously charged by :meth:`hit`."""
+        now = self._time_fn()
+        slot = (policy.name, key)
+        shard = self._shard(slot)
+        with shard.lock:
+            tat = shard.tats.get(slot)
+            if tat is None:
+                return
+            tat -= policy.interval
+            if tat <= now:
+                del shard.tats[slot]
+            else:
+                shard.tats[slot] = tat
+
+    @staticmethod
+    def _evict_front_locked(shard: _Shard, now: float, limit: int | None) -> int:
+        """Drop idle keys from the least-recently-used end of ``shard``."""
+        tats = shard.tats
+        evicted = 0
+        while tats and (limit is None or evicted < limit):
+            slot, tat = next(iter(tats.items()))
+            if tat > now:
+                break
+            del tats[slot]
+            evicted += 1
+        return evicted
+
+    def evict_idle(self) -> int:
+        """Forget every key whose budget is full again; returns the count."""
+        now = self._time_fn()
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                evicted += self._evict_front_locked(shard, now, limit=None)
+                # Recency order only approximates TAT order across keys; catch
+                # the stragglers so a sweep leaves no idle key behind.
+                idle = [slot for slot, tat in shard.tats.items() if tat <= now]
+                for slot in idle:
+                    del shard.tats[slot]
+                evicted += len(idle)
+        return evicted
+
+    def reset(self, key: str | None = None) -> None:
+        """Forget ``key`` under every policy, or everything when ``None``."""
+        for shard in self._shards:
+            with shard.lock:
+                if key is None:
+                    shard.tats.clear()
+                else:
+                    for slot in [s for s in shard.tats if s[1] == key]:
+                        del shard.tats[slot]
+
+    def __len__(self) -> int:
+        return sum(len(shard.tats) for shard in self._shards)
+
+
+class _IdleEvictor:
+    """One daemon thread sweeping every registered limiter."""
+
+    def __init__(self, interval: float = DEFAULT_EVICTION_INTERVAL) -> None:
+        self.interval = interval
+        self._limiters: weakref.WeakSet[RateLimiter] = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def register(self, limiter: RateLimiter) -> None:
+        with self._lock:
+            self._limiters.add(limiter)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="ratelimit-evictor", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                limiters = list(self._limiters)
+            for limiter in limiters:
+                try:
+                    limiter.evict_idle()
+                except Exception:  # noqa: BLE001 - keep the sweeper alive
+                    logger.debug("Rate limiter sweep failed", exc_info=True)
+
+
+_EVICTOR = _IdleEvictor()
+
+
+def principal_key(api_key: str | None, client_ip: str) -> str:
+    """Identify the caller for rate limiting.
+
+    API-key callers are keyed by the key's public id (the part before the
+    first ``.`` of a minted service key) or otherwise a short digest, so raw
+    secrets never sit in limiter state. Everyone else is keyed by client IP.
+    """
+    if api_key:
+        key_id, sep, _ = api_key.partition(".")
+        if sep and key_id:
+            return f"key:{key_id}"
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    return f"ip:{client_ip}"
+
+
+@dataclass
+class PolicySet:
+    """Which policies apply to a request.
+
+    - the caller's base budget is ``principals[principal]`` when configured,
+      else ``default``;
+    - routes matching a ``routes`` path prefix are *additionally* charged
+      against that route's policy (longest prefix wins).
+    """
+
+    default: RatePolicy | None
+    routes: dict[str, RatePolicy] = field(default_factory=dict)
+    principals: dict[str, RatePolicy] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._prefixes = sorted(self.routes, key=len, reverse=True)
+
+    @classmethod
+    def from_config(
+        cls,
+        requests_per_minute: float | None,
+        routes: Mapping[str, Any] | None = None,
+        principals: Mapping[str, Any] | None = None,
+    ) -> PolicySet:
+        """Build from ``{prefix: rpm}`` / ``{principal: rpm}`` mappings.
+
+        Non-positive or unparseable entries are skipped with a warning.
+        """
+        default = (
+            RatePolicy.per_minute("global", requests_per_minute)
+            if requests_per_minute
+            else None
+        )
+        return cls(
+            default=default,
+            routes=_policies("route", routes),
+            principals=_policies("principal", principals),
+        )
+
+    def resolve(self, path: str, principal: str) -> list[RatePolicy]:
+        policies = []
+        base = self.principals.get(principal, self.default)
+        if base is not None:
+            policies.append(base)
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                policies.append(self.routes[prefix])
+                break
+        return policies
+
+
+def _policies(kind: str, raw: Mapping[str, Any] | None) -> dict[str, RatePolicy]:
+    policies: dict[str, RatePolicy] = {}
+    if not isinstance(raw, Mapping):
+        return policies
+    for name, rpm in raw.items():
+        try:
+            policies[name] = RatePolicy.per_minute(f"{kind}:{name}", float(rpm))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid {kind} rate limit {name!r}: {rpm!r}")
+    return policies
+
+
+def check_all(
+    limiter: RateLimiter, policies: list[RatePolicy], key: str
+) -> RateLimitDecision | None:
+    """Charge ``key`` against each policy; return the binding decision.
+
+    The first denial wins and refunds the policies already charged, so a
+    rejected request costs nothing; otherwise the decision with the fewest
+    remaining requests is returned (so headers describe the tightest budget).
+    ``None`` when no policy applies.
+    """
+    binding: RateLimitDecision | None = None
+    for index, policy in enumerate(policies):
+        decision = limiter.hit(policy, key)
+        if not decision.allowed:
+            for charged in policies[:index]:
+                limiter.refund(charged, key)
+            return decision
+        if binding is None or decision.remaining < binding.remaining:
+            binding = decision
+    return binding
+
+
+__all__ = [
+    "PolicySet",
+    "RateLimitDecision",
+    "RateLimiter",
+    "RatePolicy",
+    "check_all",
+    "principal_key",
+]
@@ -37,11 +37,22 @@ implementations:
 
 Both satisfy the same :class:`RevocationStore` protocol, so the store can be
 swapped in :mod:`chatty_commander.web.server` without touching the verify paths.
+
+Almost every lookup is for a token that was never revoked, so the sqlite store
+keeps a :class:`BloomFilter` of revoked jtis in memory and only queries the
+table when the filter says "maybe". The filter is rebuilt from the table every
+``bloom_refresh`` seconds, so a revocation written by another process sharing
+the database is honored within that window. Both stores also accept revocation
+listeners (:meth:`~InMemoryRevocationStore.add_listener`), which is how the
+verified-claims cache in ``web/deps/auth.py`` evicts a token the moment it is
+revoked.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import math
 import sqlite3
 import threading
 import time
@@ -74,12 +85,60 @@ class RevocationStore(Protocol):
         ...
 
 
+RevocationListener = Callable[[str], None]
+
+
+def _notify(listeners: list[RevocationListener], jti: str) -> None:
+    for listener in listeners:
+        try:
+            listener(jti)
+        except Exception:  # noqa: BLE001 - a listener must not break revoke()
+            logger.warning("Revocation listener failed", exc_info=True)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no deletes, no false negatives).
+
+    Sized for ``capacity`` items at roughly ``error_rate`` false positives.
+    Indexes come from one blake2b digest split into two 64-bit halves
+    (Kirsch-Mitzenmacher double hashing). :meth:`might_contain` takes no lock:
+    bits are only ever set, so a racing reader sees either the old or the new
+    state of each byte.
+    """
+
+    def __init__(self, capacity: int = 10_000, error_rate: float = 0.01) -> None:
+        self.capacity = max(1, int(capacity))
+        bits = -self.capacity * math.log(error_rate) / (math.log(2) ** 2)
+        self._num_bits = max(64, int(math.ceil(bits)))
+        self._num_hashes = max(1, round(self._num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self.count = 0
+
+    def _indexes(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self._num_bits for i in range(self._num_hashes)]
+
+    def add(self, item: str) -> None:
+        for idx in self._indexes(item):
+            self._bits[idx >> 3] |= 1 << (idx & 7)
+        self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[idx >> 3] & (1 << (idx & 7)) for idx in self._indexes(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.might_contain(item)
+
+
 class InMemoryRevocationStore:
     """Process-local jti denylist with lazy pruning by ``exp``.
 
     Backed by a ``{jti: exp}`` dict guarded by a lock. Entries past their
-    ``exp`` are dropped lazily on access (same self-pruning pattern as
-    ``TokenBucketRateLimiter._prune_locked``), so the table never grows beyond
+    ``exp`` are dropped lazily on access (same self-pruning idea as the rate
+    limiter's idle-key eviction), so the table never grows beyond
     the set of *currently-valid* revoked tokens.
 
     Adequate for a single-process local-first server: tokens naturally expire,
@@ -91,6 +150,13 @@ class InMemoryRevocationStore:
         self._time_fn = time_fn
         self._lock = threading.Lock()
         self._revoked: dict[str, int] = {}
+        self._listeners: list[RevocationListener] = []
+
+    def add_listener(self, listener: RevocationListener) -> None:
+        """Call ``listener(jti)`` after every :meth:`revoke`."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
 
     def revoke(self, jti: str, exp: int) -> None:
         if not jti:
@@ -99,6 +165,8 @@ class InMemoryRevocationStore:
         with self._lock:
             self._revoked[jti] = int(exp)
             self._prune_locked(now)
+            listeners = list(self._listeners)
+        _notify(listeners, jti)
 
     def is_revoked(self, jti: str) -> bool:
         if not jti:
@@ -148,6 +216,20 @@ class SqliteRevocationStore:
     hot auth path is not serialized behind a write lock + fsync; an expired row
     reads as not-revoked without being deleted.
 
+    Negative lookups skip sqlite entirely: every revoked jti is added to an
+    in-memory :class:`BloomFilter` (seeded from the table at startup), and
+    :meth:`is_revoked` only takes the lock and queries when the filter reports
+    a possible match. The filter is rebuilt from the live rows by
+    :meth:`prune` and whenever it outgrows its capacity, so pruned jtis stop
+    costing false positives.
+
+    Other processes may write to the same database file, and their revocations
+    never reach this process's filter directly. The filter is therefore treated
+    as stale after ``bloom_refresh`` seconds: the next :meth:`is_revoked`
+    rebuilds it from the table before answering, which bounds how long a
+    cross-process revocation can go unnoticed. ``bloom_refresh=0`` rebuilds on
+    every lookup.
+
     Thread safety: a single connection opened with ``check_same_thread=False``
     is guarded by a lock, so the store is safe to share across the request
     threads that consult it. Pass ``path=":memory:"`` for an ephemeral in-memory
@@ -164,10 +246,18 @@ class SqliteRevocationStore:
         path: str = DEFAULT_SQLITE_PATH,
         *,
         time_fn: Callable[[], float] = time.time,
+        bloom_capacity: int = 10_000,
+        bloom_refresh: float = 5.0,
     ) -> None:
         self._time_fn = time_fn
         self._lock = threading.Lock()
         self._closed = False
+        self._listeners: list[RevocationListener] = []
+        self._bloom_capacity = max(1, int(bloom_capacity))
+        self._bloom = BloomFilter(self._bloom_capacity)
+        self._bloom_refresh = max(0.0, float(bloom_refresh))
+        self._bloom_built_at = 0.0
+        self.bloom_skips = 0
         if path == ":memory:":
             # ``:memory:`` databases are per-connection and vanish on close, so a
             # fresh store (e.g. a new app instance) can't see prior revocations —
@@ -193,12 +283,22 @@ class SqliteRevocationStore:
                 "(jti TEXT PRIMARY KEY, exp INTEGER NOT NULL)"
             )
             self._conn.commit()
+            self._rebuild_bloom_locked(int(self._time_fn()))
+
+    def add_listener(self, listener: RevocationListener) -> None:
+        """Call ``listener(jti)`` after every :meth:`revoke`."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
 
     def revoke(self, jti: str, exp: int) -> None:
         if not jti:
             return
         now = int(self._time_fn())
         with self._lock:
+            # Into the filter first: a concurrent is_revoked must never get a
+            # definite "no" for a jti whose row is being written.
+            self._bloom.add(jti)
             self._conn.execute(
                 "INSERT INTO revoked_tokens (jti, exp) VALUES (?, ?) "
                 "ON CONFLICT(jti) DO UPDATE SET exp=excluded.exp",
@@ -206,6 +306,10 @@ class SqliteRevocationStore:
             )
             self._prune_locked(now)
             self._conn.commit()
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild_bloom_locked(now)
+            listeners = list(self._listeners)
+        _notify(listeners, jti)
 
     def is_revoked(self, jti: str) -> bool:
         # Pure read: SELECT only, never writes. Returns True iff the jti exists
@@ -214,6 +318,15 @@ class SqliteRevocationStore:
         # path is not serialized behind a write lock + fsync.
         if not jti:
             return False
+        if self._bloom_stale():
+            # Pick up rows other processes wrote since the last rebuild. Re-check
+            # under the lock so a burst of requests rebuilds once, not once each.
+            with self._lock:
+                if self._bloom_stale():
+                    self._rebuild_bloom_locked(int(self._time_fn()))
+        if not self._bloom.might_contain(jti):
+            self.bloom_skips += 1
+            return False
         now = int(self._time_fn())
         with self._lock:
             row = self._conn.execute(
@@ -222,12 +335,28 @@ class SqliteRevocationStore:
             ).fetchone()
             return row is not None
 
+    def _bloom_stale(self) -> bool:
+        return self._time_fn() - self._bloom_built_at >= self._bloom_refresh
+
     def prune(self) -> None:
         """Drop rows whose token has already expired (write path)."""
         now = int(self._time_fn())
         with self._lock:
             self._prune_locked(now)
             self._conn.commit()
+            self._rebuild_bloom_locked(now)
+
+    def _rebuild_bloom_locked(self, now: int) -> None:
+        """Rebuild the filter from live rows (caller holds the lock)."""
+        rows = self._conn.execute(
+            "SELECT jti FROM revoked_tokens WHERE exp > ?", (now,)
+        ).fetchall()
+        bloom = BloomFilter(max(self._bloom_capacity, 2 * len(rows)))
+        for (jti,) in rows:
+            bloom.add(jti)
+        # Single reference swap, so lock-free readers see one filter or the other.
+        self._bloom = bloom
+        self._bloom_built_at = self._time_fn()
 
     def _prune_locked(self, now: int) -> None:
         """Drop rows whose token has already expired (caller holds the lock)."""
@@ -28,6 +28,8 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from chatty_commander.app.config import persist_config
+
 logger = logging.getLogger(__name__)
 
 # Module-level fallback state for the selected device, used when no config
@@ -114,8 +116,7 @@ def include_audio_routes(
             cfg_mgr = get_config_manager() if callable(get_config_manager) else None
             if cfg_mgr is not None and isinstance(getattr(cfg_mgr, "config", None), dict):
                 cfg_mgr.config.setdefault("audio", {})["device"] = device_id
-                if hasattr(cfg_mgr, "save_config"):
-                    cfg_mgr.save_config()
+                persist_config(cfg_mgr)
                 persisted = True
         except Exception as e:
             # Degrade gracefully: the selection is kept in module state above.
@@ -73,6 +73,7 @@ from ..deps.auth import bearer_token as _bearer_token
 from ..deps.auth import decode_token as _decode_token
 from ..deps.auth import jwt_secret_for as _jwt_secret
 from ..deps.auth import roles_from as _roles_from
+from ..deps.auth import subscribe_claims_cache as _subscribe_claims_cache
 from ..deps.auth import users_for as _users
 from ..revocation import InMemoryRevocationStore, RevocationStore
 
@@ -174,6 +175,7 @@ def include_auth_routes(
     store: RevocationStore = (
         revocation_store if revocation_store is not None else InMemoryRevocationStore()
     )
+    _subscribe_claims_cache(store)
 
     def _require_enabled() -> dict[str, Any]:
         """Resolve users or 404 when the feature is unconfigured (opt-in)."""
@@ -29,6 +29,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, ConfigDict, Field
 
+from chatty_commander.app.config import persist_config
 from chatty_commander.web.deps.auth import require_role
 
 logger = logging.getLogger(__name__)
@@ -123,13 +124,7 @@ def include_avatar_settings_routes(
             avatar = _get_avatar_cfg(cfg_mgr)
             payload = new_cfg.model_dump(exclude_none=True)
             avatar.update(payload)
-            # Persist via cfg_mgr.save_config if available
-            save = getattr(cfg_mgr, "save_config", None)
-            if callable(save):
-                try:
-                    save()  # type: ignore[call-arg]
-                except TypeError:
-                    save(getattr(cfg_mgr, "config", {}))  # type: ignore[misc]
+            persist_config(cfg_mgr)
             return AvatarConfigModel(**avatar)
         except HTTPException:
             raise
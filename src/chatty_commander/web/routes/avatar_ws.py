@@ -36,6 +36,7 @@ from typing import Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from ...avatars.thinking_state import get_thinking_manager
+from ..ws_hub import BroadcastHub
 from .ws import authorize_websocket
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,13 @@ class AvatarWSConnectionManager:
         # ever hold it around the list operation itself (append/remove/snapshot),
         # never while awaiting a send.
         self._connections_lock = threading.Lock()
+        # Fan-out goes through per-connection outboxes so one slow avatar
+        # client cannot stall state updates for the others; a failed send
+        # drops the socket via ``disconnect``.
+        self.hub = BroadcastHub("avatar_ws", on_dead=self.disconnect)
+        # Loop the connections live on, captured at connect time so state
+        # changes raised on worker threads can be handed over to it.
+        self._loop: asyncio.AbstractEventLoop | None = None
         # optional persona -> theme resolver
         self.theme_resolver = theme_resolver
         # Track the manager instance we've registered with to survive resets in tests
@@ -81,6 +89,7 @@ class AvatarWSConnectionManager:
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
+        self._loop = asyncio.get_running_loop()
         with self._connections_lock:
             self.active_connections.append(websocket)
         # ensure we are bound to the current manager (handles reset in tests)
@@ -107,6 +116,16 @@ class AvatarWSConnectionManager:
                 self.active_connections.remove(websocket)
             except ValueError:
                 pass
+        # Outboxes are loop-bound; a disconnect seen from another thread is
+        # picked up by the next broadcast instead (it drops unknown sockets).
+        if self._on_loop():
+            self.hub.discard(websocket)
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
 
     async def send_personal_message(
         self, message: dict[str, Any], websocket: WebSocket
@@ -129,29 +148,42 @@ class AvatarWSConnectionManager:
         except Exception:
             pass
 
-        # Schedule broadcast (simple inline to avoid broken nested def)
         async def _do_broadcast():
-            # Snapshot the connection list under the lock, then send outside it
-            # so a concurrent connect/disconnect (possibly on another thread)
-            # can't mutate the list while we iterate it.
+            # Snapshot the connection list under the lock, then queue outside
+            # it so a concurrent connect/disconnect (possibly on another
+            # thread) can't mutate the list while we iterate it.
+            with self._connections_lock:
+                connections = list(self.active_connections)
+            await self.hub.broadcast_json(connections, message)
+
+        async def _send_direct():
+            # No server loop to hand over to (sync caller, nothing connected
+            # yet): send inline on a throwaway loop, still encoding once.
             with self._connections_lock:
                 connections = list(self.active_connections)
-            dead: list[WebSocket] = []
+            frame = json.dumps(message)
             for connection in connections:
                 try:
-                    await connection.send_text(json.dumps(message))
+                    await connection.send_text(frame)
                 except Exception:
-                    dead.append(connection)
-            for d in dead:
-                self.disconnect(d)
+                    self.disconnect(connection)
+
         try:
             loop = asyncio.get_running_loop()
             loop.create_task(_do_broadcast())
+            return
         except RuntimeError:
-            try:
-                asyncio.run(_do_broadcast())
-            except Exception as e:  # pragma: no cover
-                logger.error(f"Broadcast failed: {e}")
+            pass
+        server_loop = self._loop
+        if server_loop is not None and server_loop.is_running():
+            # Called from a worker thread: hand the broadcast to the loop the
+            # sockets belong to.
+            asyncio.run_coroutine_threadsafe(_do_broadcast(), server_loop)
+            return
+        try:
+            asyncio.run(_send_direct())
+        except Exception as e:  # pragma: no cover
+            logger.error(f"Broadcast failed: {e}")
 
 
 manager = AvatarWSConnectionManager()
@@ -37,8 +37,10 @@ from pydantic import BaseModel, ConfigDict, Field
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from chatty_commander import __version__ as APP_VERSION
+from chatty_commander.app.config import persist_config
 from chatty_commander.utils.security import mask_sensitive_data
 from chatty_commander.web.deps.auth import require_role, require_scope
+from chatty_commander.web.ratelimit import RateLimiter, RatePolicy, principal_key
 
 logger = logging.getLogger(__name__)
 
@@ -102,69 +104,12 @@ def _resolve_command_rate_limit() -> float | None:
     return DEFAULT_COMMAND_RATE_LIMIT_PER_MINUTE
 
 
-class TokenBucketRateLimiter:
-    """Dependency-free, thread-safe in-memory token bucket, keyed per caller.
-
-    Each key gets a bucket of ``capacity`` tokens (defaults to the per-minute
-    rate, i.e. the full minute budget may be spent as a burst) refilled at
-    ``rate_per_minute / 60`` tokens per second.
-    """
-
-    def __init__(
-        self,
-        rate_per_minute: float,
-        *,
-        burst: float | None = None,
-        time_fn: Callable[[], float] = time.monotonic,
-        max_keys: int = 1024,
-    ) -> None:
-        if rate_per_minute <= 0:
-            raise ValueError("rate_per_minute must be positive")
-        self.rate = rate_per_minute / 60.0
-        self.capacity = float(burst) if burst is not None else max(1.0, rate_per_minute)
-        self._time_fn = time_fn
-        self._max_keys = max_keys
-        self._lock = threading.Lock()
-        # key -> (tokens, last_update_timestamp)
-        self._buckets: dict[str, tuple[float, float]] = {}
-
-    def try_acquire(self, key: str) -> tuple[bool, float]:
-        """Consume one token for ``key``.
-
-        Returns ``(allowed, retry_after_seconds)``; ``retry_after_seconds`` is
-        0.0 when allowed.
-        """
-        now = self._time_fn()
-        with self._lock:
-            tokens, last = self._buckets.get(key, (self.capacity, now))
-            tokens = min(self.capacity, tokens + (now - last) * self.rate)
-            if tokens >= 1.0:
-                self._buckets[key] = (tokens - 1.0, now)
-                self._prune_locked(now)
-                return True, 0.0
-            self._buckets[key] = (tokens, now)
-            return False, (1.0 - tokens) / self.rate
-
-    def _prune_locked(self, now: float) -> None:
-        """Drop fully-refilled (idle) buckets once the table grows too large."""
-        if len(self._buckets) <= self._max_keys:
-            return
-        stale = [
-            key
-            for key, (tokens, last) in self._buckets.items()
-            if tokens + (now - last) * self.rate >= self.capacity
-        ]
-        for key in stale:
-            del self._buckets[key]
-
-
 def _rate_limit_key(request: Request) -> str:
     """Identify the caller: API key when provided, client IP otherwise."""
-    api_key = request.headers.get("X-API-Key")
-    if api_key:
-        return f"key:{api_key}"
     client = request.client
-    return f"ip:{client.host if client else 'unknown'}"
+    return principal_key(
+        request.headers.get("X-API-Key"), client.host if client else "unknown"
+    )
 
 
 ALLOWED_CONFIG_KEYS = frozenset(
@@ -253,20 +198,23 @@ class HealthStatus(BaseModel):
     cpu_usage: str = Field(default="unknown", description="CPU usage")
     commands_executed: int = Field(default=0, description="Total commands executed")
     last_health_check: str = Field(..., description="Last health check timestamp")
+    llm_backends: dict[str, str] = Field(
+        default_factory=dict,
+        description="LLM backend load state: cold, loading, warm or failed",
+    )
 
 
-class ResponseTimeMiddleware(BaseHTTPMiddleware):
-    """Middleware to track the rolling average of request response times.
-
-    Uses instance-level state so multiple app instances in tests don't
-    share the same deque (avoids cross-contamination between test cases).
-    """
+class ResponseTimeWindow:
+    """Rolling average of the most recent ``maxlen`` response times (ms)."""
 
-    def __init__(self, app: Any, maxlen: int = 100) -> None:
-        super().__init__(app)
+    def __init__(self, maxlen: int = 100) -> None:
         self._response_times: deque[float] = deque(maxlen=maxlen)
         self._lock = threading.Lock()
 
+    def record(self, duration_ms: float) -> None:
+        with self._lock:
+            self._response_times.append(duration_ms)
+
     def get_average_ms(self) -> float:
         with self._lock:
             return (
@@ -275,15 +223,27 @@ class ResponseTimeMiddleware(BaseHTTPMiddleware):
                 else 0.0
             )
 
+
+class ResponseTimeMiddleware(BaseHTTPMiddleware):
+    """Middleware to track the rolling average of request response times.
+
+    Uses instance-level state so multiple app instances in tests don't
+    share the same deque (avoids cross-contamination between test cases).
+    """
+
+    def __init__(self, app: Any, maxlen: int = 100) -> None:
+        super().__init__(app)
+        self._window = ResponseTimeWindow(maxlen)
+
+    def get_average_ms(self) -> float:
+        return self._window.get_average_ms()
+
     async def dispatch(
         self, request: Request, call_next: Callable[[Request], Any]
     ) -> Any:
         start_time = time.time()
         response = await call_next(request)
-        duration_ms = (time.time() - start_time) * 1000.0
-
-        with self._lock:
-            self._response_times.append(duration_ms)
+        self._window.record((time.time() - start_time) * 1000.0)
 
         response.headers["X-API-Version"] = APP_VERSION
         return response
@@ -313,7 +273,8 @@ def include_core_routes(
     get_active_connections: Callable[[], int] | None = None,
     get_cache_size: Callable[[], int] | None = None,
     get_total_commands: Callable[[], int] | None = None,
-    response_time_middleware: ResponseTimeMiddleware | None = None,
+    response_time_middleware: ResponseTimeMiddleware | ResponseTimeWindow | None = None,
+    get_llm_manager: Callable[[], Any] | None = None,
 ) -> APIRouter:
     """Provide core REST routes as an APIRouter.
 
@@ -419,6 +380,17 @@ def include_core_routes(
         )
         database_status = await _get_database_status(db_url)
 
+        # Report only an LLM manager that already exists: a health check must
+        # never be what constructs it or loads a model.
+        llm_backends: dict[str, str] = {}
+        if get_llm_manager:
+            try:
+                llm_manager = get_llm_manager()
+                if llm_manager is not None:
+                    llm_backends = dict(llm_manager.get_backend_states())
+            except Exception:
+                pass
+
         return HealthStatus(
             status="healthy",
             uptime=uptime_str,
@@ -427,6 +399,7 @@ def include_core_routes(
             memory_usage=memory_usage,
             cpu_usage=cpu_usage,
             last_health_check=datetime.now().isoformat(),
+            llm_backends=llm_backends,
         )
 
     @router.get("/api/v1/commands")
@@ -539,13 +512,7 @@ def include_core_routes(
                 # Recursive deep-merge so a partial-section PUT preserves
                 # sibling keys instead of replacing the whole top-level block.
                 _deep_merge(cfg, filtered_data)
-            save = getattr(cfg_mgr, "save_config", None)
-            if callable(save):
-                try:
-                    save()
-                except TypeError:
-                    # Some implementations require the cfg param
-                    save(cfg)  # type: ignore[arg-type]
+            persist_config(cfg_mgr)
             return {"message": "Configuration updated successfully"}
         except Exception as err:
             # Log the real error server-side; return a generic client message
@@ -597,13 +564,16 @@ def include_core_routes(
                 status_code=500, detail="Failed to change state"
             ) from err
 
-    # Per-router token bucket for the command endpoint. Resolved once at
-    # router construction; None means rate limiting is disabled (the default
-    # under pytest — see _resolve_command_rate_limit).
+    # Per-router budget for the command endpoint. Resolved once at router
+    # construction; None means rate limiting is disabled (the default under
+    # pytest — see _resolve_command_rate_limit).
     _command_rate = _resolve_command_rate_limit()
-    command_rate_limiter = (
-        TokenBucketRateLimiter(_command_rate) if _command_rate is not None else None
+    command_policy = (
+        RatePolicy.per_minute("command", _command_rate)
+        if _command_rate is not None
+        else None
     )
+    command_rate_limiter = RateLimiter() if command_policy is not None else None
 
     @router.post(
         "/api/v1/command",
@@ -615,15 +585,15 @@ def include_core_routes(
     )
     async def execute_command(request: CommandRequest, http_request: Request):
         counters["command_post"] += 1
-        if command_rate_limiter is not None:
-            allowed, retry_after = command_rate_limiter.try_acquire(
-                _rate_limit_key(http_request)
+        if command_rate_limiter is not None and command_policy is not None:
+            decision = command_rate_limiter.hit(
+                command_policy, _rate_limit_key(http_request)
             )
-            if not allowed:
+            if not decision.allowed:
                 raise HTTPException(
                     status_code=429,
                     detail="Rate limit exceeded for command execution",
-                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                    headers=decision.headers(),
                 )
         start_time = time.time()
         try:
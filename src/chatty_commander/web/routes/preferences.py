@@ -40,6 +40,8 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, ConfigDict, Field
 
+from chatty_commander.app.config import persist_config
+
 # Sensible defaults applied whenever a preference has not been set yet.
 # Keep ``theme`` in sync with the frontend ThemeProvider default ("dark").
 _DEFAULTS: dict[str, Any] = {
@@ -92,16 +94,6 @@ def _get_preferences(cfg_mgr: Any) -> dict[str, Any]:
     return prefs
 
 
-def _save(cfg_mgr: Any) -> None:
-    """Persist config via ``save_config`` when the manager supports it."""
-    save = getattr(cfg_mgr, "save_config", None)
-    if callable(save):
-        try:
-            save()
-        except TypeError:
-            save(getattr(cfg_mgr, "config", {}))
-
-
 def include_preferences_routes(*, get_config_manager: Callable[[], Any]) -> APIRouter:
     router = APIRouter()
 
@@ -127,7 +119,7 @@ def include_preferences_routes(*, get_config_manager: Callable[[], Any]) -> APIR
             # section. Disallowed keys are silently ignored (not written).
             filtered = {k: v for k, v in updates.items() if k in ALLOWED_PREF_KEYS}
             prefs.update(filtered)
-            _save(cfg_mgr)
+            persist_config(cfg_mgr)
             return dict(prefs)
         except HTTPException:
             raise
@@ -12,6 +12,8 @@ from typing import Any
 from fastapi import APIRouter
 from pydantic import BaseModel, ConfigDict, Field
 
+from chatty_commander.app.config import persist_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -215,8 +217,7 @@ def include_system_routes(
                     for k, v in data.items():
                         if k in ALLOWED_PREF_KEYS:
                             cfg_mgr.config[k] = v
-                    if hasattr(cfg_mgr, "save_config"):
-                        cfg_mgr.save_config()
+                    persist_config(cfg_mgr)
                     applied = True
             except Exception as e:
                 logger.warning(f"Failed to apply restore: {e}")
@@ -38,6 +38,8 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from chatty_commander.app.config import persist_config
+
 logger = logging.getLogger(__name__)
 
 # Must stay in sync with the DaisyUI theme list in
@@ -113,8 +115,7 @@ def include_theme_routes(
             cfg = getattr(cfg_mgr, "config", None)
             if isinstance(cfg, dict):
                 cfg.setdefault("ui", {})["theme"] = theme
-                if hasattr(cfg_mgr, "save_config"):
-                    cfg_mgr.save_config()
+                persist_config(cfg_mgr)
         except Exception as exc:
             logger.warning("Failed to persist theme %r: %s", theme, exc)
 
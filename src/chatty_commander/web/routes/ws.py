@@ -31,6 +31,8 @@ from typing import Any
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from ..ws_hub import BroadcastHub, hub_stats
+
 logger = logging.getLogger(__name__)
 
 # Policy-violation close code used to reject an unauthenticated WebSocket
@@ -103,6 +105,7 @@ def include_ws_routes(
     on_message: Callable[[dict[str, Any]], Any] | None = None,
     get_initial_messages: Callable[[], list[dict[str, Any]]] | None = None,
     heartbeat_seconds: float = 30.0,
+    hub: BroadcastHub | None = None,
 ) -> APIRouter:
     """
     Attach the /ws endpoint using provided accessors to avoid tight coupling.
@@ -116,6 +119,11 @@ def include_ws_routes(
         ``connection_established`` snapshot — e.g. an initial ``dograh_status``
         push so push-driven cards render immediately without polling. Must
         never raise; a failure is logged and the connection proceeds.
+      - hub: the broadcaster feeding these connections; its outbox for a
+        socket is closed as soon as the socket disconnects
+
+    Also serves ``GET /api/v1/ws/stats``: per-connection queue depth, drop /
+    coalesce counts and send lag for every live broadcast hub.
     """
     router = APIRouter()
 
@@ -200,5 +208,11 @@ def include_ws_routes(
             conns = get_connections()
             conns.discard(websocket)
             set_connections(conns)
+            if hub is not None:
+                hub.discard(websocket)
+
+    @router.get("/api/v1/ws/stats")
+    async def websocket_stats() -> dict[str, Any]:
+        return hub_stats()
 
     return router
@@ -126,6 +126,13 @@ try:
 except ImportError:
     metrics_router = None  # type: ignore[assignment]
 
+try:
+    from ..obs.tracing import create_traces_router
+
+    traces_router = create_traces_router()
+except ImportError:
+    traces_router = None  # type: ignore[assignment]
+
 # Settings router needs to be created with config manager
 settings_router = None
 
@@ -172,7 +179,7 @@ def register_shared_routers(
     factory.
 
     Covers the import-guarded routers (avatar ws/api/selector, version,
-    dograh, metrics, agents) plus the config-bound factories (audio,
+    dograh, metrics, voice traces, agents) plus the config-bound factories (audio,
     preferences, themes).
 
     ``no_auth`` is threaded through so the Phase-2 role dependency
@@ -188,6 +195,7 @@ def register_shared_routers(
         "version_router",
         "dograh_router",
         "metrics_router",
+        "traces_router",
         "agents_router",
     ):
         _include_optional(app, nm)
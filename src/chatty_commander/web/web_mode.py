@@ -36,9 +36,11 @@ stable surface used by tests:
 from __future__ import annotations
 
 import asyncio
+import inspect
 import logging
 import os
 import time
+from collections.abc import Awaitable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -48,40 +50,50 @@ try:
 except ImportError:
     uvicorn = None  # type: ignore[assignment]
 
-from collections import defaultdict
 
 from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from starlette.middleware.base import BaseHTTPMiddleware
 
 # Advisors (optional feature set used by tests)
 from chatty_commander import __version__ as APP_VERSION
+from chatty_commander.advisors.dispatcher import (
+    AdvisorOverloadError,
+    ClientDisconnected,
+    await_unless_disconnected,
+)
 from chatty_commander.advisors.service import AdvisorMessage, AdvisorsService
 from chatty_commander.app.command_executor import CommandExecutor
 from chatty_commander.app.config import Config
+from chatty_commander.app.config_watcher import start_config_watcher
 from chatty_commander.app.model_manager import ModelManager
 from chatty_commander.app.state_manager import StateManager
 from chatty_commander.utils.security import constant_time_compare
-from chatty_commander.web.routes.core import ResponseTimeMiddleware, include_core_routes
+from chatty_commander.web.middleware.auth import ApiKeyAuth
+from chatty_commander.web.middleware.edge import SECURITY_HEADERS, EdgeMiddleware
+from chatty_commander.web.ratelimit import (
+    PolicySet,
+    RateLimitDecision,
+    RateLimiter,
+    check_all,
+    principal_key,
+)
+from chatty_commander.web.routes.core import ResponseTimeWindow, include_core_routes
 from chatty_commander.web.routes.system import include_system_routes
 
 try:
-    from chatty_commander.utils.logging_config import (
-        RequestIdMiddleware,
-        configure_logging,
-    )
+    from chatty_commander.utils.logging_config import configure_logging
     _LOGGING_CONFIG_AVAILABLE = True
 except Exception:  # pragma: no cover
-    RequestIdMiddleware = None  # type: ignore[assignment,misc]
     configure_logging = None  # type: ignore[assignment]
     _LOGGING_CONFIG_AVAILABLE = False
 try:
-    from chatty_commander.obs.metrics import RequestMetricsMiddleware
+    from chatty_commander.obs.metrics import RequestMetrics
     _OBS_METRICS_AVAILABLE = True
 except Exception:  # pragma: no cover - optional dependency path
-    RequestMetricsMiddleware = None  # type: ignore[assignment,misc]
+    RequestMetrics = None  # type: ignore[assignment,misc]
     _OBS_METRICS_AVAILABLE = False
 from chatty_commander.web.routes.voice import include_voice_routes
 from chatty_commander.web.routes.ws import include_ws_routes
@@ -91,6 +103,7 @@ from chatty_commander.web.routes.ws import include_ws_routes
 # ensure_no_auth_allowed is the shared production guard for the dev auth
 # bypass (refuses no_auth=True when CHATTY_ENV=production).
 from chatty_commander.web.server import ensure_no_auth_allowed, register_shared_routers
+from chatty_commander.web.ws_hub import BroadcastHub
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -128,23 +141,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
 
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        # microphone=(self) so the Voice Test page can call getUserMedia;
-        # everything else stays denied.
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(self), camera=()"
-        )
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "connect-src 'self' ws: wss:; "
-            "frame-ancestors 'none'"
-        )
+        response.headers.update(SECURITY_HEADERS)
 
         # Remove server header for security
         if "server" in response.headers:
@@ -232,84 +229,133 @@ def get_client_ip(
     return direct_ip
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware with secure client IP extraction."""
+def _rate_limit_disabled() -> bool:
+    # Explicit opt-out for test harnesses / trusted local runs: parallel
+    # clients share one source IP and would otherwise trip the limit. Same
+    # CHATTY_DISABLE_RATE_LIMIT control used by the command rate limiter
+    # (a stray PYTEST_CURRENT_TEST must NOT silently disable prod limiting).
+    raw = os.environ.get("CHATTY_DISABLE_RATE_LIMIT")
+    return raw is not None and raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+class RateLimitGate:
+    """Per-caller rate limiting on the shared GCRA limiter.
+
+    :meth:`check` runs before auth and charges every request to its client
+    IP: the base budget (``requests_per_minute``, or an ``ip:<addr>``
+    ``principal_policies`` override) and, when its path matches a
+    ``route_policies`` prefix, that route's budget too. ``key:<key id>``
+    overrides are charged by :meth:`check_verified` once auth has accepted
+    the key, so rotating made-up keys never buys a fresh budget. Responses
+    carry the standard ``RateLimit-*`` headers plus the legacy
+    ``X-RateLimit-*`` ones existing clients read.
+    """
 
     def __init__(
         self,
-        app,
         requests_per_minute: int = 60,
         trusted_proxies: list[str] | None = None,
+        route_policies: dict[str, Any] | None = None,
+        principal_policies: dict[str, Any] | None = None,
+        limiter: RateLimiter | None = None,
     ):
-        super().__init__(app)
         self.requests_per_minute = requests_per_minute
-        self.requests: defaultdict[str, list[float]] = defaultdict(list)
         self.trusted_proxies = trusted_proxies or []
-        self._last_cleanup = time.time()
+        self.policies = PolicySet.from_config(
+            requests_per_minute, route_policies, principal_policies
+        )
+        self.limiter = limiter or RateLimiter()
 
-    async def dispatch(self, request: Request, call_next):
-        # Explicit opt-out for test harnesses / trusted local runs: parallel
-        # clients share one source IP and would otherwise trip the limit. Same
-        # CHATTY_DISABLE_RATE_LIMIT control used by the command rate limiter
-        # (a stray PYTEST_CURRENT_TEST must NOT silently disable prod limiting).
-        raw = os.environ.get("CHATTY_DISABLE_RATE_LIMIT")
-        if raw is not None and raw.strip().lower() in {"1", "true", "yes", "on"}:
-            return await call_next(request)
+    def check(self, request: Request) -> tuple[Response | None, dict[str, str]]:
+        """Charge ``request`` to its client IP's budgets.
 
-        # Use secure IP extraction to prevent spoofing
-        client_ip = get_client_ip(request, self.trusted_proxies)
+        Returns ``(denial, headers)``: the 429 response when over budget
+        (``None`` otherwise) and the rate-limit headers for the response
+        that is eventually sent.
+        """
+        if _rate_limit_disabled():
+            return None, {}
+
+        # Use secure IP extraction to prevent spoofing. The X-API-Key is not
+        # verified yet, so it must not pick the bucket.
+        principal = principal_key(None, get_client_ip(request, self.trusted_proxies))
+        decision = check_all(
+            self.limiter, self.policies.resolve(request.url.path, principal), principal
+        )
+        request.state.rate_limit = decision
+        return self._respond(decision)
+
+    def check_verified(
+        self, request: Request
+    ) -> tuple[Response | None, dict[str, str]]:
+        """Charge a verified API key to its ``key:<key id>`` budget.
+
+        Call after auth: only a key auth accepted (``request.state.scopes``
+        is set) with a configured override is charged. Returns like
+        :meth:`check`, with no headers when nothing applies and otherwise
+        those of the tighter of the IP and key decisions.
+        """
+        if _rate_limit_disabled():
+            return None, {}
+        api_key = request.headers.get("X-API-Key")
+        if not api_key or getattr(request.state, "scopes", None) is None:
+            return None, {}
+        principal = principal_key(api_key, "")
+        policy = self.policies.principals.get(principal)
+        if policy is None:
+            return None, {}
+        decision = self.limiter.hit(policy, principal)
+        prior = getattr(request.state, "rate_limit", None)
+        if decision.allowed and prior is not None:
+            if prior.remaining < decision.remaining:
+                decision = prior
+        return self._respond(decision)
+
+    @staticmethod
+    def _respond(
+        decision: RateLimitDecision | None,
+    ) -> tuple[Response | None, dict[str, str]]:
+        if decision is None:
+            return None, {}
+
+        rate_limit_headers = decision.headers()
+        rate_limit_headers.update(
+            {
+                "X-RateLimit-Limit": rate_limit_headers["RateLimit-Limit"],
+                "X-RateLimit-Remaining": rate_limit_headers["RateLimit-Remaining"],
+                "X-RateLimit-Reset": str(int(time.time() + decision.reset_after)),
+            }
+        )
+        if not decision.allowed:
+            return (
+                HTMLResponse(
+                    content="Rate limit exceeded. Please try again later.",
+                    status_code=429,
+                    headers=rate_limit_headers,
+                ),
+                rate_limit_headers,
+            )
+        return None, rate_limit_headers
 
-        current_time = time.time()
 
-        # Periodic global cleanup: evict stale IP entries to prevent
-        # memory exhaustion from many unique IPs. A secondary size-based
-        # trigger guards against bursts of rotating IPs between the
-        # periodic sweeps (e.g. a DDoS) accumulating unbounded entries.
-        if current_time - self._last_cleanup > 60 or len(self.requests) > 10000:
-            self._last_cleanup = current_time
-            for ip in list(self.requests):
-                self.requests[ip] = [
-                    t for t in self.requests[ip] if current_time - t < 60
-                ]
-                if not self.requests[ip]:
-                    del self.requests[ip]
-        else:
-            # Clean only current IP's old requests
-            self.requests[client_ip] = [
-                req_time
-                for req_time in self.requests[client_ip]
-                if current_time - req_time < 60
-            ]
+class RateLimitMiddleware(RateLimitGate, BaseHTTPMiddleware):
+    """:class:`RateLimitGate` as a standalone Starlette middleware.
 
-        # Compute rate limit headers
-        request_count = len(self.requests[client_ip])
-        remaining = max(0, self.requests_per_minute - request_count)
-        if self.requests[client_ip]:
-            oldest = min(self.requests[client_ip])
-            reset_time = int(oldest + 60)
-        else:
-            reset_time = int(current_time + 60)
-        rate_limit_headers = {
-            "X-RateLimit-Limit": str(self.requests_per_minute),
-            "X-RateLimit-Remaining": str(remaining),
-            "X-RateLimit-Reset": str(reset_time),
-        }
-
-        # Check rate limit
-        if request_count >= self.requests_per_minute:
-            return HTMLResponse(
-                content="Rate limit exceeded. Please try again later.",
-                status_code=429,
-                headers={"Retry-After": "60", **rate_limit_headers},
-            )
+    ``key:<key id>`` budgets only apply when an auth middleware outside this
+    one has already verified the key.
+    """
 
-        # Add current request
-        self.requests[client_ip].append(current_time)
-        # Update remaining after recording this request
-        rate_limit_headers["X-RateLimit-Remaining"] = str(
-            max(0, self.requests_per_minute - len(self.requests[client_ip]))
-        )
+    def __init__(self, app, **kwargs: Any):
+        BaseHTTPMiddleware.__init__(self, app)
+        RateLimitGate.__init__(self, **kwargs)
 
+    async def dispatch(self, request: Request, call_next):
+        denied, rate_limit_headers = self.check(request)
+        if denied is None:
+            denied, key_headers = self.check_verified(request)
+            rate_limit_headers = key_headers or rate_limit_headers
+        if denied is not None:
+            return denied
         response = await call_next(request)
         for header_name, header_value in rate_limit_headers.items():
             response.headers[header_name] = header_value
@@ -392,8 +438,12 @@ class WebModeServer:
             )
             self.advisors_service = None  # type: ignore[assignment]
 
-        # WebSocket connection management
+        # WebSocket connection management. Broadcasts are queued per
+        # connection by the hub; a socket whose send fails is dropped here.
         self.active_connections: set[WebSocket] = set()
+        self.ws_hub = BroadcastHub(
+            "ws", on_dead=lambda ws: self.active_connections.discard(ws)
+        )
 
         # Telemetry task lifecycle management
         self._telemetry_task: asyncio.Task | None = None  # type: ignore[type-arg]
@@ -451,6 +501,10 @@ class WebModeServer:
             )
 
             get_poller_registry().clear()
+            # Write any coalesced settings save before the process exits.
+            flush = getattr(self.config_manager, "flush_pending_save", None)
+            if callable(flush):
+                flush()
 
     async def _telemetry_loop(self) -> None:
         """Runs until _telemetry_running is False or the task is cancelled.
@@ -551,26 +605,6 @@ class WebModeServer:
             redoc_url="/redoc" if self.no_auth else None,
         )
 
-        # Request ID middleware — must be outermost so all downstream middleware
-        # and handlers see the request_id in their log context.
-        if _LOGGING_CONFIG_AVAILABLE and RequestIdMiddleware is not None:
-            app.add_middleware(RequestIdMiddleware)
-
-        # Observability: request metrics middleware (must be added before other middleware
-        # so it wraps the full request lifecycle)
-        if _OBS_METRICS_AVAILABLE and RequestMetricsMiddleware is not None:
-            app.add_middleware(RequestMetricsMiddleware)
-
-        # Security middleware
-        app.add_middleware(SecurityHeadersMiddleware)
-
-        # Auth middleware (protects /api routes globally)
-        from chatty_commander.web.middleware.auth import AuthMiddleware
-
-        app.add_middleware(
-            AuthMiddleware, config_manager=self.config_manager, no_auth=self.no_auth
-        )
-
         # Get trusted proxies from config (for secure IP extraction behind proxies)
         trusted_proxies: list[str] = []
         if hasattr(self.config_manager, "web_server"):
@@ -599,14 +633,42 @@ class WebModeServer:
             except (TypeError, ValueError):
                 pass
 
+        # Optional overrides: web_server.rate_limit_routes maps a path prefix
+        # to an extra per-caller budget for that route, and
+        # web_server.rate_limit_principals maps "ip:<addr>" to a replacement
+        # base budget or "key:<key id>" to a budget charged once auth has
+        # verified that key (all in req/min).
+        route_policies: dict[str, Any] = {}
+        principal_policies: dict[str, Any] = {}
+        if hasattr(self.config_manager, "web_server"):
+            route_policies = self.config_manager.web_server.get("rate_limit_routes") or {}
+            principal_policies = (
+                self.config_manager.web_server.get("rate_limit_principals") or {}
+            )
+
+        # Request ID, rate limiting, auth, security headers, response time
+        # and request metrics run as one pure-ASGI pass (web/middleware/edge.py)
+        # instead of a stack of BaseHTTPMiddleware task hops. Per-IP rate
+        # limiting runs before auth, as it did in the old chain; per-key
+        # budgets run after it.
+        self.response_times = ResponseTimeWindow()
         app.add_middleware(
-            RateLimitMiddleware,
-            requests_per_minute=rate_limit_rpm,
-            trusted_proxies=trusted_proxies,
+            EdgeMiddleware,
+            auth=ApiKeyAuth(self.config_manager, no_auth=self.no_auth),
+            rate_limit=RateLimitGate(
+                requests_per_minute=rate_limit_rpm,
+                trusted_proxies=trusted_proxies,
+                route_policies=route_policies,
+                principal_policies=principal_policies,
+            ),
+            metrics=(
+                RequestMetrics()
+                if _OBS_METRICS_AVAILABLE and RequestMetrics is not None
+                else None
+            ),
+            response_times=self.response_times,
         )
 
-        app.add_middleware(ResponseTimeMiddleware)
-
         # CORS policy — delegate to shared apply_cors() for consistency.
         # SECURITY: even in no_auth (dev) mode the allowlist stays pinned to
         # localhost origins. no_auth disables authentication entirely, so a
@@ -649,6 +711,8 @@ class WebModeServer:
             get_active_connections=lambda: len(self.active_connections),
             get_cache_size=lambda: len(self._command_cache) + len(self._state_cache),
             get_total_commands=lambda: self.commands_executed,
+            response_time_middleware=self.response_times,
+            get_llm_manager=lambda: getattr(self.advisors_service, "llm_manager", None),
         )
         app.include_router(core)
 
@@ -690,6 +754,7 @@ class WebModeServer:
             on_message=None,
             get_initial_messages=self._initial_ws_messages,
             heartbeat_seconds=30.0,
+            hub=self.ws_hub,
         )
         app.include_router(ws)
 
@@ -797,6 +862,7 @@ class WebModeServer:
         @app.post("/api/v1/advisors/message", response_model=AdvisorOutbound)
         async def advisor_message(
             message: AdvisorInbound,
+            request: Request,
             x_api_key: str | None = Header(None, alias="X-API-Key"),
         ):
             """Advisor message handler."""
@@ -811,17 +877,25 @@ class WebModeServer:
 
             if not self.advisors_service:
                 raise HTTPException(status_code=500, detail="Advisors unavailable")
+            svc = self.advisors_service
+            inbound = AdvisorMessage(
+                platform=message.platform,
+                channel=message.channel,
+                user=message.user,
+                text=message.text,
+                username=message.username,
+                metadata=message.metadata,
+            )
+            # Never run the blocking LLM call on the event loop: prefer the
+            # service's bounded, per-context-ordered pool when it has one.
+            handle_async = getattr(svc, "handle_message_async", None)
+            pending: Awaitable[Any]
+            if inspect.iscoroutinefunction(handle_async):
+                pending = handle_async(inbound)
+            else:
+                pending = asyncio.to_thread(svc.handle_message, inbound)
             try:
-                reply = self.advisors_service.handle_message(
-                    AdvisorMessage(
-                        platform=message.platform,
-                        channel=message.channel,
-                        user=message.user,
-                        text=message.text,
-                        username=message.username,
-                        metadata=message.metadata,
-                    )
-                )
+                reply = await await_unless_disconnected(request, pending)
                 return AdvisorOutbound(
                     reply=reply.reply,
                     context_key=reply.context_key,
@@ -831,6 +905,15 @@ class WebModeServer:
                 )
             except HTTPException:
                 raise
+            except AdvisorOverloadError as e:
+                raise HTTPException(
+                    status_code=e.status_code,
+                    detail=str(e),
+                    headers={"Retry-After": str(e.retry_after)},
+                ) from e
+            except ClientDisconnected:
+                # Nobody is listening; 499 (nginx "client closed request").
+                return Response(status_code=499)
             except Exception as e:  # noqa: BLE001
                 raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -893,9 +976,34 @@ class WebModeServer:
             svc = self.advisors_service
             if not svc or not getattr(svc, "enabled", False):
                 raise HTTPException(status_code=400, detail="Advisors not enabled")
-            count = svc.memory.clear(platform, channel, user)
+            count = svc.clear_memory(platform, channel, user)
             return {"cleared": int(count)}
 
+        @app.get("/api/v1/advisors/memory/search")
+        async def advisors_memory_search(
+            q: str = Query(..., min_length=1),
+            platform: str | None = None,
+            channel: str | None = None,
+            user: str | None = None,
+            limit: int = Query(default=10, ge=1, le=100),
+        ):
+            """Full-text search over persisted advisor memory."""
+            svc = self.advisors_service
+            if not svc or not getattr(svc, "enabled", False):
+                raise HTTPException(status_code=400, detail="Advisors not enabled")
+            hits = await asyncio.to_thread(
+                svc.memory.search, q, platform, channel, user, limit
+            )
+            return [
+                {
+                    "context": key,
+                    "role": i.role,
+                    "content": i.content,
+                    "timestamp": i.timestamp,
+                }
+                for key, i in hits
+            ]
+
         @app.get("/api/v1/advisors/context/stats", response_model=ContextStats)
         async def advisors_context_stats():
             svc = self.advisors_service
@@ -983,16 +1091,14 @@ class WebModeServer:
             return False
 
     async def _broadcast_message(self, message: WebSocketMessage) -> None:
-        payload = message.model_dump_json()
-        for ws in list(self.active_connections):
-            try:
-                await ws.send_text(payload)
-            except Exception as e:  # noqa: BLE001
-                logger.debug("broadcast failed to a client: %s", e)
-                try:
-                    self.active_connections.discard(ws)
-                except Exception:
-                    pass
+        # Serialized once for all clients; each connection's writer task sends
+        # it, so a slow client only delays (and eventually coalesces or drops)
+        # its own frames.
+        await self.ws_hub.broadcast(
+            list(self.active_connections),
+            message.model_dump_json(),
+            self.ws_hub.coalesce_key({"type": message.type, "data": message.data}),
+        )
 
     def _on_state_change(self, old_state: str, new_state: str) -> None:
         # Synchronous bookkeeping always happens; the live broadcast is routed
@@ -1203,4 +1309,9 @@ def run_server(
     app = WebModeServer(
         config_manager, state_manager, model_manager, command_executor, no_auth=no_auth
     ).app
-    uvicorn.run(app, host=host, port=port)
+    watcher = start_config_watcher(config_manager, model_manager, state_manager)
+    try:
+        uvicorn.run(app, host=host, port=port)
+    finally:
+        if watcher is not None:
+            watcher.stop()
@@ -0,0 +1,267 @@
+# MIT License
+#
+# Copyright (c) 2024 mhand
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""WebSocket fan-out with per-connection outboxes.
+
+Broadcasting by awaiting each client's ``send_text`` in turn lets one slow or
+stalled client hold up every other client, and serializing per connection
+repeats the same JSON encoding N times. :class:`BroadcastHub` instead:
+
+- takes an already-serialized frame (``broadcast_json`` encodes exactly once);
+- appends it to each connection's bounded :class:`_Outbox`, drained by that
+  connection's own writer task, so ``broadcast`` never waits on a socket;
+- bounds slow consumers: frames with a *coalesce key* (by default the latest
+  ``agent_state_change`` per agent, and ``telemetry``) replace a still-queued
+  frame with the same key, and a full outbox drops its oldest frame;
+- records queue lag (enqueue to send) per connection and per hub.
+
+The hub does not own the connection set. Callers pass the current connections
+on every broadcast, and outboxes for sockets that have left are closed. A
+failed send closes the outbox and reports the socket through ``on_dead`` so
+the owner can drop it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ..obs.metrics import DEFAULT_REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+#: Message types where only the newest queued frame per key matters.
+COALESCED_TYPES = frozenset({"agent_state_change", "telemetry"})
+
+_HUBS: weakref.WeakValueDictionary[str, BroadcastHub] = weakref.WeakValueDictionary()
+
+
+def default_coalesce_key(message: dict[str, Any]) -> str | None:
+    """``agent_state_change`` per agent id, ``telemetry`` as a single slot."""
+    msg_type = message.get("type")
+    if msg_type not in COALESCED_TYPES:
+        return None
+    data = message.get("data")
+    agent_id = data.get("agent_id") if isinstance(data, dict) else None
+    return f"{msg_type}:{agent_id}" if agent_id is not None else str(msg_type)
+
+
+class _Outbox:
+    """Bounded frame queue plus writer task for one socket."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, hub: BroadcastHub, websocket: Any) -> None:
+        self.id = next(self._ids)
+        self.hub = hub
+        self.websocket = websocket
+        # [frame, coalesce_key, enqueued_at]; lists so coalescing can swap the
+        # frame in place and keep the slot's position.
+        self.frames: deque[list[Any]] = deque()
+        self.pending: dict[str, list[Any]] = {}
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, frame: str, key: str | None) -> None:
+        now = time.monotonic()
+        if key is not None:
+            slot = self.pending.get(key)
+            if slot is not None:
+                slot[0] = frame
+                self.coalesced += 1
+                self.hub._coalesced.inc(labels=self.hub._labels)
+                return
+        if len(self.frames) >= self.hub.max_queue:
+            oldest = self.frames.popleft()
+            if oldest[1] is not None:
+                self.pending.pop(oldest[1], None)
+            self.dropped += 1
+            self.hub._dropped.inc(labels=self.hub._labels)
+        slot = [frame, key, now]
+        self.frames.append(slot)
+        if key is not None:
+            self.pending[key] = slot
+        self.wakeup.set()
+
+    async def _run(self) -> None:
+        try:
+            while not self.closed:
+                if not self.frames:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                frame, key, enqueued_at = self.frames.popleft()
+                if key is not None:
+                    self.pending.pop(key, None)
+                await self.websocket.send_text(frame)
+                lag = time.monotonic() - enqueued_at
+                self.sent += 1
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.hub._lag.observe(lag, labels=self.hub._labels)
+        except asyncio.CancelledError:
+            pass
+        except Exception as err:  # noqa: BLE001 - any send failure ⇒ dead socket
+            logger.debug("WebSocket send failed on %s hub: %s", self.hub.name, err)
+            self.hub._dead(self)
+
+    def close(self) -> None:
+        self.closed = True
+        self.frames.clear()
+        self.pending.clear()
+        if not self.task.done():
+            self.task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        client = getattr(self.websocket, "client", None)
+        return {
+            "id": self.id,
+            "client": f"{client.host}:{client.port}" if client else None,
+            "queued": len(self.frames),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+
+class BroadcastHub:
+    """Serialize-once, per-connection-queued WebSocket broadcaster.
+
+    Args:
+        name: Label used in metrics and :func:`hub_stats`.
+        max_queue: Frames buffered per connection before the oldest is dropped.
+        coalesce_key: Maps a message dict to a coalescing key (or ``None``).
+        on_dead: Called with a socket whose send failed.
+        registry: Metrics registry (defaults to the process-wide one).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_queue: int = 256,
+        coalesce_key: Callable[[dict[str, Any]], str | None] = default_coalesce_key,
+        on_dead: Callable[[Any], None] | None = None,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        self.name = name
+        self.max_queue = max(1, int(max_queue))
+        self.coalesce_key = coalesce_key
+        self.on_dead = on_dead
+        self._outboxes: dict[Any, _Outbox] = {}
+        self._labels = {"hub": name}
+        reg = registry or DEFAULT_REGISTRY
+        self._lag = reg.histogram(
+            "ws_send_lag_seconds", "Time a WebSocket frame waited in its outbox"
+        )
+        self._dropped = reg.counter(
+            "ws_frames_dropped_total", "WebSocket frames dropped for slow clients"
+        )
+        self._coalesced = reg.counter(
+            "ws_frames_coalesced_total",
+            "Queued WebSocket frames replaced by a newer frame with the same key",
+        )
+        _HUBS[name] = self
+
+    async def broadcast(
+        self, connections: Iterable[Any], frame: str, key: str | None = None
+    ) -> None:
+        """Queue ``frame`` for every socket in ``connections``.
+
+        Returns once the frame is queued (after yielding once so fresh writer
+        tasks get to run), never waiting for a slow client.
+        """
+        current = list(connections)
+        live = set(current)
+        for ws in [ws for ws in self._outboxes if ws not in live]:
+            self._outboxes.pop(ws).close()
+        for ws in current:
+            outbox = self._outboxes.get(ws)
+            # A done task means the writer's loop went away (e.g. a broadcast
+            # made under a short-lived asyncio.run); start a fresh one.
+            if outbox is None or outbox.closed or outbox.task.done():
+                outbox = self._outboxes[ws] = _Outbox(self, ws)
+            outbox.put(frame, key)
+        await asyncio.sleep(0)
+
+    async def broadcast_json(
+        self, connections: Iterable[Any], message: dict[str, Any]
+    ) -> None:
+        """Encode ``message`` once and :meth:`broadcast` it."""
+        await self.broadcast(
+            connections, json.dumps(message), self.coalesce_key(message)
+        )
+
+    def discard(self, websocket: Any) -> None:
+        """Close ``websocket``'s outbox (on disconnect)."""
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None:
+            outbox.close()
+
+    def _dead(self, outbox: _Outbox) -> None:
+        outbox.closed = True
+        if self._outboxes.get(outbox.websocket) is outbox:
+            del self._outboxes[outbox.websocket]
+        if self.on_dead is not None:
+            try:
+                self.on_dead(outbox.websocket)
+            except Exception as err:  # noqa: BLE001
+                logger.debug("on_dead callback failed: %s", err)
+
+    def close(self) -> None:
+        for outbox in self._outboxes.values():
+            outbox.close()
+        self._outboxes.clear()
+
+    def stats(self) -> dict[str, Any]:
+        connections = [outbox.stats() for outbox in self._outboxes.values()]
+        return {
+            "connections": connections,
+            "queued": sum(c["queued"] for c in connections),
+            "max_lag_ms": max((c["max_lag_ms"] for c in connections), default=0.0),
+        }
+
+    def __len__(self) -> int:
+        return len(self._outboxes)
+
+
+def hub_stats() -> dict[str, Any]:
+    """Per-connection stats for every live hub, keyed by hub name."""
+    return {name: hub.stats() for name, hub in list(_HUBS.items())}
+
+
+__all__ = ["BroadcastHub", "COALESCED_TYPES", "default_coalesce_key", "hub_stats"]
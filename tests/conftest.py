@@ -1,8 +1,13 @@
+import json
 import os
 import shutil
+import socket
 import sys
 import tempfile
+import threading
+import time
 from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, Mock, patch
@@ -221,6 +226,19 @@ def cleanup_mocks() -> Generator[None, None, None]:
     _patch_stopall()
 
 
+@pytest.fixture(autouse=True)
+def flush_config_saves() -> Generator[None, None, None]:
+    """Write deferred config saves before the next test starts.
+
+    Many tests use ``Config()`` on the repository's ``config.json``; a save
+    left on a coalescer timer would otherwise land during a later test.
+    """
+    yield
+    from chatty_commander.app.config_watcher import flush_pending_saves
+
+    flush_pending_saves()
+
+
 @pytest.fixture(autouse=True)
 def clear_agents_store() -> Generator[None, None, None]:
     """Clear the in-memory agent blueprint store before each test.
@@ -277,3 +295,149 @@ def mock_llm_backends() -> Generator[None, None, None]:
         _llm_mgr._default_manager = None
         yield
         _llm_mgr._default_manager = _original
+
+
+class FakeOllamaServer:
+    """Minimal local Ollama HTTP API for tests.
+
+    Serves ``GET /api/tags``, ``GET /api/ps`` and ``POST /api/generate``
+    (streaming and not). A prompt-less generate loads the model, and one with
+    ``keep_alive: 0`` unloads it, as on a real server. The first generate for
+    a model that is not resident sleeps ``load_delay`` seconds to mimic a cold
+    load. Set ``status`` to answer every request with that HTTP status, or
+    call :meth:`stop` to make the server unreachable.
+    """
+
+    def __init__(self, models=("test-model",), load_delay=0.0, reply="Hello there."):
+        self.models = list(models)
+        self.load_delay = load_delay
+        self.reply = reply
+        self.status = 200
+        self.resident: dict[str, object] = {}
+        self.requests: list[tuple[str, str, dict]] = []
+        self.connections: set[int] = set()
+        self.cold_loads = 0
+        self._sockets: list = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.host = f"127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def count(self, method: str, path: str) -> int:
+        with self._lock:
+            return sum(1 for m, p, _ in self.requests if (m, p) == (method, path))
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        # Also drop keep-alive connections that handler threads still serve.
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _generate(self, body: dict) -> tuple[dict, list[dict] | None]:
+        model = body.get("model", "")
+        keep_alive = body.get("keep_alive", "5m")
+        with self._lock:
+            resident = model in self.resident
+        if keep_alive == 0:
+            self.resident.pop(model, None)
+            return {"model": model, "done": True, "done_reason": "unload"}, None
+        if not resident:
+            with self._lock:
+                self.cold_loads += 1
+            time.sleep(self.load_delay)
+            self.resident[model] = keep_alive
+        if not body.get("prompt"):
+            return {"model": model, "response": "", "done": True, "done_reason": "load"}, None
+        if body.get("stream", True):
+            words = self.reply.split(" ")
+            lines = [
+                {"model": model, "response": w if i == 0 else f" {w}", "done": False}
+                for i, w in enumerate(words)
+            ]
+            lines.append({"model": model, "response": "", "done": True})
+            return {}, lines
+        return {"model": model, "response": self.reply, "done": True}, None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake._sockets.append(self.connection)
+
+            def _send(self, status, payload=None, lines=None):
+                if lines is not None:
+                    data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+                    content_type = "application/x-ndjson"
+                else:
+                    data = json.dumps(payload or {}).encode()
+                    content_type = "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _record(self, body):
+                with fake._lock:
+                    fake.requests.append((self.command, self.path, body))
+                    fake.connections.add(self.client_address[1])
+
+            def do_GET(self):  # noqa: N802 - http.server API
+                self._record({})
+                if fake.status != 200:
+                    return self._send(fake.status, {"error": "unavailable"})
+                if self.path == "/api/tags":
+                    return self._send(
+                        200, {"models": [{"name": name} for name in fake.models]}
+                    )
+                if self.path == "/api/ps":
+                    return self._send(
+                        200, {"models": [{"name": name} for name in fake.resident]}
+                    )
+                self._send(404, {"error": "not found"})
+
+            def do_POST(self):  # noqa: N802 - http.server API
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._record(body)
+                if fake.status != 200:
+                    return self._send(fake.status, {"error": "unavailable"})
+                if self.path != "/api/generate":
+                    return self._send(404, {"error": "not found"})
+                if body.get("model") not in fake.models:
+                    return self._send(404, {"error": f"model '{body.get('model')}' not found"})
+                payload, lines = fake._generate(body)
+                self._send(200, payload, lines)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch) -> Generator[FakeOllamaServer, None, None]:
+    """A running :class:`FakeOllamaServer` on 127.0.0.1.
+
+    The SSRF policy rejects loopback hosts, so it is relaxed for the test.
+    """
+    monkeypatch.setattr(
+        "chatty_commander.utils.url_validator.is_safe_url", lambda url: True
+    )
+    server = FakeOllamaServer()
+    yield server
+    server.stop()
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from chatty_commander.advisors.memory import MemoryStore
+
+
+def _seed(path, contexts=200, turns=50):
+    store = MemoryStore(persist=True, persist_path=str(path))
+    for c in range(contexts):
+        for t in range(turns):
+            store.add("discord", "gen", f"u{c}", "user", f"message {t} for user {c}")
+    store.close()
+
+
+@pytest.mark.perf
+def test_startup_is_independent_of_history(tmp_path):
+    small = tmp_path / "small.sqlite3"
+    large = tmp_path / "large.sqlite3"
+    _seed(small, contexts=2)
+    _seed(large, contexts=400)
+
+    def open_and_read(path):
+        start = time.perf_counter()
+        store = MemoryStore(persist=True, persist_path=str(path))
+        assert len(store.get("discord", "gen", "u1", limit=50)) == 50
+        elapsed = time.perf_counter() - start
+        store.close()
+        return elapsed
+
+    small_t = min(open_and_read(small) for _ in range(3))
+    large_t = min(open_and_read(large) for _ in range(3))
+    assert large_t < small_t * 3 + 0.02, f"{large_t * 1e3:.1f}ms with 20k turns"
+
+
+@pytest.mark.perf
+def test_appends_do_not_block_on_disk(tmp_path):
+    store = MemoryStore(persist=True, persist_path=str(tmp_path / "m.sqlite3"))
+    start = time.perf_counter()
+    for n in range(5000):
+        store.add("discord", "gen", "u1", "user", f"msg {n}")
+    per_add = (time.perf_counter() - start) / 5000
+    store.flush()
+    store.close()
+    assert per_add < 200e-6, f"{per_add * 1e6:.0f}us per add"
+
+
+@pytest.mark.perf
+def test_memory_search_benchmark(request, tmp_path):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    path = tmp_path / "bench.sqlite3"
+    _seed(path, contexts=100)
+    store = MemoryStore(persist=True, persist_path=str(path))
+    try:
+        hits = benchmark(store.search, "message 7 user 42")
+        assert hits
+    finally:
+        store.close()
@@ -0,0 +1,63 @@
+import time
+import uuid
+
+import jwt
+import pytest
+
+from chatty_commander.web.deps.auth import (
+    JWT_ALGORITHM,
+    decode_access_token,
+    get_claims_cache,
+)
+from chatty_commander.web.revocation import SqliteRevocationStore
+
+SECRET = "perf-secret"
+
+
+def _token():
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": "a", "type": "access", "jti": uuid.uuid4().hex, "exp": now + 600},
+        SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+
+def _store(tmp_path, revoked=1000):
+    store = SqliteRevocationStore(str(tmp_path / "rev.sqlite3"))
+    for i in range(revoked):
+        store.revoke(f"revoked-{i}", exp=9999999999)
+    return store
+
+
+@pytest.mark.perf
+def test_cached_verification_beats_full_decode(tmp_path):
+    store = _store(tmp_path)
+    token = _token()
+    rounds = 2000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        get_claims_cache().clear()
+        decode_access_token(token, SECRET, store=store)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode_access_token(token, SECRET, store=store)
+    warm = time.perf_counter() - start
+
+    assert warm < cold, f"warm {warm * 1e6 / rounds:.1f}us vs cold {cold * 1e6 / rounds:.1f}us"
+    assert store.bloom_skips >= rounds
+
+
+@pytest.mark.perf
+def test_claims_cache_benchmark(request, tmp_path):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    store = _store(tmp_path)
+    token = _token()
+    decode_access_token(token, SECRET, store=store)
+    assert benchmark(decode_access_token, token, SECRET, store=store)["sub"] == "a"
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from chatty_commander.app.command_executor import CommandExecutor
+from chatty_commander.app.execution_engine import CommandEngine, ExecutionResult
+from chatty_commander.obs.metrics import MetricsRegistry
+from chatty_commander.utils.url_validator import PinnedURL
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def _executor(url):
+    config = Mock()
+    config.config = {}
+    config.model_actions = {"ping": {"action": "url", "url": url}}
+    return CommandExecutor(config, Mock(), Mock())
+
+
+def _pinned(url):
+    return PinnedURL(url=url, ip="127.0.0.1", host_header="localhost", sni_hostname="localhost")
+
+
+def _fresh_client_seconds(url, n):
+    """What every URL action used to pay: a new client per request."""
+    start = time.perf_counter()
+    for _ in range(n):
+        with httpx.Client() as client:
+            client.get(url, timeout=10, follow_redirects=False)
+    return time.perf_counter() - start
+
+
+@pytest.mark.perf
+def test_pooled_url_actions_beat_fresh_clients(local_server):
+    n = 30
+    executor = _executor(local_server)
+    with patch(
+        "chatty_commander.utils.url_validator.resolve_safe_url",
+        return_value=_pinned(local_server),
+    ) as resolve:
+        executor.execute_command("ping")  # warm the pool
+        start = time.perf_counter()
+        for _ in range(n):
+            assert executor.execute_command("ping") is True
+        pooled = time.perf_counter() - start
+    executor.close()
+
+    fresh = _fresh_client_seconds(local_server, n)
+    assert resolve.call_count == 1
+    assert pooled < fresh / 2, f"pooled {pooled:.3f}s vs fresh {fresh:.3f}s"
+
+
+@pytest.mark.perf
+def test_engine_runs_io_bound_actions_concurrently():
+    class SleepyExecutor:
+        def action_type(self, name):
+            return "url"
+
+        def run(self, name):
+            time.sleep(0.02)
+            return ExecutionResult(name, "url", "ok", True)
+
+    engine = CommandEngine(SleepyExecutor(), debounce_window=0, registry=MetricsRegistry())
+
+    async def burst():
+        return await asyncio.gather(*(engine.submit(f"c{i}") for i in range(16)))
+
+    start = time.perf_counter()
+    results = asyncio.run(burst())
+    elapsed = time.perf_counter() - start
+    engine.shutdown()
+
+    assert all(r.success for r in results)
+    # Sequential would be 16 * 20ms; the url policy allows 8 at a time.
+    assert elapsed < 16 * 0.02 / 2
+
+
+@pytest.mark.perf
+def test_benchmark_engine_submit_overhead(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+
+    class NoopExecutor:
+        def action_type(self, name):
+            return "custom_message"
+
+        def run(self, name):
+            return ExecutionResult(name, "custom_message", "ok", True)
+
+    engine = CommandEngine(NoopExecutor(), debounce_window=0, registry=MetricsRegistry())
+    loop = asyncio.new_event_loop()
+    try:
+        result = benchmark(lambda: loop.run_until_complete(engine.submit("m")))
+    finally:
+        loop.close()
+        engine.shutdown()
+    assert result.success
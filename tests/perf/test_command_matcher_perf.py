@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from chatty_commander.voice.matching import CommandMatcher
+
+N_COMMANDS = 5000
+
+
+def _commands():
+    return [f"command_{i}_action_{i % 97}" for i in range(N_COMMANDS)] + ["lights"]
+
+
+@pytest.mark.perf
+def test_compiled_matcher_is_sub_millisecond_with_5k_commands():
+    """Matching cost tracks transcript length, not command count."""
+    matcher = CommandMatcher(_commands())
+    texts = [
+        "please run command 4321 action 53 now",
+        "turn on the lihgts",
+        "nothing to see here at all",
+    ]
+    for text in texts:
+        matcher.match(text)  # warm
+
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            matcher.match(text)
+    per_match = (time.perf_counter() - start) / (rounds * len(texts))
+    assert matcher.match(texts[0]) == "command_4321_action_53"
+    assert per_match < 1e-3, f"{per_match * 1e6:.0f}us per match"
+
+
+@pytest.mark.perf
+def test_compiled_matcher_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    matcher = CommandMatcher(_commands())
+    result = benchmark(matcher.match, "please run command 4321 action 53 now")
+    assert result == "command_4321_action_53"
@@ -0,0 +1,108 @@
+"""Requests/s and p99 on /api/v1/status: BaseHTTPMiddleware chain vs EdgeMiddleware."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from chatty_commander.obs.metrics import (
+    MetricsRegistry,
+    RequestMetrics,
+    RequestMetricsMiddleware,
+)
+from chatty_commander.utils.logging_config import RequestIdMiddleware
+from chatty_commander.web.middleware.auth import ApiKeyAuth, AuthMiddleware
+from chatty_commander.web.middleware.edge import EdgeMiddleware
+from chatty_commander.web.routes.core import ResponseTimeMiddleware, ResponseTimeWindow
+from chatty_commander.web.web_mode import (
+    RateLimitGate,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
+
+REQUESTS = 1000
+RPM = 10**9
+
+
+class _Cfg:
+    auth = {"api_key": "perf-key"}
+
+
+def _status_app():
+    app = FastAPI()
+
+    @app.get("/api/v1/status")
+    async def status():
+        return {"status": "running", "current_state": "idle"}
+
+    return app
+
+
+def legacy_app():
+    """The chain WebModeServer used to add, in the same order."""
+    app = _status_app()
+    app.add_middleware(RequestIdMiddleware)
+    app.add_middleware(RequestMetricsMiddleware, registry=MetricsRegistry())
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(AuthMiddleware, config_manager=_Cfg())
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=RPM)
+    app.add_middleware(ResponseTimeMiddleware)
+    return app
+
+
+def edge_app():
+    app = _status_app()
+    app.add_middleware(
+        EdgeMiddleware,
+        auth=ApiKeyAuth(_Cfg()),
+        rate_limit=RateLimitGate(requests_per_minute=RPM),
+        metrics=RequestMetrics(MetricsRegistry()),
+        response_times=ResponseTimeWindow(),
+    )
+    return app
+
+
+async def _drive(app, n=REQUESTS):
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-API-Key": "perf-key"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(50):  # warm up
+            await client.get("/api/v1/status", headers=headers)
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(n):
+            t0 = time.perf_counter()
+            resp = await client.get("/api/v1/status", headers=headers)
+            latencies.append(time.perf_counter() - t0)
+            assert resp.status_code == 200
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return n / elapsed, latencies[int(len(latencies) * 0.99)]
+
+
+@pytest.mark.perf
+def test_edge_beats_base_http_middleware_chain(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    monkeypatch.delenv("CHATTY_DISABLE_RATE_LIMIT", raising=False)
+    legacy_rps, legacy_p99 = asyncio.run(_drive(legacy_app()))
+    edge_rps, edge_p99 = asyncio.run(_drive(edge_app()))
+    summary = (
+        f"legacy {legacy_rps:.0f} req/s p99 {legacy_p99 * 1e3:.2f}ms; "
+        f"edge {edge_rps:.0f} req/s p99 {edge_p99 * 1e3:.2f}ms"
+    )
+    print(summary)
+    assert edge_rps > legacy_rps * 1.2, summary
+    assert edge_p99 < legacy_p99, summary
+
+
+@pytest.mark.perf
+def test_edge_middleware_benchmark(request, monkeypatch):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    app = edge_app()
+    benchmark.pedantic(lambda: asyncio.run(_drive(app, n=200)), rounds=5)
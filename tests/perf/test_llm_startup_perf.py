@@ -0,0 +1,67 @@
+"""Startup cost of LLMManager: eager model load vs deferred load + warmup."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chatty_commander.llm import backends as backends_mod
+from chatty_commander.llm.backends import LocalTransformersBackend
+from chatty_commander.llm.manager import LLMManager
+from chatty_commander.llm.warmup import WARM
+
+# Stand-in for loading DialoGPT-medium into torch (several seconds for real).
+MODEL_LOAD_SECONDS = 0.5
+
+
+@pytest.fixture
+def slow_model(monkeypatch):
+    def fake_initialize(self):
+        time.sleep(MODEL_LOAD_SECONDS)
+        self._model = MagicMock()
+        self._tokenizer = MagicMock()
+        self._device = "cpu"
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("LLM_WARMUP", raising=False)
+    monkeypatch.setattr(backends_mod, "_modules_installed", lambda *names: True)
+    monkeypatch.setattr(backends_mod.OllamaBackend, "is_available", lambda self: False)
+    monkeypatch.setattr(LocalTransformersBackend, "_initialize_model", fake_initialize)
+
+
+def _construct(**kwargs):
+    start = time.perf_counter()
+    manager = LLMManager(response_cache=None, **kwargs)
+    return manager, time.perf_counter() - start
+
+
+@pytest.mark.perf
+def test_construction_does_not_pay_the_model_load(slow_model):
+    manager, seconds = _construct()
+    print(f"LLMManager() {seconds * 1000:.1f} ms (model load {MODEL_LOAD_SECONDS}s)")
+    # Regression guard: the old constructor loaded the model inline.
+    assert seconds < MODEL_LOAD_SECONDS / 5
+    assert manager.get_backend_states()["local"] != WARM
+
+
+@pytest.mark.perf
+def test_background_warmup_keeps_startup_fast(slow_model):
+    manager, seconds = _construct(warmup=True)
+    assert seconds < MODEL_LOAD_SECONDS / 5
+    deadline = time.monotonic() + 10
+    while manager.get_backend_states()["local"] != WARM:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    # The first request after warmup does not wait for the model.
+    start = time.perf_counter()
+    assert manager.backends["local"].load() is True
+    assert time.perf_counter() - start < MODEL_LOAD_SECONDS / 5
+
+
+@pytest.mark.perf
+def test_llm_manager_startup_benchmark(request, slow_model):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    benchmark(lambda: LLMManager(response_cache=None))
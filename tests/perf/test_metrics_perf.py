@@ -0,0 +1,134 @@
+"""Microbenchmarks: cost per metric update under thread contention."""
+
+import threading
+import time
+
+import pytest
+
+from chatty_commander.obs.metrics import Histogram, HistogramBuckets, MetricsRegistry
+
+OPS_PER_THREAD = 20_000
+LABELS = {"route": "/api/v1/command", "method": "POST", "service": "chatty"}
+
+
+class LockedLinearHistogram:
+    """The previous observe(): lock, sort labels, walk every edge."""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def observe(self, value, labels=None):
+        key = tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+        with self.lock:
+            counts = self.counts.setdefault(key, [0] * (len(self.edges) + 1))
+            placed = False
+            for idx, edge in enumerate(self.edges):
+                if value <= edge:
+                    counts[idx] += 1
+                    placed = True
+            if not placed:
+                counts[-1] += 1
+
+
+def ns_per_op(update, threads):
+    """Run ``update(i)`` OPS_PER_THREAD times on each of ``threads`` threads."""
+    start = threading.Barrier(threads + 1)
+
+    def work():
+        start.wait()
+        for i in range(OPS_PER_THREAD):
+            update(i)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    return elapsed / (threads * OPS_PER_THREAD) * 1e9
+
+
+def _value(i):
+    return (i % 100) / 50.0
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("threads", [1, 4, 8])
+def test_bound_histogram_is_cheaper_than_locked_linear(threads):
+    edges = HistogramBuckets().edges
+    legacy = LockedLinearHistogram(edges)
+    child = Histogram("h").labels(LABELS)
+
+    legacy_ns = min(
+        ns_per_op(lambda i: legacy.observe(_value(i), labels=LABELS), threads)
+        for _ in range(3)
+    )
+    bound_ns = min(ns_per_op(lambda i: child.observe(_value(i)), threads) for _ in range(3))
+
+    print(f"\n{threads} threads: legacy {legacy_ns:.0f} ns/op, bound {bound_ns:.0f} ns/op")
+    assert bound_ns < legacy_ns
+
+
+@pytest.mark.perf
+def test_sharded_counter_is_exact_under_contention():
+    counter = MetricsRegistry().counter("c")
+    child = counter.labels(LABELS)
+    cost = ns_per_op(lambda i: child.inc(), 8)
+    print(f"\nbound counter: {cost:.0f} ns/op across 8 threads")
+    assert child.get() == 8 * OPS_PER_THREAD
+
+
+@pytest.mark.perf
+def test_cached_scrape_is_much_cheaper_than_render():
+    registry = MetricsRegistry()
+    hist = registry.histogram("lat")
+    for route in range(50):
+        child = hist.labels(route=f"/r{route}", method="GET")
+        for i in range(20):
+            child.observe(_value(i))
+
+    t0 = time.perf_counter()
+    registry.to_prometheus()
+    render = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        registry.to_prometheus()
+    cached = (time.perf_counter() - t0) / 100
+
+    assert registry.renders == 1
+    assert cached < render / 10
+
+
+def _benchmark(request):
+    try:
+        return request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+
+
+@pytest.mark.perf
+def test_benchmark_bound_observe(request):
+    benchmark = _benchmark(request)
+    child = Histogram("h").labels(LABELS)
+    benchmark(child.observe, 0.042)
+
+
+@pytest.mark.perf
+def test_benchmark_labelled_observe(request):
+    benchmark = _benchmark(request)
+    hist = Histogram("h")
+    benchmark(hist.observe, 0.042, LABELS)
+
+
+@pytest.mark.perf
+def test_benchmark_contended_observe(request):
+    benchmark = _benchmark(request)
+    child = Histogram("h").labels(LABELS)
+    benchmark.pedantic(
+        ns_per_op, args=(lambda i: child.observe(_value(i)), 8), rounds=5
+    )
@@ -0,0 +1,132 @@
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from chatty_commander.app.model_manager import ModelManager
+from chatty_commander.app.state_manager import StateManager
+
+STATES = {"idle": "models-idle", "computer": "models-computer", "chatty": "models-chatty"}
+
+
+class SlowModel:
+    """Synthetic model with a fixed per-file load cost."""
+
+    load_seconds = 0.02
+
+    def __init__(self, path):
+        time.sleep(self.load_seconds)
+        self.path = path
+
+
+def _config(tmp_path, per_state=6, write=None):
+    dirs = {}
+    for state, dirname in STATES.items():
+        d = tmp_path / dirname
+        d.mkdir()
+        for i in range(per_state):
+            path = d / f"{state}_{i}.onnx"
+            if write is None:
+                path.write_bytes(b"onnx")
+            else:
+                write(path)
+        dirs[state] = str(d)
+    return SimpleNamespace(
+        default_state="idle",
+        general_models_path=dirs["idle"],
+        system_models_path=dirs["computer"],
+        chat_models_path=dirs["chatty"],
+        state_models={s: [] for s in STATES},
+        state_transitions={
+            "idle": {"hey_computer": "computer"},
+            "computer": {"okay_stop": "idle"},
+            "chatty": {"okay_stop": "idle"},
+        },
+        wakeword_state_map={},
+    )
+
+
+def _eager_sequential_seconds(config):
+    """What the old ModelManager paid: every file of every state, in turn."""
+    start = time.perf_counter()
+    for attr in ("general_models_path", "system_models_path", "chat_models_path"):
+        path = getattr(config, attr)
+        for name in sorted(os.listdir(path)):
+            SlowModel(os.path.join(path, name))
+    return time.perf_counter() - start
+
+
+@pytest.mark.perf
+def test_startup_loads_one_state_in_parallel(tmp_path):
+    config = _config(tmp_path)
+    eager = _eager_sequential_seconds(config)  # 18 files one after another
+    with patch(
+        "chatty_commander.app.model_manager._get_patchable_model_class",
+        return_value=SlowModel,
+    ):
+        start = time.perf_counter()
+        mm = ModelManager(config, load_workers=4)
+        lazy = time.perf_counter() - start
+    assert len(mm.active_models) == 6
+    # 6 files across 4 workers ~= 2 load rounds vs 18 sequential loads.
+    assert lazy < eager / 3, f"startup {lazy * 1e3:.0f}ms vs eager {eager * 1e3:.0f}ms"
+
+
+@pytest.mark.perf
+def test_first_detection_after_transition_uses_prewarmed_models(tmp_path):
+    config = _config(tmp_path)
+    with patch(
+        "chatty_commander.app.model_manager._get_patchable_model_class",
+        return_value=SlowModel,
+    ):
+        mm = ModelManager(config, load_workers=4)
+        sm = StateManager(config)
+        mm.attach_state_manager(sm)
+        sm.change_state("computer")  # prewarms idle (loaded) -> nothing
+        sm.change_state("idle")  # prewarms computer
+        time.sleep(0.2)  # user speaks the wake word a moment later
+
+        start = time.perf_counter()
+        mm.reload_models("computer")
+        first_detection_ready = time.perf_counter() - start
+    assert len(mm.active_models) == 6
+    assert first_detection_ready < SlowModel.load_seconds, (
+        f"{first_detection_ready * 1e3:.1f}ms to activate computer models"
+    )
+
+
+@pytest.mark.perf
+def test_onnx_model_startup_benchmark(request, tmp_path):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    onnx = pytest.importorskip("onnx")
+    ort = pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper
+
+    def write_tiny_model(path):
+        graph = helper.make_graph(
+            [helper.make_node("Identity", ["x"], ["y"])],
+            "tiny",
+            [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 16])],
+            [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 16])],
+        )
+        onnx.save(helper.make_model(graph), str(path))
+
+    config = _config(tmp_path, write=write_tiny_model)
+
+    def session(path):
+        return ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+
+    def startup():
+        with patch(
+            "chatty_commander.app.model_manager._get_patchable_model_class",
+            return_value=session,
+        ):
+            return ModelManager(config, load_workers=4)
+
+    mm = benchmark(startup)
+    assert len(mm.active_models) == 6
@@ -0,0 +1,87 @@
+"""Prompt assembly over a long conversation: cost per turn and prefix reuse."""
+
+import os
+import time
+from itertools import pairwise
+
+import pytest
+
+from chatty_commander.advisors.prompt_assembly import PromptAssembler
+
+PERSONA = {"system_prompt": "You are a helpful, concise advisor. " * 20}
+TURNS = 300
+
+
+def _legacy_prompt(memory, user_input, persona):
+    """The previous path: re-join all memory, then one big f-string per turn."""
+    history = "\n".join(f"{role}: {content}" for role, content in memory)
+    combined = f"{history}\n{user_input}" if history else user_input
+    return (
+        f"{persona['system_prompt']}\n\nCONVERSATION CONTEXT:\n...\n\n"
+        f"INSTRUCTIONS: ...\n\nUser: {combined}\n\nAssistant:"
+    )
+
+
+def _run_legacy():
+    memory = []
+    elapsed = 0.0
+    for i in range(TURNS):
+        text = f"question {i} about the weather in city {i % 17}"
+        start = time.perf_counter()
+        _legacy_prompt(memory, text, PERSONA)
+        elapsed += time.perf_counter() - start
+        memory += [("user", text), ("assistant", f"answer {i} " * 10)]
+    return elapsed
+
+
+def _run_assembled(assembler):
+    """Assemble TURNS prompts; return build time and mean prefix shared with the previous prompt."""
+    prompts = []
+    elapsed = 0.0
+    for i in range(TURNS):
+        text = f"question {i} about the weather in city {i % 17}"
+        start = time.perf_counter()
+        prompt = assembler.assemble(
+            user_id="u",
+            user_input=text,
+            persona_config=PERSONA,
+            mode="chatty",
+            intent="question",
+            sentiment="neutral",
+        )
+        assembler.window("u").add_turn(text, f"answer {i} " * 10)
+        elapsed += time.perf_counter() - start
+        prompts.append(prompt.text)
+    shared = [
+        len(os.path.commonprefix([prev, cur])) / len(cur)
+        for prev, cur in pairwise(prompts)
+    ]
+    return elapsed, sum(shared) / len(shared)
+
+
+@pytest.mark.perf
+def test_assembled_prompts_reuse_their_prefix():
+    _, reuse = _run_assembled(PromptAssembler())
+    print(f"mean prefix shared with previous prompt: {reuse:.0%}")
+    assert reuse > 0.8
+
+
+@pytest.mark.perf
+def test_assembly_keeps_pace_with_plain_concatenation():
+    legacy = _run_legacy()
+    assembled, _ = _run_assembled(
+        PromptAssembler(max_prompt_tokens=1 << 20, history_tokens=1 << 20)
+    )
+    print(f"{TURNS} turns: legacy {legacy * 1000:.1f} ms; assembled {assembled * 1000:.1f} ms")
+    # Unbounded token budget so both carry a long history. The assembled path
+    # also keeps a token count, but extends its text instead of re-joining it.
+    assert assembled < legacy * 2
+
+
+@pytest.mark.perf
+def test_prompt_assembly_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    benchmark(lambda: _run_assembled(PromptAssembler()))
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from chatty_commander.web.ratelimit import RateLimiter, RatePolicy
+
+POLICY = RatePolicy.per_minute("global", 600)
+
+
+def _per_hit(limiter, keys):
+    start = time.perf_counter()
+    for key in keys:
+        limiter.hit(POLICY, key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+@pytest.mark.perf
+def test_latency_is_flat_with_100k_clients():
+    # Frozen clock: no key goes idle, so the table really holds 100k clients.
+    limiter = RateLimiter(time_fn=lambda: 1000.0, background_eviction=False)
+    ips = [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(100_000)]
+    first = _per_hit(limiter, ips[:10_000])
+    _per_hit(limiter, ips[10_000:90_000])
+    last = _per_hit(limiter, ips[90_000:])
+    assert len(limiter) == 100_000
+    assert last < 50e-6, f"{last * 1e6:.1f}us per hit with 100k keys"
+    assert last < first * 3 + 5e-6
+
+
+@pytest.mark.perf
+def test_rate_limiter_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    limiter = RateLimiter(time_fn=lambda: 1000.0, background_eviction=False)
+    for i in range(100_000):
+        limiter.hit(POLICY, f"ip:{i}")
+    counter = iter(range(10**9))
+    benchmark(lambda: limiter.hit(POLICY, f"ip:{next(counter) % 100_000}"))
@@ -0,0 +1,66 @@
+import time
+
+import bcrypt
+import pytest
+
+from chatty_commander.web.middleware import service_keys as sk
+
+
+class _Cfg:
+    def __init__(self, registry):
+        self.config = {"auth": {"service_keys": registry}}
+
+
+def _registry(n):
+    # Low-cost rounds keep fixture setup fast; verification cost still scales
+    # with the number of hashes checked, which is what this measures.
+    salt = bcrypt.gensalt(rounds=4)
+    registry = {
+        f"key{i}": {
+            "key_id": f"id{i}",
+            "key_hash": bcrypt.hashpw(f"id{i}.secret".encode(), salt).decode(),
+            "scopes": ["status:read"],
+            "active": True,
+        }
+        for i in range(n)
+    }
+    return _Cfg(registry)
+
+
+def _per_request(cfg, key, rounds=200):
+    sk.invalidate_service_key_cache()
+    sk.resolve_service_key_scopes(cfg, key)  # first request pays bcrypt once
+    start = time.perf_counter()
+    for _ in range(rounds):
+        assert sk.resolve_service_key_scopes(cfg, key) == ["status:read"]
+    return (time.perf_counter() - start) / rounds
+
+
+@pytest.mark.perf
+def test_verification_cost_is_flat_in_key_count():
+    small = _per_request(_registry(2), "id1.secret")
+    large = _per_request(_registry(200), "id150.secret")
+    assert large < 1e-3, f"{large * 1e6:.0f}us per request with 200 keys"
+    assert large < small * 5 + 50e-6
+
+
+@pytest.mark.perf
+def test_cold_lookup_checks_one_hash_with_key_id():
+    cfg = _registry(200)
+    sk.invalidate_service_key_cache()
+    start = time.perf_counter()
+    assert sk.resolve_service_key_scopes(cfg, "id199.secret") == ["status:read"]
+    cold = time.perf_counter() - start
+    # A full scan would run 200 bcrypt checks (~1ms each at rounds=4).
+    assert cold < 0.05, f"{cold * 1e3:.1f}ms cold lookup"
+
+
+@pytest.mark.perf
+def test_service_key_cache_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    cfg = _registry(200)
+    sk.resolve_service_key_scopes(cfg, "id42.secret")
+    assert benchmark(sk.resolve_service_key_scopes, cfg, "id42.secret") == ["status:read"]
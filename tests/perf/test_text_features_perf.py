@@ -0,0 +1,134 @@
+"""Intent/sentiment classification over a 10k-message corpus.
+
+Compares the shared precompiled matcher with the previous per-call regex
+approach (reproduced below), and checks both label the corpus identically.
+"""
+
+import random
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+
+from chatty_commander.advisors.conversation_engine import ConversationEngine
+from chatty_commander.advisors.text_features import extract_features
+from chatty_commander.ai.intelligence_core import IntelligenceCore
+
+CORPUS_SIZE = 10_000
+
+_VOCAB = (
+    "switch change go to mode computer idle chatty what how why hello hi hey "
+    "good morning afternoon bye goodbye see you tell me explain describe help "
+    "assist do make create great awesome love like happy bad terrible hate sad "
+    "angry the window this today weather file screen lights please thanks a of"
+).split()
+
+
+def _corpus(size=CORPUS_SIZE, seed=0):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(3, 14))) + rng.choice(".?!")
+        for _ in range(size)
+    ]
+
+
+def _legacy_contains_word(text_lower, words):
+    for word in words:
+        pattern = r"\s+".join(re.escape(part) for part in word.split())
+        if re.search(rf"\b{pattern}\b", text_lower):
+            return True
+    return False
+
+
+def _legacy_intent(text):
+    text_lower = text.lower()
+    if _legacy_contains_word(text_lower, ["switch", "change", "go to"]):
+        if _legacy_contains_word(text_lower, ["mode"]):
+            return "mode_switch"
+    if text_lower.startswith(("what", "how", "why", "when", "where", "who")):
+        return "question"
+    if _legacy_contains_word(text_lower, ["help", "assist", "do", "make", "create"]):
+        return "task_request"
+    if _legacy_contains_word(
+        text_lower, ["hello", "hi", "hey", "good morning", "good afternoon"]
+    ):
+        return "greeting"
+    if _legacy_contains_word(text_lower, ["bye", "goodbye", "see you", "farewell"]):
+        return "farewell"
+    if _legacy_contains_word(text_lower, ["tell me", "explain", "describe", "what is"]):
+        return "information_seeking"
+    return "general_conversation"
+
+
+def _legacy_sentiment(text):
+    positive = ["good", "great", "awesome", "excellent", "love", "like", "happy", "pleased"]
+    negative = ["bad", "terrible", "awful", "hate", "dislike", "sad", "angry", "frustrated"]
+    text_lower = text.lower()
+    p = sum(1 for w in positive if _legacy_contains_word(text_lower, [w]))
+    n = sum(1 for w in negative if _legacy_contains_word(text_lower, [w]))
+    return "positive" if p > n else "negative" if n > p else "neutral"
+
+
+def _label_legacy(corpus):
+    # Prompt assembly and record_conversation_turn each classified the message.
+    return [
+        (_legacy_intent(t), _legacy_sentiment(t), _legacy_intent(t), _legacy_sentiment(t))
+        for t in corpus
+    ]
+
+
+def _label_shared(engine, corpus):
+    return [
+        (
+            engine.analyze_intent(t),
+            engine.analyze_sentiment(t),
+            engine.analyze_intent(t),
+            engine.analyze_sentiment(t),
+        )
+        for t in corpus
+    ]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+@pytest.mark.perf
+def test_shared_features_match_legacy_labels_and_are_faster():
+    corpus = _corpus()
+    engine = ConversationEngine({})
+    extract_features.cache_clear()
+    legacy, legacy_s = _timed(_label_legacy, corpus)
+    shared, shared_s = _timed(_label_shared, engine, corpus)
+    print(
+        f"{CORPUS_SIZE} messages: legacy {legacy_s * 1000:.0f} ms; "
+        f"shared {shared_s * 1000:.0f} ms ({legacy_s / shared_s:.1f}x)"
+    )
+    assert shared == legacy
+    assert shared_s < legacy_s / 3
+
+
+@pytest.mark.perf
+def test_text_features_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    corpus = _corpus()
+    engine = ConversationEngine({})
+    with patch("chatty_commander.ai.intelligence_core.create_enhanced_voice_processor"):
+        with patch("chatty_commander.ai.intelligence_core.AdvisorsService"):
+            with patch("chatty_commander.ai.intelligence_core.StateManager"):
+                core = IntelligenceCore({})
+
+    def run():
+        # Both engines classify each message; it is tokenized once.
+        extract_features.cache_clear()
+        _label_shared(engine, corpus)
+        for text in corpus:
+            core._analyze_intent(text)
+
+    benchmark(run)
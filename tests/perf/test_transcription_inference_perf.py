@@ -0,0 +1,107 @@
+"""Throughput of concurrent transcription: per-call model vs batched service."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chatty_commander.voice.inference import (
+    TranscriptionPriority,
+    TranscriptionService,
+    WhisperEngine,
+)
+
+CLIENTS = 8
+REQUESTS = 48
+
+
+class CostModelEngine:
+    """CPU-bound decode stand-in: a fixed cost per forward pass plus a small
+    per-clip cost, serialised on one "CPU" lock like torch on a busy host."""
+
+    def __init__(self, per_pass=0.01, per_clip=0.001):
+        self.per_pass = per_pass
+        self.per_clip = per_clip
+        self.cpu = threading.Lock()
+
+    def transcribe(self, audio):
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios):
+        with self.cpu:
+            time.sleep(self.per_pass + self.per_clip * len(audios))
+        return ["ok"] * len(audios)
+
+
+def _synthetic_clip(seconds=1.5):
+    np = pytest.importorskip("numpy")
+    t = np.arange(int(16000 * seconds), dtype=np.float32) / 16000
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _drive(call, clip, n=REQUESTS):
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda _: call(clip), range(n)))
+        elapsed = time.perf_counter() - start
+    assert len(results) == n
+    return n / elapsed
+
+
+@pytest.mark.perf
+def test_batched_service_beats_per_call_transcription():
+    clip = [0.0] * 16000
+    engine = CostModelEngine()
+    direct_rps = _drive(engine.transcribe, clip)
+    service = TranscriptionService(engine, workers=2, max_batch=8)
+    try:
+        batched_rps = _drive(
+            lambda audio: service.transcribe(
+                audio, TranscriptionPriority.INTERACTIVE, timeout=10
+            ),
+            clip,
+        )
+    finally:
+        service.close()
+    summary = f"direct {direct_rps:.1f} req/s; batched {batched_rps:.1f} req/s"
+    print(summary)
+    assert batched_rps > direct_rps * 2, summary
+
+
+@pytest.mark.perf
+def test_tiny_whisper_throughput():
+    whisper = pytest.importorskip("whisper")
+    clip = _synthetic_clip()
+    model = whisper.load_model("tiny", device="cpu")
+    engine = WhisperEngine(model)
+    direct_rps = _drive(engine.transcribe, clip, n=16)
+    service = TranscriptionService(engine, workers=2, max_batch=8)
+    try:
+        batched_rps = _drive(
+            lambda audio: service.transcribe(
+                audio, TranscriptionPriority.INTERACTIVE, timeout=120
+            ),
+            clip,
+            n=16,
+        )
+    finally:
+        service.close()
+    print(f"tiny model: direct {direct_rps:.2f} req/s; batched {batched_rps:.2f} req/s")
+    assert batched_rps > direct_rps
+
+
+@pytest.mark.perf
+def test_transcription_service_benchmark(request):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except Exception:
+        pytest.skip("pytest-benchmark not available (install pytest-benchmark to run perf)")
+    service = TranscriptionService(CostModelEngine(per_pass=0.002), max_batch=8)
+    try:
+        benchmark.pedantic(
+            lambda: _drive(lambda a: service.transcribe(a, timeout=10), [0.0] * 16000),
+            rounds=3,
+        )
+    finally:
+        service.close()
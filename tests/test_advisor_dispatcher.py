@@ -0,0 +1,188 @@
+"""Tests for the bounded advisor dispatcher (advisors/dispatcher.py)."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from chatty_commander.advisors.dispatcher import (
+    AdvisorDispatcher,
+    AdvisorOverloadError,
+    ClientDisconnected,
+    await_unless_disconnected,
+)
+from chatty_commander.advisors.service import AdvisorMessage, AdvisorsService
+
+
+async def test_same_key_runs_in_order_other_keys_in_parallel():
+    dispatcher = AdvisorDispatcher(max_workers=4)
+    log = []
+    lock = threading.Lock()
+
+    def work(tag, delay):
+        with lock:
+            log.append(("start", tag))
+        time.sleep(delay)
+        with lock:
+            log.append(("end", tag))
+        return tag
+
+    results = await asyncio.gather(
+        dispatcher.submit("a", work, "a1", 0.1),
+        dispatcher.submit("a", work, "a2", 0.0),
+        dispatcher.submit("b", work, "b1", 0.0),
+    )
+    assert results == ["a1", "a2", "b1"]
+    # a2 never starts before a1 ends ...
+    assert log.index(("end", "a1")) < log.index(("start", "a2"))
+    # ... while b1 is not held up behind context "a".
+    assert log.index(("end", "b1")) < log.index(("end", "a1"))
+    assert dispatcher.get_stats()["contexts"] == 0
+    dispatcher.shutdown()
+
+
+async def test_per_key_limit_returns_429_and_global_limit_503():
+    dispatcher = AdvisorDispatcher(max_workers=1, max_pending=3, max_pending_per_key=2)
+    release = threading.Event()
+
+    tasks = [
+        asyncio.ensure_future(dispatcher.submit("a", release.wait)),
+        asyncio.ensure_future(dispatcher.submit("a", release.wait)),
+    ]
+    await asyncio.sleep(0)
+    with pytest.raises(AdvisorOverloadError) as per_key:
+        await dispatcher.submit("a", release.wait)
+    assert per_key.value.status_code == 429
+
+    tasks.append(asyncio.ensure_future(dispatcher.submit("b", release.wait)))
+    await asyncio.sleep(0)
+    with pytest.raises(AdvisorOverloadError) as overall:
+        await dispatcher.submit("c", release.wait)
+    assert overall.value.status_code == 503
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert dispatcher.get_stats()["rejected"] == 2
+    dispatcher.shutdown()
+
+
+async def test_cancelled_message_is_not_run():
+    dispatcher = AdvisorDispatcher(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    first = asyncio.ensure_future(dispatcher.submit("a", release.wait))
+    second = asyncio.ensure_future(dispatcher.submit("a", ran.append, "second"))
+    await asyncio.sleep(0.05)
+    second.cancel()
+    release.set()
+    await first
+    with pytest.raises(asyncio.CancelledError):
+        await second
+    assert ran == []
+    assert dispatcher.get_stats()["cancelled"] == 1
+    dispatcher.shutdown()
+
+
+async def test_cancelled_running_message_keeps_its_key_locked():
+    dispatcher = AdvisorDispatcher(max_workers=2)
+    release = threading.Event()
+    log = []
+
+    def slow():
+        log.append("first start")
+        release.wait(5)
+        log.append("first end")
+
+    first = asyncio.ensure_future(dispatcher.submit("a", slow))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    second = asyncio.ensure_future(dispatcher.submit("a", log.append, "second"))
+    await asyncio.sleep(0.05)
+    assert log == ["first start"]
+    assert dispatcher.get_stats()["running"] == 1
+
+    release.set()
+    await second
+    assert log == ["first start", "first end", "second"]
+    assert dispatcher.get_stats()["pending"] == 0
+    assert dispatcher.get_stats()["contexts"] == 0
+    dispatcher.shutdown()
+
+
+async def test_await_unless_disconnected_cancels_work():
+    request = MagicMock()
+    calls = []
+
+    async def is_disconnected():
+        calls.append(True)
+        return len(calls) > 1
+
+    request.is_disconnected = is_disconnected
+    work = asyncio.ensure_future(asyncio.sleep(10))
+    with pytest.raises(ClientDisconnected):
+        await await_unless_disconnected(request, work, poll_interval=0.01)
+    await asyncio.sleep(0)
+    assert work.cancelled()
+
+
+async def test_service_handle_message_async_keeps_loop_free():
+    config = {
+        "enabled": True,
+        "providers": {},
+        "concurrency": {"max_workers": 2},
+        "context": {
+            "personas": {"general": {"system_prompt": "x"}},
+            "default_persona": "general",
+        },
+    }
+    with patch("chatty_commander.llm.manager.get_global_llm_manager", return_value=None):
+        service = AdvisorsService(config)
+    service.provider = MagicMock(model="m", api_mode="completion")
+
+    def slow_generate(prompt):
+        time.sleep(0.2)
+        return "done"
+
+    service.provider.generate.side_effect = slow_generate
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.ensure_future(ticker())
+    reply = await service.handle_message_async(
+        AdvisorMessage(platform="discord", channel="c", user="u", text="hi")
+    )
+    tick_task.cancel()
+    assert reply.reply == "done"
+    assert ticks >= 5  # the loop kept running while the LLM call blocked
+    assert service.dispatcher.max_workers == 2
+
+
+def test_message_route_maps_overload_to_status(monkeypatch):
+    from tests.test_advisors_context import _build_web_server, _DummyConfigWebAPI
+
+    server = _build_web_server(_DummyConfigWebAPI())
+
+    class Busy:
+        enabled = True
+
+        async def handle_message_async(self, message):
+            raise AdvisorOverloadError("busy", status_code=429, retry_after=2)
+
+    server.advisors_service = Busy()
+    resp = TestClient(server.app).post(
+        "/api/v1/advisors/message",
+        json={"platform": "discord", "channel": "c", "user": "u", "text": "hi"},
+    )
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "2"
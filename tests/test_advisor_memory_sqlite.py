@@ -0,0 +1,216 @@
+"""Tests for the sqlite advisor memory backend (advisors/memory.py)."""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from chatty_commander.advisors.memory import (
+    JsonlMemoryBackend,
+    MemoryItem,
+    MemoryStore,
+    SqliteMemoryBackend,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "memory.sqlite3"
+
+
+def _store(db_path: Path, **kwargs) -> MemoryStore:
+    return MemoryStore(persist=True, persist_path=str(db_path), **kwargs)
+
+
+def test_default_backend_is_sqlite_with_wal(db_path: Path) -> None:
+    store = _store(db_path)
+    assert isinstance(store.backend, SqliteMemoryBackend)
+    store.add("discord", "gen", "u1", "user", "hello")
+    store.flush()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_jsonl_path_keeps_jsonl_backend(tmp_path: Path) -> None:
+    store = MemoryStore(persist=True, persist_path=str(tmp_path / "m.jsonl"))
+    assert isinstance(store.backend, JsonlMemoryBackend)
+
+
+def test_roundtrip_across_restart(db_path: Path) -> None:
+    store = _store(db_path)
+    store.add("discord", "gen", "u1", "user", "Hello")
+    store.add("discord", "gen", "u1", "assistant", "Hi there")
+    store.add("slack", "ops", "u2", "user", "other context")
+    store.close()
+
+    store2 = _store(db_path)
+    items = store2.get("discord", "gen", "u1")
+    assert [(i.role, i.content) for i in items] == [
+        ("user", "Hello"),
+        ("assistant", "Hi there"),
+    ]
+    assert store2.clear("slack", "ops", "u2") == 1
+    store2.close()
+
+    store3 = _store(db_path)
+    assert store3.get("slack", "ops", "u2") == []
+    store3.close()
+
+
+def test_startup_does_not_load_history(db_path: Path) -> None:
+    store = _store(db_path)
+    for n in range(50):
+        store.add("discord", "gen", f"u{n}", "user", f"msg {n}")
+    store.close()
+
+    store2 = _store(db_path)
+    assert len(store2._store) == 0  # nothing read until a context is used
+    assert store2.get("discord", "gen", "u7")[0].content == "msg 7"
+    assert list(store2._store) == ["discord:gen:u7"]
+    store2.close()
+
+
+def test_writes_are_group_committed(db_path: Path) -> None:
+    store = _store(db_path)
+    for n in range(200):
+        store.add("discord", "gen", "u1", "user", f"msg {n}")
+    store.flush()
+    backend = store.backend
+    assert isinstance(backend, SqliteMemoryBackend)
+    assert backend.commits < 200
+    store.close()
+
+
+def test_concurrent_writers_are_visible_to_reads(db_path: Path) -> None:
+    backend = SqliteMemoryBackend(str(db_path), linger=0)
+
+    def write(n: int) -> None:
+        for i in range(50):
+            backend.append(f"ctx{n}", MemoryItem(role="user", content=f"m{i}", timestamp="t"))
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for n in range(8):
+        assert len(backend.recent(f"ctx{n}", 100)) == 50
+    assert not backend._has_pending_writes()
+    backend.close()
+
+
+def test_search_ranks_and_scopes(db_path: Path) -> None:
+    store = _store(db_path)
+    store.add("discord", "gen", "u1", "user", "turn on the kitchen lights")
+    store.add("discord", "gen", "u1", "assistant", "Kitchen lights are on")
+    store.add("discord", "gen", "u2", "user", "what is the weather")
+    store.add("discord", "gen", "u2", "user", 'quote " and lights')
+
+    hits = store.search("kitchen lights")
+    assert {item.content for _, item in hits} == {
+        "turn on the kitchen lights",
+        "Kitchen lights are on",
+    }
+    scoped = store.search("lights", platform="discord", channel="gen", user="u2")
+    assert [(k, i.content) for k, i in scoped] == [
+        ("discord:gen:u2", 'quote " and lights')
+    ]
+    assert store.search("   ") == []
+    assert store.search("lights", limit=1)[0][1].content
+    store.close()
+
+
+def test_search_without_persistence_scans_windows() -> None:
+    store = MemoryStore()
+    store.add("discord", "gen", "u1", "user", "Deploy the Service")
+    store.add("discord", "gen", "u1", "user", "unrelated")
+    hits = store.search("service deploy")
+    assert [i.content for _, i in hits] == ["Deploy the Service"]
+
+
+def test_retention_caps_rows_per_context(db_path: Path) -> None:
+    store = _store(db_path, max_items_per_context=2, retain_per_context=5)
+    for n in range(20):
+        store.add("discord", "gen", "u1", "user", f"msg{n}")
+    store.flush()
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT content FROM memory ORDER BY id").fetchall()
+    assert [r[0] for r in rows] == [f"msg{n}" for n in range(15, 20)]
+    # Trimmed rows are gone from the FTS index too.
+    assert store.search("msg3") == []
+    assert [i.content for i in store.get("discord", "gen", "u1")] == ["msg18", "msg19"]
+    store.close()
+
+
+def test_age_retention_on_compact(db_path: Path) -> None:
+    store = _store(db_path, max_age_days=1)
+    store.add("discord", "gen", "u1", "user", "old")
+    store.flush()
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE memory SET created = created - 2 * 86400")
+    conn.commit()
+    store.add("discord", "gen", "u1", "user", "new")
+    store.compact()
+    rows = conn.execute("SELECT content FROM memory").fetchall()
+    assert rows == [("new",)]
+    store.close()
+
+
+def test_migrates_jsonl_once(tmp_path: Path) -> None:
+    legacy = tmp_path / "advisors_memory.jsonl"
+    legacy.write_text(
+        "\n".join(
+            [
+                json.dumps(
+                    {"key": "discord:gen:u1", "role": "user", "content": "from jsonl", "timestamp": "t1"}
+                ),
+                "corrupted { json",
+                json.dumps(
+                    {"key": "discord:gen:u1", "role": "assistant", "content": "reply", "timestamp": "t2"}
+                ),
+            ]
+        )
+        + "\n"
+    )
+    db = tmp_path / "advisors_memory.sqlite3"
+    store = _store(db)
+    assert not legacy.exists()
+    assert (tmp_path / "advisors_memory.jsonl.migrated").exists()
+    items = store.get("discord", "gen", "u1")
+    assert [(i.content, i.timestamp) for i in items] == [("from jsonl", "t1"), ("reply", "t2")]
+    store.close()
+
+    # A second start does not import again.
+    store2 = _store(db)
+    assert len(store2.get("discord", "gen", "u1", limit=100)) == 2
+    store2.close()
+
+
+def test_explicit_sqlite_backend_migrates_configured_jsonl(tmp_path: Path) -> None:
+    legacy = tmp_path / "memory.jsonl"
+    legacy.write_text(
+        json.dumps({"key": "a:b:c", "role": "user", "content": "kept", "timestamp": "t"})
+        + "\n"
+    )
+    store = MemoryStore(persist=True, persist_path=str(legacy), backend="sqlite")
+    assert isinstance(store.backend, SqliteMemoryBackend)
+    assert store.backend.path == str(tmp_path / "memory.sqlite3")
+    assert store.get("a", "b", "c")[0].content == "kept"
+    store.close()
+
+
+def test_evicted_context_reloads_from_index(db_path: Path) -> None:
+    store = _store(db_path, max_cached_contexts=2)
+    for user in ("u1", "u2", "u3"):
+        store.add("discord", "gen", user, "user", f"hi from {user}")
+    assert "discord:gen:u1" not in store._store
+    assert store.get("discord", "gen", "u1")[0].content == "hi from u1"
+    store.close()
+
+
+def test_unknown_backend_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        MemoryStore(persist=True, persist_path=str(tmp_path / "m.db"), backend="redis")
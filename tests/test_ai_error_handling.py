@@ -389,7 +389,7 @@ class TestAdvisorsServiceAdditional:
             assert cleared is True
             assert isinstance(stats, dict)
 
-    def test_build_combined_and_resolve_persona_helpers(self):
+    def test_seed_history_and_resolve_persona_helpers(self):
         # Arrange - direct access to pure helpers
         config = {"enabled": True, "providers": {}, "personas": {"p": "You are p."}}
         with patch("chatty_commander.advisors.service.build_provider_safe") as mb, \
@@ -397,9 +397,14 @@ class TestAdvisorsServiceAdditional:
              patch("chatty_commander.advisors.service.ContextManager", return_value=Mock()):
             mb.return_value = Mock()
             svc = AdvisorsService(config)
+            svc.memory.add("plat", "ch", "usr", "user", "earlier q")
             # Act
-            combined = svc._build_combined_history_text("plat", "ch", "usr", "current q")
+            svc._seed_history("plat:ch:usr", "plat", "ch", "usr")
+            prompt = svc.conversation_engine.build_enhanced_prompt(
+                "current q", "plat:ch:usr", {"system_prompt": "You are p."}
+            )
             persona = svc._resolve_persona_config(Mock(persona_id="p"))
             # Assert
-            assert "current q" in combined
+            assert "User: earlier q" in prompt
+            assert "current q" in prompt
             assert isinstance(persona, dict)
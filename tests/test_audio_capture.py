@@ -0,0 +1,227 @@
+"""Tests for the shared audio capture service (voice/capture.py)."""
+
+import struct
+import threading
+import time
+import wave
+from unittest.mock import Mock
+
+import pytest
+
+from chatty_commander.voice.capture import (
+    AudioCaptureService,
+    AudioRingBuffer,
+    BufferAudioSource,
+    WaveFileSource,
+)
+from chatty_commander.voice.pipeline import VoicePipeline
+from chatty_commander.voice.transcription import (
+    TranscriptionBackend,
+    VoiceTranscriber,
+)
+
+RATE = 16000
+
+
+def _pcm(values):
+    return struct.pack(f"<{len(values)}h", *values)
+
+
+def _loud(samples: int) -> bytes:
+    return _pcm([8000 if i % 2 else -8000 for i in range(samples)])
+
+
+def _quiet(samples: int) -> bytes:
+    return b"\x00\x00" * samples
+
+
+class CaptureBackend(TranscriptionBackend):
+    def __init__(self):
+        self.audio: list[bytes] = []
+
+    def transcribe(self, audio_data: bytes, sample_rate: int = 16000) -> str:
+        self.audio.append(audio_data)
+        return "lights"
+
+    def is_available(self) -> bool:
+        return True
+
+
+class TestAudioRingBuffer:
+    def test_wraps_and_preserves_order(self):
+        ring = AudioRingBuffer(8)
+        ring.write(b"abcdef")
+        data, pos, dropped = ring.read_from(0, 4)
+        assert (data, pos, dropped) == (b"abcd", 4, 0)
+        ring.write(b"ghij")
+        data, pos, dropped = ring.read_from(pos, 100)
+        assert (data, pos, dropped) == (b"efghij", 10, 0)
+
+    def test_overrun_reports_dropped_bytes(self):
+        ring = AudioRingBuffer(4)
+        ring.write(b"abcdefgh")
+        data, pos, dropped = ring.read_from(0, 10)
+        assert data == b"efgh"
+        assert pos == 8
+        assert dropped == 4
+
+    def test_rejects_unaligned_capacity(self):
+        with pytest.raises(ValueError):
+            AudioRingBuffer(7)
+
+
+class TestAudioCaptureService:
+    def test_buffer_source_feeds_independent_readers(self):
+        data = _pcm(list(range(4000)))
+        service = AudioCaptureService(BufferAudioSource(data), chunk_size=500)
+        first = service.open_reader("a")
+        second = service.open_reader("b")
+        service.start()
+
+        got_first = first.read(len(data), timeout=2.0)
+        got_second = b"".join(iter(lambda: second.read(1000, timeout=2.0), b""))
+        service.stop()
+
+        assert got_first == data
+        assert got_second == data
+        assert first.at_end() and second.at_end()
+
+    def test_pre_roll_opens_reader_in_the_past(self):
+        service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=1.0)
+        service._ring.write(_pcm(list(range(RATE))))  # one second of history
+        reader = service.open_reader("late", pre_roll=0.25)
+        assert reader.available() == service.seconds_to_bytes(0.25)
+        # Pre-roll is bounded by what the ring still holds.
+        assert service.open_reader(pre_roll=5.0).available() == RATE * 2
+
+    def test_pre_roll_is_measured_from_the_given_position(self):
+        service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=2.0)
+        service._ring.write(_quiet(RATE // 2))
+        detected_at = service.position
+        service._ring.write(_loud(RATE // 2))  # captured after the detection
+        reader = service.open_reader("late", pre_roll=0.25, position=detected_at)
+        assert reader.position == detected_at - service.seconds_to_bytes(0.25)
+
+    def test_close_wakes_blocked_reader(self):
+        service = AudioCaptureService(BufferAudioSource(b""))
+        reader = service.open_reader()
+        results = []
+        t = threading.Thread(target=lambda: results.append(reader.read(100, timeout=5)))
+        t.start()
+        time.sleep(0.05)
+        reader.close()
+        t.join(timeout=1.0)
+        assert results == [b""]
+
+    def test_stats_report_readers(self):
+        service = AudioCaptureService(BufferAudioSource(b""))
+        service.open_reader("wakeword")
+        stats = service.get_stats()
+        assert stats["source"] == "BufferAudioSource"
+        assert "wakeword" in stats["readers"]
+
+    def test_wave_file_source(self, tmp_path):
+        path = tmp_path / "clip.wav"
+        data = _pcm(list(range(100)))
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(8000)
+            wav_file.writeframes(data)
+        source = WaveFileSource(str(path))
+        assert source.sample_rate == 8000
+        source.open()
+        assert source.read(100) == data
+        assert source.read(100) == b""
+
+
+class TestTranscriberFromCapture:
+    def test_recording_includes_pre_roll_audio(self):
+        service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=2.0)
+        # Speech that began before the recorder opened its cursor.
+        service._ring.write(_loud(RATE // 4))
+        service._ring.write(_quiet(RATE * 3 // 2))
+        service._ring.close()
+
+        backend = CaptureBackend()
+        transcriber = VoiceTranscriber(
+            backend="mock", capture=service, pre_roll=2.0, silence_timeout=0.0
+        )
+        transcriber._backend = backend
+
+        assert transcriber.record_and_transcribe() == "lights"
+        assert backend.audio[0].startswith(_loud(RATE // 4))
+        assert transcriber.get_backend_info()["shared_capture"] is True
+
+    def test_streaming_mode_reads_from_capture(self):
+        service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=3.0)
+        service._ring.write(_loud(RATE // 2) + _quiet(RATE * 2))
+        service._ring.close()
+
+        transcriber = VoiceTranscriber(
+            backend="mock", capture=service, streaming=True, pre_roll=3.0
+        )
+        backend = CaptureBackend()
+        transcriber._backend = backend
+        partials = []
+
+        assert transcriber.record_and_transcribe(on_partial=partials.append) == "lights"
+        assert len(backend.audio) == 1
+        assert partials[-1].is_final
+
+
+def test_pipeline_headless_with_synthetic_capture():
+    service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=2.0)
+    service._ring.write(_loud(RATE // 4) + _quiet(RATE * 3 // 2))
+    service._ring.close()
+
+    config = Mock()
+    config.model_actions = {"lights": {}}
+    executor = Mock()
+    executor.execute_command.return_value = True
+    pipeline = VoicePipeline(
+        config_manager=config,
+        command_executor=executor,
+        use_mock=True,
+        capture=service,
+        silence_timeout=0.0,
+        pre_roll=2.0,
+    )
+    backend = CaptureBackend()
+    pipeline.transcriber._backend = backend
+    pipeline.tts = Mock()
+
+    pipeline._process_voice_command("hey_jarvis")
+
+    executor.execute_command.assert_called_once_with("lights")
+    assert backend.audio and backend.audio[0]
+
+
+def test_pipeline_recording_starts_at_the_wake_word_detection():
+    service = AudioCaptureService(BufferAudioSource(b""), buffer_seconds=4.0)
+    service._ring.write(_quiet(RATE // 2))
+    service._ring.write(_loud(RATE // 4))  # wake word and the start of the command
+    detected_at = service.position
+    # The worker thread opens its reader only after this much more audio.
+    service._ring.write(_quiet(RATE * 3 // 2))
+    service._ring.close()
+
+    config = Mock()
+    config.model_actions = {"lights": {}}
+    pipeline = VoicePipeline(
+        config_manager=config,
+        command_executor=Mock(),
+        use_mock=True,
+        capture=service,
+        silence_timeout=0.0,
+        pre_roll=0.25,
+    )
+    backend = CaptureBackend()
+    pipeline.transcriber._backend = backend
+    pipeline.tts = Mock()
+    pipeline.wake_detector.detection_position = detected_at
+
+    pipeline._on_wake_word_detected("hey_jarvis", 0.9)
+    pipeline._processing_thread.join(timeout=5)
+
+    assert backend.audio[0].startswith(_loud(RATE // 4))
@@ -0,0 +1,139 @@
+"""Tests for the verified-claims cache in front of ``jwt.decode``."""
+
+from __future__ import annotations
+
+import time
+import uuid
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from chatty_commander.web.deps import auth as deps_auth
+from chatty_commander.web.deps.auth import (
+    JWT_ALGORITHM,
+    VerifiedClaimsCache,
+    decode_access_token,
+    get_auth_context,
+    subscribe_claims_cache,
+)
+from chatty_commander.web.revocation import (
+    InMemoryRevocationStore,
+    SqliteRevocationStore,
+)
+
+SECRET = "claims-cache-secret"
+
+
+def _token(exp_in: int = 600, **extra) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": "alice",
+        "type": "access",
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + exp_in,
+        "roles": ["user"],
+        **extra,
+    }
+    return jwt.encode(claims, SECRET, algorithm=JWT_ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache():
+    get_auth_context().reset()
+    yield
+    get_auth_context().reset()
+
+
+def test_repeat_verification_skips_jwt_decode():
+    store = InMemoryRevocationStore()
+    token = _token()
+    first = decode_access_token(token, SECRET, store=store)
+    with patch.object(deps_auth.jwt, "decode", side_effect=AssertionError):
+        assert decode_access_token(token, SECRET, store=store) == first
+
+
+def test_cached_claims_are_copies():
+    store = InMemoryRevocationStore()
+    token = _token()
+    decode_access_token(token, SECRET, store=store)["roles"] = ["admin"]
+    decode_access_token(token, SECRET, store=store).pop("sub")
+    assert decode_access_token(token, SECRET, store=store)["sub"] == "alice"
+
+
+def test_other_secret_does_not_hit_cache():
+    store = InMemoryRevocationStore()
+    token = _token()
+    decode_access_token(token, SECRET, store=store)
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(token, "rotated-secret", store=store)
+    assert exc.value.status_code == 401
+
+
+def test_entry_never_outlives_token_exp():
+    clock = [1000.0]
+    cache = VerifiedClaimsCache(ttl=300, time_fn=lambda: clock[0])
+    cache.put("t", SECRET, {"jti": "a", "exp": 1010})
+    assert cache.get("t", SECRET) is not None
+    clock[0] = 1010.0
+    assert cache.get("t", SECRET) is None
+    # Already-expired (leeway-accepted) tokens are not cached at all.
+    cache.put("t2", SECRET, {"jti": "b", "exp": 1005})
+    assert len(cache) == 0
+
+
+def test_lru_bound_and_jti_index_cleanup():
+    cache = VerifiedClaimsCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"t{i}", SECRET, {"jti": f"j{i}"})
+    assert len(cache) == 2
+    assert cache.get("t0", SECRET) is None
+    assert set(cache._by_jti) == {"j1", "j2"}
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_revoke_evicts_cached_claims_immediately(kind):
+    store = (
+        InMemoryRevocationStore() if kind == "memory" else SqliteRevocationStore(":memory:")
+    )
+    subscribe_claims_cache(store)
+    token = _token()
+    claims = decode_access_token(token, SECRET, store=store)
+    cache = deps_auth.get_claims_cache()
+    assert len(cache) == 1
+
+    store.revoke(claims["jti"], claims["exp"])
+    assert len(cache) == 0
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(token, SECRET, store=store)
+    assert exc.value.status_code == 401
+
+
+def test_revocation_still_checked_for_unsubscribed_store():
+    class BareStore:
+        def __init__(self):
+            self.revoked = set()
+
+        def revoke(self, jti, exp):
+            self.revoked.add(jti)
+
+        def is_revoked(self, jti):
+            return jti in self.revoked
+
+    store = BareStore()
+    token = _token()
+    claims = decode_access_token(token, SECRET, store=store)
+    store.revoke(claims["jti"], claims["exp"])
+    with pytest.raises(HTTPException):
+        decode_access_token(token, SECRET, store=store)
+    assert len(deps_auth.get_claims_cache()) == 0
+
+
+def test_wrong_type_rejected_even_when_cached():
+    store = InMemoryRevocationStore()
+    token = _token(type="refresh")
+    deps_auth.decode_token(token, SECRET, expected_type="refresh", store=store)
+    with pytest.raises(HTTPException):
+        decode_access_token(token, SECRET, store=store)
@@ -70,7 +70,7 @@ class TestCommandExecutor:
         mock_response.status_code = 200
         # Configure the mock to return this response
         mock_client.get.return_value = mock_response
-        mock_httpx.Client.return_value.__enter__.return_value = mock_client
+        mock_httpx.Client.return_value = mock_client
 
         assert executor.execute_command("test_url") is True
         # Fetch must go to the pinned IP URL, with Host header + SNI set to the
@@ -97,7 +97,7 @@ class TestCommandExecutor:
         mock_client = MagicMock()
         # Setup mock to raise an exception
         mock_client.get.side_effect = Exception("Network error")
-        mock_httpx.Client.return_value.__enter__.return_value = mock_client
+        mock_httpx.Client.return_value = mock_client
 
         assert executor.execute_command("test_url") is True
         mock_client.get.assert_called_once_with(
@@ -0,0 +1,96 @@
+"""Tests for the compiled command matcher index (voice/matching.py)."""
+
+from chatty_commander.voice import matching
+from chatty_commander.voice.matching import (
+    CommandMatcher,
+    edit_distance,
+    get_matcher,
+    invalidate_matcher_cache,
+    soundex,
+)
+
+
+def test_name_hit_beats_alias_and_respects_command_order():
+    matcher = CommandMatcher(["lights", "hello", "take_screenshot"])
+    assert matcher.match("hi there, take screenshot") == "take_screenshot"
+    assert matcher.match("hello lights") == "lights"
+    # alias only ("lamp" -> lights, "hi" -> hello): keyword table order wins
+    assert matcher.match("hi lamp") == "hello"
+
+
+def test_aliases_only_for_configured_commands():
+    matcher = CommandMatcher(["hello"])
+    assert matcher.match("turn on the lamp") is None
+
+
+def test_word_boundaries_are_respected():
+    matcher = CommandMatcher(["play", "turn on"])
+    assert matcher.match("replay that") is None
+    assert matcher.match("turn the fan on") is None
+    assert matcher.match("please turn on the fan") == "turn on"
+
+
+def test_fuzzy_fallback_corrects_one_edit():
+    matcher = CommandMatcher(["lights", "weather"])
+    assert matcher.match("turn on the lihgts") == "lights"
+    assert matcher.match("whats the wether") == "weather"
+    assert matcher.match("turn on the lihgts", fuzzy=False) is None
+    # Short words are never corrected.
+    assert CommandMatcher(["time"]).match("tie") is None
+
+
+def test_candidates_are_ranked_with_scores():
+    matcher = CommandMatcher(["lights", "hello", "music"])
+    ranked = matcher.candidates("hello, play the lihgts")
+    assert [c.command for c in ranked] == ["hello", "music", "lights"]
+    assert ranked[0].score == 1.0 and ranked[0].kind == "name"
+    assert ranked[1].kind == "alias" and ranked[1].phrase == "play"
+    assert ranked[2].kind == "fuzzy_name" and ranked[2].score < ranked[1].score
+
+
+def test_phonetic_candidates_are_ranking_only():
+    matcher = CommandMatcher(["weather"])
+    # Two edits away: not acted on, but still offered as a phonetic candidate.
+    assert matcher.match("wheatherr report") is None
+    ranked = matcher.candidates("wheatherr report")
+    assert ranked and ranked[0].command == "weather"
+    assert ranked[0].kind.startswith("phonetic_")
+
+
+def test_get_matcher_rebuilds_only_when_commands_change():
+    invalidate_matcher_cache()
+    actions = {"hello": {}}
+    first = get_matcher(actions)
+    assert get_matcher(actions) is first
+    actions["lights"] = {}
+    second = get_matcher(actions)
+    assert second is not first
+    # Same commands in a new mapping (e.g. after a reload): index reused.
+    assert get_matcher({"hello": {}, "lights": {}}) is second
+    actions["lights"] = {"action": "keypress"}  # bodies do not matter
+    assert get_matcher(actions) is second
+    assert matching.match_command("lights please", actions) == "lights"
+
+
+def test_get_matcher_sees_in_place_renames_of_the_same_size():
+    invalidate_matcher_cache()
+    actions = {"hello": {}, "lights": {}}
+    assert get_matcher(actions).match("take screenshot") is None
+    del actions["lights"]
+    actions["take_screenshot"] = {}
+    assert get_matcher(actions).match("take screenshot") == "take_screenshot"
+
+
+def test_get_matcher_uses_the_given_keyword_map():
+    invalidate_matcher_cache()
+    actions = {"lights": {}}
+    assert get_matcher(actions).match("lamp") == "lights"
+    assert get_matcher(actions, {"lights": ["bulb"]}).match("lamp") is None
+    assert get_matcher(actions, {"lights": ["bulb"]}).match("bulb") == "lights"
+
+
+def test_helpers():
+    assert edit_distance("lights", "lihgts") == 1
+    assert edit_distance("", "abc") == 3
+    assert soundex("Robert") == "R163"
+    assert soundex("Ashcraft") == "A261"
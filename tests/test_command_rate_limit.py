@@ -22,7 +22,7 @@
 
 """Rate limiting on POST /api/v1/command (topic from bot PR #639).
 
-Covers the dependency-free in-memory token bucket and its wiring into the
+Covers the shared GCRA limiter's token-bucket behaviour and its wiring into the
 command endpoint: per-key budgets, refill over time, 429 + Retry-After on
 exhaustion, env-based configuration, and the default-off behavior under
 pytest so existing suites are unaffected.
@@ -36,9 +36,9 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from chatty_commander.web.ratelimit import RateLimiter, RatePolicy
 from chatty_commander.web.routes.core import (
     DEFAULT_COMMAND_RATE_LIMIT_PER_MINUTE,
-    TokenBucketRateLimiter,
     _resolve_command_rate_limit,
     include_core_routes,
 )
@@ -59,9 +59,21 @@ class FakeClock:
         self.now += seconds
 
 
+class TokenBucket:
+    """Single-policy view over the shared limiter, shaped like the old bucket."""
+
+    def __init__(self, rate_per_minute, *, time_fn):
+        self.limiter = RateLimiter(time_fn=time_fn, background_eviction=False)
+        self.policy = RatePolicy.per_minute("command", rate_per_minute)
+
+    def try_acquire(self, key):
+        decision = self.limiter.hit(self.policy, key)
+        return decision.allowed, decision.retry_after
+
+
 def test_bucket_allows_burst_then_denies():
     clock = FakeClock()
-    limiter = TokenBucketRateLimiter(3, time_fn=clock)
+    limiter = TokenBucket(3, time_fn=clock)
     assert all(limiter.try_acquire("k")[0] for _ in range(3))
     allowed, retry_after = limiter.try_acquire("k")
     assert allowed is False
@@ -70,7 +82,7 @@ def test_bucket_allows_burst_then_denies():
 
 def test_bucket_refills_over_time():
     clock = FakeClock()
-    limiter = TokenBucketRateLimiter(60, time_fn=clock)  # 1 token/second
+    limiter = TokenBucket(60, time_fn=clock)  # 1 token/second
     for _ in range(60):
         assert limiter.try_acquire("k")[0]
     assert limiter.try_acquire("k")[0] is False
@@ -81,7 +93,7 @@ def test_bucket_refills_over_time():
 
 def test_bucket_keys_are_independent():
     clock = FakeClock()
-    limiter = TokenBucketRateLimiter(1, time_fn=clock)
+    limiter = TokenBucket(1, time_fn=clock)
     assert limiter.try_acquire("a")[0] is True
     assert limiter.try_acquire("a")[0] is False
     assert limiter.try_acquire("b")[0] is True
@@ -89,7 +101,7 @@ def test_bucket_keys_are_independent():
 
 def test_bucket_retry_after_matches_refill_rate():
     clock = FakeClock()
-    limiter = TokenBucketRateLimiter(60, time_fn=clock)  # 1 token/second
+    limiter = TokenBucket(60, time_fn=clock)  # 1 token/second
     for _ in range(60):
         limiter.try_acquire("k")
     _, retry_after = limiter.try_acquire("k")
@@ -100,19 +112,18 @@ def test_bucket_retry_after_matches_refill_rate():
 
 def test_bucket_prunes_idle_keys():
     clock = FakeClock()
-    limiter = TokenBucketRateLimiter(60, time_fn=clock, max_keys=10)
+    limiter = TokenBucket(60, time_fn=clock)
     for i in range(10):
         limiter.try_acquire(f"old-{i}")
     clock.advance(120.0)  # all old buckets fully refilled -> prunable
     limiter.try_acquire("new")
-    assert len(limiter._buckets) <= 11
-    assert "new" in limiter._buckets
-    assert not any(k.startswith("old-") for k in limiter._buckets)
+    limiter.limiter.evict_idle()
+    assert len(limiter.limiter) == 1
 
 
 def test_bucket_rejects_nonpositive_rate():
     with pytest.raises(ValueError):
-        TokenBucketRateLimiter(0)
+        RatePolicy.per_minute("command", 0)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,287 @@
+"""Tests for config diffing, partial hot reload, the file watcher and save coalescing."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from chatty_commander.app.config import Config, persist_config
+from chatty_commander.app.config_watcher import (
+    ConfigSection,
+    ConfigWatcher,
+    SaveCoalescer,
+    diff_config,
+    flush_pending_saves,
+    start_config_watcher,
+)
+
+BASE = {
+    "commands": {
+        "hello": {"action": "custom_message", "message": "hi"},
+        "paste": {"action": "keypress", "keys": "paste"},
+    },
+    "keybindings": {"paste": "ctrl+v"},
+    "advisors": {"enabled": False},
+    "state_models": {"idle": ["hey"]},
+}
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for name in (
+        "CHATCOMM_DEBUG",
+        "CHATCOMM_DEFAULT_STATE",
+        "CHATCOMM_INFERENCE_FRAMEWORK",
+        "CHATCOMM_START_ON_BOOT",
+        "CHATCOMM_CHECK_FOR_UPDATES",
+        "CHATBOT_ENDPOINT",
+        "HOME_ASSISTANT_ENDPOINT",
+        "CHATTY_BRIDGE_TOKEN",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+def _write(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    # Make sure a stat-based watcher sees a new mtime even on coarse clocks.
+    stamp = time.time() + 1
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def cfg_path(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, BASE)
+    return path
+
+
+def test_diff_reports_sections_and_entries():
+    new = json.loads(json.dumps(BASE))
+    new["commands"]["hello"]["message"] = "hey"
+    new["commands"]["submit"] = {"action": "keypress", "keys": "enter"}
+    del new["commands"]["paste"]
+    new["advisors"]["enabled"] = True
+    new["brand_new"] = 1
+
+    changes = {c.section: c for c in diff_config(BASE, new)}
+    assert set(changes) == {ConfigSection.COMMANDS, ConfigSection.ADVISORS, ConfigSection.OTHER}
+    commands = changes[ConfigSection.COMMANDS]
+    assert commands.added == {"submit"}
+    assert commands.removed == {"paste"}
+    assert commands.modified == {"hello"}
+    assert changes[ConfigSection.OTHER].added == {"brand_new"}
+    assert diff_config(BASE, json.loads(json.dumps(BASE))) == []
+
+
+def test_reload_rebuilds_only_changed_sections(cfg_path):
+    config = Config(str(cfg_path))
+    actions = config.model_actions
+    seen = []
+    config.subscribe(seen.append)
+
+    data = json.loads(json.dumps(BASE))
+    data["advisors"]["enabled"] = True
+    _write(cfg_path, data)
+    assert config.reload_config() is True
+    assert config.advisors["enabled"] is True
+    assert config.model_actions is actions  # untouched: matcher index stays warm
+    assert [c.section for c in seen[-1]] == [ConfigSection.ADVISORS]
+
+    data["keybindings"]["paste"] = "shift+insert"
+    _write(cfg_path, data)
+    assert config.reload_config() is True
+    assert config.model_actions is not actions
+    assert config.model_actions["paste"] == {"keypress": "shift+insert"}
+
+    assert config.reload_config() is False  # file unchanged
+
+
+def test_subscribers_filter_by_section(cfg_path):
+    config = Config(str(cfg_path))
+    commands_seen, advisors_seen = [], []
+    config.subscribe(commands_seen.append, sections=[ConfigSection.COMMANDS])
+    unsubscribe = config.subscribe(advisors_seen.append, sections=[ConfigSection.ADVISORS])
+
+    data = json.loads(json.dumps(BASE))
+    data["commands"]["new"] = {"action": "keypress", "keys": "x"}
+    _write(cfg_path, data)
+    config.reload_config()
+    assert len(commands_seen) == 1 and commands_seen[0][0].added == {"new"}
+    assert advisors_seen == []
+
+    unsubscribe()
+    data["advisors"]["enabled"] = True
+    _write(cfg_path, data)
+    config.reload_config()
+    assert advisors_seen == []
+
+
+def test_own_saves_do_not_trigger_reload(cfg_path):
+    config = Config(str(cfg_path))
+    seen = []
+    config.subscribe(seen.append)
+    config.set_check_for_updates(False)
+    assert config.reload_config() is False
+    assert seen == []
+
+
+def _record_writes(monkeypatch, path):
+    """List the atomic replaces of ``path``; other files are ignored.
+
+    Coalescers from earlier tests may still be flushing on their timers.
+    """
+    writes = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if dst == str(path):
+            writes.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    return writes
+
+
+def test_batch_updates_write_once(cfg_path, monkeypatch):
+    config = Config(str(cfg_path))
+    writes = _record_writes(monkeypatch, cfg_path)
+
+    with config.batch_updates():
+        config.set_check_for_updates(False)
+        config._update_general_setting("debug_mode", False)
+        with config.batch_updates():
+            config.save_config({"hello": "world"})
+        assert writes == []
+    assert writes == [str(cfg_path)]
+    on_disk = json.loads(cfg_path.read_text())
+    assert on_disk["general"]["check_for_updates"] is False
+    assert on_disk["hello"] == "world"
+
+
+def test_schedule_save_coalesces_bursts(cfg_path):
+    config = Config(str(cfg_path))
+    for i in range(20):
+        config.config_data[f"k{i}"] = i
+        config.schedule_save(delay=5.0)
+    coalescer = config._coalescer
+    assert coalescer is not None and coalescer.pending
+    assert config.flush_pending_save() is True
+    assert coalescer.saves == 1 and coalescer.requests == 20
+    assert json.loads(cfg_path.read_text())["k19"] == 19
+
+
+def test_setters_coalesce_into_one_write(cfg_path, monkeypatch):
+    config = Config(str(cfg_path))
+    writes = _record_writes(monkeypatch, cfg_path)
+
+    config.set_check_for_updates(False)
+    config.general_settings.debug_mode = False
+    config.general_settings.inference_framework = "openvino"
+    # The debounce timer may beat the flush on a loaded machine; either way the
+    # three setters produce a single write.
+    config.flush_pending_save()
+    assert writes == [str(cfg_path)]
+    general = json.loads(cfg_path.read_text())["general"]
+    assert general["check_for_updates"] is False
+    assert general["inference_framework"] == "openvino"
+
+
+def test_schedule_save_inside_batch_writes_at_batch_exit(cfg_path, monkeypatch):
+    config = Config(str(cfg_path))
+    writes = _record_writes(monkeypatch, cfg_path)
+
+    with config.batch_updates():
+        config.set_check_for_updates(False)
+        config.schedule_save()
+    assert writes == [str(cfg_path)]
+    assert config._coalescer is None or not config._coalescer.pending
+
+
+def test_flush_pending_saves_writes_scheduled_saves(cfg_path, monkeypatch):
+    config = Config(str(cfg_path))
+    writes = _record_writes(monkeypatch, cfg_path)
+    config.schedule_save(delay=60.0)
+    flush_pending_saves()
+    assert writes == [str(cfg_path)]
+    assert not config._coalescer.pending
+
+
+def test_persist_config_coalesces_for_real_configs_only(cfg_path):
+    config = Config(str(cfg_path))
+    persist_config(config)
+    assert config._coalescer is not None and config._coalescer.pending
+    assert config.flush_pending_save() is True
+
+    class Legacy:
+        config: dict = {}
+        saves = 0
+
+        def save_config(self):
+            self.saves += 1
+
+    legacy = Legacy()
+    persist_config(legacy)
+    assert legacy.saves == 1
+
+
+def test_start_config_watcher_reloads_models_on_path_edits(cfg_path):
+    config = Config(str(cfg_path))
+    reloaded = []
+
+    class Models:
+        def reload_models(self, state=None):
+            reloaded.append(state)
+
+    class States:
+        current_state = "idle"
+
+    watcher = start_config_watcher(config, Models(), States())
+    assert watcher is not None
+    watcher.stop()
+    data = json.loads(json.dumps(BASE))
+    data["general_models_path"] = "elsewhere"
+    _write(cfg_path, data)
+    assert config.reload_config() is True
+    assert reloaded == ["idle"]
+
+
+def test_save_coalescer_fires_after_delay():
+    calls = []
+    coalescer = SaveCoalescer(lambda: calls.append(1) or True, delay=0.02)
+    for _ in range(5):
+        coalescer.request()
+    deadline = time.monotonic() + 2
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert calls == [1]
+    assert not coalescer.pending
+
+
+@pytest.mark.parametrize("use_watchdog", [False, True])
+def test_watcher_reloads_on_external_edit(cfg_path, use_watchdog):
+    config = Config(str(cfg_path))
+    watcher = ConfigWatcher(
+        config, poll_interval=0.02, debounce=0.02, use_watchdog=use_watchdog
+    ).start()
+    try:
+        assert watcher.mode in ("polling", "watchdog")
+        data = json.loads(json.dumps(BASE))
+        data["commands"]["lights"] = {"action": "url", "url": "{home_assistant}/lights"}
+        _write(cfg_path, data)
+        deadline = time.monotonic() + 5
+        while "lights" not in config.model_actions and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert "lights" in config.model_actions
+        assert watcher.reloads == 1
+    finally:
+        watcher.stop()
+
+
+def test_watcher_from_config_respects_disable(cfg_path):
+    data = dict(BASE, config_watch={"enabled": False})
+    _write(cfg_path, data)
+    assert ConfigWatcher.from_config(Config(str(cfg_path))) is None
+    assert ConfigWatcher.from_config(Config("")) is None
+    assert start_config_watcher(Config(str(cfg_path))) is None
@@ -2,7 +2,10 @@
 Unit tests for tab-aware context switching system.
 """
 
+import json
+import os
 import tempfile
+import threading
 import time
 from pathlib import Path
 
@@ -220,6 +223,8 @@ class TestContextManager:
         assert cleared_count == 1
         assert context_manager.get_context(context1.identity.context_key) is None
         assert context_manager.get_context(context2.identity.context_key) is context2
+        # Persistence is off, so nothing is queued for the journal.
+        assert context_manager.persistence_stats()["dirty"] == 0
 
     def test_get_stats(self, context_manager):
         """Test getting context statistics."""
@@ -382,3 +387,171 @@ class TestContextManagerDebounceAndExpiry:
             # The stale context should have been expired during the gated sweep.
             assert manager.get_context(stale.identity.context_key) is None
             assert manager.get_stats()["total_contexts"] == 2
+
+
+class TestContextJournal:
+    """Tests for journaled context persistence (snapshot + append-only journal)."""
+
+    def _config(self, temp_dir, **overrides):
+        config = {
+            "personas": {
+                "general": {"system_prompt": "You are helpful."},
+                "terse": {"system_prompt": "Be brief."},
+            },
+            "default_persona": "general",
+            "persistence_enabled": True,
+            "persistence_path": str(Path(temp_dir) / "contexts.json"),
+            "save_every_changes": 1,
+        }
+        config.update(overrides)
+        return config
+
+    def _journal(self, manager):
+        lines = manager.journal_path.read_text().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_only_dirty_contexts_are_written(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ContextManager(self._config(temp_dir))
+            for i in range(10):
+                manager.get_or_create_context(
+                    platform=PlatformType.WEB, channel="c", user_id=f"user{i}"
+                )
+            assert manager.switch_persona("web:c:user3", "terse")
+
+            records = self._journal(manager)
+            assert len(records) == 11
+            assert records[-1]["key"] == "web:c:user3"
+            assert records[-1]["state"]["persona_id"] == "terse"
+            assert not manager.persistence_path.exists()  # no full rewrite yet
+
+            stats = manager.persistence_stats()
+            assert stats["snapshots"] == 0
+            assert stats["write_amplification"] == pytest.approx(1.0)
+
+    def test_replay_restores_puts_and_deletes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir)
+            manager = ContextManager(config)
+            manager.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="a")
+            manager.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="b")
+            manager.switch_persona("web:c:a", "terse")
+            manager.clear_context("web:c:b")
+
+            reloaded = ContextManager(config)
+            assert set(reloaded.contexts) == {"web:c:a"}
+            assert reloaded.get_context("web:c:a").persona_id == "terse"
+
+    def test_snapshot_truncates_journal_and_replay_uses_tail(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir, snapshot_every_records=5)
+            manager = ContextManager(config)
+            for i in range(7):
+                manager.get_or_create_context(
+                    platform=PlatformType.SLACK, channel="c", user_id=f"u{i}"
+                )
+
+            snapshot = json.loads(manager.persistence_path.read_text())
+            assert snapshot["seq"] == 5
+            assert len(snapshot["contexts"]) == 5
+            assert [r["seq"] for r in self._journal(manager)] == [6, 7]
+
+            reloaded = ContextManager(config)
+            assert len(reloaded.contexts) == 7
+            assert reloaded.persistence_stats()["journal_records"] == 2
+
+    def test_stale_journal_records_are_skipped(self):
+        """A crash between snapshot and journal truncation must not re-apply old records."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir)
+            manager = ContextManager(config)
+            manager.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="a")
+            manager.clear_context("web:c:a")
+            stale = manager.journal_path.read_text()
+            manager.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="b")
+            manager.compact()
+            manager.journal_path.write_text(stale)  # simulate the untruncated journal
+
+            reloaded = ContextManager(config)
+            assert set(reloaded.contexts) == {"web:c:b"}
+
+    def test_torn_trailing_record_is_ignored_and_truncated(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir)
+            manager = ContextManager(config)
+            manager.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="a")
+            good_size = manager.journal_path.stat().st_size
+            with open(manager.journal_path, "a") as f:
+                f.write('{"seq": 2, "op": "put", "key": "web:c:b", "sta')
+
+            reloaded = ContextManager(config)
+            assert set(reloaded.contexts) == {"web:c:a"}
+            assert reloaded.journal_path.stat().st_size == good_size
+
+            reloaded.get_or_create_context(platform=PlatformType.WEB, channel="c", user_id="b")
+            assert set(ContextManager(config).contexts) == {"web:c:a", "web:c:b"}
+
+    def test_legacy_flat_snapshot_loads(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir)
+            legacy = ContextState(
+                identity=ContextIdentity(
+                    platform=PlatformType.CLI, channel="term", user_id="me"
+                ),
+                persona_id="general",
+                system_prompt="You are helpful.",
+                memory_key="cli:term:me:memory",
+                metadata={},
+            )
+            Path(config["persistence_path"]).write_text(
+                json.dumps({"cli:term:me": legacy.to_dict()})
+            )
+            manager = ContextManager(config)
+            assert manager.get_context("cli:term:me").persona_id == "general"
+            manager.compact()
+            assert json.loads(manager.persistence_path.read_text())["version"] == 2
+
+    def test_keys_dirtied_during_a_save_reach_the_next_one(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ContextManager(self._config(temp_dir))
+            manager.get_or_create_context(
+                platform=PlatformType.WEB, channel="c", user_id="early"
+            )
+            real_fsync = os.fsync
+
+            def fsync(fd):
+                # Stands in for another change landing mid-write.
+                manager._dirty.add("web:c:early")
+                real_fsync(fd)
+
+            monkeypatch.setattr(os, "fsync", fsync)
+            manager.get_or_create_context(
+                platform=PlatformType.WEB, channel="c", user_id="late"
+            )
+            assert manager.persistence_stats()["dirty"] == 1
+
+    def test_concurrent_updates_are_all_persisted(self):
+        """Advisor messages run on a worker pool; saves must not lose contexts."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = self._config(temp_dir, snapshot_every_records=50)
+            manager = ContextManager(config)
+            errors = []
+
+            def worker(n):
+                try:
+                    for i in range(300):
+                        manager.get_or_create_context(
+                            platform=PlatformType.WEB, channel=f"t{n}", user_id=f"u{i}"
+                        )
+                except Exception as exc:  # surfaced below
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            manager.flush()
+
+            assert errors == []
+            assert len(ContextManager(config).list_contexts()) == 1200
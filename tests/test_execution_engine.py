@@ -0,0 +1,262 @@
+"""Tests for the async command execution engine and URL connection reuse."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from chatty_commander.app.command_executor import CommandExecutor
+from chatty_commander.app.execution_engine import (
+    ActionPolicy,
+    CommandEngine,
+    ExecutionResult,
+    HttpClientPool,
+    PinnedResolutionCache,
+)
+from chatty_commander.obs.metrics import MetricsRegistry
+from chatty_commander.utils.url_validator import PinnedURL
+
+
+class FakeExecutor:
+    """Records calls and tracks how many actions overlap."""
+
+    def __init__(self, actions, delay=0.0):
+        self.actions = actions
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def action_type(self, name):
+        return self.actions.get(name)
+
+    def run(self, name):
+        with self._lock:
+            self.calls.append(name)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return ExecutionResult(name, self.actions[name], "ok", True, duration_ms=1.0)
+
+
+def _engine(executor, **kwargs):
+    kwargs.setdefault("registry", MetricsRegistry())
+    return CommandEngine(executor, **kwargs)
+
+
+def _pinned(url="https://93.184.216.34/x", host="example.com"):
+    return PinnedURL(url=url, ip="93.184.216.34", host_header=host, sni_hostname=host)
+
+
+class TestCommandEngine:
+    async def test_duplicate_triggers_share_one_execution(self):
+        executor = FakeExecutor({"lights": "url"}, delay=0.05)
+        engine = _engine(executor, debounce_window=1.0)
+
+        first, second = await asyncio.gather(
+            engine.submit("lights"), engine.submit("lights")
+        )
+
+        assert executor.calls == ["lights"]
+        assert first.success and not first.debounced
+        assert second.success and second.debounced
+        assert engine.stats()["debounced"] == 1
+
+    async def test_trigger_after_window_runs_again(self):
+        now = [0.0]
+        executor = FakeExecutor({"lights": "url"})
+        engine = _engine(executor, debounce_window=0.5, clock=lambda: now[0])
+
+        await engine.submit("lights")
+        now[0] = 0.6
+        result = await engine.submit("lights")
+
+        assert executor.calls == ["lights", "lights"]
+        assert not result.debounced
+
+    async def test_concurrency_is_capped_per_action_type(self):
+        actions = {f"u{i}": "url" for i in range(6)}
+        actions["k"] = "keypress"
+        executor = FakeExecutor(actions, delay=0.05)
+        engine = _engine(
+            executor,
+            policies={"url": ActionPolicy(concurrency=2, timeout=5.0)},
+            debounce_window=0,
+        )
+
+        results = await asyncio.gather(*(engine.submit(n) for n in actions))
+
+        assert all(r.success for r in results)
+        # Two url slots plus the keypress slot.
+        assert executor.peak == 3
+        assert max(r.queued_ms for r in results) >= 40
+
+    async def test_timeout_reports_and_holds_slot_until_done(self):
+        executor = FakeExecutor({"slow": "shell", "next": "shell"}, delay=0.2)
+        engine = _engine(
+            executor,
+            policies={"shell": ActionPolicy(concurrency=1, timeout=0.05)},
+        )
+
+        slow = await engine.submit("slow")
+        assert slow.status == "timeout"
+        assert not slow.success
+        assert "timed out" in slow.error
+
+        engine.policies["shell"] = ActionPolicy(concurrency=1, timeout=5.0)
+        nxt = await engine.submit("next")
+        assert nxt.success
+        # "next" waited for the timed-out action's thread to finish.
+        assert nxt.queued_ms >= 100
+        assert executor.peak == 1
+
+    async def test_unknown_command_and_full_queue(self):
+        executor = FakeExecutor({"a": "url", "b": "url"}, delay=0.1)
+        engine = _engine(executor, max_pending=1)
+
+        missing = await engine.submit("nope")
+        assert missing.status == "not_found"
+
+        first = asyncio.ensure_future(engine.submit("a"))
+        await asyncio.sleep(0)
+        rejected = await engine.submit("b")
+        assert rejected.status == "rejected"
+        assert (await first).success
+
+    async def test_failures_are_recorded_in_metrics(self):
+        registry = MetricsRegistry()
+        executor = FakeExecutor({"a": "url"})
+        executor.run = Mock(side_effect=RuntimeError("boom"))
+        engine = _engine(executor, registry=registry)
+
+        result = await engine.submit("a")
+
+        assert result.status == "error" and result.error == "boom"
+        counter = registry.counter("command_executions_total")
+        assert counter.get(labels={"action": "url", "status": "error"}) == 1
+
+    def test_dispatch_from_sync_code(self):
+        executor = FakeExecutor({"a": "keypress"})
+        engine = _engine(executor)
+        try:
+            result = engine.dispatch("a").result(timeout=2.0)
+        finally:
+            engine.shutdown()
+        assert result.success
+        assert executor.calls == ["a"]
+
+    def test_from_config_merges_limits(self):
+        engine = CommandEngine.from_config(
+            FakeExecutor({}),
+            {"debounce_ms": 200, "limits": {"shell": {"concurrency": 4}}},
+        )
+        assert engine.debounce_window == pytest.approx(0.2)
+        assert engine.policy_for("shell").concurrency == 4
+        assert engine.policy_for("shell").timeout == 20.0
+        assert engine.policy_for("url").concurrency == 8
+
+
+class TestPinnedResolutionCache:
+    def test_hits_within_ttl_and_refreshes_after(self):
+        now = [0.0]
+        resolver = Mock(return_value=_pinned())
+        cache = PinnedResolutionCache(ttl=10, resolver=resolver, clock=lambda: now[0])
+
+        cache.resolve("https://example.com/x")
+        cache.resolve("https://example.com/x")
+        assert resolver.call_count == 1
+
+        now[0] = 11
+        cache.resolve("https://example.com/x")
+        assert resolver.call_count == 2
+        assert cache.stats()["hits"] == 1
+
+    def test_rejections_are_not_cached(self):
+        resolver = Mock(return_value=None)
+        cache = PinnedResolutionCache(resolver=resolver)
+        assert cache.resolve("http://10.0.0.1") is None
+        assert cache.resolve("http://10.0.0.1") is None
+        assert resolver.call_count == 2
+
+
+class TestHttpClientPool:
+    def test_reuses_clients_and_closes_evicted(self):
+        made = []
+
+        def factory():
+            made.append(Mock())
+            return made[-1]
+
+        pool = HttpClientPool(factory, max_clients=2)
+        a = pool.get("a")
+        assert pool.get("a") is a
+        pool.get("b")
+        pool.get("c")
+
+        a.close.assert_called_once()
+        assert pool.stats() == {"clients": 2, "created": 3, "reused": 1}
+        pool.close()
+        assert all(c.close.called for c in made)
+
+
+class TestCommandExecutorIntegration:
+    @pytest.fixture
+    def executor(self):
+        config = Mock()
+        config.config = {"command_engine": {"dns_ttl": 60}}
+        config.model_actions = {
+            "url_cmd": {"action": "url", "url": "https://example.com/x"},
+            "legacy": {"shell": "true"},
+        }
+        ex = CommandExecutor(config, Mock(), Mock())
+        yield ex
+        ex.close()
+
+    def test_url_actions_reuse_client_and_pin(self, executor):
+        with (
+            patch(
+                "chatty_commander.utils.url_validator.resolve_safe_url",
+                return_value=_pinned(),
+            ) as resolve,
+            patch("chatty_commander.app.command_executor.httpx") as mock_httpx,
+        ):
+            mock_httpx.Client.return_value.get.return_value = Mock(status_code=200)
+            assert executor.execute_command("url_cmd") is True
+            assert executor.execute_command("url_cmd") is True
+
+        assert resolve.call_count == 1
+        assert mock_httpx.Client.call_count == 1
+        assert mock_httpx.Client.return_value.get.call_count == 2
+
+    def test_run_returns_structured_result(self, executor):
+        with (
+            patch(
+                "chatty_commander.utils.url_validator.resolve_safe_url",
+                return_value=_pinned(),
+            ),
+            patch("chatty_commander.app.command_executor.httpx") as mock_httpx,
+        ):
+            mock_httpx.Client.return_value.get.return_value = Mock(status_code=503)
+            result = executor.run("url_cmd")
+
+        assert result.action == "url"
+        assert result.error == "http 503"
+        assert result.duration_ms >= 0
+        assert executor.run("missing").status == "not_found"
+
+    def test_action_type_handles_legacy_format(self, executor):
+        assert executor.action_type("url_cmd") == "url"
+        assert executor.action_type("legacy") == "shell"
+        assert executor.action_type("missing") is None
+
+    async def test_execute_async_uses_engine(self, executor):
+        with patch("chatty_commander.app.command_executor.subprocess.run") as run:
+            run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+            result = await executor.execute_async("legacy")
+        assert result.success
+        assert result.status == "ok"
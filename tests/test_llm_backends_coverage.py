@@ -296,7 +296,7 @@ class TestOllamaBackend:
         mock_client.get.return_value = mock_response
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend(model="llama2")
             result = backend.is_available()
 
@@ -324,7 +324,7 @@ class TestOllamaBackend:
         mock_client.get.return_value = mock_response
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend(model="llama2")
             result = backend.is_available()
 
@@ -339,7 +339,7 @@ class TestOllamaBackend:
         mock_client.get.side_effect = Exception("Connection error")
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend()
             result = backend.is_available()
 
@@ -355,7 +355,7 @@ class TestOllamaBackend:
         mock_client.get.return_value = mock_response
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend()
             result = backend.is_available()
 
@@ -384,7 +384,7 @@ class TestOllamaBackend:
         mock_client.post.return_value = mock_response
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend(model="llama2")
             backend._try_pull_model()
 
@@ -399,7 +399,7 @@ class TestOllamaBackend:
         mock_client.post.return_value = mock_response
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend(model="llama2")
             backend._try_pull_model()
             # Should not raise
@@ -413,7 +413,7 @@ class TestOllamaBackend:
         mock_client.post.side_effect = Exception("API Error")
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend = OllamaBackend(model="llama2")
             backend._try_pull_model()
             # Should not raise
@@ -443,7 +443,7 @@ class TestOllamaBackend:
         backend._available = True
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             result = backend.generate_response("test prompt")
 
         assert result == "Test response"
@@ -463,7 +463,7 @@ class TestOllamaBackend:
         backend._available = True
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             backend.generate_response(
                 "test prompt",
                 max_tokens=500,
@@ -488,7 +488,7 @@ class TestOllamaBackend:
         backend._available = True
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             with pytest.raises(RuntimeError, match="request failed"):
                 backend.generate_response("test prompt")
 
@@ -504,7 +504,7 @@ class TestOllamaBackend:
         mock_client.post.side_effect = Exception("Network error")
 
         with patch("httpx.Client") as MockClient:
-            MockClient.return_value.__enter__.return_value = mock_client
+            MockClient.return_value = mock_client
             with pytest.raises(Exception, match="Network error"):
                 backend.generate_response("test prompt")
 
@@ -526,7 +526,7 @@ class TestOllamaBackend:
             "chatty_commander.utils.url_validator.is_safe_url", return_value=False
         ) as mock_is_safe:
             with patch("httpx.Client") as MockClient:
-                MockClient.return_value.__enter__.return_value = mock_client
+                MockClient.return_value = mock_client
                 with pytest.raises(RuntimeError, match="security policy"):
                     backend.generate_response("test prompt")
 
@@ -0,0 +1,173 @@
+"""Tests for the LLM response cache (llm/cache.py) and its LLMManager wiring."""
+
+import threading
+import time
+
+import pytest
+
+from chatty_commander.llm.backends import LLMBackend
+from chatty_commander.llm.cache import ResponseCache, normalize_prompt
+from chatty_commander.llm.manager import LLMManager
+from chatty_commander.obs.metrics import MetricsRegistry
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.model = "test-model"
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def generate_response(self, prompt: str, **kwargs) -> str:
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return f"{prompt}#{n}"
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_backend_info(self):
+        return {"backend": "counting"}
+
+
+def _cache(**kwargs):
+    return ResponseCache(registry=MetricsRegistry(), **kwargs)
+
+
+def _manager(backend, cache):
+    manager = LLMManager(use_mock=True, response_cache=cache)
+    manager.backends["ollama"] = backend
+    manager.active_backend = backend
+    return manager
+
+
+def test_key_normalizes_whitespace_and_param_order():
+    a = ResponseCache.make_key("ollama", "m", "turn  on\nlights ", {"a": 1, "b": 2})
+    b = ResponseCache.make_key("ollama", "m", "turn on lights", {"b": 2, "a": 1})
+    assert a == b
+    assert a != ResponseCache.make_key("openai", "m", "turn on lights", {"a": 1, "b": 2})
+    assert a != ResponseCache.make_key("ollama", "m", "turn on lights", {"a": 1})
+    assert normalize_prompt("  x \t y ") == "x y"
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = _cache(max_entries=2, ttl=10.0)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # refresh "a"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    now = time.time()
+    monkeypatch.setattr("chatty_commander.llm.cache.time.time", lambda: now + 11)
+    assert cache.get("a") is None
+
+
+def test_manager_serves_repeat_prompt_from_cache():
+    backend = CountingBackend()
+    registry = MetricsRegistry()
+    manager = _manager(backend, ResponseCache(registry=registry))
+
+    first = manager.generate_response("hello", temperature=0.3)
+    assert manager.generate_response("hello ", temperature=0.3) == first
+    assert backend.calls == 1
+    # Different params and explicit opt-out both reach the backend.
+    manager.generate_response("hello", temperature=0.9)
+    manager.generate_response("hello", temperature=0.3, cache=False)
+    assert backend.calls == 3
+
+    labels = {"backend": "ollama"}
+    assert registry.counter("llm_cache_hits_total").get(labels) == 1
+    assert registry.counter("llm_cache_misses_total").get(labels) == 2
+
+
+def test_concurrent_identical_requests_coalesce():
+    backend = CountingBackend(delay=0.2)
+    registry = MetricsRegistry()
+    manager = _manager(backend, ResponseCache(registry=registry))
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.generate_response("q")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert backend.calls == 1
+    assert results == ["q#1"] * 5
+    assert registry.counter("llm_cache_coalesced_total").get({"backend": "ollama"}) == 4
+
+
+def test_failures_are_not_cached():
+    backend = CountingBackend(fail=True)
+    cache = _cache()
+    manager = _manager(backend, cache)
+    manager.backends.pop("mock")  # no fallback available
+    with pytest.raises(RuntimeError):
+        manager.generate_response("x")
+    assert cache.stats()["entries"] == 0
+    backend.fail = False
+    assert manager.generate_response("x") == "x#2"
+
+
+def test_fallback_replies_are_not_cached_under_the_failed_backend():
+    backend = CountingBackend(fail=True)
+    cache = _cache()
+    manager = _manager(backend, cache)
+    manager.backends["local"] = CountingBackend()
+    assert manager.generate_response("x") == "x#1"  # answered by "local"
+    assert cache.stats()["entries"] == 0
+
+    backend.fail = False
+    manager.active_backend = backend
+    assert manager.generate_response("x") == "x#2"
+    assert backend.calls == 2
+    assert manager.generate_response("x") == "x#2"  # now cached
+    assert backend.calls == 2
+
+
+def test_streamed_fallback_replies_are_not_cached():
+    class Streaming(CountingBackend):
+        def generate_stream(self, prompt, **kwargs):
+            yield self.generate_response(prompt, **kwargs)
+
+    backend = Streaming(fail=True)
+    cache = _cache()
+    manager = _manager(backend, cache)
+    manager.backends["local"] = Streaming()
+    assert "".join(manager.generate_stream("x")) == "x#1"
+    assert cache.stats()["entries"] == 0
+
+
+def test_mock_backend_is_not_cached():
+    manager = LLMManager(use_mock=True, response_cache=_cache())
+    responses = {manager.generate_response("same") for _ in range(3)}
+    assert len(responses) > 1
+
+
+def test_persistence_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    first = _cache(persist_path=path)
+    first.set("k", "v")
+    second = _cache(persist_path=path)
+    assert second.stats()["persistent"] is True
+    assert second.get("k") == "v"
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_TTL", "0")
+    assert ResponseCache.from_env() is None
+    monkeypatch.setenv("LLM_CACHE_TTL", "60")
+    monkeypatch.setenv("LLM_CACHE_SIZE", "8")
+    cache = ResponseCache.from_env()
+    assert cache is not None and cache.max_entries == 8 and cache.ttl == 60.0
@@ -0,0 +1,281 @@
+"""Tests for circuit breakers, hedging and latency routing (llm/health.py)."""
+
+import threading
+import time
+
+import pytest
+
+from chatty_commander.llm.backends import LLMBackend
+from chatty_commander.llm.health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BackendHealth,
+    CircuitBreaker,
+    RollingWindow,
+)
+from chatty_commander.llm.manager import LLMManager
+from chatty_commander.obs.metrics import MetricsRegistry
+
+
+class FakeBackend(LLMBackend):
+    def __init__(self, reply="ok", delay=0.0, fail=False):
+        self.model = "m"
+        self.reply = reply
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _begin(self):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.reply} down")
+
+    def generate_response(self, prompt, **kwargs):
+        self._begin()
+        return self.reply
+
+    def generate_stream(self, prompt, **kwargs):
+        self._begin()
+        yield self.reply
+        yield "!"
+
+    def is_available(self):
+        return True
+
+    def get_backend_info(self):
+        return {"backend": self.reply}
+
+
+def _manager(registry=None, **backends):
+    health = BackendHealth(
+        registry=registry or MetricsRegistry(), failure_threshold=2, reset_timeout=60
+    )
+    manager = LLMManager(
+        use_mock=True,
+        response_cache=None,
+        health=health,
+        routing=backends.pop("routing", None),
+        hedge_delay=backends.pop("hedge_delay", None),
+    )
+    manager.response_cache = None
+    manager.backends.update(backends)
+    first = next(n for n in ("openai", "ollama", "local") if n in backends)
+    manager.active_backend = backends[first]
+    return manager
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("chatty_commander.llm.health.time.monotonic", lambda: now[0])
+    transitions = []
+    breaker = CircuitBreaker(
+        "b",
+        failure_threshold=2,
+        reset_timeout=10,
+        on_transition=lambda *t: transitions.append(t[1:]),
+    )
+    breaker.record_failure(1.0)
+    assert breaker.state == CLOSED
+    breaker.record_failure(1.0)
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    now[0] += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # one trial at a time
+    breaker.record_failure(1.0)
+    assert breaker.state == OPEN
+
+    now[0] += 10
+    assert breaker.allow() is True
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert transitions == [
+        (CLOSED, OPEN),
+        (OPEN, HALF_OPEN),
+        (HALF_OPEN, OPEN),
+        (OPEN, HALF_OPEN),
+        (HALF_OPEN, CLOSED),
+    ]
+
+
+def test_breaker_opens_on_window_error_rate():
+    breaker = CircuitBreaker(
+        "b", failure_threshold=100, error_rate_threshold=0.5, min_calls=4
+    )
+    for ok in (True, False, True, False):
+        (breaker.record_success if ok else breaker.record_failure)(0.1)
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["error_rate"] == 0.5
+
+
+def test_rolling_window_quantiles_ignore_failures_and_old_samples(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("chatty_commander.llm.health.time.monotonic", lambda: now[0])
+    window = RollingWindow(size=10, horizon=5)
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        window.record(latency, True)
+    window.record(9.0, False)
+    assert window.latency(0.5) == 0.3
+    assert window.latency(0.95) == 0.4
+    now[0] = 6.0
+    assert window.latency() is None
+    assert window.count() == 0
+
+
+def test_open_circuit_skips_backend_without_calling_it():
+    registry = MetricsRegistry()
+    broken = FakeBackend("openai", fail=True)
+    good = FakeBackend("ollama")
+    manager = _manager(registry, openai=broken, ollama=good)
+
+    for _ in range(2):
+        manager.active_backend = broken
+        assert manager.generate_response("q") == "ollama"
+    assert manager.get_health()["openai"]["state"] == OPEN
+
+    manager.active_backend = broken
+    assert manager.generate_response("q") == "ollama"
+    assert broken.calls == 2
+    text = registry.to_prometheus()
+    assert 'llm_circuit_state{backend="openai"} 2' in text
+    assert "llm_circuit_rejected_total" in text
+    assert (
+        'llm_circuit_transitions_total{backend="openai",from_state="closed",'
+        'to_state="open"} 1' in text
+    )
+
+
+def test_hedged_request_is_answered_by_the_faster_backend():
+    registry = MetricsRegistry()
+    slow = FakeBackend("openai", delay=1.0)
+    fast = FakeBackend("ollama", delay=0.01)
+    manager = _manager(registry, openai=slow, ollama=fast, hedge_delay=0.05)
+
+    t0 = time.perf_counter()
+    assert manager.generate_response("q", hedge=True) == "ollama"
+    assert time.perf_counter() - t0 < 0.5
+    assert manager.health.hedges.get() == 1
+    assert manager.health.hedge_wins.get() == 1
+    # A hedge win answers this request only; the primary stays active.
+    assert manager.get_active_backend_name() == "openai"
+
+
+def test_hedge_win_does_not_reroute_later_requests():
+    slow = FakeBackend("openai", delay=0.3)
+    fast = FakeBackend("ollama")
+    manager = _manager(openai=slow, ollama=fast, hedge_delay=0.05)
+    assert manager.generate_response("q", hedge=True) == "ollama"
+    slow.delay = 0
+    for _ in range(4):
+        assert manager.generate_response("q") == "openai"
+    assert fast.calls == 1
+    assert slow.calls == 5
+
+
+def test_hedge_is_not_sent_when_primary_is_quick():
+    fast = FakeBackend("openai")
+    other = FakeBackend("ollama")
+    manager = _manager(openai=fast, ollama=other, hedge_delay=0.5)
+    assert manager.generate_response("q", hedge=True) == "openai"
+    assert other.calls == 0
+    assert manager.health.hedges.get() == 0
+
+
+def test_hedged_stream_streams_from_first_backend_to_produce_output():
+    slow = FakeBackend("openai", delay=1.0)
+    fast = FakeBackend("ollama", delay=0.01)
+    manager = _manager(openai=slow, ollama=fast, hedge_delay=0.05)
+    t0 = time.perf_counter()
+    assert list(manager.generate_stream("q", hedge=True)) == ["ollama", "!"]
+    assert time.perf_counter() - t0 < 0.5
+    assert manager.health.hedge_wins.get() == 1
+
+
+def test_hedged_stream_falls_through_when_primary_fails():
+    broken = FakeBackend("openai", fail=True)
+    good = FakeBackend("ollama")
+    manager = _manager(openai=broken, ollama=good, hedge_delay=5)
+    t0 = time.perf_counter()
+    assert "".join(manager.generate_stream("q", hedge=True)) == "ollama!"
+    assert time.perf_counter() - t0 < 1
+
+
+def _half_open(manager, name):
+    for _ in range(2):
+        manager.health.record(name, 1.0, ok=False)
+    manager.health.breaker(name).reset_timeout = 0
+    assert manager.get_health()[name]["state"] == HALF_OPEN
+
+
+def test_losing_hedge_stream_releases_half_open_trial():
+    slow = FakeBackend("openai", delay=0.3)
+    fast = FakeBackend("ollama")
+    manager = _manager(openai=slow, ollama=fast, hedge_delay=0.05)
+    _half_open(manager, "openai")
+    assert list(manager.generate_stream("q", hedge=True)) == ["ollama", "!"]
+    deadline = time.monotonic() + 5
+    while not manager.health.available("openai"):
+        assert time.monotonic() < deadline, "half-open trial never released"
+        time.sleep(0.01)
+    assert manager.get_health()["openai"]["state"] == HALF_OPEN
+
+
+def test_abandoned_stream_releases_half_open_trial():
+    backend = FakeBackend("openai")
+    manager = _manager(openai=backend, ollama=FakeBackend("ollama"))
+    _half_open(manager, "openai")
+    stream = manager.generate_stream("q")
+    assert next(stream) == "openai"
+    assert not manager.health.available("openai")
+    stream.close()
+    assert manager.health.available("openai")
+
+
+def test_fastest_routing_prefers_lowest_recent_latency():
+    a = FakeBackend("openai")
+    b = FakeBackend("ollama")
+    manager = _manager(openai=a, ollama=b, routing="fastest")
+    manager.health.record("openai", 0.8, ok=True)
+    manager.health.record("ollama", 0.1, ok=True)
+    assert manager.generate_response("q") == "ollama"
+    assert list(manager.generate_stream("q")) == ["ollama", "!"]
+    # Routing is per request; the active backend is not rewritten.
+    assert manager.get_active_backend_name() == "openai"
+    assert a.calls == 0
+
+
+def test_fastest_routing_respects_preferred_backend():
+    a = FakeBackend("openai")
+    b = FakeBackend("ollama")
+    manager = _manager(openai=a, ollama=b, routing="fastest")
+    manager.preferred_backend = "openai"
+    manager.health.record("openai", 0.8, ok=True)
+    manager.health.record("ollama", 0.1, ok=True)
+    assert manager.generate_response("q") == "openai"
+    for _ in range(2):
+        manager.health.record("openai", 1.0, ok=False)
+    assert manager.generate_response("q") == "ollama"
+
+
+def test_refresh_resets_tripped_circuits():
+    broken = FakeBackend("openai", fail=True)
+    manager = _manager(openai=broken, ollama=FakeBackend("ollama"))
+    for _ in range(2):
+        manager.health.record("openai", 1.0, ok=False)
+    assert manager.get_health()["openai"]["state"] == OPEN
+    manager.refresh_backends()
+    assert manager.get_health()["openai"]["state"] == CLOSED
+
+
+@pytest.mark.parametrize("mode", ["bogus", None])
+def test_unknown_routing_falls_back_to_priority(mode, monkeypatch):
+    monkeypatch.setenv("LLM_ROUTING", "bogus")
+    manager = LLMManager(use_mock=True, response_cache=None, routing=mode)
+    assert manager.routing == "priority"
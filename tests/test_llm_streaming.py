@@ -0,0 +1,226 @@
+"""Tests for end-to-end LLM token streaming into TTS."""
+
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from chatty_commander.advisors.service import AdvisorMessage, AdvisorsService
+from chatty_commander.app.command_executor import CommandExecutor
+from chatty_commander.llm.backends import LLMBackend, MockLLMBackend, OllamaBackend
+from chatty_commander.llm.cache import ResponseCache
+from chatty_commander.llm.manager import LLMManager
+from chatty_commander.obs.metrics import MetricsRegistry
+from chatty_commander.voice.tts import SentenceChunker, TextToSpeech, iter_sentences
+
+
+class StreamingBackend(LLMBackend):
+    def __init__(self, fragments, fail_after=None):
+        self.fragments = fragments
+        self.fail_after = fail_after
+        self.streams = 0
+
+    def generate_stream(self, prompt, **kwargs):
+        self.streams += 1
+        for i, fragment in enumerate(self.fragments):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield fragment
+
+    def generate_response(self, prompt, **kwargs):
+        return "".join(self.generate_stream(prompt, **kwargs)).strip()
+
+    def is_available(self):
+        return True
+
+    def get_backend_info(self):
+        return {"backend": "streaming"}
+
+
+def _manager(backend, name="ollama", cache=None):
+    manager = LLMManager(use_mock=True, response_cache=cache)
+    manager.backends[name] = backend
+    manager.active_backend = backend
+    return manager
+
+
+class TestSentenceChunker:
+    def test_emits_sentences_as_punctuation_arrives(self):
+        chunker = SentenceChunker(min_chars=5)
+        assert chunker.feed("Hello there") == []
+        assert chunker.feed(".") == []  # could still be "there.com"
+        assert chunker.feed(" How are") == ["Hello there."]
+        assert chunker.feed(" you? I'm") == ["How are you?"]
+        assert chunker.flush() == "I'm"
+
+    def test_short_sentences_are_merged_and_decimals_kept(self):
+        sentences = list(
+            iter_sentences(["OK. It is 3.5 degrees. ", "Bring a coat."], min_chars=12)
+        )
+        assert sentences == ["OK. It is 3.5 degrees.", "Bring a coat."]
+
+    def test_long_runs_split_at_soft_breaks(self):
+        text = "alpha beta, " * 30
+        sentences = list(iter_sentences([text], max_chars=50))
+        assert all(len(s) <= 50 for s in sentences)
+        assert " ".join(sentences).split() == text.split()
+
+
+class TestBackendStreaming:
+    def test_default_backend_stream_yields_full_response(self):
+        class Plain(LLMBackend):
+            def generate_response(self, prompt, **kwargs):
+                return "whole"
+
+            def is_available(self):
+                return True
+
+            def get_backend_info(self):
+                return {}
+
+        assert list(Plain().generate_stream("x")) == ["whole"]
+
+    def test_mock_backend_streams_words(self):
+        backend = MockLLMBackend(responses=["one two three"])
+        assert list(backend.generate_stream("x")) == ["one", " two", " three"]
+
+    def test_ollama_backend_parses_ndjson(self):
+        body = "\n".join(
+            json.dumps(d)
+            for d in [
+                {"response": "Hel", "done": False},
+                {"response": "lo.", "done": False},
+                {"response": "", "done": True},
+            ]
+        )
+        seen = {}
+
+        def handler(request):
+            seen["payload"] = json.loads(request.content)
+            return httpx.Response(200, text=body)
+
+        backend = OllamaBackend(host="localhost:11434", model="m")
+        backend._available = True
+        real_client = httpx.Client
+        with (
+            patch.object(backend, "_validate_url"),
+            patch(
+                "httpx.Client",
+                lambda *a, **k: real_client(transport=httpx.MockTransport(handler)),
+            ),
+        ):
+            assert list(backend.generate_stream("hi", max_tokens=7)) == ["Hel", "lo."]
+        assert seen["payload"]["stream"] is True
+        assert seen["payload"]["options"]["num_predict"] == 7
+
+
+class TestManagerStreaming:
+    def test_stream_is_cached_after_completion(self):
+        backend = StreamingBackend(["Hi ", "there."])
+        cache = ResponseCache(registry=MetricsRegistry())
+        manager = _manager(backend, cache=cache)
+
+        assert list(manager.generate_stream("q")) == ["Hi ", "there."]
+        assert list(manager.generate_stream("q")) == ["Hi there."]
+        assert manager.generate_response("q") == "Hi there."
+        assert backend.streams == 1
+
+    def test_falls_back_when_stream_fails_before_output(self):
+        manager = _manager(StreamingBackend(["x"], fail_after=0))
+        manager.backends["mock"] = MockLLMBackend(responses=["fallback reply"])
+        assert "".join(manager.generate_stream("q")) == "fallback reply"
+        assert manager.get_active_backend_name() == "mock"
+
+    def test_failure_mid_stream_propagates(self):
+        manager = _manager(StreamingBackend(["a", "b"], fail_after=1))
+        stream = manager.generate_stream("q")
+        assert next(stream) == "a"
+        with pytest.raises(RuntimeError):
+            next(stream)
+
+
+def test_speak_stream_starts_before_generation_finishes():
+    tts = TextToSpeech(backend="mock")
+    first_spoken = threading.Event()
+    original = tts.backend.speak
+
+    def speak(text):
+        original(text)
+        first_spoken.set()
+
+    tts.backend.speak = speak
+    overlap = []
+
+    def fragments():
+        yield "The first sentence is ready. "
+        overlap.append(first_spoken.wait(timeout=2.0))
+        yield "The second one comes later."
+
+    assert tts.speak_stream(fragments()) == (
+        "The first sentence is ready. The second one comes later."
+    )
+    assert overlap == [True]
+    assert tts.backend.spoken == [
+        "The first sentence is ready.",
+        "The second one comes later.",
+    ]
+
+
+def test_speak_stream_reuses_one_speaker_thread():
+    tts = TextToSpeech(backend="mock")
+    speakers = []
+    original = tts.backend.speak
+
+    def speak(text):
+        speakers.append(threading.current_thread())
+        original(text)
+
+    tts.backend.speak = speak
+    for i in range(3):
+        assert tts.speak_stream([f"Stream number {i} is done."]) == (
+            f"Stream number {i} is done."
+        )
+    assert len(speakers) == 3
+    assert len(set(speakers)) == 1
+    assert tts.backend.spoken == [f"Stream number {i} is done." for i in range(3)]
+
+
+def test_voice_chat_streams_into_tts():
+    config = MagicMock()
+    config.model_actions = {"chat": {"action": "voice_chat"}}
+    config.llm_manager = _manager(
+        StreamingBackend(["Sure thing, on it. ", "Lights are now on."])
+    )
+    pipeline = MagicMock()
+    pipeline.transcriber.record_and_transcribe.return_value = "lights please"
+    pipeline.tts = TextToSpeech(backend="mock")
+    config.voice_pipeline = pipeline
+
+    executor = CommandExecutor(config, MagicMock(), MagicMock())
+    assert executor.execute_command("chat") is True
+    assert pipeline.tts.backend.spoken == ["Sure thing, on it.", "Lights are now on."]
+
+
+def test_advisor_reply_streams_chunks():
+    config = {
+        "enabled": True,
+        "providers": {},
+        "context": {
+            "personas": {"general": {"system_prompt": "Be brief."}},
+            "default_persona": "general",
+        },
+    }
+    manager = _manager(StreamingBackend(["Hello", " world"]), name="ollama")
+    with patch(
+        "chatty_commander.llm.manager.get_global_llm_manager", return_value=manager
+    ):
+        service = AdvisorsService(config)
+    chunks = []
+    reply = service.handle_message(
+        AdvisorMessage(platform="discord", channel="c", user="u", text="hi"),
+        on_chunk=chunks.append,
+    )
+    assert chunks == ["Hello", " world"]
+    assert reply.reply == "Hello world"
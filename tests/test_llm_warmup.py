@@ -0,0 +1,141 @@
+"""Tests for deferred backend loading and warmup (llm/warmup.py)."""
+
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chatty_commander.llm import backends as backends_mod
+from chatty_commander.llm.backends import LocalTransformersBackend
+from chatty_commander.llm.manager import LLMManager
+from chatty_commander.llm.warmup import COLD, FAILED, LOADING, WARM, LazyLoader
+from chatty_commander.web.routes.core import include_core_routes
+
+
+@pytest.fixture
+def slow_local(monkeypatch):
+    """LocalTransformersBackend whose model "loads" after ``gate`` is set."""
+    gate = threading.Event()
+    loads = []
+
+    def fake_initialize(self):
+        loads.append(self.model_name)
+        assert gate.wait(5)
+        self._model = MagicMock()
+        self._tokenizer = MagicMock()
+        self._device = "cpu"
+
+    monkeypatch.setattr(backends_mod, "_modules_installed", lambda *names: True)
+    monkeypatch.setattr(LocalTransformersBackend, "_initialize_model", fake_initialize)
+    return gate, loads
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_lazy_loader_runs_once_for_concurrent_callers():
+    gate = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return gate.wait(5)
+
+    loader = LazyLoader(load, name="x")
+    assert loader.state == COLD
+    assert loader.start() is not None
+    assert loader.start() is None
+    waiter = threading.Thread(target=loader.ensure)
+    waiter.start()
+    assert loader.state == LOADING
+    gate.set()
+    waiter.join(5)
+    assert loader.ensure() is True
+    assert loader.state == WARM
+    assert len(calls) == 1
+    assert loader.load_seconds is not None
+
+
+def test_lazy_loader_records_failure():
+    def load():
+        raise RuntimeError("no weights")
+
+    loader = LazyLoader(load)
+    assert loader.ensure() is False
+    assert loader.state == FAILED
+    assert loader.error == "no weights"
+
+
+def test_local_backend_defers_model_load_to_first_use(slow_local):
+    gate, loads = slow_local
+    backend = LocalTransformersBackend(model_name="dummy")
+    assert loads == []
+    assert backend.is_available() is True
+    assert backend.get_backend_info()["state"] == COLD
+
+    gate.set()
+    assert backend.load() is True
+    assert loads == ["dummy"]
+    assert backend.get_backend_info()["state"] == WARM
+
+
+def test_local_backend_is_unavailable_after_failed_load(monkeypatch):
+    monkeypatch.setattr(backends_mod, "_modules_installed", lambda *names: True)
+    monkeypatch.setattr(LocalTransformersBackend, "_initialize_model", lambda self: None)
+    backend = LocalTransformersBackend()
+    assert backend.is_available() is True
+    with pytest.raises(RuntimeError, match="not available"):
+        backend.generate_response("hi")
+    assert backend.load_state == FAILED
+    assert backend.is_available() is False
+
+
+def test_manager_construction_does_not_load_and_warmup_does(slow_local, monkeypatch):
+    gate, loads = slow_local
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(backends_mod.OllamaBackend, "is_available", lambda self: False)
+    manager = LLMManager(response_cache=None, warmup=False)
+    assert manager.get_active_backend_name() == "local"
+    assert loads == []
+    assert manager.get_backend_states()["local"] == COLD
+
+    thread = manager.warmup()
+    assert _wait_for(lambda: manager.get_backend_states()["local"] == LOADING)
+    assert manager.get_backend_info()["state"] == LOADING
+    gate.set()
+    thread.join(5)
+    assert manager.get_backend_states() == {
+        "mock": WARM,
+        "openai": WARM,
+        "ollama": COLD,
+        "local": WARM,
+    }
+    assert loads == ["microsoft/DialoGPT-medium"]
+
+
+def test_health_reports_backend_states():
+    manager = MagicMock()
+    manager.get_backend_states.return_value = {"mock": WARM, "local": LOADING}
+    router = include_core_routes(
+        get_start_time=lambda: 0,
+        get_state_manager=MagicMock(),
+        get_config_manager=lambda: MagicMock(config={}),
+        get_last_command=lambda: None,
+        get_last_state_change=datetime.now,
+        execute_command_fn=lambda x: True,
+        get_llm_manager=lambda: manager,
+    )
+    app = FastAPI()
+    app.include_router(router)
+    body = TestClient(app).get("/health").json()
+    assert body["llm_backends"] == {"mock": WARM, "local": LOADING}
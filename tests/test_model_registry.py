@@ -0,0 +1,172 @@
+"""Tests for lazy, parallel, shared wake-word model loading."""
+
+import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from chatty_commander.app.model_manager import ModelManager
+from chatty_commander.app.model_registry import ModelRegistry
+from chatty_commander.app.state_manager import StateManager
+
+
+class RecordingModel:
+    """Stand-in for wakewords Model that records loads and overlap."""
+
+    lock = threading.Lock()
+    loaded: list[str] = []
+    active = 0
+    peak = 0
+    delay = 0.0
+
+    def __init__(self, path):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.active -= 1
+            cls.loaded.append(os.path.basename(os.path.dirname(path)) + "/" + os.path.basename(path))
+        self.path = path
+
+
+@pytest.fixture
+def model_class():
+    RecordingModel.loaded = []
+    RecordingModel.active = RecordingModel.peak = 0
+    RecordingModel.delay = 0.0
+    with patch(
+        "chatty_commander.app.model_manager._get_patchable_model_class",
+        return_value=RecordingModel,
+    ):
+        yield RecordingModel
+
+
+@pytest.fixture
+def config(tmp_path):
+    dirs = {}
+    for state, names in {
+        "models-idle": ["hey_chat", "hey_computer"],
+        "models-computer": ["okay_stop", "lights"],
+        "models-chatty": ["okay_stop"],
+    }.items():
+        d = tmp_path / state
+        d.mkdir()
+        for name in names:
+            (d / f"{name}.onnx").write_bytes(b"onnx")
+        dirs[state] = str(d)
+    # The chatty "okay_stop" is the same file as the computer one.
+    os.unlink(os.path.join(dirs["models-chatty"], "okay_stop.onnx"))
+    os.symlink(
+        os.path.join(dirs["models-computer"], "okay_stop.onnx"),
+        os.path.join(dirs["models-chatty"], "okay_stop.onnx"),
+    )
+    return SimpleNamespace(
+        default_state="idle",
+        general_models_path=dirs["models-idle"],
+        system_models_path=dirs["models-computer"],
+        chat_models_path=dirs["models-chatty"],
+        state_models={"idle": [], "computer": [], "chatty": []},
+        state_transitions={
+            "idle": {"hey_computer": "computer", "hey_chat": "chatty"},
+            "computer": {"chat_mode": "chatty", "okay_stop": "idle"},
+            "chatty": {"okay_stop": "idle"},
+        },
+        wakeword_state_map={},
+    )
+
+
+def test_startup_loads_only_the_starting_state(config, model_class):
+    mm = ModelManager(config)
+    assert sorted(model_class.loaded) == ["models-idle/hey_chat.onnx", "models-idle/hey_computer.onnx"]
+    assert set(mm.active_models) == {"hey_chat", "hey_computer"}
+    assert mm.models["system"] == {}
+
+    assert set(mm.get_models("computer")) == {"okay_stop", "lights"}
+    assert len(model_class.loaded) == 4
+
+
+def test_files_shared_across_states_load_once(config, model_class):
+    mm = ModelManager(config)
+    mm.reload_models("computer")
+    mm.reload_models("chatty")
+    assert mm.models["chat"]["okay_stop"] is mm.models["system"]["okay_stop"]
+    assert model_class.loaded.count("models-computer/okay_stop.onnx") == 1
+
+
+def test_reload_reuses_unchanged_files_and_picks_up_changes(config, model_class):
+    mm = ModelManager(config)
+    before = mm.models["general"]["hey_chat"]
+    mm.reload_models("idle")
+    assert mm.models["general"]["hey_chat"] is before
+
+    path = os.path.join(config.general_models_path, "hey_chat.onnx")
+    with open(path, "wb") as f:
+        f.write(b"retrained model")
+    mm.reload_models("idle")
+    assert mm.models["general"]["hey_chat"] is not before
+
+
+def test_reload_all_loads_in_parallel(config, model_class):
+    model_class.delay = 0.05
+    mm = ModelManager(config, load_workers=4)
+    mm.reload_models()
+    assert model_class.peak > 1
+    assert set(mm.models["chat"]) == {"okay_stop"}
+
+
+def test_failed_loads_are_skipped_and_retried(config, model_class):
+    calls = []
+
+    def flaky(path):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("corrupt")
+        return model_class(path)
+
+    registry = ModelRegistry()
+    result = registry.load_many(["a.onnx"], flaky)
+    assert isinstance(result["a.onnx"], RuntimeError)
+    assert isinstance(registry.load_many(["a.onnx"], flaky)["a.onnx"], model_class)
+    assert registry.stats()["failures"] == 1
+
+
+def test_concurrent_requests_share_one_load(model_class):
+    model_class.delay = 0.05
+    registry = ModelRegistry(max_workers=4)
+    futures = [registry.submit("same.onnx", model_class) for _ in range(5)]
+    instances = {id(f.result()) for f in futures}
+    assert len(instances) == 1
+    assert len(model_class.loaded) == 1
+
+
+def test_state_transitions_prewarm_next_state(config, model_class):
+    mm = ModelManager(config)
+    sm = StateManager(config)
+    mm.attach_state_manager(sm)
+
+    # From computer the first configured target is chatty: prewarm its models.
+    sm.change_state("computer")
+    deadline = time.monotonic() + 2.0
+    while mm.registry.stats()["loads"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "models-chatty/okay_stop.onnx" in model_class.loaded
+    assert mm.models["chat"] == {}  # warmed in the registry, not yet active
+
+    loads = mm.registry.stats()["loads"]
+    mm.reload_models("chatty")
+    assert set(mm.active_models) == {"okay_stop"}
+    assert mm.registry.stats()["loads"] == loads  # served from the prewarm
+
+
+def test_prediction_prefers_observed_transitions(config, model_class):
+    mm = ModelManager(config)
+    assert mm.predict_next_state("idle") == "computer"
+    mm.on_state_change("idle", "chatty")
+    mm.on_state_change("idle", "chatty")
+    mm.on_state_change("idle", "computer")
+    assert mm.predict_next_state("idle") == "chatty"
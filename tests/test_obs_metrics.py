@@ -509,3 +509,88 @@ def test_request_counter_increments_on_handler_exception():
     counter = registry.counter("http_requests_total")
     total = sum(value for _labels, value in counter.samples())
     assert total > 0, "request counter must increment even when handler raises"
+
+
+# ─── Sharded updates, bound children and cached exposition ──────────────────
+
+
+class TestShardedMetrics:
+    def test_counter_merges_thread_shards_including_exited_threads(self):
+        counter = Counter("sharded", "sharded")
+
+        def work():
+            for _ in range(1000):
+                counter.inc(labels={"k": "v"})
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert counter.get({"k": "v"}) == 8000
+        # Dead threads' shards are folded away on read.
+        assert counter._shards._live == []
+        counter.inc(labels={"k": "v"})
+        assert counter.get({"k": "v"}) == 8001
+
+    def test_bound_children_share_series_with_label_dicts(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("bound_total")
+        child = counter.labels(route="/x", method="GET")
+        assert counter.labels({"method": "GET", "route": "/x"}) is child
+
+        child.inc()
+        counter.inc(2, labels={"method": "GET", "route": "/x"})
+        assert child.get() == 3
+
+        gauge = registry.gauge("bound_gauge").labels(region="eu")
+        gauge.set(4.5)
+        assert registry.gauge("bound_gauge").get({"region": "eu"}) == 4.5
+
+    def test_histogram_counts_one_bucket_per_observation(self):
+        hist = MetricsRegistry().histogram(
+            "per_bucket", buckets=HistogramBuckets([0.1, 0.5, 1.0])
+        )
+        child = hist.labels(op="x")
+        for v in [0.1, 0.2, 0.5, 0.7, 3.0, -1.0]:
+            child.observe(v)
+
+        (series,) = hist.snapshot()["series"]
+        # Edge values land in their own bucket (le is inclusive); negatives
+        # clamp to zero.
+        assert series["counts"] == [2, 2, 1, 1]
+        assert series["count"] == 6
+        assert series["sum"] == 0.1 + 0.2 + 0.5 + 0.7 + 3.0
+
+
+class TestExpositionCache:
+    def test_render_is_reused_until_a_metric_changes(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("cached_total", "cached")
+        counter.inc()
+
+        first = registry.to_prometheus()
+        assert registry.to_prometheus() is first
+        assert registry.renders == 1
+
+        counter.inc()
+        second = registry.to_prometheus()
+        assert "cached_total 2" in second
+        assert registry.renders == 2
+
+        registry.gauge("new_gauge").set(1)
+        assert "new_gauge 1.0" in registry.to_prometheus()
+        assert registry.renders == 3
+
+    def test_router_serves_cached_text(self):
+        from fastapi import FastAPI
+
+        registry = MetricsRegistry()
+        registry.histogram("lat", buckets=HistogramBuckets([1.0])).observe(0.5)
+        app = FastAPI()
+        app.include_router(create_metrics_router(registry=registry))
+        client = TestClient(app)
+
+        assert client.get("/metrics/prom").text == client.get("/metrics/prom").text
+        assert registry.renders == 1
@@ -0,0 +1,129 @@
+"""OllamaBackend against a local fake Ollama server (see ``fake_ollama`` in conftest)."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from chatty_commander.llm.backends import OllamaBackend
+from chatty_commander.providers.ollama_provider import OllamaProvider
+
+
+def _backend(fake, **kwargs):
+    return OllamaBackend(host=fake.host, model="test-model", prewarm=False, **kwargs)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_requests_share_one_connection_and_one_url_check(fake_ollama):
+    backend = _backend(fake_ollama)
+    with patch(
+        "chatty_commander.utils.url_validator.is_safe_url", return_value=True
+    ) as is_safe:
+        for _ in range(5):
+            assert backend.generate_response("hi") == "Hello there."
+        assert list(backend.generate_stream("hi")) == ["Hello", " there."]
+    assert is_safe.call_count == 1
+    assert len(fake_ollama.connections) == 1
+    backend.close()
+
+
+def test_availability_is_a_cached_tags_probe(fake_ollama):
+    backend = _backend(fake_ollama, probe_interval=60)
+    assert backend.is_available() is True
+    assert backend.is_available() is True
+    assert fake_ollama.count("GET", "/api/tags") == 1
+    assert fake_ollama.count("POST", "/api/generate") == 0
+    assert backend.get_backend_info()["model_listed"] is True
+    backend.close()
+
+
+def test_keep_alive_is_sent_and_warm_avoids_the_cold_load(fake_ollama):
+    fake_ollama.load_delay = 0.2
+    backend = _backend(fake_ollama, keep_alive="1h")
+    assert backend.warm() is True
+    assert fake_ollama.resident == {"test-model": "1h"}
+
+    t0 = time.perf_counter()
+    backend.generate_response("hi")
+    assert time.perf_counter() - t0 < 0.2
+    assert fake_ollama.cold_loads == 1
+    assert all(
+        body.get("keep_alive") == "1h"
+        for method, path, body in fake_ollama.requests
+        if path == "/api/generate"
+    )
+
+    assert backend.unload() is True
+    assert fake_ollama.resident == {}
+    assert backend.get_backend_info()["warm"] is False
+    backend.close()
+
+
+def test_failure_forces_a_fresh_probe(fake_ollama):
+    backend = _backend(fake_ollama, probe_interval=60)
+    assert backend.is_available() is True
+
+    fake_ollama.status = 503
+    with pytest.raises(RuntimeError, match="503"):
+        backend.generate_response("hi")
+    # The cached "available" was dropped, so this probes and sees the outage.
+    assert backend.is_available() is False
+    assert fake_ollama.count("GET", "/api/tags") == 2
+    assert backend.get_backend_info()["last_error"] == "HTTP 503"
+    backend.close()
+
+
+def test_dead_server_is_noticed_and_recovery_is_seen(fake_ollama):
+    backend = _backend(fake_ollama, probe_interval=0.05)
+    assert backend.is_available() is True
+
+    fake_ollama.status = 503
+    time.sleep(0.06)
+    assert backend.is_available() is False
+
+    fake_ollama.status = 200
+    time.sleep(0.06)
+    assert backend.is_available() is True
+    backend.close()
+
+
+def test_stopped_server_marks_backend_unavailable(fake_ollama):
+    backend = _backend(fake_ollama, probe_interval=60)
+    assert backend.generate_response("hi")
+    fake_ollama.stop()
+    with pytest.raises(Exception):
+        backend.generate_response("hi")
+    assert backend.is_available() is False
+    backend.close()
+
+
+def test_keeper_prewarms_the_model(fake_ollama):
+    backend = _backend(fake_ollama, probe_interval=0.05)
+    backend.start_keeper()
+    try:
+        assert _wait_for(lambda: backend.warmed_at is not None)
+        assert "test-model" in fake_ollama.resident
+        # Re-warming only happens on recovery (or warm_interval), not per probe.
+        assert _wait_for(lambda: fake_ollama.count("GET", "/api/tags") >= 3)
+        assert fake_ollama.count("POST", "/api/generate") == 1
+    finally:
+        backend.close()
+
+
+def test_provider_health_check_does_not_generate(fake_ollama):
+    provider = OllamaProvider(
+        {"ollama_host": f"http://{fake_ollama.host}", "model": "test-model"}
+    )
+    assert provider.health_check() is True
+    assert fake_ollama.count("POST", "/api/generate") == 0
+
+    provider.model = "missing-model"
+    assert provider.health_check() is False
@@ -0,0 +1,139 @@
+"""Tests for prompt assembly in the conversation engine (advisors/prompt_assembly.py)."""
+
+from unittest.mock import Mock, patch
+
+from chatty_commander.advisors import prompt_assembly
+from chatty_commander.advisors.conversation_engine import ConversationEngine
+from chatty_commander.advisors.prompt_assembly import (
+    NO_HISTORY,
+    HistoryWindow,
+    PromptAssembler,
+    estimate_tokens,
+)
+from chatty_commander.advisors.service import AdvisorMessage, AdvisorsService
+
+PERSONA = {"system_prompt": "You are a terse advisor."}
+
+
+def _engine(**prompt_cfg):
+    return ConversationEngine({"prompt": prompt_cfg} if prompt_cfg else {})
+
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hi there!") == 3
+    # Long words count as several tokens.
+    assert estimate_tokens("internationalization") == 4
+
+
+def test_prompt_layout_puts_per_turn_parts_last():
+    engine = _engine()
+    prompt = engine.assemble_prompt("hello there", "u1", PERSONA)
+    assert prompt.prefix.startswith("You are a terse advisor.\n\nINSTRUCTIONS:")
+    assert prompt.prefix.endswith(f"CONVERSATION CONTEXT:\n{NO_HISTORY}")
+    assert "- User Intent: greeting" in prompt.suffix
+    assert prompt.suffix.endswith("User: hello there\n\nAssistant:")
+    assert engine.build_enhanced_prompt("hello there", "u1", PERSONA) == prompt.text
+
+
+def test_default_persona_includes_mode_traits_and_preferences():
+    engine = _engine()
+    engine.update_user_preferences("u1", {"units": "metric"})
+    text = engine.build_enhanced_prompt(
+        "hi", "u1", {"name": "Max", "traits": ["calm"]}, current_mode="computer"
+    )
+    assert text.startswith("You are Max,")
+    assert "PERSONALITY TRAITS: calm" in text
+    assert "CURRENT MODE: computer" in text
+    assert 'USER PREFERENCES: {"units": "metric"}' in text
+
+
+def test_system_segment_is_rendered_once_per_persona_and_mode(monkeypatch):
+    calls = []
+    render = prompt_assembly._render_system
+
+    def counting(persona, mode):
+        calls.append(mode)
+        return render(persona, mode)
+
+    monkeypatch.setattr(prompt_assembly, "_render_system", counting)
+    engine = _engine()
+    for text in ("a", "b", "c"):
+        engine.build_enhanced_prompt(text, "u1", PERSONA, "chatty")
+        engine.build_enhanced_prompt(text, "u2", PERSONA, "computer")
+    assert calls == ["chatty", "computer"]
+
+
+def test_consecutive_prompts_share_a_growing_prefix():
+    engine = _engine()
+    previous = None
+    for i in range(5):
+        prompt = engine.assemble_prompt(f"question {i}", "u1", PERSONA)
+        if previous is not None and i > 1:
+            assert prompt.text.startswith(previous.prefix)
+        engine.record_conversation_turn("u1", f"question {i}", f"answer {i}", {})
+        previous = prompt
+    assert "User: question 3\nAssistant: answer 3" in previous.text
+
+
+def test_history_is_truncated_to_budget_in_steps():
+    window = HistoryWindow(low_water=0.5)
+    for i in range(40):
+        window.add_turn(f"question number {i}", f"answer number {i}")
+    full = window.tokens
+    text = window.render(full // 2)
+    assert window.tokens <= full // 4 + 10
+    assert text.endswith("Assistant: answer number 39")
+    first_line = text.split("\n", 1)[0]
+
+    # Growing back under the budget keeps the same first line (stable prefix).
+    window.add_turn("question 40", "answer 40")
+    assert window.render(full // 2).split("\n", 1)[0] == first_line
+
+
+def test_prompt_stays_within_token_budget():
+    engine = _engine(max_prompt_tokens=400, reserve_tokens=50, history_tokens=1000)
+    for i in range(100):
+        engine.record_conversation_turn("u1", f"tell me about topic {i}", "x " * 20, {})
+    prompt = engine.assemble_prompt("and now?", "u1", PERSONA)
+    assert prompt.tokens <= 350
+    assert estimate_tokens(prompt.text) <= 350 + 20
+
+
+def test_seed_history_only_applies_once_and_clear_forgets():
+    engine = _engine()
+    assert engine.seed_history("u1", [("user", "old q"), ("assistant", "old a")])
+    assert not engine.seed_history("u1", [("user", "ignored")])
+    text = engine.build_enhanced_prompt("new q", "u1", PERSONA)
+    assert "User: old q\nAssistant: old a" in text
+    assert "ignored" not in text
+
+    engine.clear_history("u1")
+    assert not engine.has_history("u1")
+    assert NO_HISTORY in engine.build_enhanced_prompt("new q", "u1", PERSONA)
+
+
+def test_segment_cache_is_bounded():
+    assembler = PromptAssembler(max_cached_segments=2)
+    for mode in ("a", "b", "c"):
+        assembler.system_segment(PERSONA, mode)
+    assert len(assembler._segments) == 2
+
+
+def test_service_seeds_and_reads_one_history_key_regardless_of_platform_case():
+    config = {"enabled": True, "providers": {}, "personas": {"p": "You are p."}}
+    with patch("chatty_commander.advisors.service.build_provider_safe") as build, \
+         patch("chatty_commander.llm.manager.get_global_llm_manager", return_value=None):
+        provider = Mock()
+        provider.generate.return_value = "ok"
+        build.return_value = provider
+        svc = AdvisorsService(config)
+        svc.llm_manager = None
+        svc.memory.add("discord", "ch", "u", "user", "earlier q")
+        svc.handle_message(
+            AdvisorMessage(platform="Discord", channel="ch", user="u", text="now q")
+        )
+    prompt = provider.generate.call_args.args[0]
+    assert "User: earlier q" in prompt
+    assert svc.conversation_engine.has_history("discord:ch:u")
+    assert not svc.conversation_engine.has_history("Discord:ch:u")
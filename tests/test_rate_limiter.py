@@ -0,0 +1,215 @@
+"""Tests for the shared GCRA rate limiter (web/ratelimit.py) and its middleware."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chatty_commander.web.ratelimit import (
+    PolicySet,
+    RateLimiter,
+    RatePolicy,
+    check_all,
+    principal_key,
+)
+from chatty_commander.web.web_mode import RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(clock):
+    return RateLimiter(time_fn=clock, background_eviction=False)
+
+
+def test_decision_headers_follow_budget():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    policy = RatePolicy.per_minute("p", 3)
+
+    first = limiter.hit(policy, "k")
+    assert first.headers() == {
+        "RateLimit-Limit": "3",
+        "RateLimit-Remaining": "2",
+        "RateLimit-Reset": "20",
+        "RateLimit-Policy": "3;w=60",
+    }
+    limiter.hit(policy, "k")
+    limiter.hit(policy, "k")
+    denied = limiter.hit(policy, "k")
+    assert not denied.allowed
+    assert denied.headers()["Retry-After"] == "20"
+    assert denied.headers()["RateLimit-Reset"] == "60"
+
+
+def test_burst_smaller_than_limit_paces_requests():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    policy = RatePolicy("p", limit=10, window=10, burst=2)
+    assert limiter.hit(policy, "k").allowed
+    assert limiter.hit(policy, "k").allowed
+    assert not limiter.hit(policy, "k").allowed
+    clock.now += 1.0
+    assert limiter.hit(policy, "k").allowed
+
+
+def test_policies_have_separate_budgets():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    a, b = RatePolicy.per_minute("a", 1), RatePolicy.per_minute("b", 1)
+    assert limiter.hit(a, "k").allowed
+    assert limiter.hit(b, "k").allowed
+    assert not limiter.hit(a, "k").allowed
+
+
+def test_idle_keys_are_evicted_without_changing_decisions():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    policy = RatePolicy.per_minute("p", 60)
+    for i in range(100):
+        limiter.hit(policy, f"ip-{i}")
+    limiter.hit(policy, "busy")
+    limiter.hit(policy, "busy")
+    clock.now += 1.5  # 1s per request: only "busy" still owes budget
+    assert limiter.evict_idle() == 100
+    assert len(limiter) == 1
+    assert limiter.hit(policy, "busy").remaining == 58
+
+
+def test_hits_evict_idle_keys_incrementally():
+    clock = FakeClock()
+    limiter = RateLimiter(shards=1, time_fn=clock, background_eviction=False)
+    policy = RatePolicy.per_minute("p", 60)
+    for i in range(10):
+        limiter.hit(policy, f"old-{i}")
+    clock.now += 5.0
+    for i in range(5):
+        limiter.hit(policy, f"new-{i}")
+    assert len(limiter) == 5
+
+
+def test_principal_key_hides_raw_secrets():
+    assert principal_key(None, "1.2.3.4") == "ip:1.2.3.4"
+    assert principal_key("ci.s3cret", "1.2.3.4") == "key:ci"
+    hashed = principal_key("legacy-secret", "1.2.3.4")
+    assert hashed.startswith("key:") and "legacy" not in hashed
+
+
+def test_policy_set_resolution():
+    policies = PolicySet.from_config(
+        600,
+        routes={"/api/v1/advisors": 10, "/api": 100, "/bad": "nope"},
+        principals={"key:ci": 6000},
+    )
+    names = [p.name for p in policies.resolve("/api/v1/advisors/message", "ip:x")]
+    assert names == ["global", "route:/api/v1/advisors"]
+    assert [p.name for p in policies.resolve("/health", "key:ci")] == ["principal:key:ci"]
+    assert "/bad" not in policies.routes
+
+
+def test_check_all_reports_tightest_budget():
+    limiter = _limiter(FakeClock())
+    loose, tight = RatePolicy.per_minute("loose", 100), RatePolicy.per_minute("tight", 2)
+    assert check_all(limiter, [loose, tight], "k").policy is tight
+    check_all(limiter, [loose, tight], "k")
+    denied = check_all(limiter, [loose, tight], "k")
+    assert not denied.allowed and denied.policy is tight
+    assert check_all(limiter, [], "k") is None
+
+
+def test_check_all_refunds_earlier_policies_on_denial():
+    limiter = _limiter(FakeClock())
+    shared, tight = RatePolicy.per_minute("shared", 3), RatePolicy.per_minute("tight", 1)
+    assert check_all(limiter, [shared, tight], "k").allowed
+    for _ in range(5):
+        denied = check_all(limiter, [shared, tight], "k")
+        assert not denied.allowed and denied.policy is tight
+    # Only the admitted request was charged against the shared budget.
+    assert limiter.hit(shared, "k").remaining == 1
+
+
+def test_refund_of_a_full_budget_forgets_the_key():
+    limiter = _limiter(FakeClock())
+    policy = RatePolicy.per_minute("p", 5)
+    limiter.hit(policy, "k")
+    limiter.refund(policy, "k")
+    limiter.refund(policy, "other")
+    assert len(limiter) == 0
+
+
+def test_max_keys_caps_tracked_keys():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        shards=4, time_fn=clock, background_eviction=False, max_keys=10
+    )
+    policy = RatePolicy.per_minute("p", 1)
+    for i in range(1000):
+        limiter.hit(policy, f"ip-{i}")
+    assert len(limiter) <= 10
+    # The most recent caller is still tracked and still limited.
+    assert not limiter.hit(policy, "ip-999").allowed
+
+
+def test_max_keys_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(background_eviction=False, max_keys=0)
+
+
+def _app(**kwargs):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.get("/api/slow")
+    def slow():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, **kwargs)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _limits_enabled(monkeypatch):
+    monkeypatch.delenv("CHATTY_DISABLE_RATE_LIMIT", raising=False)
+
+
+def test_middleware_sets_headers_and_limits():
+    client = _app(requests_per_minute=2)
+    resp = client.get("/api/ping")
+    assert resp.headers["RateLimit-Remaining"] == "1"
+    assert resp.headers["X-RateLimit-Remaining"] == "1"
+    assert resp.headers["RateLimit-Policy"] == "2;w=60"
+    client.get("/api/ping")
+    resp = client.get("/api/ping")
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+
+
+def test_middleware_route_and_principal_policies():
+    client = _app(
+        requests_per_minute=100,
+        route_policies={"/api/slow": 1},
+        principal_policies={"key:ci": 1},
+    )
+    assert client.get("/api/slow").status_code == 200
+    assert client.get("/api/slow").status_code == 429
+    assert client.get("/api/ping").status_code == 200
+
+    # Nothing outside this middleware verified the key, so its budget
+    # does not apply.
+    ci = {"X-API-Key": "ci.secret"}
+    assert client.get("/api/ping", headers=ci).status_code == 200
+    assert client.get("/api/ping", headers=ci).status_code == 200
+
+
+def test_middleware_keys_unverified_callers_by_ip():
+    client = _app(requests_per_minute=2)
+    assert client.get("/api/ping", headers={"X-API-Key": "junk-1"}).status_code == 200
+    assert client.get("/api/ping", headers={"X-API-Key": "junk-2"}).status_code == 200
+    assert client.get("/api/ping", headers={"X-API-Key": "junk-3"}).status_code == 429
@@ -8,10 +8,13 @@ self-pruning (driven by a mocked clock, no real sleeps).
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
 
 import pytest
 
 from chatty_commander.web.revocation import (
+    BloomFilter,
     InMemoryRevocationStore,
     RevocationStore,
     SqliteRevocationStore,
@@ -224,3 +227,95 @@ def test_server_selects_revocation_store_from_config(kind, tmp_path):
         assert type(store).__name__ == expected
     finally:
         get_auth_context().reset()
+
+
+# ── bloom filter in front of the sqlite table ──────────────────────────────
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_sqlite_negative_lookup_skips_the_table():
+    store = SqliteRevocationStore(":memory:")
+    store.revoke("revoked", exp=9999999999)
+    conn = store._conn
+    queries: list[str] = []
+    conn.set_trace_callback(queries.append)
+
+    assert store.is_revoked("never-revoked") is False
+    assert queries == []
+    assert store.bloom_skips == 1
+    assert store.is_revoked("revoked") is True
+    assert len(queries) == 1
+
+
+def test_sqlite_bloom_is_seeded_from_existing_rows(tmp_path):
+    path = str(tmp_path / "rev.sqlite3")
+    first = SqliteRevocationStore(path)
+    first.revoke("persisted", exp=9999999999)
+    first.close()
+    second = SqliteRevocationStore(path)
+    assert second.is_revoked("persisted") is True
+
+
+def test_sqlite_bloom_grows_past_capacity():
+    store = SqliteRevocationStore(":memory:", bloom_capacity=4)
+    for i in range(50):
+        store.revoke(f"jti-{i}", exp=9999999999)
+    assert all(store.is_revoked(f"jti-{i}") for i in range(50))
+    assert store._bloom.capacity >= 50
+
+
+def test_sqlite_sees_revocations_from_another_process_after_refresh(tmp_path):
+    path = str(tmp_path / "rev.sqlite3")
+    clock = _Clock()
+    reader = SqliteRevocationStore(path, time_fn=clock, bloom_refresh=5.0)
+    assert reader.is_revoked("shared") is False
+    # A second store on the same file stands in for another process.
+    writer = SqliteRevocationStore(path, time_fn=clock)
+    writer.revoke("shared", exp=9999999999)
+    writer.close()
+
+    assert reader.is_revoked("shared") is False  # filter not yet stale
+    clock.t += 5
+    assert reader.is_revoked("shared") is True
+
+
+def test_sqlite_stale_bloom_is_rebuilt_once_under_contention(monkeypatch):
+    clock = _Clock()
+    store = SqliteRevocationStore(":memory:", time_fn=clock, bloom_refresh=5.0)
+    rebuilds = []
+    real_rebuild = store._rebuild_bloom_locked
+    monkeypatch.setattr(
+        store, "_rebuild_bloom_locked", lambda now: (rebuilds.append(now), real_rebuild(now))
+    )
+    clock.t += 5
+    with store._lock:  # every reader sees the stale filter, then queues here
+        readers = [
+            threading.Thread(target=store.is_revoked, args=("jti",)) for _ in range(8)
+        ]
+        for reader in readers:
+            reader.start()
+        time.sleep(0.05)
+    for reader in readers:
+        reader.join()
+    assert len(rebuilds) == 1
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_revoke_notifies_listeners(kind):
+    store = (
+        InMemoryRevocationStore() if kind == "memory" else SqliteRevocationStore(":memory:")
+    )
+    seen: list[str] = []
+    store.add_listener(seen.append)
+    store.add_listener(seen.append)  # duplicate registration is ignored
+    store.revoke("jti-1", exp=9999999999)
+    store.revoke("", exp=9999999999)
+    assert seen == ["jti-1"]
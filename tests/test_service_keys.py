@@ -30,6 +30,8 @@ scopes to ``request.state``.
 
 from __future__ import annotations
 
+from unittest.mock import patch
+
 import bcrypt
 import pytest
 
@@ -39,6 +41,7 @@ try:
 except ImportError:  # pragma: no cover
     pytest.skip("FastAPI not available", allow_module_level=True)
 
+from chatty_commander.web.middleware import service_keys as sk
 from chatty_commander.web.middleware.auth import AuthMiddleware
 from chatty_commander.web.middleware.service_keys import (
     resolve_service_key_scopes,
@@ -238,3 +241,72 @@ def test_unknown_key_rejected_when_keys_configured():
     )
     r = client.get("/api/echo-scopes", headers={"X-API-Key": "nope"})
     assert r.status_code == 401
+
+
+# ── key IDs + verified-key cache ─────────────────────────────────────────────
+
+
+@pytest.fixture
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(sk, "_VERIFIED_CACHE", sk.VerifiedKeyCache())
+    yield sk._VERIFIED_CACHE
+
+
+def _spec(secret, **extra):
+    return {"key_hash": _hash(secret), "scopes": ["status:read"], "active": True, **extra}
+
+
+def test_key_id_prefix_checks_a_single_hash(_fresh_cache):
+    registry = {f"k{i}": _spec(f"other-{i}", key_id=f"id{i}") for i in range(5)}
+    registry["bridge"] = _spec("id9.secret", key_id="id9")
+    cfg = _Cfg({"service_keys": registry})
+    with patch.object(sk, "_verify_key_hash", wraps=sk._verify_key_hash) as verify:
+        assert resolve_service_key_scopes(cfg, "id9.secret") == ["status:read"]
+    assert verify.call_count == 1
+
+
+def test_verified_key_is_cached_without_plaintext(_fresh_cache):
+    cfg = _Cfg({"service_keys": {"bridge": _spec("bridge-secret")}})
+    assert resolve_service_key_scopes(cfg, "bridge-secret") == ["status:read"]
+    with patch.object(sk, "_verify_key_hash") as verify:
+        assert resolve_service_key_scopes(cfg, "bridge-secret") == ["status:read"]
+    verify.assert_not_called()
+    stored = list(_fresh_cache._entries)
+    assert stored and all(b"bridge-secret" not in d for d in stored)
+
+
+def test_cached_key_rejected_after_revocation_or_rotation(_fresh_cache):
+    spec = _spec("bridge-secret")
+    cfg = _Cfg({"service_keys": {"bridge": spec}})
+    assert resolve_service_key_scopes(cfg, "bridge-secret") is not None
+
+    spec["active"] = False
+    assert resolve_service_key_scopes(cfg, "bridge-secret") is None
+
+    spec["active"] = True
+    spec["key_hash"] = _hash("rotated-secret")
+    assert resolve_service_key_scopes(cfg, "bridge-secret") is None
+    assert resolve_service_key_scopes(cfg, "rotated-secret") == ["status:read"]
+
+
+def test_explicit_invalidation_and_ttl(_fresh_cache, monkeypatch):
+    cfg = _Cfg({"service_keys": {"bridge": _spec("s1"), "other": _spec("s2")}})
+    resolve_service_key_scopes(cfg, "s1")
+    resolve_service_key_scopes(cfg, "s2")
+    assert sk.invalidate_service_key_cache("bridge") == 1
+    assert len(_fresh_cache) == 1
+
+    now = sk.time.monotonic()
+    monkeypatch.setattr(sk.time, "monotonic", lambda: now + 301)
+    assert _fresh_cache.get(_fresh_cache.digest("s2")) is None
+
+
+def test_mint_service_key_round_trip(_fresh_cache):
+    plaintext, key_id, key_hash = sk.mint_service_key("bridge01")
+    assert plaintext.startswith("bridge01.")
+    cfg = _Cfg(
+        {"service_keys": {"bridge": {"key_id": key_id, "key_hash": key_hash, "active": True}}}
+    )
+    assert resolve_service_key_scopes(cfg, plaintext) == []
+    with pytest.raises(ValueError):
+        sk.mint_service_key("bad.id")
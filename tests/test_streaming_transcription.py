@@ -0,0 +1,178 @@
+"""Tests for streaming, VAD-segmented transcription (voice/streaming.py)."""
+
+import math
+import struct
+import threading
+from unittest.mock import patch
+
+import chatty_commander.voice.streaming as smod
+from chatty_commander.voice.streaming import (
+    PartialTranscript,
+    StreamingTranscriber,
+    chunk_rms,
+)
+from chatty_commander.voice.transcription import (
+    TranscriptionBackend,
+    VoiceTranscriber,
+)
+
+RATE = 16000
+CHUNK = 1600  # 100ms
+
+
+def _tone(seconds: float, amplitude: int = 8000) -> list[bytes]:
+    chunks = []
+    for _ in range(int(seconds * 10)):
+        samples = [
+            int(amplitude * math.sin(2 * math.pi * 440 * i / RATE))
+            for i in range(CHUNK)
+        ]
+        chunks.append(struct.pack(f"<{CHUNK}h", *samples))
+    return chunks
+
+
+def _silence(seconds: float) -> list[bytes]:
+    return [b"\x00\x00" * CHUNK for _ in range(int(seconds * 10))]
+
+
+class RecordingBackend(TranscriptionBackend):
+    """Returns one word per segment and records segment sizes."""
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.segments: list[int] = []
+
+    def transcribe(self, audio_data: bytes, sample_rate: int = 16000) -> str:
+        self.segments.append(len(audio_data))
+        return self.words[len(self.segments) - 1]
+
+    def is_available(self) -> bool:
+        return True
+
+
+def test_chunk_rms_silence_and_tone():
+    assert chunk_rms(b"") == 0.0
+    assert chunk_rms(_silence(0.1)[0]) == 0.0
+    assert chunk_rms(_tone(0.1)[0]) > 5000
+
+
+def test_chunk_rms_pure_python_fallback_matches_numpy():
+    chunk = _tone(0.1)[0]
+    expected = chunk_rms(chunk)
+    with patch.object(smod, "np", None):
+        assert abs(chunk_rms(chunk) - expected) < 1.0
+
+
+def test_splits_at_pauses_and_emits_partials():
+    backend = RecordingBackend(["turn on", "the lights"])
+    partials: list[PartialTranscript] = []
+    streamer = StreamingTranscriber(
+        backend, sample_rate=RATE, segment_silence=0.3, on_partial=partials.append
+    )
+
+    audio = _tone(0.5) + _silence(0.4) + _tone(0.5) + _silence(1.2)
+    result = streamer.transcribe_stream(audio)
+
+    assert result == "turn on the lights"
+    assert len(backend.segments) == 2
+    assert [p.text for p in partials] == [
+        "turn on",
+        "turn on the lights",
+        "turn on the lights",
+    ]
+    assert partials[-1].is_final and not partials[0].is_final
+
+
+def test_stops_at_endpoint_without_consuming_rest():
+    backend = RecordingBackend(["hello"])
+    consumed = []
+
+    def source():
+        for chunk in _tone(0.3) + _silence(1.5) + _tone(2.0):
+            consumed.append(chunk)
+            yield chunk
+
+    result = StreamingTranscriber(backend, sample_rate=RATE).transcribe_stream(
+        source()
+    )
+    assert result == "hello"
+    # 0.3s speech + 1.0s silence timeout; the trailing tone is never read.
+    assert len(consumed) == 13
+
+
+def test_pre_roll_is_prepended_to_segment():
+    backend = RecordingBackend(["hi"])
+    streamer = StreamingTranscriber(backend, sample_rate=RATE, pre_roll=0.2)
+    streamer.transcribe_stream(_silence(0.5) + _tone(0.3) + _silence(1.0))
+    # 0.2s pre-roll + 0.3s speech + trailing silence up to the split
+    assert backend.segments[0] >= (2 + 3) * CHUNK * 2
+
+
+def test_first_segment_transcribed_while_still_capturing():
+    started = threading.Event()
+
+    class SlowBackend(RecordingBackend):
+        def transcribe(self, audio_data, sample_rate=16000):
+            started.set()
+            return super().transcribe(audio_data, sample_rate)
+
+    backend = SlowBackend(["a", "b"])
+    seen_during_capture = []
+
+    def source():
+        for chunk in _tone(0.5) + _silence(0.4):
+            yield chunk
+        # Worker thread should pick up the first segment before capture ends.
+        seen_during_capture.append(started.wait(timeout=2.0))
+        for chunk in _tone(0.5) + _silence(1.0):
+            yield chunk
+
+    result = StreamingTranscriber(backend, sample_rate=RATE).transcribe_stream(
+        source()
+    )
+    assert seen_during_capture == [True]
+    assert result == "a b"
+
+
+def test_backend_error_in_segment_is_skipped():
+    class FlakyBackend(RecordingBackend):
+        def transcribe(self, audio_data, sample_rate=16000):
+            if not self.segments:
+                self.segments.append(len(audio_data))
+                raise RuntimeError("decode fail")
+            return super().transcribe(audio_data, sample_rate)
+
+    backend = FlakyBackend(["unused", "lights"])
+    audio = _tone(0.5) + _silence(0.4) + _tone(0.5) + _silence(1.0)
+    assert StreamingTranscriber(backend, sample_rate=RATE).transcribe_stream(audio) == "lights"
+
+
+def test_voice_transcriber_transcribe_stream_uses_its_settings():
+    transcriber = VoiceTranscriber(
+        backend="mock", responses=["open browser"], silence_timeout=0.5
+    )
+    result = transcriber.transcribe_stream(_tone(0.4) + _silence(0.6))
+    assert result == "open browser"
+    assert transcriber.get_backend_info()["streaming"] is False
+
+
+def test_voice_transcriber_streaming_mode_reads_microphone_chunks():
+    transcriber = VoiceTranscriber(
+        backend="mock", responses=["hello"], streaming=True
+    )
+    partials = []
+    closed = []
+
+    def fake_mic():
+        try:
+            yield from _tone(0.4) + _silence(1.2)
+        finally:
+            closed.append(True)
+
+    with (
+        patch("chatty_commander.voice.transcription.AUDIO_DEPS_AVAILABLE", True),
+        patch.object(transcriber, "_iter_microphone_chunks", return_value=fake_mic()),
+    ):
+        assert transcriber.record_and_transcribe(on_partial=partials.append) == "hello"
+    assert closed == [True]
+    assert partials[-1].is_final
@@ -0,0 +1,61 @@
+"""Tests for shared keyword matching (advisors/text_features.py)."""
+
+from unittest.mock import patch
+
+from chatty_commander.advisors.conversation_engine import ConversationEngine
+from chatty_commander.advisors.text_features import (
+    Lexicon,
+    TextFeatures,
+    extract_features,
+    tokenize,
+)
+from chatty_commander.ai.intelligence_core import IntelligenceCore
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert tokenize("Hello, World!  it's") == ("hello", "world", "it", "s")
+    assert tokenize("  \t") == ()
+
+
+def test_extract_features_is_memoized_per_text():
+    first = extract_features("switch to computer mode")
+    assert extract_features("switch to computer mode") is first
+    assert first.words == {"switch", "to", "computer", "mode"}
+    assert first.normalized == "switch to computer mode"
+
+
+def test_lexicon_matches_whole_words_and_phrases():
+    lexicon = Lexicon(["do", "go to", "good morning"])
+    assert lexicon.matches(TextFeatures.from_text("Do it"))
+    assert not lexicon.matches(TextFeatures.from_text("open the window"))
+    assert lexicon.matches(TextFeatures.from_text("go   to\tidle"))
+    assert lexicon.matches(TextFeatures.from_text("Good morning!"))
+    assert not lexicon.matches(TextFeatures.from_text("ago together"))
+    assert not lexicon.matches(TextFeatures.from_text("good mornings"))
+
+
+def test_lexicon_counts_distinct_entries():
+    lexicon = Lexicon(["good", "great", "see you"])
+    features = TextFeatures.from_text("good good great, see you, see you")
+    assert lexicon.count(features) == 3
+
+
+def test_recorded_turn_carries_features_and_labels():
+    engine = ConversationEngine({})
+    engine.record_conversation_turn("u1", "I love this, great work", "thanks", {})
+    turn = engine.conversation_history["u1"][-1]
+    assert turn.features is extract_features("I love this, great work")
+    assert turn.sentiment == "positive"
+    assert turn.intent == "general_conversation"
+
+
+def test_intelligence_core_intents_use_word_boundaries():
+    with patch("chatty_commander.ai.intelligence_core.create_enhanced_voice_processor"):
+        with patch("chatty_commander.ai.intelligence_core.AdvisorsService"):
+            with patch("chatty_commander.ai.intelligence_core.StateManager"):
+                core = IntelligenceCore({})
+    # Substrings of "do" / "hi" no longer fire.
+    assert core._analyze_intent("open the window") == "conversation"
+    assert core._analyze_intent("this is nice") == "conversation"
+    assert core._analyze_intent("go to idle") == "mode_switch"
+    assert core._analyze_intent("turn the lights on") == "lights_on"
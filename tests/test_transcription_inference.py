@@ -0,0 +1,260 @@
+"""Tests for the shared, batched transcription service (voice/inference.py)."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chatty_commander.voice import inference
+from chatty_commander.voice.inference import (
+    TranscriptionOverloadError,
+    TranscriptionPriority,
+    TranscriptionService,
+    shared_whisper_service,
+)
+
+LIVE = TranscriptionPriority.LIVE
+INTERACTIVE = TranscriptionPriority.INTERACTIVE
+BACKGROUND = TranscriptionPriority.BACKGROUND
+
+
+def _audio(label, seconds=1.0):
+    """Stand-in for float32 samples: a list that remembers its label."""
+
+    class Clip(list):
+        pass
+
+    clip = Clip([0.0] * int(16000 * seconds))
+    clip.label = label
+    return clip
+
+
+class FakeEngine:
+    """Records calls; ``gate`` holds every call until it is set."""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.calls = []
+        self.started = threading.Event()
+        self.lock = threading.Lock()
+
+    def _run(self, kind, audios):
+        self.started.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        with self.lock:
+            self.calls.append((kind, [a.label for a in audios]))
+        return [f"text:{a.label}" for a in audios]
+
+    def transcribe(self, audio):
+        return self._run("single", [audio])[0]
+
+    def transcribe_batch(self, audios):
+        return self._run("batch", audios)
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(engine, **kwargs):
+        service = TranscriptionService(engine, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.close()
+
+
+def test_single_request_uses_full_transcribe(make_service):
+    engine = FakeEngine()
+    service = make_service(engine, workers=1)
+    assert service.transcribe(_audio("a"), LIVE, timeout=5) == "text:a"
+    assert engine.calls == [("single", ["a"])]
+
+
+def test_queued_short_utterances_are_batched(make_service):
+    gate = threading.Event()
+    engine = FakeEngine(gate)
+    service = make_service(engine, workers=1, max_batch=3, batch_window=0)
+    blocker = service.submit(_audio("busy"), BACKGROUND)
+    assert engine.started.wait(5)
+    futures = [service.submit(_audio(str(i)), INTERACTIVE) for i in range(5)]
+    gate.set()
+
+    assert [f.result(5) for f in futures] == [f"text:{i}" for i in range(5)]
+    assert blocker.result(5) == "text:busy"
+    assert engine.calls[1:] == [("batch", ["0", "1", "2"]), ("batch", ["3", "4"])]
+    stats = service.stats()
+    assert stats["largest_batch"] == 3
+    assert stats["batched_jobs"] == 5
+
+
+def test_long_and_mixed_priority_audio_is_not_batched(make_service):
+    gate = threading.Event()
+    engine = FakeEngine(gate)
+    service = make_service(
+        engine, workers=1, max_batch=4, batch_window=0, batch_max_seconds=5
+    )
+    service.submit(_audio("busy"), BACKGROUND)
+    assert engine.started.wait(5)
+    futures = [
+        service.submit(_audio("long", seconds=8), INTERACTIVE),
+        service.submit(_audio("bg"), BACKGROUND),
+        service.submit(_audio("short"), INTERACTIVE),
+    ]
+    gate.set()
+    for f in futures:
+        f.result(5)
+    assert engine.calls[1:] == [
+        ("single", ["long"]),
+        ("single", ["short"]),
+        ("single", ["bg"]),
+    ]
+
+
+def test_live_requests_jump_the_queue(make_service):
+    gate = threading.Event()
+    engine = FakeEngine(gate)
+    service = make_service(engine, workers=1, max_batch=1)
+    service.submit(_audio("busy"), BACKGROUND)
+    assert engine.started.wait(5)
+    later = [service.submit(_audio(f"bg{i}"), BACKGROUND) for i in range(2)]
+    live = service.submit(_audio("live"), LIVE)
+    gate.set()
+    live.result(5)
+    for f in later:
+        f.result(5)
+    assert [labels for _, labels in engine.calls] == [
+        ["busy"],
+        ["live"],
+        ["bg0"],
+        ["bg1"],
+    ]
+
+
+def test_one_worker_is_reserved_for_live_requests(make_service):
+    gate = threading.Event()
+    engine = FakeEngine(gate)
+    service = make_service(engine, workers=2, max_batch=1)
+    service.submit(_audio("bg0"), BACKGROUND)
+    service.submit(_audio("bg1"), BACKGROUND)
+    assert engine.started.wait(5)
+    time.sleep(0.05)
+    # Only one background job may run; the other worker stays free.
+    assert service.stats()["pending"] == 1
+
+    engine.gate = None  # the live request must not wait for the gate
+    assert service.transcribe(_audio("live"), LIVE, timeout=5) == "text:live"
+    gate.set()
+
+
+def test_non_live_requests_are_refused_when_the_queue_is_full(make_service):
+    gate = threading.Event()
+    engine = FakeEngine(gate)
+    service = make_service(engine, workers=1, max_pending=2)
+    service.submit(_audio("busy"), BACKGROUND)
+    assert engine.started.wait(5)
+    service.submit(_audio("a"), BACKGROUND)
+    service.submit(_audio("b"), INTERACTIVE)
+    with pytest.raises(TranscriptionOverloadError) as exc:
+        service.submit(_audio("c"), BACKGROUND)
+    assert exc.value.pending == 2
+    # Live commands are always admitted.
+    live = service.submit(_audio("live"), LIVE)
+    gate.set()
+    assert live.result(5) == "text:live"
+    assert service.stats()["rejected"] == 1
+
+
+def test_engine_errors_reach_every_caller_in_the_batch(make_service):
+    engine = MagicMock()
+    engine.transcribe_batch.side_effect = RuntimeError("boom")
+    gate = threading.Event()
+    engine.transcribe.side_effect = lambda audio: gate.wait(5) and "done"
+    service = make_service(engine, workers=1, batch_window=0)
+    service.submit(_audio("busy"), BACKGROUND)
+    futures = [service.submit(_audio(str(i)), BACKGROUND) for i in range(2)]
+    gate.set()
+    for f in futures:
+        with pytest.raises(RuntimeError, match="boom"):
+            f.result(5)
+
+
+def test_short_batch_result_fails_every_caller(make_service):
+    engine = MagicMock()
+    engine.transcribe_batch.return_value = ["only one"]
+    gate = threading.Event()
+    engine.transcribe.side_effect = lambda audio: gate.wait(5) and "done"
+    service = make_service(engine, workers=1, batch_window=0)
+    service.submit(_audio("busy"), BACKGROUND)
+    futures = [service.submit(_audio(str(i)), BACKGROUND) for i in range(2)]
+    gate.set()
+    for f in futures:
+        with pytest.raises(RuntimeError, match="returned 1 results for"):
+            f.result(5)
+
+
+def test_shared_service_loads_each_model_once(monkeypatch):
+    monkeypatch.setattr(inference, "_services", {})
+    loader = MagicMock(side_effect=[RuntimeError("disk"), "model-a", "model-b"])
+    with pytest.raises(RuntimeError):
+        shared_whisper_service("tiny", loader)
+    first = shared_whisper_service("tiny", loader)
+    assert first is shared_whisper_service("tiny", loader)
+    assert first.model == "model-a"
+    assert shared_whisper_service("base", loader).model == "model-b"
+    assert loader.call_count == 3
+
+
+def test_whisper_local_backends_share_the_service(monkeypatch):
+    import sys
+
+    from chatty_commander.voice import transcription as tmod
+
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(inference, "_services", {})
+    monkeypatch.setattr(tmod, "np", np)
+    fake_model = MagicMock()
+    fake_model.transcribe.return_value = {"text": " hello "}
+    fake_whisper = MagicMock()
+    fake_whisper.load_model.return_value = fake_model
+    monkeypatch.setitem(sys.modules, "whisper", fake_whisper)
+
+    live = tmod.WhisperLocalBackend("tiny", priority=LIVE)
+    background = tmod.WhisperLocalBackend("tiny")
+    assert live._service is background._service
+    assert background.priority == BACKGROUND
+    fake_whisper.load_model.assert_called_once_with("tiny")
+    assert live.transcribe(b"\x00\x00" * 160) == "hello"
+    live._service.close()
+
+
+def test_whisper_engine_never_runs_two_calls_at_once(make_service):
+    inside = threading.Semaphore(1)
+    overlaps = []
+
+    class Model:
+        def transcribe(self, audio):
+            if not inside.acquire(blocking=False):
+                overlaps.append(audio.label)
+                return {"text": ""}
+            time.sleep(0.01)
+            inside.release()
+            return {"text": audio.label}
+
+    service = make_service(inference.WhisperEngine(Model()), workers=2, max_batch=1)
+    futures = [
+        service.submit(_audio(f"c{i}"), priority=LIVE if i % 2 else BACKGROUND)
+        for i in range(6)
+    ]
+    assert sorted(f.result(5) for f in futures) == [f"c{i}" for i in range(6)]
+    assert overlaps == []
+
+
+def test_shared_whisper_service_defaults_to_one_worker(monkeypatch):
+    monkeypatch.setattr(inference, "_services", {})
+    service = shared_whisper_service("tiny", MagicMock(return_value="model"))
+    assert service.workers == 1
@@ -1,5 +1,8 @@
 """Comprehensive tests for TTS backends and TextToSpeech facade."""
 
+import threading
+import time
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -56,6 +59,50 @@ class TestPyttsx3Backend:
         backend = tts.Pyttsx3Backend()
         assert backend.is_available() is False
 
+    def test_engine_calls_are_serialized(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Warmup rendering and speech on other threads never overlap a run loop."""
+
+        class Engine:
+            def __init__(self) -> None:
+                self.running = False
+                self.overlaps = 0
+                self.pending: str | None = None
+
+            def say(self, text: str) -> None:
+                pass
+
+            def save_to_file(self, text: str, path: str) -> None:
+                self.pending = path
+
+            def runAndWait(self) -> None:
+                if self.running:
+                    self.overlaps += 1
+                self.running = True
+                time.sleep(0.002)
+                if self.pending:
+                    Path(self.pending).write_bytes(b"RIFF")
+                    self.pending = None
+                self.running = False
+
+        engine = Engine()
+        monkeypatch.setattr(tts, "pyttsx3", MagicMock(init=lambda: engine))
+        backend = tts.Pyttsx3Backend()
+
+        def render() -> None:
+            for _ in range(20):
+                assert backend.synthesize("hello") == b"RIFF"
+
+        def speak() -> None:
+            for _ in range(20):
+                backend.speak("hi")
+
+        threads = [threading.Thread(target=f) for f in (render, speak, speak)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert engine.overlaps == 0
+
     def test_speak_raises_when_unavailable(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test that speak raises RuntimeError when engine not available."""
         monkeypatch.setattr(tts, "pyttsx3", None)
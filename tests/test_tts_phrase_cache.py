@@ -0,0 +1,136 @@
+"""Tests for the synthesized phrase cache (voice/phrase_cache.py)."""
+
+import os
+import time
+from unittest.mock import Mock
+
+from chatty_commander.voice import tts
+from chatty_commander.voice.phrase_cache import PhraseAudioCache, phrase_key
+from chatty_commander.voice.pipeline import VoicePipeline, confirmation_phrases
+
+
+class RenderingBackend(tts.MockTTSBackend):
+    """Mock backend that can render audio, recording synth and playback calls."""
+
+    audio_format = "wav"
+
+    def __init__(self, voice="default"):
+        super().__init__()
+        self.voice = voice
+        self.synthesized: list[str] = []
+        self.played: list[bytes] = []
+
+    def supports_synthesis(self):
+        return True
+
+    def cache_params(self):
+        return {"backend": "rendering", "voice": self.voice}
+
+    def synthesize(self, text):
+        self.synthesized.append(text)
+        return f"audio:{text}".encode()
+
+    def play_audio(self, audio):
+        self.played.append(audio)
+
+
+def _engine(cache, backend=None):
+    engine = tts.TextToSpeech(backend="mock", cache_phrases=False)
+    engine.backend = backend or RenderingBackend()
+    engine.phrase_cache = cache
+    return engine
+
+
+class TestPhraseAudioCache:
+    def test_key_depends_on_all_params(self):
+        base = phrase_key({"backend": "edge", "voice": "a"}, "hi")
+        assert base == phrase_key({"voice": "a", "backend": "edge"}, "hi")
+        assert base != phrase_key({"backend": "edge", "voice": "b"}, "hi")
+        assert base != phrase_key({"backend": "edge", "voice": "a"}, "hi!")
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        PhraseAudioCache(tmp_path).put("k", b"audio", "mp3")
+        assert (tmp_path / "k.mp3").read_bytes() == b"audio"
+        assert PhraseAudioCache(tmp_path).get("k") == b"audio"
+
+    def test_disk_lru_eviction_by_size(self, tmp_path):
+        cache = PhraseAudioCache(tmp_path, max_disk_bytes=10, max_memory_bytes=0)
+        cache.put("a", b"1234", "wav")
+        cache.put("b", b"1234", "wav")
+        assert cache.get("a") == b"1234"  # "b" is now least recently used
+        cache.put("c", b"1234", "wav")
+        assert sorted(p.stem for p in tmp_path.iterdir()) == ["a", "c"]
+        assert cache.stats()["disk_bytes"] == 8
+
+    def test_restart_evicts_oldest_files_first(self, tmp_path):
+        for i, key in enumerate(["old", "new"]):
+            path = tmp_path / f"{key}.wav"
+            path.write_bytes(b"123456")
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        PhraseAudioCache(tmp_path, max_disk_bytes=8)
+        assert [p.stem for p in tmp_path.iterdir()] == ["new"]
+
+    def test_disk_tier_is_opt_in(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("CHATTY_TTS_CACHE_DIR", raising=False)
+        assert PhraseAudioCache.from_env().cache_dir is None
+        monkeypatch.setenv("CHATTY_TTS_CACHE_DIR", str(tmp_path))
+        assert PhraseAudioCache.from_env().cache_dir == tmp_path
+
+    def test_memory_tier_bounded(self):
+        cache = PhraseAudioCache(max_memory_bytes=6)
+        cache.put("a", b"123")
+        cache.put("b", b"123")
+        cache.put("c", b"123")
+        assert cache.get("a") is None
+        assert cache.get("c") == b"123"
+
+
+class TestTextToSpeechCaching:
+    def test_repeat_phrase_skips_synthesis(self):
+        engine = _engine(PhraseAudioCache())
+        engine.speak("lights on")
+        engine.speak("lights on")
+        assert engine.backend.synthesized == ["lights on"]
+        assert engine.backend.played == [b"audio:lights on"] * 2
+        assert engine.backend.spoken == []
+
+    def test_long_text_is_spoken_directly(self):
+        engine = _engine(PhraseAudioCache())
+        engine.max_cached_chars = 10
+        engine.speak("this reply is far too long to cache")
+        assert engine.backend.synthesized == []
+        assert engine.backend.spoken == ["this reply is far too long to cache"]
+
+    def test_voice_change_misses(self):
+        backend = RenderingBackend()
+        engine = _engine(PhraseAudioCache(), backend)
+        engine.speak("hello")
+        backend.voice = "other"
+        engine.speak("hello")
+        assert backend.synthesized == ["hello", "hello"]
+
+    def test_backend_without_rendering_gets_no_cache(self):
+        engine = tts.TextToSpeech(backend="mock")
+        assert engine.phrase_cache is None
+        assert "phrase_cache" not in engine.get_backend_info()
+
+    def test_warmup_renders_each_phrase_once(self):
+        engine = _engine(PhraseAudioCache())
+        assert engine.warmup(["a", "b", "a"]) == 2
+        assert engine.warmup(["a", "b"]) == 0
+        engine.speak("b")
+        assert engine.backend.synthesized == ["a", "b"]
+
+
+def test_pipeline_warms_confirmations_for_model_actions():
+    config = Mock()
+    config.model_actions = {"lights": {}, "music": {}}
+    pipeline = VoicePipeline(config_manager=config, use_mock=True)
+    pipeline.tts = _engine(PhraseAudioCache())
+
+    pipeline.warm_tts_cache(background=False)
+
+    assert set(pipeline.tts.backend.synthesized) == set(
+        confirmation_phrases(config.model_actions)
+    )
+    assert "Failed to execute music" in pipeline.tts.backend.synthesized
@@ -0,0 +1,160 @@
+"""Tests for per-stage voice pipeline latency tracing."""
+
+import struct
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chatty_commander.obs import tracing
+from chatty_commander.obs.metrics import MetricsRegistry
+from chatty_commander.obs.tracing import VoiceTracer, create_traces_router
+from chatty_commander.voice.pipeline import VoicePipeline
+from chatty_commander.voice.transcription import VoiceTranscriber
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def tracer(registry):
+    return VoiceTracer(capacity=5, registry=registry)
+
+
+def _pipeline(tracer, executor, responses):
+    config = Mock()
+    config.model_actions = {"lights_on": {"action": "custom_message", "message": "on"}}
+    return VoicePipeline(
+        config_manager=config,
+        command_executor=executor,
+        use_mock=True,
+        tts_backend="mock",
+        voice_only=True,
+        tracer=tracer,
+        responses=responses,
+    )
+
+
+def _run_wake(pipeline):
+    pipeline.start()
+    pipeline.trigger_mock_wake_word("hey_jarvis")
+    pipeline._processing_thread.join(timeout=5)
+    pipeline.stop()
+
+
+def test_wake_to_tts_trace_covers_every_stage(tracer, registry):
+    seen = {}
+    executor = Mock()
+
+    def execute(name):
+        seen["trace"] = tracing.current_trace()
+        return True
+
+    executor.execute_command.side_effect = execute
+    pipeline = _pipeline(tracer, executor, ["lights on please"])
+
+    _run_wake(pipeline)
+
+    (trace,) = tracer.recent()
+    assert trace.status == "ok"
+    assert trace.origin == "wake_word"
+    assert trace.attrs["wake_word"] == "hey_jarvis"
+    names = [s["name"] for s in trace.to_dict()["spans"]]
+    assert names == ["wake", "transcription", "matching", "execution", "tts"]
+    # The executor ran with the same trace active.
+    assert seen["trace"] is trace
+    execution = next(s for s in trace.spans if s.name == "execution")
+    assert execution.attrs == {"command": "lights_on", "success": True}
+
+    snap = registry.histogram("voice_stage_seconds").snapshot()
+    stages = {s["labels"]["stage"] for s in snap["series"]}
+    assert {"transcription", "matching", "execution", "tts"} <= stages
+
+
+def test_unmatched_and_failed_utterances_get_their_status(tracer):
+    executor = Mock()
+    executor.execute_command.return_value = False
+    pipeline = _pipeline(tracer, executor, ["mumble", "lights on"])
+
+    _run_wake(pipeline)
+    _run_wake(pipeline)
+
+    failed, unmatched = tracer.recent()
+    assert unmatched.status == "unmatched"
+    assert failed.status == "failed"
+    assert "execution" not in {s.name for s in unmatched.spans}
+
+
+def test_text_commands_are_traced(tracer):
+    executor = Mock()
+    executor.execute_command.return_value = True
+    pipeline = _pipeline(tracer, executor, [])
+
+    assert pipeline.process_text_command("lights on") == "lights_on"
+    (trace,) = tracer.recent()
+    assert trace.origin == "text"
+    assert [s.name for s in trace.spans] == ["matching", "execution", "tts"]
+
+
+def test_vad_endpoint_span_records_trailing_silence(tracer):
+    transcriber = VoiceTranscriber(backend="mock", silence_timeout=0.02)
+    loud = struct.pack("<160h", *([8000] * 160))
+    quiet = bytes(320)
+    chunks = iter([loud] + [quiet] * 50)
+
+    def read_chunk():
+        time.sleep(0.005)
+        return next(chunks, None)
+
+    trace = tracer.start("test")
+    with tracing.activate(trace):
+        transcriber._collect_until_silence(read_chunk)
+
+    (span,) = trace.spans
+    assert span.name == "vad_endpoint"
+    assert span.duration_ms >= 20
+
+
+def test_spans_are_noops_without_an_active_trace():
+    with tracing.span("matching") as attrs:
+        attrs["x"] = 1
+    tracing.add_span("capture", 0.1)
+    assert tracing.current_trace() is None
+
+
+def test_span_records_errors(tracer):
+    trace = tracer.start("test")
+    with pytest.raises(RuntimeError), trace.span("execution"):
+        raise RuntimeError("boom")
+    assert trace.spans[0].error == "RuntimeError: boom"
+
+
+def test_ring_buffer_keeps_most_recent(tracer):
+    for i in range(8):
+        tracer.start("text", n=i).finish()
+    recent = tracer.recent()
+    assert [t.attrs["n"] for t in recent] == [7, 6, 5, 4, 3]
+    assert tracer.stats()["finished"] == 8
+
+
+def test_traces_endpoint(tracer):
+    trace = tracer.start("text")
+    with trace.span("matching"):
+        pass
+    trace.finish("unmatched")
+
+    app = FastAPI()
+    app.include_router(create_traces_router(tracer))
+    client = TestClient(app)
+
+    body = client.get("/api/v1/traces", params={"limit": 1}).json()
+    assert body["traces"][0]["trace_id"] == trace.trace_id
+    assert body["traces"][0]["spans"][0]["name"] == "matching"
+    assert client.get(f"/api/v1/traces/{trace.trace_id}").json()["status"] == (
+        "unmatched"
+    )
+    assert client.get("/api/v1/traces/nope").status_code == 404
@@ -0,0 +1,167 @@
+"""Tests for the single-pass pure-ASGI edge middleware (web/middleware/edge.py)."""
+
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from chatty_commander import __version__ as APP_VERSION
+from chatty_commander.obs.metrics import MetricsRegistry, RequestMetrics
+from chatty_commander.utils.logging_config import get_request_id
+from chatty_commander.web.middleware.auth import ApiKeyAuth
+from chatty_commander.web.middleware.edge import SECURITY_HEADERS, EdgeMiddleware
+from chatty_commander.web.ratelimit import principal_key
+from chatty_commander.web.routes.core import ResponseTimeWindow
+from chatty_commander.web.web_mode import RateLimitGate
+
+
+class _Cfg:
+    def __init__(self, key="secret"):
+        self.auth = {"api_key": key}
+
+
+def _app(rpm=1000, **stages):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/api/v1/status")
+    async def status(request: Request):
+        calls.append(getattr(request.state, "scopes", None))
+        return {"request_id": get_request_id()}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i};"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/banner")
+    async def banner():
+        return PlainTextResponse(
+            "hi", headers={"Server": "leaky", "X-Frame-Options": "SAMEORIGIN"}
+        )
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text(await websocket.receive_text())
+        await websocket.close()
+
+    stages.setdefault("auth", ApiKeyAuth(_Cfg()))
+    stages.setdefault(
+        "rate_limit", RateLimitGate(requests_per_minute=rpm, trusted_proxies=[])
+    )
+    app.add_middleware(EdgeMiddleware, **stages)
+    return app, calls
+
+
+def test_authorized_request_gets_shared_headers_and_scopes(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    app, calls = _app()
+    resp = TestClient(app).get(
+        "/api/v1/status", headers={"X-API-Key": "secret", "X-Request-ID": "rid-1"}
+    )
+    assert resp.status_code == 200
+    # The request ID is bound for the handler and echoed back.
+    assert resp.json() == {"request_id": "rid-1"}
+    assert resp.headers["X-Request-ID"] == "rid-1"
+    assert resp.headers["X-API-Version"] == APP_VERSION
+    for name, value in SECURITY_HEADERS.items():
+        assert resp.headers[name] == value
+    assert resp.headers["RateLimit-Limit"] == resp.headers["X-RateLimit-Limit"]
+    assert calls == [["*"]]
+
+
+def test_missing_key_short_circuits_with_401(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    app, calls = _app()
+    resp = TestClient(app).get("/api/v1/status", headers={"X-Request-ID": "rid-2"})
+    assert resp.status_code == 401
+    assert resp.json()["request_id"] == "rid-2"
+    assert resp.headers["X-Request-ID"] == "rid-2"
+    assert resp.headers["X-Content-Type-Options"] == "nosniff"
+    assert calls == []
+
+
+def test_rate_limit_runs_before_auth(monkeypatch):
+    monkeypatch.delenv("CHATTY_DISABLE_RATE_LIMIT", raising=False)
+    app, calls = _app(rpm=1)
+    client = TestClient(app)
+    assert client.get("/api/v1/status").status_code == 401
+    resp = client.get("/api/v1/status")
+    assert resp.status_code == 429
+    assert "RateLimit-Reset" in resp.headers
+    assert "X-Request-ID" in resp.headers
+    assert calls == []
+
+
+def test_rotating_unverified_keys_share_the_ip_budget(monkeypatch):
+    monkeypatch.delenv("CHATTY_DISABLE_RATE_LIMIT", raising=False)
+    app, _ = _app(rpm=2)
+    client = TestClient(app)
+    statuses = [
+        client.get("/api/v1/status", headers={"X-API-Key": f"guess-{i}"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+
+
+def test_key_budget_applies_once_the_key_is_verified(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    monkeypatch.delenv("CHATTY_DISABLE_RATE_LIMIT", raising=False)
+    gate = RateLimitGate(
+        requests_per_minute=100,
+        trusted_proxies=[],
+        principal_policies={principal_key("secret", ""): 1},
+    )
+    app, calls = _app(rate_limit=gate)
+    client = TestClient(app)
+    key = {"X-API-Key": "secret"}
+    ok = client.get("/api/v1/status", headers=key)
+    assert ok.status_code == 200
+    assert ok.headers["RateLimit-Remaining"] == "0"
+    assert client.get("/api/v1/status", headers=key).status_code == 429
+    # The IP's own budget is untouched by the key's.
+    assert client.get("/api/v1/status").status_code == 401
+    assert calls == [["*"]]
+
+
+def test_app_headers_it_owns_are_replaced():
+    app, _ = _app()
+    resp = TestClient(app).get("/banner")
+    assert "server" not in resp.headers
+    assert resp.headers.get_list("X-Frame-Options") == ["DENY"]
+
+
+def test_streaming_response_passes_through(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    app, _ = _app()
+    with TestClient(app).stream(
+        "GET", "/api/v1/stream", headers={"X-API-Key": "secret"}
+    ) as resp:
+        body = "".join(resp.iter_text())
+        assert resp.headers["X-API-Version"] == APP_VERSION
+    assert body == "chunk0;chunk1;chunk2;"
+
+
+def test_websockets_pass_through():
+    app, _ = _app()
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_text("ping")
+        assert ws.receive_text() == "ping"
+
+
+def test_metrics_and_response_times_are_recorded(monkeypatch):
+    monkeypatch.delenv("CHATTY_API_KEY", raising=False)
+    registry = MetricsRegistry()
+    window = ResponseTimeWindow()
+    app, _ = _app(metrics=RequestMetrics(registry), response_times=window)
+    client = TestClient(app)
+    client.get("/api/v1/status", headers={"X-API-Key": "secret"})
+    client.get("/api/v1/status")
+
+    samples = registry.counter("http_requests_total").samples()
+    by_status = {labels["status"]: labels["route"] for labels, _ in samples}
+    assert by_status == {"200": "/api/v1/status", "401": "unknown"}
+    assert window.get_average_ms() > 0
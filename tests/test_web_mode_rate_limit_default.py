@@ -1,4 +1,4 @@
-"""The RateLimitMiddleware default must be sane and config-overridable.
+"""The web-mode rate limit default must be sane and config-overridable.
 
 Previously it was wired with requests_per_minute=10000, which effectively
 disabled the limiter. It now defaults to 600/min and reads
@@ -11,7 +11,8 @@ from chatty_commander.app.command_executor import CommandExecutor
 from chatty_commander.app.config import Config
 from chatty_commander.app.model_manager import ModelManager
 from chatty_commander.app.state_manager import StateManager
-from chatty_commander.web.web_mode import RateLimitMiddleware, WebModeServer
+from chatty_commander.web.middleware.edge import EdgeMiddleware
+from chatty_commander.web.web_mode import WebModeServer
 
 
 def _build_server(rate_limit_rpm=None) -> WebModeServer:
@@ -27,8 +28,8 @@ def _build_server(rate_limit_rpm=None) -> WebModeServer:
 
 
 def _rate_limit_rpm(app) -> int:
-    mw = next(m for m in app.user_middleware if m.cls is RateLimitMiddleware)
-    return mw.kwargs["requests_per_minute"]
+    mw = next(m for m in app.user_middleware if m.cls is EdgeMiddleware)
+    return mw.kwargs["rate_limit"].requests_per_minute
 
 
 def test_default_rate_limit_is_sane():
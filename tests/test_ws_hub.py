@@ -0,0 +1,142 @@
+"""Tests for the WebSocket broadcast hub (web/ws_hub.py)."""
+
+import asyncio
+import json
+
+from chatty_commander.obs.metrics import MetricsRegistry
+from chatty_commander.web.ws_hub import BroadcastHub, default_coalesce_key, hub_stats
+
+
+class FakeSocket:
+    def __init__(self, gate: asyncio.Event | None = None, fail: bool = False):
+        self.gate = gate
+        self.fail = fail
+        self.frames: list[str] = []
+
+    async def send_text(self, frame: str) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.frames.append(frame)
+
+
+def _hub(**kwargs):
+    return BroadcastHub("test", registry=MetricsRegistry(), **kwargs)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _state(agent, state):
+    return {"type": "agent_state_change", "data": {"agent_id": agent, "state": state}}
+
+
+def test_coalesce_key_policy():
+    assert default_coalesce_key(_state("a1", "thinking")) == "agent_state_change:a1"
+    assert default_coalesce_key({"type": "telemetry", "data": {}}) == "telemetry"
+    assert default_coalesce_key({"type": "command_detected", "data": {}}) is None
+
+
+async def test_frame_is_serialized_once_and_shared():
+    hub = _hub()
+    sockets = [FakeSocket() for _ in range(3)]
+    await hub.broadcast_json(sockets, {"type": "x", "data": {"n": 1}})
+    await _settle()
+    frames = [s.frames[0] for s in sockets]
+    assert all(f is frames[0] for f in frames)
+    assert json.loads(frames[0]) == {"type": "x", "data": {"n": 1}}
+    hub.close()
+
+
+async def test_slow_client_does_not_stall_others():
+    hub = _hub()
+    gate = asyncio.Event()
+    slow, fast = FakeSocket(gate=gate), FakeSocket()
+    for i in range(3):
+        await asyncio.wait_for(hub.broadcast(frame=f"m{i}", connections=[slow, fast]), 1)
+    await _settle()
+    assert fast.frames == ["m0", "m1", "m2"]
+    assert slow.frames == []
+
+    gate.set()
+    await _settle()
+    assert slow.frames == ["m0", "m1", "m2"]
+    hub.close()
+
+
+async def test_slow_client_keeps_only_latest_state_per_agent():
+    hub = _hub()
+    gate = asyncio.Event()
+    slow = FakeSocket(gate=gate)
+    await hub.broadcast_json([slow], {"type": "hello", "data": {}})  # in flight
+    for state in ("thinking", "responding", "idle"):
+        await hub.broadcast_json([slow], _state("a1", state))
+    await hub.broadcast_json([slow], _state("a2", "thinking"))
+
+    gate.set()
+    await _settle()
+    received = [json.loads(f) for f in slow.frames]
+    assert [m["data"].get("state") for m in received[1:]] == ["idle", "thinking"]
+    assert hub.stats()["connections"][0]["coalesced"] == 2
+    hub.close()
+
+
+async def test_full_outbox_drops_oldest():
+    hub = _hub(max_queue=2)
+    gate = asyncio.Event()
+    slow = FakeSocket(gate=gate)
+    for i in range(5):
+        await hub.broadcast([slow], f"m{i}")
+    gate.set()
+    await _settle()
+    # m0 was already being sent; of the rest only the newest two survive.
+    assert slow.frames == ["m0", "m3", "m4"]
+    assert hub.stats()["connections"][0]["dropped"] == 2
+    hub.close()
+
+
+async def test_failed_send_reports_dead_socket():
+    dead: list = []
+    hub = _hub(on_dead=dead.append)
+    good, bad = FakeSocket(), FakeSocket(fail=True)
+    await hub.broadcast([good, bad], "m")
+    await _settle()
+    assert dead == [bad]
+    assert len(hub) == 1
+
+
+async def test_departed_sockets_are_closed_and_stats_track_lag():
+    hub = _hub()
+    a, b = FakeSocket(), FakeSocket()
+    await hub.broadcast([a, b], "m")
+    await hub.broadcast([a], "n")
+    await _settle()
+    assert len(hub) == 1
+    stats = hub_stats()["test"]
+    assert stats["connections"][0]["sent"] == 2
+    assert stats["connections"][0]["max_lag_ms"] >= 0.0
+    hub.close()
+
+
+def test_ws_stats_route():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from chatty_commander.web.routes.ws import include_ws_routes
+
+    app = FastAPI()
+    app.include_router(
+        include_ws_routes(
+            get_connections=set,
+            set_connections=lambda _c: None,
+            get_state_snapshot=dict,
+        )
+    )
+    hub = _hub()
+    resp = TestClient(app).get("/api/v1/ws/stats")
+    assert resp.status_code == 200
+    assert resp.json()["test"] == {"connections": [], "queued": 0, "max_lag_ms": 0.0}
+    hub.close()
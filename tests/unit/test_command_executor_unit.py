@@ -104,7 +104,7 @@ class TestCommandExecutorExecuteHappyPaths:
             mock_client = Mock()
             mock_resp = Mock(status_code=200)
             mock_client.get.return_value = mock_resp
-            mock_httpx.Client.return_value.__enter__.return_value = mock_client
+            mock_httpx.Client.return_value = mock_client
             # Act
             result = executor.execute_command("url_cmd")
             # Assert
@@ -182,7 +182,7 @@ class TestCommandExecutorExecuteHappyPaths:
             mock_client = Mock()
             mock_resp = Mock(status_code=200)
             mock_client.get.return_value = mock_resp
-            mock_httpx.Client.return_value.__enter__.return_value = mock_client
+            mock_httpx.Client.return_value = mock_client
             # Act
             result = executor.execute_command("old_url")
             # Assert
@@ -559,7 +559,7 @@ class TestCommandExecutorMoreCoverage:
             return_value=_pinned("https://93.184.216.34", "ex.com"),
         ), patch("chatty_commander.app.command_executor.httpx.Client") as cli:
             resp = Mock(status_code=500)
-            cli.return_value.__enter__.return_value.get.return_value = resp
+            cli.return_value.get.return_value = resp
             res = executor.execute_command("u")
             assert res is True
 
@@ -304,9 +304,7 @@ class TestLLMManagerSelectionHasNoSideEffects:
         with patch.dict(os.environ, env, clear=True):
             with patch("openai.OpenAI", return_value=mock_openai_client):
                 with patch("httpx.Client") as MockHttpx:
-                    MockHttpx.return_value.__enter__.return_value = (
-                        mock_httpx_client
-                    )
+                    MockHttpx.return_value = mock_httpx_client
                     with patch(
                         "chatty_commander.utils.url_validator.is_safe_url",
                         return_value=True,
@@ -1514,6 +1514,14 @@ class TestPipelineMatchingHelpersDirect:
         # Assert
         assert match is None
 
+    def test_overridden_keyword_map_is_used_for_matching(self, pipeline: VoicePipeline, mock_config: Mock):
+        # Arrange: aliases come from _get_keyword_map, so an override takes effect
+        pipeline._get_keyword_map = lambda: {"lights": ["bulb"]}
+
+        # Act / Assert
+        assert pipeline._match_command("switch the bulb") == "lights"
+        assert pipeline._match_command("turn on the lamp") is None
+
     def test_process_voice_command_early_returns_on_empty_transcription(self, pipeline: VoicePipeline):
         # Arrange
         pipeline.transcriber.record_and_transcribe = Mock(return_value="")
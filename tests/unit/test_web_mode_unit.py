@@ -127,7 +127,7 @@ class TestGetClientIpAndRateLimit:
         # We just ensure no crash on construction + dispatch call path exercised via await in real
         assert mw.requests_per_minute == 10
         # simple state check
-        assert hasattr(mw, "requests")
+        assert hasattr(mw, "limiter")
 
 
 # ============================================================================